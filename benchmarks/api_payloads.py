@@ -0,0 +1,99 @@
+"""
+Benchmark da serialização e da compressão das respostas grandes da API (core/responses.py).
+
+Monta em memória a resposta de GET /processes/ para um admin (lista de LegalProcess com
+delay_risk) e mede, para a mesma lista:
+  * o caminho padrão do FastAPI: serialização do response_model + json da biblioteca padrão
+    (JSONResponse) contra o mesmo response_model + orjson (FastJSONResponse);
+  * os bytes transferidos sem compressão, com gzip e com brotli (se o pacote estiver instalado),
+    e o tempo de CPU gasto em cada compressão.
+
+Uso:
+    python -m benchmarks.api_payloads [--processes 20000] [--repeat 10]
+
+Não usa banco de dados.
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from typing import List
+
+# Os modelos importam database.py, que exige DATABASE_URL; nenhuma consulta é feita.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.responses import JSONResponse # noqa: E402
+from pydantic import TypeAdapter # noqa: E402
+
+from models.legal_process import LegalProcess # noqa: E402
+from core.responses import BROTLI_QUALITY, GZIP_LEVEL, FastJSONResponse, brotli, orjson # noqa: E402
+
+DELAY_RISKS = ["Baixo", "Médio", "Alto", "N/A"]
+
+
+def build_processes(num_processes: int) -> List[LegalProcess]:
+    rng = random.Random(42)
+    today = date.today()
+    processes = []
+    for i in range(1, num_processes + 1):
+        entry = today - timedelta(days=rng.randint(0, 900))
+        delivery = entry + timedelta(days=rng.randint(30, 400))
+        concluded = delivery + timedelta(days=rng.randint(-20, 20)) if rng.random() < 0.6 else None
+        processes.append(LegalProcess(
+            id=i, process_number=f"{i:07d}-00.0000.8.26.0000", lawyer_id=rng.randint(1, 40), client_id=rng.randint(1, 200),
+            entry_date=entry, delivery_deadline=delivery, fatal_deadline=delivery + timedelta(days=5),
+            data_conclusao_real=concluded, status="concluído" if concluded else "ativo",
+            action_type=rng.choice(["Cível", "Trabalhista", "Tributária"]), delay_risk=rng.choice(DELAY_RISKS),
+        ))
+    return processes
+
+
+def timed(run, repeat: int):
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CPU de serialização e bytes transferidos da listagem de processos.")
+    parser.add_argument("--processes", type=int, default=20000, help="Processos na resposta (padrão 20000)")
+    parser.add_argument("--repeat", type=int, default=10, help="Execuções de cada medição; reporta a mediana (padrão 10)")
+    args = parser.parse_args()
+
+    processes = build_processes(args.processes)
+    # O que o FastAPI faz com o valor retornado por um endpoint com response_model=List[LegalProcess].
+    adapter = TypeAdapter(List[LegalProcess])
+    model_ms, content = timed(lambda: adapter.dump_python(adapter.validate_python(processes), mode="json"), args.repeat)
+
+    stdlib_ms, stdlib_body = timed(lambda: JSONResponse(content).body, args.repeat)
+    fast_ms, body = timed(lambda: FastJSONResponse(content).body, args.repeat)
+    assert json.loads(body) == json.loads(stdlib_body), "orjson e json padrão geraram conteúdos diferentes"
+
+    print(f"{args.processes} processos, JSON de {len(body) / 1024:.0f} KiB (orjson {'instalado' if orjson else 'NÃO instalado'})\n")
+    print(f"{'serialização (mediana)':<40} {'ms':>8}")
+    print(f"{'response_model (pydantic)':<40} {model_ms:8.1f}")
+    print(f"{'json padrão (JSONResponse)':<40} {stdlib_ms:8.1f}")
+    print(f"{'orjson (FastJSONResponse)':<40} {fast_ms:8.1f}")
+    print(f"{'total padrão -> total com orjson':<40} {model_ms + stdlib_ms:8.1f} -> {model_ms + fast_ms:.1f}\n")
+
+    encodings = [("sem compressão", lambda: body), (f"gzip (nível {GZIP_LEVEL})", lambda: gzip.compress(body, GZIP_LEVEL))]
+    if brotli is not None:
+        encodings.append((f"brotli (qualidade {BROTLI_QUALITY})", lambda: brotli.compress(body, quality=BROTLI_QUALITY)))
+    else:
+        print("brotli não instalado: apenas gzip será medido.\n")
+
+    print(f"{'codificação':<40} {'KiB':>8} {'razão':>7} {'CPU (ms)':>9}")
+    for name, compress in encodings:
+        ms, compressed = timed(compress, args.repeat)
+        print(f"{name:<40} {len(compressed) / 1024:8.0f} {len(body) / len(compressed):6.1f}x {ms:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
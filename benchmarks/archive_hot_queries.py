@@ -0,0 +1,165 @@
+"""
+Benchmark das consultas da tabela principal antes e depois do arquivamento (core/archive.py).
+
+Popula um banco descartável com processos em que a maioria está concluída há anos (o caso de
+um escritório com alguns anos de histórico), mede as consultas do dia a dia sobre
+legal_processes, arquiva os concluídos antigos e mede de novo.
+
+Uso:
+    python -m benchmarks.archive_hot_queries [--processes 50000] [--repeat 20]
+
+O banco é um SQLite temporário, a menos que BENCH_DATABASE_URL aponte para outro (ex.: um MySQL
+de testes, para números próximos aos de produção). DATABASE_URL é ignorada: o benchmark nunca
+roda no banco da aplicação, e se recusa a usar um banco que já tenha processos.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+_tmpdir = None
+if os.getenv("BENCH_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"]
+else:
+    _tmpdir = tempfile.TemporaryDirectory(prefix="bench_archive_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir.name}/bench.db"
+
+from sqlalchemy import func, insert # noqa: E402
+
+from database import SessionLocal, engine # noqa: E402
+from models import lawyer, client, legal_process, deadline_calendar, notification_ledger, outbox, scheduler_lease, job_queue, lawyer_delay_stats, legal_process_archive # noqa: E402,F401
+from models.action_type import ActionTypeDB # noqa: E402
+from models.client import AreaOfExpertiseEnum, ClientDB # noqa: E402
+from models.lawyer import LawyerDB # noqa: E402
+from models.legal_process import LegalProcessDB # noqa: E402
+from models.legal_process_archive import LegalProcessArchiveDB, legal_processes_all # noqa: E402
+from migrations import upgrade # noqa: E402
+from core.archive import ARCHIVE_AFTER_DAYS, archive_concluded_processes # noqa: E402
+
+NUM_LAWYERS = 40
+NUM_CLIENTS = 200
+CONCLUDED_SHARE = 0.85 # Fração dos processos concluídos, distribuídos pelos últimos HISTORY_YEARS anos
+HISTORY_YEARS = 6
+INSERT_CHUNK = 5000
+
+
+def populate(num_processes: int) -> None:
+    db = SessionLocal()
+    try:
+        if db.query(LegalProcessDB.id).first() is not None:
+            sys.exit("O banco de benchmark já tem processos; use um banco vazio (BENCH_DATABASE_URL).")
+        db.execute(insert(LawyerDB), [
+            {"id": i, "name": f"Advogado {i}", "oab": f"{i:05d}BM", "email": f"bench{i}@example.com",
+             "username": f"bench{i}", "hashed_password": "-"}
+            for i in range(1, NUM_LAWYERS + 1)
+        ])
+        areas = list(AreaOfExpertiseEnum)
+        db.execute(insert(ClientDB), [
+            {"id": i, "name": f"Cliente {i}", "area_of_expertise": areas[i % len(areas)]}
+            for i in range(1, NUM_CLIENTS + 1)
+        ])
+        action_types = ["Cível", "Trabalhista", "Tributária"]
+        db.execute(insert(ActionTypeDB), [{"id": i, "name": name} for i, name in enumerate(action_types, start=1)])
+
+        today = date.today()
+        rng = random.Random(42)
+        rows = []
+        for i in range(1, num_processes + 1):
+            if rng.random() < CONCLUDED_SHARE:
+                concluded = today - timedelta(days=rng.randint(1, HISTORY_YEARS * 365))
+                entry = concluded - timedelta(days=rng.randint(30, 400))
+                status, delivery = "concluído", concluded + timedelta(days=rng.randint(-20, 20))
+            else:
+                concluded, entry = None, today - timedelta(days=rng.randint(0, 300))
+                status, delivery = rng.choice(["ativo", "ativo", "ativo", "suspenso"]), today + timedelta(days=rng.randint(-10, 90))
+            rows.append({
+                "process_number": f"{i:07d}-00.0000.8.26.0000", "entry_date": entry,
+                "delivery_deadline": delivery, "fatal_deadline": delivery + timedelta(days=5),
+                "data_conclusao_real": concluded, "status": status, "action_type_id": rng.randint(1, len(action_types)),
+                "lawyer_id": rng.randint(1, NUM_LAWYERS), "client_id": rng.randint(1, NUM_CLIENTS),
+            })
+            if len(rows) == INSERT_CHUNK:
+                db.execute(insert(LegalProcessDB), rows)
+                rows = []
+        if rows:
+            db.execute(insert(LegalProcessDB), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def hot_queries():
+    """As consultas de legal_processes feitas a cada acesso (mesmos filtros de GET /processes/)."""
+    process = LegalProcessDB
+    today = date.today()
+    return {
+        "processos de um advogado": lambda db: db.query(process).filter(process.lawyer_id == 7).all(),
+        "admin: status = ativo": lambda db: db.query(process).filter(process.status == "ativo").all(),
+        "admin: prazo fatal nos próximos 30 dias": lambda db: db.query(process).filter(
+            process.fatal_deadline >= today, process.fatal_deadline <= today + timedelta(days=30)).all(),
+        "admin: todos (painel)": lambda db: db.query(process).all(),
+        "contagem por status": lambda db: db.query(process.status, func.count(process.id)).group_by(process.status).all(),
+    }
+
+
+def measure(repeat: int) -> dict:
+    results = {}
+    for name, run in hot_queries().items():
+        timings = []
+        for _ in range(repeat):
+            db = SessionLocal()
+            try:
+                started = time.perf_counter()
+                run(db)
+                timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                db.close()
+        results[name] = statistics.median(timings)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latência das consultas de legal_processes antes e depois do arquivamento.")
+    parser.add_argument("--processes", type=int, default=50000, help="Quantidade de processos gerados (padrão 50000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Execuções de cada consulta; reporta a mediana (padrão 20)")
+    args = parser.parse_args()
+
+    upgrade(engine)
+    print(f"Gerando {args.processes} processos em {engine.url.render_as_string(hide_password=True)} ...")
+    populate(args.processes)
+
+    before = measure(args.repeat)
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        archived = archive_concluded_processes(db)
+        remaining = db.query(func.count(LegalProcessDB.id)).scalar()
+        in_archive = db.query(func.count(LegalProcessArchiveDB.id)).scalar()
+        in_view = db.query(func.count(legal_processes_all.c.id)).scalar()
+    finally:
+        db.close()
+    archive_seconds = time.perf_counter() - started
+    print(f"Arquivados {archived} processos concluídos há mais de {ARCHIVE_AFTER_DAYS} dias em {archive_seconds:.1f} s "
+          f"(tabela principal: {remaining}, arquivo: {in_archive}, view legal_processes_all: {in_view}).")
+
+    after = measure(args.repeat)
+
+    width = max(len(name) for name in before)
+    print(f"\n{'consulta':<{width}}  {'antes (ms)':>10}  {'depois (ms)':>11}  {'ganho':>6}")
+    for name in before:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<{width}}  {before[name]:10.1f}  {after[name]:11.1f}  {speedup:5.1f}x")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        if _tmpdir is not None:
+            engine.dispose()
+            _tmpdir.cleanup()
@@ -0,0 +1,197 @@
+"""
+Benchmark da codificação de status e tipo de ação dos processos (migração 0008).
+
+Popula um banco descartável no schema anterior (status e action_type como texto, com os mesmos
+índices da migração sobre essas colunas, para a comparação ser justa), mede o espaço ocupado pela
+tabela e pelos índices e as consultas do notificador e da listagem, aplica a migração 0008 e mede
+de novo com as colunas codificadas (status_code SMALLINT, action_type_id e a tabela action_types).
+
+Uso:
+    python -m benchmarks.process_status_codes [--processes 100000] [--repeat 20]
+
+O banco é um SQLite temporário, a menos que BENCH_DATABASE_URL aponte para outro (ex.: um MySQL
+de testes, para números próximos aos de produção). DATABASE_URL é ignorada: o benchmark nunca
+roda no banco da aplicação, e se recusa a usar um banco que já tenha processos.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+_tmpdir = None
+if os.getenv("BENCH_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"]
+else:
+    _tmpdir = tempfile.TemporaryDirectory(prefix="bench_status_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir.name}/bench.db"
+
+from sqlalchemy import text # noqa: E402
+
+from database import engine # noqa: E402
+from migrations import current_revision, upgrade # noqa: E402
+
+REVISION_BEFORE = "0007"
+NUM_LAWYERS = 40
+NUM_CLIENTS = 200
+INSERT_CHUNK = 5000
+# Tipos de ação com nomes do tamanho dos usados pelos escritórios.
+ACTION_TYPES = [
+    "Ação de Indenização por Danos Morais", "Ação Civil Pública Ambiental", "Mandado de Segurança",
+    "Execução Fiscal", "Reclamação Trabalhista", "Licenciamento Ambiental", "Consultivo",
+    "Contencioso Cível", "Contencioso Administrativo", "Regulatório", "Arbitragem", "Contratual",
+    "Ação Anulatória de Auto de Infração", "Recuperação Judicial", "Revisional de Contrato",
+]
+STATUSES = ["ativo"] * 6 + ["suspenso", "concluído", "concluído", "arquivado"]
+# Os mesmos índices criados pela migração 0008, sobre as colunas de texto, só para a medição
+# "antes" (removidos antes da migração).
+_LEGACY_INDEXES = {
+    "ix_bench_legacy_lawyer_status": "lawyer_id, status",
+    "ix_bench_legacy_status_fatal": "status, fatal_deadline",
+    "ix_bench_legacy_action_type": "action_type",
+}
+
+
+def populate(num_processes: int) -> None:
+    with engine.begin() as connection:
+        if connection.execute(text("SELECT 1 FROM legal_processes LIMIT 1")).first() is not None:
+            sys.exit("O banco de benchmark já tem processos; use um banco vazio (BENCH_DATABASE_URL).")
+        connection.execute(text(
+            "INSERT INTO lawyers (id, name, oab, email, username, hashed_password) VALUES (:id, :name, :oab, :email, :username, '-')"
+        ), [{"id": i, "name": f"Advogado {i}", "oab": f"{i:05d}BM", "email": f"bench{i}@example.com", "username": f"bench{i}"}
+            for i in range(1, NUM_LAWYERS + 1)])
+        connection.execute(text("INSERT INTO clients (id, name, area_of_expertise) VALUES (:id, :name, 'AMBIENTAL')"), [
+            {"id": i, "name": f"Cliente {i}"} for i in range(1, NUM_CLIENTS + 1)
+        ])
+
+        insert_process = text(
+            "INSERT INTO legal_processes (process_number, entry_date, delivery_deadline, fatal_deadline, "
+            "data_conclusao_real, status, action_type, lawyer_id, client_id) VALUES "
+            "(:process_number, :entry_date, :delivery_deadline, :fatal_deadline, :data_conclusao_real, :status, :action_type, :lawyer_id, :client_id)"
+        )
+        today = date.today()
+        rng = random.Random(42)
+        rows = []
+        for i in range(1, num_processes + 1):
+            entry = today - timedelta(days=rng.randint(0, 900))
+            delivery = entry + timedelta(days=rng.randint(30, 400))
+            status = rng.choice(STATUSES)
+            rows.append({
+                "process_number": f"{i:07d}-00.0000.8.26.0000", "entry_date": entry, "delivery_deadline": delivery,
+                "fatal_deadline": delivery + timedelta(days=5),
+                "data_conclusao_real": delivery + timedelta(days=rng.randint(-20, 20)) if status == "concluído" else None,
+                "status": status, "action_type": rng.choice(ACTION_TYPES),
+                "lawyer_id": rng.randint(1, NUM_LAWYERS), "client_id": rng.randint(1, NUM_CLIENTS),
+            })
+            if len(rows) == INSERT_CHUNK:
+                connection.execute(insert_process, rows)
+                rows = []
+        if rows:
+            connection.execute(insert_process, rows)
+        for index_name, columns in _LEGACY_INDEXES.items():
+            connection.execute(text(f"CREATE INDEX {index_name} ON legal_processes ({columns})"))
+
+
+def storage() -> dict:
+    """Bytes ocupados pelos dados de legal_processes e pelos seus índices secundários."""
+    with engine.begin() as connection:
+        if engine.dialect.name == "mysql":
+            connection.execute(text("ANALYZE TABLE legal_processes"))
+            row = connection.execute(text(
+                "SELECT data_length, index_length FROM information_schema.TABLES "
+                "WHERE table_schema = DATABASE() AND table_name = 'legal_processes'"
+            )).first()
+            return {"tabela": row.data_length, "índices": row.index_length}
+        # SQLite: páginas de cada b-tree (dbstat), sem o índice único de process_number (igual nos dois casos).
+        sizes = dict(connection.execute(text("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")).all())
+        index_names = [row.name for row in connection.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'legal_processes' AND name NOT LIKE 'sqlite_autoindex%'"
+        ))]
+        return {
+            "tabela": sizes.get("legal_processes", 0),
+            "índices": sum(sizes.get(name, 0) for name in index_names if "process_number" not in name),
+        }
+
+
+def hot_queries(encoded: bool) -> dict:
+    """Mesmas consultas nos dois schemas (SQL equivalente ao gerado pelo ORM em cada versão)."""
+    today = date.today()
+    window = {"date_from": today, "date_to": today + timedelta(days=30)}
+    if encoded:
+        active, by_action_type = "status_code = 1", "action_type_id IN (SELECT id FROM action_types WHERE name LIKE '%Ambiental%')"
+        group_column = "status_code"
+    else:
+        active, by_action_type = "status = 'ativo'", "action_type LIKE '%Ambiental%'"
+        group_column = "status"
+    return {
+        "notificador: ativos com prazo fatal em 30 dias": (
+            f"SELECT id FROM legal_processes WHERE {active} AND fatal_deadline BETWEEN :date_from AND :date_to", window),
+        "listagem: status = ativo": (f"SELECT id, lawyer_id, fatal_deadline FROM legal_processes WHERE {active}", {}),
+        "listagem: tipo de ação contém 'Ambiental'": (f"SELECT id, lawyer_id, fatal_deadline FROM legal_processes WHERE {by_action_type}", {}),
+        "listagem: advogado + status": (f"SELECT id FROM legal_processes WHERE lawyer_id = 7 AND {active}", {}),
+        "contagem por status": (f"SELECT {group_column}, COUNT(*) FROM legal_processes GROUP BY {group_column}", {}),
+    }
+
+
+def measure(encoded: bool, repeat: int) -> dict:
+    results = {}
+    with engine.connect() as connection:
+        for name, (sql, params) in hot_queries(encoded).items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                connection.execute(text(sql), params).all()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = statistics.median(timings)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Espaço e latência de legal_processes antes e depois da codificação de status/tipo de ação.")
+    parser.add_argument("--processes", type=int, default=100000, help="Quantidade de processos gerados (padrão 100000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Execuções de cada consulta; reporta a mediana (padrão 20)")
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        revision = current_revision(connection)
+    if revision not in (None, REVISION_BEFORE):
+        sys.exit(f"O banco de benchmark está na revisão '{revision}'; use um banco vazio (BENCH_DATABASE_URL).")
+    upgrade(engine, REVISION_BEFORE)
+    print(f"Gerando {args.processes} processos em {engine.url.render_as_string(hide_password=True)} ...")
+    populate(args.processes)
+
+    before_storage, before = storage(), measure(False, args.repeat)
+
+    with engine.begin() as connection:
+        for index_name in _LEGACY_INDEXES:
+            connection.execute(text(f"DROP INDEX {index_name}" + (" ON legal_processes" if engine.dialect.name == "mysql" else "")))
+    started = time.perf_counter()
+    upgrade(engine)
+    print(f"Migração 0008 aplicada em {time.perf_counter() - started:.1f} s.")
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as connection:
+            connection.execute(text("VACUUM")) # Devolve as páginas liberadas pela remoção das colunas de texto
+
+    after_storage, after = storage(), measure(True, args.repeat)
+
+    print(f"\n{'espaço de legal_processes':<46}  {'antes (KiB)':>11}  {'depois (KiB)':>12}  {'redução':>7}")
+    for name in before_storage:
+        reduction = 1 - after_storage[name] / before_storage[name] if before_storage[name] else 0.0
+        print(f"{name:<46}  {before_storage[name] / 1024:11.0f}  {after_storage[name] / 1024:12.0f}  {reduction:7.0%}")
+
+    print(f"\n{'consulta':<46}  {'antes (ms)':>11}  {'depois (ms)':>12}  {'ganho':>7}")
+    for name in before:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<46}  {before[name]:11.1f}  {after[name]:12.1f}  {speedup:6.1f}x")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        if _tmpdir is not None:
+            engine.dispose()
+            _tmpdir.cleanup()
@@ -1,15 +1,23 @@
+import json
+from sqlalchemy import func, case
 from sqlalchemy.orm import Session
-from typing import Dict
+from typing import Dict, Optional
+from core.cache import get_cache
 import models.lawyer as lawyer_models
-import models.legal_process as process_models
-from datetime import date
+from models.lawyer_delay_stats import LawyerDelayStatsDB
+from models.legal_process_archive import legal_processes_all
+from datetime import datetime
 
 # Um limiar para considerar as estatísticas de um advogado como relevantes
 MIN_COMPLETED_PROCESSES_THRESHOLD = 3 # Exemplo: advogado precisa ter pelo menos 3 processos concluídos
 
+# As entradas em cache são de uma versão dos dados e nunca ficam desatualizadas; o TTL só libera o espaço das antigas.
+DELAY_STATS_CACHE_TTL_SECONDS = 3600
+
 def calculate_lawyer_delay_statistics(db: Session) -> Dict[int, Dict[str, any]]:
     """
-    Calcula estatísticas de atraso para cada advogado com base em seus processos concluídos.
+    Calcula estatísticas de atraso para cada advogado com base em seus processos concluídos
+    (ativos e arquivados, view legal_processes_all), com uma única agregação (GROUP BY lawyer_id).
 
     Retorna um dicionário mapeando lawyer_id para outro dicionário com:
     {
@@ -17,50 +25,71 @@ def calculate_lawyer_delay_statistics(db: Session) -> Dict[int, Dict[str, any]]:
         'completed_with_info': int (número de processos concluídos com dados suficientes para cálculo)
     }
     """
-    lawyer_stats = {}
-    lawyers = db.query(lawyer_models.LawyerDB).all()
+    process = legal_processes_all.c
+    aggregated = db.query(
+        process.lawyer_id,
+        func.count(process.id).label("completed_with_info"),
+        func.sum(case((process.data_conclusao_real > process.delivery_deadline, 1), else_=0)).label("delayed"),
+    ).filter(
+        process.status == 'concluído',
+        process.delivery_deadline.isnot(None),
+        process.data_conclusao_real.isnot(None)
+    ).group_by(process.lawyer_id)
+    counts = {row.lawyer_id: (row.completed_with_info, int(row.delayed or 0)) for row in aggregated}
 
-    for lawyer in lawyers:
-        completed_processes_query = db.query(process_models.LegalProcessDB).filter(
-            process_models.LegalProcessDB.lawyer_id == lawyer.id,
-            process_models.LegalProcessDB.status == 'concluído',
-            process_models.LegalProcessDB.delivery_deadline.isnot(None),
-            process_models.LegalProcessDB.data_conclusao_real.isnot(None)
-        )
-
-        completed_processes_with_info = completed_processes_query.all()
+    lawyer_stats = {}
+    for (lawyer_id,) in db.query(lawyer_models.LawyerDB.id):
+        completed, delayed = counts.get(lawyer_id, (0, 0))
+        lawyer_stats[lawyer_id] = {
+            'delay_rate': (delayed / completed) if completed > 0 else 0.0, # Sem processos concluídos com informação, sem taxa de atraso.
+            'completed_with_info': completed
+        }
+    return lawyer_stats
 
-        total_completed_with_info = len(completed_processes_with_info)
-        total_delayed = 0
+def refresh_lawyer_delay_statistics(db: Session) -> Dict[int, Dict[str, any]]:
+    """
+    Recalcula as estatísticas de atraso de todos os advogados (calculate_lawyer_delay_statistics)
+    e grava o resultado em lawyer_delay_stats. Executado pelo worker.
+    """
+    lawyer_stats = calculate_lawyer_delay_statistics(db)
 
-        if total_completed_with_info > 0:
-            for process in completed_processes_with_info:
-                # Garante que delivery_deadline e data_conclusao_real são objetos date
-                # SQLAlchemy geralmente retorna objetos date/datetime corretos do banco.
-                # Se viessem como string, precisariam ser convertidos com datetime.strptime.
-                # Para este exemplo, assume-se que são objetos date.
-                if isinstance(process.delivery_deadline, date) and isinstance(process.data_conclusao_real, date):
-                    if process.data_conclusao_real > process.delivery_deadline:
-                        total_delayed += 1
-                else:
-                    # Log ou tratamento se as datas não forem do tipo esperado (improvável com SQLAlchemy).
-                    # Para simplificar, apenas decrementaria total_completed_with_info se uma data fosse inválida
-                    # para não distorcer a taxa de atraso com dados incompletos.
-                    # Ou pode-se simplesmente ignorar este processo na contagem.
-                    # Aqui, considera-se que o filtro do SQLAlchemy já garante que não são None.
-                    # A checagem de tipo é uma segurança adicional.
-                    pass # Processos com datas inválidas não seriam contados como 'com informação' se essa lógica for mais rígida.
+    # Substitui o conteúdo da tabela na mesma transação: a API nunca vê um estado parcial.
+    refreshed_at = datetime.utcnow()
+    db.query(LawyerDelayStatsDB).delete(synchronize_session=False)
+    db.bulk_insert_mappings(LawyerDelayStatsDB, [
+        {'lawyer_id': lawyer_id, 'delay_rate': stats['delay_rate'],
+         'completed_with_info': stats['completed_with_info'], 'refreshed_at': refreshed_at}
+        for lawyer_id, stats in lawyer_stats.items()
+    ])
+    db.commit()
+    return lawyer_stats
 
-            delay_rate = (total_delayed / total_completed_with_info) if total_completed_with_info > 0 else 0.0
-        else:
-            delay_rate = 0.0 # Sem processos concluídos com informação, sem taxa de atraso.
+def _load_lawyer_delay_statistics(db: Session) -> Dict[int, Dict[str, any]]:
+    rows = db.query(LawyerDelayStatsDB).all()
+    if not rows:
+        return calculate_lawyer_delay_statistics(db)
+    return {
+        row.lawyer_id: {'delay_rate': row.delay_rate, 'completed_with_info': row.completed_with_info}
+        for row in rows
+    }
 
-        lawyer_stats[lawyer.id] = {
-            'delay_rate': delay_rate,
-            'completed_with_info': total_completed_with_info
-        }
+def get_lawyer_delay_statistics(db: Session, data_version: Optional[int] = None) -> Dict[int, Dict[str, any]]:
+    """
+    Estatísticas de atraso pré-calculadas pelo worker (mesmo formato de calculate_lawyer_delay_statistics).
+    Enquanto a tabela ainda não foi preenchida, calcula na hora.
 
-    return lawyer_stats
+    Com `data_version` (models/data_version.py, incrementada quando as estatísticas ou os processos
+    mudam), o resultado é lido do cache compartilhado (core/cache.py) daquela versão.
+    """
+    if data_version is None:
+        return _load_lawyer_delay_statistics(db)
+    cached = get_cache().get_or_load(
+        f"delay_stats:{data_version}",
+        lambda: json.dumps(_load_lawyer_delay_statistics(db)).encode("utf-8"),
+        DELAY_STATS_CACHE_TTL_SECONDS,
+    )
+    # As chaves do JSON são strings; os ids dos advogados voltam a ser inteiros.
+    return {int(lawyer_id): stats for lawyer_id, stats in json.loads(cached).items()}
 
 def get_process_delay_risk(lawyer_id: int, lawyer_delay_stats: Dict[int, Dict[str, any]]) -> str:
     """
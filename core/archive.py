@@ -0,0 +1,97 @@
+"""
+Arquivamento dos processos concluídos há mais de ARCHIVE_AFTER_DAYS dias.
+
+Os processos com status 'concluído' e data_conclusao_real anterior ao corte são copiados para
+legal_processes_archive e removidos de legal_processes, em lotes de ARCHIVE_BATCH_SIZE linhas
+(uma transação curta por lote, para não segurar locks da tabela principal por muito tempo).
+Executado diariamente pelo worker (job archive_concluded_processes).
+
+A consulta conjunta (processos ativos e arquivados) fica na view legal_processes_all
+(models/legal_process_archive.py), usada pelas estatísticas de atraso. Os processos arquivados
+mantêm o id (legal_processes não reutiliza ids, migração 0009) e o número do processo, que não
+pode ser usado por um processo novo (archived_process_numbers).
+"""
+import logging
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.orm import Session
+
+from models.deadline_calendar import DeadlineCalendarDB
+from models.legal_process import LegalProcessDB
+from models.legal_process_archive import ARCHIVED_PROCESS_STATUS, LegalProcessArchiveDB
+
+logger = logging.getLogger(__name__)
+
+try:
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+except ValueError:
+    logger.error("ARCHIVE_AFTER_DAYS inválido. Usando padrão de 365 dias.")
+    ARCHIVE_AFTER_DAYS = 365
+
+try:
+    ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+except ValueError:
+    logger.error("ARCHIVE_BATCH_SIZE inválido. Usando padrão de 500.")
+    ARCHIVE_BATCH_SIZE = 500
+
+# Colunas copiadas da tabela principal (mesmos atributos nas duas tabelas; status e tipo de ação
+# são copiados codificados).
+_PROCESS_COLUMNS = (
+    "id", "process_number", "entry_date", "delivery_deadline", "fatal_deadline",
+    "data_conclusao_real", "status", "action_type_id", "lawyer_id", "client_id",
+)
+
+
+def archived_process_numbers(db: Session, process_numbers: Iterable[str]) -> Dict[str, int]:
+    """
+    Números de processo (dentre `process_numbers`) que pertencem a processos arquivados, com o id
+    de cada um. O índice único de legal_processes não enxerga o arquivo; criação e atualização
+    de processos consultam aqui para manter o número único nas duas tabelas.
+    """
+    process_numbers = {number for number in process_numbers if number is not None}
+    if not process_numbers:
+        return {}
+    return {
+        row.process_number: row.id
+        for row in db.query(LegalProcessArchiveDB.id, LegalProcessArchiveDB.process_number)
+        .filter(LegalProcessArchiveDB.process_number.in_(process_numbers))
+    }
+
+
+def archive_concluded_processes(db: Session, today: Optional[date] = None, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move para o arquivo os processos concluídos antes do corte. Retorna quantos foram arquivados."""
+    cutoff = (today or date.today()) - timedelta(days=ARCHIVE_AFTER_DAYS)
+    source_columns = [getattr(LegalProcessDB, name) for name in _PROCESS_COLUMNS]
+    target_columns = [getattr(LegalProcessArchiveDB, name) for name in _PROCESS_COLUMNS]
+    total = 0
+
+    while True:
+        # FOR UPDATE: um processo reaberto (status alterado) durante o lote não é arquivado pela metade.
+        ids = [row.id for row in db.query(LegalProcessDB.id).filter(
+            LegalProcessDB.status == ARCHIVED_PROCESS_STATUS,
+            LegalProcessDB.data_conclusao_real.isnot(None),
+            LegalProcessDB.data_conclusao_real < cutoff,
+        ).order_by(LegalProcessDB.id).limit(batch_size).with_for_update(skip_locked=True)]
+        if not ids:
+            break
+
+        db.execute(insert(LegalProcessArchiveDB).from_select(
+            [*target_columns, LegalProcessArchiveDB.archived_at],
+            select(*source_columns, literal(datetime.utcnow())).where(LegalProcessDB.id.in_(ids)),
+        ))
+        # Processos concluídos não têm entradas no calendário (só os ativos); a remoção é uma garantia
+        # para a FK, já que o DELETE em massa abaixo não dispara os eventos de LegalProcessDB.
+        db.execute(delete(DeadlineCalendarDB).where(DeadlineCalendarDB.process_id.in_(ids)))
+        # O histórico de notificações (notification_ledger) é removido pela FK (ON DELETE CASCADE).
+        db.execute(delete(LegalProcessDB).where(LegalProcessDB.id.in_(ids)))
+        db.commit()
+
+        total += len(ids)
+        logger.info(f"Arquivados {len(ids)} processo(s) concluído(s) antes de {cutoff.isoformat()} (total: {total}).")
+        if len(ids) < batch_size:
+            break
+
+    return total
@@ -0,0 +1,57 @@
+"""
+Usuários iniciais criados no startup da API: o admin e o advogado de teste.
+
+Uma única consulta verifica os dois (por username, OAB ou email); apenas os ausentes são
+criados, e o hash das senhas (bcrypt, lento) só é calculado nesse caso. Em produção, com os
+usuários já cadastrados, a verificação pode ser desligada com BOOTSTRAP_USERS=false.
+"""
+import logging
+import os
+from typing import List
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.lawyer import LawyerDB
+
+logger = logging.getLogger(__name__)
+
+BOOTSTRAP_USERS = os.getenv("BOOTSTRAP_USERS", "true").lower() in ("1", "true", "yes")
+
+DEFAULT_USERS = (
+    # Admin (as rotas administrativas reconhecem a OAB 00001SP ou o username "admin").
+    {"name": "Admin User", "oab": "00001SP", "email": "admin@example.com", "username": "admin", "password": "admin"},
+    # Advogado de teste.
+    {"name": "Advogado de Teste", "oab": "12345SP", "email": "advogado@example.com", "username": "advogado", "password": "advogado"},
+)
+
+
+def ensure_bootstrap_users(db: Session) -> List[str]:
+    """Cria os usuários de DEFAULT_USERS que ainda não existem. Retorna os usernames criados."""
+    from core.security import get_password_hash
+
+    existing = db.query(LawyerDB.username, LawyerDB.oab, LawyerDB.email).filter(or_(
+        LawyerDB.username.in_([user["username"] for user in DEFAULT_USERS]),
+        LawyerDB.oab.in_([user["oab"] for user in DEFAULT_USERS]),
+        LawyerDB.email.in_([user["email"] for user in DEFAULT_USERS]),
+    )).all()
+    taken = {value for row in existing for value in row}
+
+    missing = [user for user in DEFAULT_USERS if not taken.intersection((user["username"], user["oab"], user["email"]))]
+    if not missing:
+        return []
+
+    for user in missing:
+        db.add(LawyerDB(
+            name=user["name"], oab=user["oab"], email=user["email"], username=user["username"],
+            hashed_password=get_password_hash(user["password"]), telegram_id=None,
+        ))
+    try:
+        db.commit()
+    except IntegrityError as e:
+        # Outro processo da API (ex.: uvicorn --workers) criou os usuários ao mesmo tempo.
+        db.rollback()
+        logger.warning(f"Usuários iniciais já criados por outro processo: {e}")
+        return []
+    return [user["username"] for user in missing]
@@ -0,0 +1,272 @@
+"""
+Cálculo de prazos em dias úteis com calendários de feriados plugáveis.
+
+Cada calendário (nacional, estadual, de tribunal) define seus feriados e pode herdar de
+outros calendários. Para um calendário, uma tabela de ordinais de dias úteis é pré-calculada
+uma única vez (e memoizada): ordinal[i] = quantidade de dias úteis do início da tabela até o dia i.
+Com ela, "quantos dias úteis entre A e B" e "N dias úteis após D" custam O(1) por consulta,
+e a conversão de muitas datas é apenas indexação em um array.
+"""
+import os
+from array import array
+from bisect import bisect_left
+from datetime import date, timedelta
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Calendário usado por padrão nos cálculos de prazo (ex.: janela de notificação do Telegram).
+BUSINESS_DAYS_CALENDAR: str = os.getenv("BUSINESS_DAYS_CALENDAR", "BR")
+
+# Anos cobertos pela tabela pré-calculada ao redor do ano corrente; é estendida sob demanda.
+_TABLE_YEARS_BEFORE = 2
+_TABLE_YEARS_AFTER = 3
+
+
+def easter_sunday(year: int) -> date:
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher, calendário gregoriano)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+class HolidayCalendar:
+    """
+    Calendário de feriados.
+
+    Args:
+        name: Identificador do calendário (ex.: "BR", "BR-SP", "TJSP").
+        fixed: Feriados de data fixa, como tuplas (mês, dia).
+        easter_offsets: Feriados móveis, em dias relativos ao Domingo de Páscoa (ex.: -2 = Sexta-feira Santa).
+        dates: Datas específicas (ex.: feriados municipais decretados, suspensões de expediente).
+        recess: Períodos anuais sem contagem de prazo, como ((mês, dia) inicial, (mês, dia) final),
+                podendo atravessar a virada do ano (ex.: recesso forense de 20/12 a 20/01).
+        parents: Calendários cujos feriados também se aplicam (ex.: estadual herda o nacional).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fixed: Iterable[Tuple[int, int]] = (),
+        easter_offsets: Iterable[int] = (),
+        dates: Iterable[date] = (),
+        recess: Iterable[Tuple[Tuple[int, int], Tuple[int, int]]] = (),
+        parents: Sequence["HolidayCalendar"] = (),
+    ):
+        self.name = name
+        self.fixed = tuple(fixed)
+        self.easter_offsets = tuple(easter_offsets)
+        self.dates = frozenset(dates)
+        self.recess = tuple(recess)
+        self.parents = tuple(parents)
+
+    def holidays_for_year(self, year: int) -> FrozenSet[date]:
+        return _holidays_for_year(self, year)
+
+    def is_holiday(self, day: date) -> bool:
+        return day in self.holidays_for_year(day.year)
+
+    def __repr__(self) -> str:
+        return f"HolidayCalendar({self.name!r})"
+
+
+@lru_cache(maxsize=256)
+def _holidays_for_year(calendar: HolidayCalendar, year: int) -> FrozenSet[date]:
+    holidays = set()
+    for month, day in calendar.fixed:
+        holidays.add(date(year, month, day))
+    if calendar.easter_offsets:
+        easter = easter_sunday(year)
+        for offset in calendar.easter_offsets:
+            holidays.add(easter + timedelta(days=offset))
+    holidays.update(d for d in calendar.dates if d.year == year)
+    for (start_month, start_day), (end_month, end_day) in calendar.recess:
+        # Um recesso que atravessa o ano contribui com o trecho final do ano anterior e o inicial do seguinte.
+        if (start_month, start_day) <= (end_month, end_day):
+            ranges = [(date(year, start_month, start_day), date(year, end_month, end_day))]
+        else:
+            ranges = [(date(year, 1, 1), date(year, end_month, end_day)),
+                      (date(year, start_month, start_day), date(year, 12, 31))]
+        for start, end in ranges:
+            current = start
+            while current <= end:
+                holidays.add(current)
+                current += timedelta(days=1)
+    for parent in calendar.parents:
+        holidays.update(parent.holidays_for_year(year))
+    return frozenset(holidays)
+
+
+# --- Registro de calendários ---
+_CALENDARS: Dict[str, HolidayCalendar] = {}
+
+
+def register_holiday_calendar(calendar: HolidayCalendar) -> HolidayCalendar:
+    """Registra (ou substitui) um calendário pelo nome e descarta as tabelas memoizadas dele."""
+    _CALENDARS[calendar.name] = calendar
+    get_business_day_table.cache_clear()
+    return calendar
+
+
+def get_holiday_calendar(name: Optional[str] = None) -> HolidayCalendar:
+    name = name or BUSINESS_DAYS_CALENDAR
+    try:
+        return _CALENDARS[name]
+    except KeyError:
+        raise ValueError(f"Calendário de feriados desconhecido: '{name}'. Disponíveis: {', '.join(sorted(_CALENDARS))}.")
+
+
+class BusinessDayTable:
+    """
+    Tabela pré-calculada de dias úteis de um calendário entre start e end (inclusive).
+
+    - ordinals[i]: número de dias úteis em [start, start + i] (array compacto de inteiros).
+    - business_dates: lista ordenada dos dias úteis do período (inverso de ordinals).
+    """
+
+    def __init__(self, calendar: HolidayCalendar, start: date, end: date):
+        self.calendar = calendar
+        self.start = start
+        self.end = end
+        self.ordinals = array("i")
+        self.business_dates: List[date] = []
+        count = 0
+        current = start
+        while current <= end:
+            if current.weekday() < 5 and not calendar.is_holiday(current):
+                count += 1
+                self.business_dates.append(current)
+            self.ordinals.append(count)
+            current += timedelta(days=1)
+        self._start_ordinal = start.toordinal()
+
+    def covers(self, day: date) -> bool:
+        return self.start <= day <= self.end
+
+    def _index(self, day: date) -> int:
+        index = day.toordinal() - self._start_ordinal
+        if index < 0 or index >= len(self.ordinals):
+            raise ValueError(f"Data {day} fora do período pré-calculado ({self.start} a {self.end}).")
+        return index
+
+    def ordinal(self, day: date) -> int:
+        """Número de dias úteis de start até day (inclusive)."""
+        return self.ordinals[self._index(day)]
+
+    def ordinals_for(self, days: Iterable[date]) -> List[int]:
+        """Ordinais de várias datas (uma indexação por data), para comparações em lote."""
+        start_ordinal = self._start_ordinal
+        ordinals = self.ordinals
+        return [ordinals[day.toordinal() - start_ordinal] for day in days]
+
+    def is_business_day(self, day: date) -> bool:
+        index = self._index(day)
+        previous = self.ordinals[index - 1] if index > 0 else 0
+        return self.ordinals[index] != previous
+
+    def business_days_between(self, start: date, end: date) -> int:
+        """Dias úteis em (start, end]; negativo se end < start."""
+        return self.ordinal(end) - self.ordinal(start)
+
+    def add_business_days(self, day: date, n: int) -> date:
+        """
+        Data que fica n dias úteis após day (n >= 0) ou antes (n < 0).
+        Se day não for útil, a contagem parte do último dia útil anterior a ele.
+        """
+        position = self.ordinal(day) - 1 + n
+        if position < 0 or position >= len(self.business_dates):
+            raise ValueError(f"Resultado fora do período pré-calculado ({self.start} a {self.end}).")
+        if n < 0 and not self.is_business_day(day):
+            position += 1 # day não é útil: o dia útil anterior já conta como o primeiro passo para trás.
+        return self.business_dates[position]
+
+    def next_business_day(self, day: date) -> date:
+        """day, se for útil; caso contrário, o próximo dia útil (prorrogação do prazo, CPC art. 224 §1º)."""
+        position = bisect_left(self.business_dates, day)
+        if position >= len(self.business_dates):
+            raise ValueError(f"Resultado fora do período pré-calculado ({self.start} a {self.end}).")
+        return self.business_dates[position]
+
+    def previous_business_day(self, day: date) -> date:
+        """Último dia útil estritamente anterior a day."""
+        position = bisect_left(self.business_dates, day) - 1
+        if position < 0:
+            raise ValueError(f"Resultado fora do período pré-calculado ({self.start} a {self.end}).")
+        return self.business_dates[position]
+
+
+_table_lock = Lock()
+_TABLE_RANGE_OVERRIDES: Dict[str, Tuple[int, int]] = {}
+
+
+@lru_cache(maxsize=32)
+def get_business_day_table(calendar_name: Optional[str] = None) -> BusinessDayTable:
+    """Tabela memoizada do calendário (padrão: BUSINESS_DAYS_CALENDAR)."""
+    calendar = get_holiday_calendar(calendar_name)
+    this_year = date.today().year
+    first_year, last_year = _TABLE_RANGE_OVERRIDES.get(
+        calendar.name, (this_year - _TABLE_YEARS_BEFORE, this_year + _TABLE_YEARS_AFTER)
+    )
+    return BusinessDayTable(calendar, date(first_year, 1, 1), date(last_year, 12, 31))
+
+
+def get_business_day_table_for(*days: date, calendar_name: Optional[str] = None) -> BusinessDayTable:
+    """
+    Tabela memoizada que cobre todas as datas informadas (com margem de um ano para
+    somas de dias úteis); estende o período pré-calculado se necessário.
+    """
+    table = get_business_day_table(calendar_name)
+    if all(table.covers(day) for day in days):
+        return table
+    with _table_lock:
+        table = get_business_day_table(calendar_name)
+        if all(table.covers(day) for day in days):
+            return table
+        first_year = min([table.start.year] + [day.year - 1 for day in days])
+        last_year = max([table.end.year] + [day.year + 1 for day in days])
+        _TABLE_RANGE_OVERRIDES[table.calendar.name] = (first_year, last_year)
+        get_business_day_table.cache_clear()
+        return get_business_day_table(calendar_name)
+
+
+def add_business_days(day: date, n: int, calendar_name: Optional[str] = None) -> date:
+    return get_business_day_table_for(day, calendar_name=calendar_name).add_business_days(day, n)
+
+
+def business_days_between(start: date, end: date, calendar_name: Optional[str] = None) -> int:
+    return get_business_day_table_for(start, end, calendar_name=calendar_name).business_days_between(start, end)
+
+
+def is_business_day(day: date, calendar_name: Optional[str] = None) -> bool:
+    return get_business_day_table_for(day, calendar_name=calendar_name).is_business_day(day)
+
+
+def previous_business_day(day: date, calendar_name: Optional[str] = None) -> date:
+    return get_business_day_table_for(day, calendar_name=calendar_name).previous_business_day(day)
+
+
+# Feriados nacionais (Lei 662/1949, Lei 6.802/1980, Lei 14.759/2023) e datas móveis em que não há expediente forense.
+NATIONAL_BR = register_holiday_calendar(HolidayCalendar(
+    "BR",
+    fixed=[(1, 1), (4, 21), (5, 1), (9, 7), (10, 12), (11, 2), (11, 15), (11, 20), (12, 25)],
+    easter_offsets=[-48, -47, -2, 60], # Carnaval (segunda e terça), Sexta-feira Santa, Corpus Christi.
+))
+
+# Exemplos de calendários estaduais; outros podem ser registrados com register_holiday_calendar.
+register_holiday_calendar(HolidayCalendar("BR-SP", fixed=[(7, 9)], parents=[NATIONAL_BR])) # Revolução Constitucionalista.
+register_holiday_calendar(HolidayCalendar("BR-RJ", fixed=[(4, 23)], parents=[NATIONAL_BR])) # Dia de São Jorge.
+
+# Contagem forense: nacional + suspensão de prazos de 20/12 a 20/01 (CPC, art. 220).
+register_holiday_calendar(HolidayCalendar("BR-FORENSE", recess=[((12, 20), (1, 20))], parents=[NATIONAL_BR]))
@@ -0,0 +1,394 @@
+"""
+Backends de cache da API: usuário autenticado (core.security), estatísticas de atraso
+(core.analytics) e respostas das listagens (core/query_cache.py).
+
+CACHE_BACKEND escolhe a implementação (get_cache()):
+  * "local" (padrão): LRU em memória limitado em bytes (LocalCache), um por processo;
+  * "redis": servidor que fala o protocolo do Redis (RedisCache, em CACHE_REDIS_URL), compartilhado
+    pelos workers do uvicorn e preservado entre deploys: um processo novo encontra o cache pronto
+    em vez de refazer todas as consultas ao mesmo tempo;
+  * "tiered": L1 local na frente do L2 Redis (TieredCache). As remoções (delete) são publicadas
+    no canal CACHE_INVALIDATION_CHANNEL e tiram a chave do L1 dos demais processos.
+
+Os valores são bytes (a serialização é de quem chama). Falhas de comunicação com o Redis não
+derrubam requisições: são registradas no log e o cache se comporta como vazio por
+CACHE_REDIS_RETRY_SECONDS segundos, até a próxima tentativa de conexão.
+
+Para desenvolvimento e testes sem um Redis instalado: python -m core.cache_server
+"""
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local").lower()
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "processos:")
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "processos:invalidacoes")
+
+try:
+    CACHE_LOCAL_MAX_BYTES = int(os.getenv("CACHE_LOCAL_MAX_BYTES", str(64 * 1024 * 1024)))
+except ValueError:
+    logger.error("CACHE_LOCAL_MAX_BYTES inválido. Usando padrão de 64 MiB.")
+    CACHE_LOCAL_MAX_BYTES = 64 * 1024 * 1024
+
+try:
+    # Tempo máximo de uma entrada no L1 do modo "tiered": limita o efeito de uma invalidação
+    # perdida (o pub/sub não guarda mensagens enquanto um processo está reconectando).
+    CACHE_L1_TTL_SECONDS = int(os.getenv("CACHE_L1_TTL_SECONDS", "60"))
+except ValueError:
+    logger.error("CACHE_L1_TTL_SECONDS inválido. Usando padrão de 60 segundos.")
+    CACHE_L1_TTL_SECONDS = 60
+
+CACHE_REDIS_TIMEOUT_SECONDS = 0.5
+CACHE_REDIS_RETRY_SECONDS = 5
+CACHE_REDIS_POOL_SIZE = 8
+
+# Locks por faixa de chave para get_or_load (uma carga por chave em andamento, sem um lock por chave).
+_LOAD_LOCK_STRIPES = 64
+
+
+class CacheBackend:
+    """Interface comum dos caches. `ttl` em segundos; None mantém até ser descartado."""
+
+    def __init__(self) -> None:
+        self._load_locks = [threading.Lock() for _ in range(_LOAD_LOCK_STRIPES)]
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, object]:
+        raise NotImplementedError
+
+    def get_or_load(self, key: str, loader: Callable[[], bytes], ttl: Optional[float] = None) -> bytes:
+        """
+        Valor da chave ou, na falta, o resultado de `loader` (que é gravado). Requisições
+        simultâneas para a mesma chave neste processo aguardam uma única carga.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._load_locks[zlib.crc32(key.encode("utf-8")) % _LOAD_LOCK_STRIPES]:
+            value = self.get(key)
+            if value is None:
+                value = loader()
+                self.set(key, value, ttl)
+        return value
+
+
+class LocalCache(CacheBackend):
+    """LRU em memória, limitado pela soma dos tamanhos dos valores, com TTL por entrada."""
+
+    def __init__(self, max_bytes: int = CACHE_LOCAL_MAX_BYTES) -> None:
+        super().__init__()
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remove(self, key: str) -> None:
+        # Chamado com o lock.
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if len(value) > self.max_bytes:
+            return # Um valor maior que o cache inteiro só expulsaria todos os outros.
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expires_at, value)
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "backend": "local", "entries": len(self._entries), "size_bytes": self._size, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            }
+
+
+# --- Cliente do protocolo do Redis (RESP) ---
+
+class RedisError(Exception):
+    """Erro devolvido pelo servidor (resposta "-ERR ...")."""
+
+
+class _RedisConnection:
+    def __init__(self, host: str, port: int, db: int, password: Optional[str], timeout: Optional[float]) -> None:
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+        try:
+            if password:
+                self.command("AUTH", password)
+            if db:
+                self.command("SELECT", db)
+        except Exception:
+            self.close()
+            raise
+
+    def send(self, *args) -> None:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        self.sock.sendall(b"".join(parts))
+
+    def read_reply(self):
+        line = self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Conexão com o Redis encerrada.")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload
+        if kind == b"-":
+            raise RedisError(payload.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            return None if length < 0 else self.reader.read(length + 2)[:-2]
+        if kind == b"*":
+            length = int(payload)
+            return None if length < 0 else [self.read_reply() for _ in range(length)]
+        raise ConnectionError(f"Resposta inválida do Redis: {line[:50]!r}")
+
+    def command(self, *args):
+        self.send(*args)
+        return self.read_reply()
+
+    def close(self) -> None:
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisCache(CacheBackend):
+    """Cache em um servidor compatível com o Redis (GET/SET PX/DEL/PUBLISH/SUBSCRIBE)."""
+
+    def __init__(self, url: str = CACHE_REDIS_URL, key_prefix: str = CACHE_KEY_PREFIX,
+                 timeout: float = CACHE_REDIS_TIMEOUT_SECONDS, pool_size: int = CACHE_REDIS_POOL_SIZE) -> None:
+        super().__init__()
+        parts = urlsplit(url)
+        self._address = (parts.hostname or "localhost", parts.port or 6379)
+        self._db = int(parts.path.lstrip("/") or 0)
+        self._password = unquote(parts.password) if parts.password else None
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+        self._pool: "queue.LifoQueue[_RedisConnection]" = queue.LifoQueue(maxsize=pool_size)
+        self._unavailable_until = 0.0
+        self._subscribers: List[threading.Thread] = []
+        self._closed = threading.Event()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _connect(self, timeout: Optional[float]) -> _RedisConnection:
+        return _RedisConnection(*self._address, self._db, self._password, timeout)
+
+    def _execute(self, *args):
+        """Executa um comando; None (e cache "vazio") se o servidor estiver inacessível."""
+        if time.monotonic() < self._unavailable_until:
+            return None
+        try:
+            connection = self._pool.get_nowait()
+        except queue.Empty:
+            connection = None
+        try:
+            if connection is None:
+                connection = self._connect(self.timeout)
+            reply = connection.command(*args)
+        except RedisError as e:
+            self.errors += 1
+            logger.error(f"Erro do Redis em {args[0]}: {e}")
+            if connection is not None:
+                self._release(connection)
+            return None
+        except (OSError, ConnectionError) as e:
+            self.errors += 1
+            if connection is not None:
+                connection.close()
+            self._unavailable_until = time.monotonic() + CACHE_REDIS_RETRY_SECONDS
+            logger.warning(f"Redis inacessível em {self._address[0]}:{self._address[1]} ({e}). Nova tentativa em {CACHE_REDIS_RETRY_SECONDS}s.")
+            return None
+        self._release(connection)
+        return reply
+
+    def _release(self, connection: _RedisConnection) -> None:
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._execute("GET", self.key_prefix + key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if ttl:
+            self._execute("SET", self.key_prefix + key, value, "PX", max(1, int(ttl * 1000)))
+        else:
+            self._execute("SET", self.key_prefix + key, value)
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self._execute("DEL", *(self.key_prefix + key for key in keys))
+
+    def publish(self, channel: str, message: str) -> None:
+        self._execute("PUBLISH", channel, message)
+
+    def subscribe(self, channel: str, callback: Callable[[bytes], None]) -> None:
+        """Chama `callback` (em uma thread própria) a cada mensagem do canal, reconectando após falhas."""
+        def listen() -> None:
+            while not self._closed.is_set():
+                connection = None
+                try:
+                    connection = self._connect(timeout=None) # Bloqueia até a próxima mensagem
+                    connection.send("SUBSCRIBE", channel)
+                    while not self._closed.is_set():
+                        reply = connection.read_reply()
+                        if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                            callback(reply[2])
+                except (OSError, ConnectionError, RedisError) as e:
+                    if not self._closed.is_set():
+                        logger.warning(f"Assinatura do canal {channel} interrompida ({e}). Reconectando em {CACHE_REDIS_RETRY_SECONDS}s.")
+                        self._closed.wait(CACHE_REDIS_RETRY_SECONDS)
+                except Exception as e:
+                    logger.error(f"Erro ao processar mensagem do canal {channel}: {e}", exc_info=True)
+                finally:
+                    if connection is not None:
+                        connection.close()
+
+        thread = threading.Thread(target=listen, name=f"cache-subscriber-{channel}", daemon=True)
+        thread.start()
+        self._subscribers.append(thread)
+
+    def close(self) -> None:
+        self._closed.set()
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "backend": "redis", "address": f"{self._address[0]}:{self._address[1]}/{self._db}",
+            "available": time.monotonic() >= self._unavailable_until,
+            "hits": self.hits, "misses": self.misses, "errors": self.errors,
+        }
+
+
+class TieredCache(CacheBackend):
+    """L1 em memória na frente do L2 compartilhado, com invalidação do L1 via pub/sub."""
+
+    def __init__(self, local: LocalCache, shared: RedisCache, channel: str = CACHE_INVALIDATION_CHANNEL,
+                 l1_ttl: float = CACHE_L1_TTL_SECONDS) -> None:
+        super().__init__()
+        self.local = local
+        self.shared = shared
+        self.channel = channel
+        self.l1_ttl = l1_ttl
+        self._origin = uuid.uuid4().hex # Identifica as próprias mensagens, que são ignoradas
+        self.invalidations_received = 0
+        shared.subscribe(channel, self._on_invalidation)
+
+    def _l1_ttl(self, ttl: Optional[float]) -> float:
+        return min(ttl, self.l1_ttl) if ttl else self.l1_ttl
+
+    def _on_invalidation(self, message: bytes) -> None:
+        origin, _, keys = message.decode("utf-8").partition(" ")
+        if origin != self._origin:
+            self.invalidations_received += 1
+            self.local.delete(*keys.split(" "))
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.local.get(key)
+        if value is None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value, self.l1_ttl)
+        return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self.shared.set(key, value, ttl)
+        self.local.set(key, value, self._l1_ttl(ttl))
+
+    def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        self.local.delete(*keys)
+        self.shared.delete(*keys)
+        # Chaves não têm espaços (ver get_cache): a mensagem é "<origem> <chave> <chave>...".
+        self.shared.publish(self.channel, " ".join((self._origin, *keys)))
+
+    def stats(self) -> Dict[str, object]:
+        return {"backend": "tiered", "l1": self.local.stats(), "l2": self.shared.stats(),
+                "invalidations_received": self.invalidations_received}
+
+
+@lru_cache(maxsize=1)
+def get_cache() -> CacheBackend:
+    """
+    Cache do processo, criado no primeiro uso conforme CACHE_BACKEND. As chaves não devem conter
+    espaços (são separadas por espaço nas mensagens de invalidação).
+    """
+    if CACHE_BACKEND == "redis":
+        logger.info(f"Cache: Redis em {CACHE_REDIS_URL}.")
+        return RedisCache()
+    if CACHE_BACKEND == "tiered":
+        logger.info(f"Cache: L1 local ({CACHE_LOCAL_MAX_BYTES} bytes) + L2 Redis em {CACHE_REDIS_URL}.")
+        return TieredCache(LocalCache(), RedisCache())
+    if CACHE_BACKEND != "local":
+        logger.error(f"CACHE_BACKEND inválido: '{CACHE_BACKEND}'. Usando cache local.")
+    return LocalCache()
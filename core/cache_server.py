@@ -0,0 +1,117 @@
+"""
+Servidor mínimo compatível com o protocolo do Redis, para desenvolvimento e testes do cache
+compartilhado (CACHE_BACKEND=redis ou tiered) sem um Redis instalado.
+
+Implementa apenas o que core/cache.py usa: PING, AUTH, SELECT, GET, SET (com EX/PX), DEL,
+PUBLISH e SUBSCRIBE. Os dados ficam em memória e se perdem ao encerrar. Não use em produção.
+
+Uso:
+    python -m core.cache_server [--host 127.0.0.1] [--port 6379]
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode(item) for item in value)
+    return b"+%s\r\n" % str(value).encode("utf-8") # Resposta simples (ex.: OK, PONG)
+
+
+class CacheServer:
+    def __init__(self) -> None:
+        self._data: Dict[bytes, Tuple[Optional[float], bytes]] = {}
+        self._channels: Dict[bytes, Set[asyncio.StreamWriter]] = defaultdict(set)
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+            del self._data[key]
+            entry = None
+        return entry[1] if entry else None
+
+    def _execute(self, writer: asyncio.StreamWriter, command: bytes, args: list) -> bytes:
+        if command == b"PING":
+            return _encode("PONG")
+        if command in (b"AUTH", b"SELECT"):
+            return _encode("OK") # Um único banco, sem senha
+        if command == b"GET":
+            return _encode(self._get(args[0]))
+        if command == b"SET":
+            expires_at = None
+            options = [arg.upper() for arg in args[2:]]
+            for unit, scale in ((b"EX", 1.0), (b"PX", 0.001)):
+                if unit in options:
+                    expires_at = time.monotonic() + int(args[2 + options.index(unit) + 1]) * scale
+            self._data[args[0]] = (expires_at, args[1])
+            return _encode("OK")
+        if command == b"DEL":
+            return _encode(sum(self._data.pop(key, None) is not None for key in args))
+        if command == b"PUBLISH":
+            subscribers = list(self._channels.get(args[0], ()))
+            for subscriber in subscribers:
+                subscriber.write(_encode([b"message", args[0], args[1]]))
+            return _encode(len(subscribers))
+        if command == b"SUBSCRIBE":
+            replies = []
+            for count, channel in enumerate(args, start=1):
+                self._channels[channel].add(writer)
+                replies.append(_encode([b"subscribe", channel, count]))
+            return b"".join(replies)
+        return b"-ERR unknown command '%s'\r\n" % command
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                if not header.startswith(b"*"):
+                    writer.write(b"-ERR protocol error\r\n")
+                    break
+                args = []
+                for _ in range(int(header[1:])):
+                    length = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                writer.write(self._execute(writer, args[0].upper(), args[1:]))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            for subscribers in self._channels.values():
+                subscribers.discard(writer)
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.handle, host, port)
+        logger.info(f"Servidor de cache (protocolo Redis) ouvindo em {host}:{port}.")
+        async with server:
+            await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor de cache em memória compatível com o protocolo do Redis.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    try:
+        asyncio.run(CacheServer().serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 import os
+import logging
 from dotenv import load_dotenv
 
 # Carrega variáveis de ambiente do arquivo .env
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Chave secreta para assinar JWTs.
 # IMPORTANTE: Esta é uma chave padrão APENAS para desenvolvimento.
 # Em um ambiente de produção, ISTO DEVE ser substituído por uma chave secreta forte e única,
@@ -20,3 +23,17 @@ ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES",
 if SECRET_KEY == "your-default-secret-key-for-dev-only-change-this":
     print("AVISO: Usando SECRET_KEY padrão. Isso não é seguro e deve ser usado apenas para desenvolvimento.")
     print("Por favor, defina uma SECRET_KEY forte em seu arquivo .env para produção.")
+
+# Modo de recebimento de updates do bot do Telegram: "polling" (padrão; long polling no worker líder)
+# ou "webhook" (o Telegram envia os updates para a rota /telegram/webhook da API).
+# Lidos aqui, e não em telegram_bot.py, para que a API não importe python-telegram-bot só para consultá-los.
+TELEGRAM_UPDATE_MODE: str = os.getenv("TELEGRAM_UPDATE_MODE", "polling").strip().lower()
+if TELEGRAM_UPDATE_MODE not in ("polling", "webhook"):
+    logger.error(f"Invalid TELEGRAM_UPDATE_MODE: '{TELEGRAM_UPDATE_MODE}'. Must be 'polling' or 'webhook'. Using 'polling'.")
+    TELEGRAM_UPDATE_MODE = "polling"
+TELEGRAM_WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL") # URL pública da rota, ex.: https://meu-dominio/telegram/webhook
+TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET") # Enviado pelo Telegram no header X-Telegram-Bot-Api-Secret-Token
+# Modo offline da rota do webhook (desenvolvimento/testes): o bot da API não acessa o Telegram. getMe é
+# respondido localmente e as respostas dos comandos são apenas registradas no log, de modo que updates
+# gravados enviados com curl chegam aos handlers sem rede (e sem TELEGRAM_BOT_TOKEN).
+TELEGRAM_WEBHOOK_OFFLINE: bool = os.getenv("TELEGRAM_WEBHOOK_OFFLINE", "false").lower() in ("1", "true", "yes")
@@ -0,0 +1,84 @@
+from datetime import date
+from typing import Iterable, List, Optional
+
+from sqlalchemy import select, delete, insert, union_all, literal
+from sqlalchemy.orm import Session
+
+from models.legal_process import LegalProcessDB
+from models.deadline_calendar import DeadlineCalendarDB, DeadlineTypeEnum, CALENDAR_PROCESS_STATUS
+
+
+def _calendar_source_select(*extra_filters):
+    """SELECT (data, tipo, processo) equivalente às linhas mantidas pelos eventos de LegalProcessDB."""
+    selects = []
+    for column, deadline_type in (
+        (LegalProcessDB.delivery_deadline, DeadlineTypeEnum.ENTREGA.value),
+        (LegalProcessDB.fatal_deadline, DeadlineTypeEnum.FATAL.value),
+    ):
+        selects.append(
+            select(column, literal(deadline_type), LegalProcessDB.id).where(
+                LegalProcessDB.status == CALENDAR_PROCESS_STATUS,
+                column.isnot(None),
+                *extra_filters
+            )
+        )
+    return union_all(*selects)
+
+
+def refresh_process_deadlines(db: Session, process_ids: Iterable[int]) -> None:
+    """
+    Recalcula as linhas de calendário de um conjunto de processos.
+    Necessário após escritas em massa (query.update), que não disparam os eventos do ORM.
+    """
+    process_ids = list(process_ids)
+    if not process_ids:
+        return
+    db.execute(delete(DeadlineCalendarDB).where(DeadlineCalendarDB.process_id.in_(process_ids)))
+    db.execute(insert(DeadlineCalendarDB).from_select(
+        ["deadline_date", "deadline_type", "process_id"],
+        _calendar_source_select(LegalProcessDB.id.in_(process_ids))
+    ))
+
+
+def rebuild_deadline_calendar(db: Session) -> None:
+    """Reconstrói o calendário inteiro com um único INSERT ... SELECT."""
+    db.execute(delete(DeadlineCalendarDB))
+    db.execute(insert(DeadlineCalendarDB).from_select(
+        ["deadline_date", "deadline_type", "process_id"],
+        _calendar_source_select()
+    ))
+
+
+def get_deadline_entries(
+    db: Session,
+    date_from: date,
+    date_to: date,
+    deadline_type: Optional[DeadlineTypeEnum] = None,
+    lawyer_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> List:
+    """
+    Prazos entre date_from e date_to (inclusive), ordenados por data, via busca no índice
+    (deadline_date, deadline_type) do calendário. Cada linha traz os campos de DeadlineEntry.
+    Com `limit`, só os primeiros prazos são lidos do banco.
+    """
+    query = db.query(
+        DeadlineCalendarDB.deadline_date,
+        DeadlineCalendarDB.deadline_type,
+        DeadlineCalendarDB.process_id,
+        LegalProcessDB.process_number,
+        LegalProcessDB.lawyer_id,
+        LegalProcessDB.client_id,
+        LegalProcessDB.action_type,
+    ).join(LegalProcessDB, LegalProcessDB.id == DeadlineCalendarDB.process_id).filter(
+        DeadlineCalendarDB.deadline_date >= date_from,
+        DeadlineCalendarDB.deadline_date <= date_to,
+    )
+    if deadline_type is not None:
+        query = query.filter(DeadlineCalendarDB.deadline_type == DeadlineTypeEnum(deadline_type).value)
+    if lawyer_id is not None:
+        query = query.filter(LegalProcessDB.lawyer_id == lawyer_id)
+    query = query.order_by(DeadlineCalendarDB.deadline_date, DeadlineCalendarDB.process_id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
@@ -0,0 +1,71 @@
+"""
+Tradução de IntegrityError (violação de unicidade ou de chave estrangeira) em respostas HTTP.
+
+As escritas da API confiam nas constraints do banco (índices únicos e chaves estrangeiras) em vez
+de consultar antes de gravar: um único INSERT/UPDATE, sem a janela de corrida entre a verificação
+e a escrita. Quando uma constraint é violada, integrity_error_column identifica a coluna pela
+mensagem do driver (MySQL, SQLite ou PostgreSQL) e raise_integrity_error responde com a mensagem
+específica daquele campo.
+"""
+import re
+from functools import lru_cache
+from typing import Callable, Dict, NoReturn, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import Base
+
+_COLUMN_PATTERNS = (
+    re.compile(r"UNIQUE constraint failed: \w+\.(\w+)"), # SQLite
+    re.compile(r"Duplicate entry .* for key '(?:\w+\.)?(\w+)'"), # MySQL (nome do índice)
+    re.compile(r"FOREIGN KEY \(`(\w+)`\)"), # MySQL
+    re.compile(r"Key \((\w+)\)=\("), # PostgreSQL
+)
+
+
+@lru_cache(maxsize=1)
+def _constraint_columns() -> Dict[str, str]:
+    """Nome de índice/constraint de coluna única -> coluna (ex.: ix_lawyers_email -> email)."""
+    columns = {}
+    for table in Base.metadata.tables.values():
+        for constraint in list(table.indexes) + list(table.constraints):
+            constraint_columns = list(constraint.columns)
+            if constraint.name and len(constraint_columns) == 1:
+                columns[str(constraint.name)] = constraint_columns[0].name
+    return columns
+
+
+def integrity_error_column(error: IntegrityError) -> Optional[str]:
+    """Coluna cuja constraint foi violada, ou None quando o banco não a informa (ex.: FK no SQLite)."""
+    message = str(error.orig)
+    for pattern in _COLUMN_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            name = match.group(1)
+            return _constraint_columns().get(name, name)
+    return None
+
+
+def raise_integrity_error(
+    db: Session,
+    error: IntegrityError,
+    messages: Dict[str, Tuple[int, str]],
+    default: str,
+    find_column: Optional[Callable[[], Optional[str]]] = None,
+) -> NoReturn:
+    """
+    Desfaz a transação e levanta a HTTPException de `messages` ({coluna: (status, detalhe)})
+    correspondente à constraint violada; sem correspondência, 400 com `default`.
+
+    `find_column` é consultado (já após o rollback) quando o banco não informa a coluna, por
+    exemplo para descobrir qual das chaves estrangeiras aponta para um registro inexistente.
+    Assim as consultas de verificação só acontecem no caminho de erro.
+    """
+    db.rollback()
+    column = integrity_error_column(error)
+    if column is None and find_column is not None:
+        column = find_column()
+    status_code, detail = messages.get(column, (status.HTTP_400_BAD_REQUEST, default))
+    raise HTTPException(status_code=status_code, detail=detail) from error
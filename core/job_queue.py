@@ -0,0 +1,150 @@
+"""
+Fila de jobs durável no banco (tabela job_queue).
+
+Produtores (o scheduler do worker líder, endpoints) chamam enqueue_job; os workers chamam
+claim_jobs, que reserva jobs pendentes com SELECT ... FOR UPDATE SKIP LOCKED: linhas já
+travadas por outro worker são puladas em vez de bloquear, então a fila escala horizontalmente.
+Jobs concluídos ou que falharam definitivamente são removidos após JOB_RETENTION_DAYS dias
+(purge_finished_jobs, job diário do worker).
+"""
+import logging
+import os
+import traceback
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.job_queue import JobDB, JobStatusEnum
+
+logger = logging.getLogger(__name__)
+
+# Job "executando" há mais tempo que isto é considerado abandonado (worker morreu) e volta para a fila.
+JOB_LOCK_TIMEOUT = timedelta(minutes=30)
+
+# Espera base entre tentativas (dobra a cada falha).
+JOB_RETRY_BACKOFF = timedelta(seconds=30)
+
+try:
+    JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "7"))
+except ValueError:
+    logger.error("JOB_RETENTION_DAYS inválido. Usando padrão de 7 dias.")
+    JOB_RETENTION_DAYS = 7
+
+# Linhas removidas por DELETE na limpeza (transações curtas, sem travar a fila por muito tempo).
+PURGE_BATCH_SIZE = 1000
+
+
+def enqueue_job(db: Session, job_type: str, payload: Optional[dict] = None, run_after: Optional[datetime] = None,
+                dedup_key: Optional[str] = None, max_attempts: int = 3) -> Optional[JobDB]:
+    """
+    Enfileira um job. Com dedup_key, um segundo enfileiramento da mesma chave é ignorado
+    (retorna None). Faz commit.
+    """
+    job = JobDB(
+        job_type=job_type, payload=payload or {}, dedup_key=dedup_key, max_attempts=max_attempts,
+        run_after=run_after or datetime.utcnow(), status=JobStatusEnum.PENDENTE.value,
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.info(f"Job '{job_type}' com dedup_key '{dedup_key}' já enfileirado. Ignorando.")
+        return None
+    return job
+
+
+def claim_jobs(db: Session, worker_id: str, limit: int = 10) -> List[JobDB]:
+    """Reserva até `limit` jobs prontos para execução para este worker. Faz commit."""
+    now = datetime.utcnow()
+    candidate_ids = [row.id for row in db.query(JobDB.id).filter(
+        JobDB.status == JobStatusEnum.PENDENTE.value,
+        JobDB.run_after <= now,
+    ).order_by(JobDB.run_after, JobDB.id).limit(limit).with_for_update(skip_locked=True)]
+
+    claimed_ids = []
+    for job_id in candidate_ids:
+        # O filtro por status mantém a reserva exclusiva também em bancos sem SKIP LOCKED (ex.: SQLite em desenvolvimento).
+        claimed = db.query(JobDB).filter(
+            JobDB.id == job_id, JobDB.status == JobStatusEnum.PENDENTE.value
+        ).update({
+            JobDB.status: JobStatusEnum.EXECUTANDO.value,
+            JobDB.locked_by: worker_id,
+            JobDB.locked_at: now,
+            JobDB.attempts: JobDB.attempts + 1,
+        }, synchronize_session=False)
+        if claimed:
+            claimed_ids.append(job_id)
+    db.commit()
+
+    if not claimed_ids:
+        return []
+    return db.query(JobDB).filter(JobDB.id.in_(claimed_ids)).order_by(JobDB.run_after, JobDB.id).all()
+
+
+def complete_job(db: Session, job_id: int) -> None:
+    db.query(JobDB).filter(JobDB.id == job_id).update({
+        JobDB.status: JobStatusEnum.CONCLUIDO.value,
+        JobDB.finished_at: datetime.utcnow(),
+        JobDB.last_error: None,
+    }, synchronize_session=False)
+    db.commit()
+
+
+def fail_job(db: Session, job_id: int, error: BaseException) -> None:
+    """Registra a falha; o job volta para a fila com backoff exponencial até esgotar as tentativas."""
+    job = db.query(JobDB).filter(JobDB.id == job_id).first()
+    if not job:
+        return
+    now = datetime.utcnow()
+    job.last_error = "".join(traceback.format_exception(type(error), error, error.__traceback__))[-4000:]
+    job.locked_by = None
+    job.locked_at = None
+    if job.attempts >= job.max_attempts:
+        job.status = JobStatusEnum.FALHOU.value
+        job.finished_at = now
+        logger.error(f"Job {job.id} ({job.job_type}) falhou definitivamente após {job.attempts} tentativas.")
+    else:
+        job.status = JobStatusEnum.PENDENTE.value
+        job.run_after = now + JOB_RETRY_BACKOFF * (2 ** (job.attempts - 1))
+        logger.warning(f"Job {job.id} ({job.job_type}) falhou (tentativa {job.attempts}/{job.max_attempts}); nova tentativa após {job.run_after}.")
+    db.commit()
+
+
+def requeue_stale_jobs(db: Session) -> int:
+    """Devolve à fila os jobs reservados por workers que pararam no meio da execução."""
+    requeued = db.query(JobDB).filter(
+        JobDB.status == JobStatusEnum.EXECUTANDO.value,
+        JobDB.locked_at < datetime.utcnow() - JOB_LOCK_TIMEOUT,
+    ).update({
+        JobDB.status: JobStatusEnum.PENDENTE.value,
+        JobDB.locked_by: None,
+        JobDB.locked_at: None,
+    }, synchronize_session=False)
+    db.commit()
+    if requeued:
+        logger.warning(f"{requeued} job(s) abandonado(s) devolvido(s) à fila.")
+    return requeued
+
+
+def purge_finished_jobs(db: Session, retention_days: int = JOB_RETENTION_DAYS) -> int:
+    """
+    Remove os jobs concluídos ou que falharam definitivamente há mais de `retention_days` dias.
+    Retorna quantos foram removidos. Faz commit a cada lote.
+
+    As dedup_keys dos jobs periódicos incluem a data ou o intervalo; as removidas são de períodos
+    que não voltam a ser enfileirados.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    removed = 0
+    while True:
+        ids = [row.id for row in db.query(JobDB.id).filter(
+            JobDB.status.in_([JobStatusEnum.CONCLUIDO.value, JobStatusEnum.FALHOU.value]),
+            JobDB.finished_at < cutoff,
+        ).order_by(JobDB.id).limit(PURGE_BATCH_SIZE)]
+        if not ids:
+            return removed
+        removed += db.query(JobDB).filter(JobDB.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
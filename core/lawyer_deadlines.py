@@ -0,0 +1,182 @@
+"""
+Próximos prazos de um advogado, para o comando /my_deadlines do bot do Telegram.
+
+O chat é associado ao advogado por LawyerDB.telegram_id (coluna indexada), pelo id numérico do
+chat ou pelo @username do usuário. Advogado e prazos ficam em caches em memória com TTL curto
+(MY_DEADLINES_CACHE_TTL_SECONDS): uma rajada de comandos do mesmo advogado consulta o banco uma
+única vez, e consultas simultâneas para a mesma chave aguardam a mesma carga em vez de repeti-la.
+O acesso ao banco roda em threads (asyncio.to_thread), sem bloquear o loop de updates do bot.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from database import SessionLocal
+from models.lawyer import LawyerDB
+from models.deadline_calendar import DeadlineTypeEnum
+from core.business_days import get_business_day_table_for
+from core.deadline_calendar import get_deadline_entries
+
+logger = logging.getLogger(__name__)
+
+try:
+    MY_DEADLINES_CACHE_TTL_SECONDS = int(os.getenv("MY_DEADLINES_CACHE_TTL_SECONDS", "60"))
+except ValueError:
+    logger.error("MY_DEADLINES_CACHE_TTL_SECONDS inválido. Usando padrão de 60 segundos.")
+    MY_DEADLINES_CACHE_TTL_SECONDS = 60
+
+# Janela (em dias corridos a partir de hoje) e limite de prazos listados por /my_deadlines.
+MY_DEADLINES_WINDOW_DAYS = 30
+MY_DEADLINES_MAX_ENTRIES = 20
+
+# Quantidade máxima de chaves mantidas em cada cache (as menos usadas são descartadas).
+_CACHE_MAX_ENTRIES = 1024
+
+
+class LawyerDeadline(NamedTuple):
+    deadline_date: date
+    deadline_type: str
+    process_number: str
+    action_type: Optional[str]
+    business_days_left: int
+
+
+class _TTLCache:
+    """
+    Cache em memória com expiração por TTL e descarte LRU.
+
+    get_or_load garante uma única carga por chave em andamento: chamadas concorrentes
+    para a mesma chave aguardam o mesmo Future.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = _CACHE_MAX_ENTRIES):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        found, value = self.get(key)
+        if found:
+            return value
+        pending = self._loading.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await loader()
+        except Exception as e:
+            future.set_exception(e)
+            future.exception() # Evita o aviso de exceção não recuperada quando ninguém aguardava.
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._loading.pop(key, None)
+
+
+# chat (id, @username) -> (id, nome) do advogado, ou None se o chat não estiver cadastrado.
+_lawyer_cache = _TTLCache(MY_DEADLINES_CACHE_TTL_SECONDS)
+# id do advogado -> lista de LawyerDeadline.
+_deadlines_cache = _TTLCache(MY_DEADLINES_CACHE_TTL_SECONDS)
+
+
+def _find_lawyer(chat_id: str, username: Optional[str]) -> Optional[Tuple[int, str]]:
+    candidates = [chat_id]
+    if username:
+        candidates.append(f"@{username}")
+    db = SessionLocal()
+    try:
+        lawyer = db.query(LawyerDB.id, LawyerDB.name).filter(LawyerDB.telegram_id.in_(candidates)).order_by(LawyerDB.id).first()
+        return (lawyer.id, lawyer.name) if lawyer else None
+    finally:
+        db.close()
+
+
+def _load_deadlines(lawyer_id: int, today: date) -> List[LawyerDeadline]:
+    date_to = today + timedelta(days=MY_DEADLINES_WINDOW_DAYS)
+    db = SessionLocal()
+    try:
+        rows = get_deadline_entries(db, today, date_to, lawyer_id=lawyer_id, limit=MY_DEADLINES_MAX_ENTRIES)
+    finally:
+        db.close()
+
+    business_days = get_business_day_table_for(today, today, date_to)
+    today_ordinal = business_days.ordinal(today)
+    deadline_ordinals = business_days.ordinals_for(row.deadline_date for row in rows)
+    return [
+        LawyerDeadline(row.deadline_date, row.deadline_type, row.process_number, row.action_type, deadline_ordinal - today_ordinal)
+        for row, deadline_ordinal in zip(rows, deadline_ordinals)
+    ]
+
+
+async def get_lawyer_for_chat(chat_id: Any, username: Optional[str] = None) -> Optional[Tuple[int, str]]:
+    """(id, nome) do advogado cujo telegram_id é o id do chat ou o @username, ou None."""
+    chat_id = str(chat_id)
+    return await _lawyer_cache.get_or_load(
+        (chat_id, username), lambda: asyncio.to_thread(_find_lawyer, chat_id, username)
+    )
+
+
+async def get_upcoming_deadlines(lawyer_id: int) -> List[LawyerDeadline]:
+    """Prazos dos processos ativos do advogado nos próximos MY_DEADLINES_WINDOW_DAYS dias, por data."""
+    today = date.today()
+    return await _deadlines_cache.get_or_load(
+        (lawyer_id, today), lambda: asyncio.to_thread(_load_deadlines, lawyer_id, today)
+    )
+
+
+def format_deadlines_message(lawyer_name: str, deadlines: List[LawyerDeadline]) -> str:
+    if not deadlines:
+        return f"✅ {lawyer_name}, você não tem prazos nos próximos {MY_DEADLINES_WINDOW_DAYS} dias."
+    today = date.today()
+    lines = [f"🗓️ {lawyer_name}, seus prazos nos próximos {MY_DEADLINES_WINDOW_DAYS} dias:\n"]
+    for deadline in deadlines:
+        deadline_type = "Fatal" if deadline.deadline_type == DeadlineTypeEnum.FATAL.value else "Entrega"
+        if deadline.deadline_date == today:
+            days_left = "hoje"
+        elif deadline.business_days_left == 1:
+            days_left = "1 dia útil"
+        else:
+            days_left = f"{deadline.business_days_left} dias úteis"
+        lines.append(
+            f"• {deadline.deadline_date.strftime('%d/%m/%Y')} ({days_left}) - {deadline_type}\n"
+            f"  📄 {deadline.process_number} - {deadline.action_type or 'Ação não especificada'}"
+        )
+    if len(deadlines) >= MY_DEADLINES_MAX_ENTRIES:
+        lines.append(f"\nExibindo os {MY_DEADLINES_MAX_ENTRIES} primeiros. Consulte o painel para a lista completa.")
+    return "\n".join(lines)
@@ -0,0 +1,124 @@
+"""
+Ledger de notificações: garante que cada alerta de prazo seja produzido uma única vez por canal.
+
+As chaves candidatas são verificadas em lote (uma consulta) e as novas são reservadas com INSERT
+protegido pela constraint única, na mesma transação em que a mensagem é gravada no outbox
+(core.outbox). Assim, execuções duplicadas do scheduler (misfire, vários workers) ou reexecuções
+do script de teste não repetem mensagens; quando o outbox esgota as tentativas de entrega,
+o alerta fica "falhou" e a próxima varredura pode reenfileirá-lo.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, NamedTuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.notification_ledger import NotificationLedgerDB, NotificationStatusEnum
+
+logger = logging.getLogger(__name__)
+
+# Canal padrão das notificações de prazo.
+CHANNEL_TELEGRAM = "telegram"
+
+
+class NotificationKey(NamedTuple):
+    process_id: int
+    deadline_type: str
+    deadline_date: object # datetime.date
+    channel: str
+    alert_kind: str
+
+
+def _key_of(row: NotificationLedgerDB) -> NotificationKey:
+    return NotificationKey(row.process_id, row.deadline_type, row.deadline_date, row.channel, row.alert_kind)
+
+
+def _pending_row(key: NotificationKey, now: datetime) -> NotificationLedgerDB:
+    return NotificationLedgerDB(
+        process_id=key.process_id, deadline_type=key.deadline_type, deadline_date=key.deadline_date,
+        channel=key.channel, alert_kind=key.alert_kind,
+        status=NotificationStatusEnum.PENDENTE.value, attempts=1, created_at=now, updated_at=now,
+    )
+
+
+def claim_notifications(db: Session, keys: Iterable[NotificationKey]) -> Dict[NotificationKey, int]:
+    """
+    Reserva as notificações ainda não produzidas (ou cuja entrega falhou definitivamente).
+
+    Retorna {chave: id no ledger} apenas das chaves reservadas; as demais já estão no outbox
+    ou foram entregues e devem ser ignoradas. Não faz commit: o chamador grava as mensagens
+    no outbox, associa-as com link_outbox_messages e faz commit de tudo junto.
+    """
+    keys = set(keys)
+    if not keys:
+        return {}
+
+    now = datetime.utcnow()
+    claimed: Dict[NotificationKey, int] = {}
+
+    # Verificação em lote: uma consulta para todas as chaves candidatas.
+    existing = {
+        _key_of(row): row
+        for row in db.query(NotificationLedgerDB).filter(
+            NotificationLedgerDB.process_id.in_({key.process_id for key in keys}),
+            NotificationLedgerDB.channel.in_({key.channel for key in keys}),
+            NotificationLedgerDB.alert_kind.in_({key.alert_kind for key in keys}),
+        )
+    }
+
+    for key in keys & existing.keys():
+        row = existing[key]
+        if row.status != NotificationStatusEnum.FALHOU.value:
+            continue
+        # A entrega anterior falhou: retoma com UPDATE condicional, para que apenas uma execução vença.
+        retaken = db.query(NotificationLedgerDB).filter(
+            NotificationLedgerDB.id == row.id,
+            NotificationLedgerDB.status == NotificationStatusEnum.FALHOU.value,
+        ).update({
+            NotificationLedgerDB.status: NotificationStatusEnum.PENDENTE.value,
+            NotificationLedgerDB.attempts: NotificationLedgerDB.attempts + 1,
+            NotificationLedgerDB.updated_at: now,
+        }, synchronize_session=False)
+        if retaken:
+            claimed[key] = row.id
+
+    new_keys = keys - existing.keys()
+    if new_keys:
+        new_rows = [_pending_row(key, now) for key in new_keys]
+        try:
+            with db.begin_nested():
+                db.add_all(new_rows)
+            claimed.update((_key_of(row), row.id) for row in new_rows)
+        except IntegrityError:
+            # Outra execução reservou parte das chaves entre a consulta e o INSERT: reserva uma a uma.
+            for key in new_keys:
+                row = _pending_row(key, now)
+                try:
+                    with db.begin_nested():
+                        db.add(row)
+                    claimed[key] = row.id
+                except IntegrityError:
+                    logger.info(f"Notificação {key} já reservada por outra execução. Ignorando.")
+
+    return claimed
+
+
+def link_outbox_messages(db: Session, outbox_id_by_ledger_id: Dict[int, int]) -> None:
+    """Associa cada alerta reservado à mensagem do outbox que o entrega (um executemany). Não faz commit."""
+    if outbox_id_by_ledger_id:
+        db.bulk_update_mappings(NotificationLedgerDB, [
+            {"id": ledger_id, "outbox_id": outbox_id} for ledger_id, outbox_id in outbox_id_by_ledger_id.items()
+        ])
+
+
+def mark_notifications_for_outbox(db: Session, outbox_ids: Iterable[int], sent: bool) -> None:
+    """Propaga ao ledger o resultado final da entrega das mensagens do outbox. Não faz commit."""
+    outbox_ids = list(outbox_ids)
+    if not outbox_ids:
+        return
+    new_status = NotificationStatusEnum.ENVIADO if sent else NotificationStatusEnum.FALHOU
+    db.query(NotificationLedgerDB).filter(NotificationLedgerDB.outbox_id.in_(outbox_ids)).update({
+        NotificationLedgerDB.status: new_status.value,
+        NotificationLedgerDB.updated_at: datetime.utcnow(),
+    }, synchronize_session=False)
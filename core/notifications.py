@@ -1,11 +1,17 @@
 import logging
 import asyncio # Importa asyncio
 from datetime import date, timedelta
+from typing import Optional
 from sqlalchemy.orm import Session, joinedload
 import telegram # Adicionado import para type hint
 from models.legal_process import LegalProcessDB
 from models.lawyer import LawyerDB
+from models.deadline_calendar import DeadlineCalendarDB, DeadlineTypeEnum
+from models.notification_ledger import AlertKindEnum
 from telegram_bot import send_telegram_message, TELEGRAM_ADVANCE_NOTIFICATION_DAYS
+from core.business_days import get_business_day_table_for
+from core.notification_ledger import NotificationKey, CHANNEL_TELEGRAM, claim_notifications, link_outbox_messages
+from core.outbox import add_outbox_messages
 from database import SessionLocal
 
 logger = logging.getLogger(__name__)
@@ -18,6 +24,26 @@ def get_db_session():
     finally:
         db.close()
 
+def get_processes_with_deadlines(db: Session, date_from: date, date_to: date, deadline_type: Optional[DeadlineTypeEnum] = None):
+    """
+    Busca, pelo calendário de prazos (índice por data), os processos ativos com prazo entre
+    date_from e date_to, já com advogado e cliente carregados e ordenados pela data do prazo.
+    """
+    calendar_query = db.query(DeadlineCalendarDB.process_id).filter(
+        DeadlineCalendarDB.deadline_date >= date_from,
+        DeadlineCalendarDB.deadline_date <= date_to
+    )
+    if deadline_type is not None:
+        calendar_query = calendar_query.filter(DeadlineCalendarDB.deadline_type == deadline_type.value)
+    process_ids = {row.process_id for row in calendar_query}
+    if not process_ids:
+        return []
+
+    return db.query(LegalProcessDB).options(
+        joinedload(LegalProcessDB.lawyer),
+        joinedload(LegalProcessDB.client)
+    ).filter(LegalProcessDB.id.in_(process_ids)).order_by(LegalProcessDB.fatal_deadline).all()
+
 def check_and_notify_daily_deadlines(): # NOTE: This function seems unused after async versions were introduced. Consider removal or refactor if still needed.
     """
     Verifica processos com prazos para hoje e notifica o advogado responsável.
@@ -29,13 +55,7 @@ def check_and_notify_daily_deadlines(): # NOTE: This function seems unused after
     logger.info(f"Verificando prazos do dia: {today.strftime('%d/%m/%Y')}")
 
     try:
-        processes_due_today = db.query(LegalProcessDB).options(
-            joinedload(LegalProcessDB.lawyer),
-            joinedload(LegalProcessDB.client)
-        ).filter(
-            LegalProcessDB.status == 'ativo',
-            (LegalProcessDB.delivery_deadline == today) | (LegalProcessDB.fatal_deadline == today)
-        ).all()
+        processes_due_today = get_processes_with_deadlines(db, today, today)
 
         if not processes_due_today:
             logger.info("Nenhum processo com prazo para hoje.")
@@ -77,128 +97,251 @@ def check_and_notify_daily_deadlines(): # NOTE: This function seems unused after
         next(db_gen, None) # Garante que o finally do gerador de sessão seja chamado.
 
 
-async def check_and_notify_daily_deadlines_async(bot: telegram.Bot):
+def _daily_deadline_message(process: LegalProcessDB, today: date, deadline_types: list) -> str:
+    client_name = process.client.name if process.client else "Cliente não especificado"
+    deadline_type_str = " e ".join(
+        "Entrega" if deadline_type == DeadlineTypeEnum.ENTREGA.value else "Fatal" for deadline_type in deadline_types
+    )
+    return (
+        f"📢 ALERTA DE PRAZO PARA HOJE ({today.strftime('%d/%m/%Y')})!\n\n"
+        f"📄 Nº Processo: {process.process_number}\n"
+        f"👤 Cliente: {client_name}\n"
+        f"⚖️ Tipo de Prazo: {deadline_type_str}\n"
+        f"📝 Ação: {process.action_type or 'Não especificada'}"
+    )
+
+
+def _upcoming_fatal_deadline_message(process: LegalProcessDB) -> str:
+    client_name = process.client.name if process.client else "Cliente não especificado"
+    return (
+        f"🔔 ALERTA DE PRAZO FATAL PRÓXIMO!\n\n"
+        f"📄 Nº Processo: {process.process_number}\n"
+        f"👤 Cliente: {client_name}\n"
+        f"🗓️ Prazo Fatal: {process.fatal_deadline.strftime('%d/%m/%Y')}\n"
+        f"📝 Ação: {process.action_type or 'Não especificada'}"
+    )
+
+
+def _enqueue_claimed(db: Session, candidates: list, build_message) -> int:
     """
-    Verifica processos com prazos para hoje e notifica o advogado responsável. (Versão Async)
-
-    Args:
-        bot (telegram.Bot): A instância do bot do Telegram.
+    Reserva no ledger (em lote) as chaves dos candidatos [(processo, [chaves])] e grava no outbox,
+    na mesma transação, uma mensagem por processo com chaves reservadas. Faz commit.
     """
-    if not bot:
-        logger.error("[ASYNC] Instância do bot do Telegram não fornecida para check_and_notify_daily_deadlines_async. Ignorando.")
+    claimed = claim_notifications(db, [key for _, keys in candidates for key in keys])
+
+    messages, ledger_ids_per_message = [], []
+    for process, keys in candidates:
+        keys = [key for key in keys if key in claimed]
+        if not keys:
+            logger.info(f"Alerta do processo {process.process_number} já enfileirado ou enviado. Ignorando.")
+            continue
+        messages.append({"channel": CHANNEL_TELEGRAM, "recipient": process.lawyer.telegram_id, "body": build_message(process, keys)})
+        ledger_ids_per_message.append([claimed[key] for key in keys])
+
+    outbox_rows = add_outbox_messages(db, messages)
+    link_outbox_messages(db, {
+        ledger_id: row.id
+        for row, ledger_ids in zip(outbox_rows, ledger_ids_per_message)
+        for ledger_id in ledger_ids
+    })
+    db.commit()
+    return len(outbox_rows)
+
+
+def enqueue_daily_deadline_notifications(db: Session, today: Optional[date] = None) -> int:
+    """
+    Grava no outbox os alertas dos prazos que vencem hoje (incluindo os prorrogados de dias não
+    úteis anteriores). Retorna a quantidade de mensagens enfileiradas.
+    """
+    today = today or date.today()
+    business_days = get_business_day_table_for(today)
+    if not business_days.is_business_day(today):
+        # Prazos que vencem em dia não útil são prorrogados para o próximo dia útil,
+        # onde serão notificados; evita alertas em fins de semana/feriados e duplicados.
+        logger.info(f"{today.strftime('%d/%m/%Y')} não é dia útil ({business_days.calendar.name}). Verificação de prazos do dia ignorada.")
+        return 0
+    # Janela: dias não úteis desde o último dia útil (prazos prorrogados para hoje) + hoje.
+    window_start = business_days.previous_business_day(today) + timedelta(days=1)
+
+    logger.info(f"Verificando prazos do dia: {today.strftime('%d/%m/%Y')} (vencimentos desde {window_start.strftime('%d/%m/%Y')})")
+    processes_due_today = get_processes_with_deadlines(db, window_start, today)
+    if not processes_due_today:
+        logger.info("Nenhum processo com prazo para hoje.")
+        return 0
+
+    # Chaves do ledger (uma por tipo de prazo vencendo na janela) dos processos notificáveis.
+    candidates = []
+    for process in processes_due_today:
+        lawyer = process.lawyer
+        if lawyer and lawyer.telegram_id:
+            keys = []
+            if process.delivery_deadline and window_start <= process.delivery_deadline <= today:
+                keys.append(NotificationKey(process.id, DeadlineTypeEnum.ENTREGA.value, process.delivery_deadline, CHANNEL_TELEGRAM, AlertKindEnum.VENCIMENTO.value))
+            if process.fatal_deadline and window_start <= process.fatal_deadline <= today:
+                keys.append(NotificationKey(process.id, DeadlineTypeEnum.FATAL.value, process.fatal_deadline, CHANNEL_TELEGRAM, AlertKindEnum.VENCIMENTO.value))
+            candidates.append((process, keys))
+        elif not lawyer:
+            logger.warning(f"Processo {process.process_number} (ID: {process.id}) não possui advogado responsável cadastrado.")
+        elif not lawyer.telegram_id:
+            logger.info(f"Advogado {lawyer.name} (ID: {lawyer.id}) do processo {process.process_number} não possui Telegram ID cadastrado.")
+
+    enqueued = _enqueue_claimed(
+        db, candidates, lambda process, keys: _daily_deadline_message(process, today, [key.deadline_type for key in keys])
+    )
+    logger.info(f"{enqueued} alerta(s) de prazo do dia enfileirado(s) no outbox.")
+    return enqueued
+
+
+def enqueue_upcoming_fatal_deadline_notifications(db: Session, today: Optional[date] = None) -> int:
+    """
+    Grava no outbox os alertas de prazos fatais nos próximos TELEGRAM_ADVANCE_NOTIFICATION_DAYS
+    dias úteis. Retorna a quantidade de mensagens enfileiradas.
+    """
+    today = today or date.today()
+    business_days = get_business_day_table_for(today)
+    if not business_days.is_business_day(today):
+        logger.info(f"{today.strftime('%d/%m/%Y')} não é dia útil ({business_days.calendar.name}). Verificação de prazos fatais futuros ignorada.")
+        return 0
+    # A antecedência é contada em dias úteis: fins de semana e feriados não consomem a janela.
+    limit_date = business_days.add_business_days(today, TELEGRAM_ADVANCE_NOTIFICATION_DAYS)
+
+    logger.info(f"Verificando prazos fatais futuros entre {today.strftime('%d/%m/%Y')} e {limit_date.strftime('%d/%m/%Y')} ({TELEGRAM_ADVANCE_NOTIFICATION_DAYS} dias úteis de antecedência).")
+    upcoming_processes = get_processes_with_deadlines(db, today, limit_date, DeadlineTypeEnum.FATAL)
+    if not upcoming_processes:
+        logger.info(f"Nenhum processo com prazo fatal nos próximos {TELEGRAM_ADVANCE_NOTIFICATION_DAYS} dias úteis.")
+        return 0
+
+    candidates = []
+    for process in upcoming_processes:
+        lawyer = process.lawyer
+        if lawyer and lawyer.telegram_id:
+            # Um único alerta antecipado por prazo fatal: se a data mudar, a chave muda e um novo alerta é enviado.
+            candidates.append((process, [NotificationKey(process.id, DeadlineTypeEnum.FATAL.value, process.fatal_deadline, CHANNEL_TELEGRAM, AlertKindEnum.ANTECEDENCIA.value)]))
+        elif not lawyer:
+            logger.warning(f"Processo {process.process_number} (ID: {process.id}) com prazo fatal futuro não possui advogado responsável.")
+        elif not lawyer.telegram_id:
+            logger.info(f"Advogado {lawyer.name} (ID: {lawyer.id}) do processo {process.process_number} (prazo fatal futuro) não possui Telegram ID.")
+
+    enqueued = _enqueue_claimed(db, candidates, lambda process, keys: _upcoming_fatal_deadline_message(process))
+    logger.info(f"{enqueued} alerta(s) de prazo fatal próximo enfileirado(s) no outbox.")
+    return enqueued
+
+
+def enqueue_process_update_notifications(db: Session, process: LegalProcessDB, previous_lawyer_id: Optional[int],
+                                         previous_deadlines: tuple, actor_id: Optional[int]) -> None:
+    """
+    Grava no outbox, na transação da atualização do processo (sem commit), o aviso ao advogado
+    responsável quando o processo lhe é atribuído ou quando seus prazos mudam. Quem fez a
+    alteração não é notificado sobre a própria ação.
+    """
+    if not process.lawyer_id or process.lawyer_id == actor_id:
+        return
+    lawyer = db.query(LawyerDB).filter(LawyerDB.id == process.lawyer_id).first()
+    if not lawyer or not lawyer.telegram_id:
         return
 
-    db_gen = get_db_session()
-    db: Session = next(db_gen)
-    today = date.today()
+    deadlines_fmt = (
+        f"🗓️ Prazo de Entrega: {process.delivery_deadline.strftime('%d/%m/%Y') if process.delivery_deadline else '-'}\n"
+        f"🗓️ Prazo Fatal: {process.fatal_deadline.strftime('%d/%m/%Y') if process.fatal_deadline else '-'}"
+    )
+    if process.lawyer_id != previous_lawyer_id:
+        body = (
+            f"📌 PROCESSO ATRIBUÍDO A VOCÊ\n\n"
+            f"📄 Nº Processo: {process.process_number}\n"
+            f"{deadlines_fmt}\n"
+            f"📝 Ação: {process.action_type or 'Não especificada'}"
+        )
+    elif (process.delivery_deadline, process.fatal_deadline) != tuple(previous_deadlines):
+        body = (
+            f"✏️ PRAZOS ALTERADOS\n\n"
+            f"📄 Nº Processo: {process.process_number}\n"
+            f"{deadlines_fmt}"
+        )
+    else:
+        return
+    add_outbox_messages(db, [{"channel": CHANNEL_TELEGRAM, "recipient": lawyer.telegram_id, "body": body}])
 
-    logger.info(f"[ASYNC] Verificando prazos do dia: {today.strftime('%d/%m/%Y')}")
 
-    try:
-        processes_due_today = db.query(LegalProcessDB).options(
-            joinedload(LegalProcessDB.lawyer),
-            joinedload(LegalProcessDB.client)
-        ).filter(
-            LegalProcessDB.status == 'ativo',
-            (LegalProcessDB.delivery_deadline == today) | (LegalProcessDB.fatal_deadline == today)
-        ).all()
+# Processos listados na mensagem de reatribuição em massa (o Telegram limita a mensagem a 4096 caracteres).
+REASSIGNMENT_MESSAGE_MAX_PROCESSES = 20
 
-        if not processes_due_today:
-            logger.info("[ASYNC] Nenhum processo com prazo para hoje.")
-            return
+def enqueue_bulk_reassignment_notification(db: Session, lawyer_id: int, processes: list, total: int, actor_id: Optional[int]) -> None:
+    """
+    Grava no outbox, na transação da reatribuição em massa (sem commit), um único aviso ao advogado
+    de destino sobre os `total` processos que passaram a ser dele. `processes` são as primeiras
+    linhas (process_number e fatal_deadline) listadas na mensagem. Como em
+    enqueue_process_update_notifications, quem fez a alteração não é notificado.
+    """
+    if not total or lawyer_id == actor_id:
+        return
+    lawyer = db.query(LawyerDB).filter(LawyerDB.id == lawyer_id).first()
+    if not lawyer or not lawyer.telegram_id:
+        return
 
-        for process in processes_due_today:
-            lawyer = process.lawyer
-            client_name = process.client.name if process.client else "Cliente não especificado"
+    lines = [
+        f"📄 {process.process_number} - Prazo Fatal: {process.fatal_deadline.strftime('%d/%m/%Y') if process.fatal_deadline else '-'}"
+        for process in processes[:REASSIGNMENT_MESSAGE_MAX_PROCESSES]
+    ]
+    if total > len(lines):
+        lines.append(f"... e mais {total - len(lines)} processo(s).")
+    body = f"📌 {total} PROCESSO(S) ATRIBUÍDO(S) A VOCÊ\n\n" + "\n".join(lines)
+    add_outbox_messages(db, [{"channel": CHANNEL_TELEGRAM, "recipient": lawyer.telegram_id, "body": body}])
 
-            if lawyer and lawyer.telegram_id:
-                deadline_type = []
-                if process.delivery_deadline == today:
-                    deadline_type.append("Entrega")
-                if process.fatal_deadline == today:
-                    deadline_type.append("Fatal")
 
-                deadline_type_str = " e ".join(deadline_type)
+def run_notification_producer(producer) -> int:
+    """Executa um produtor de notificações (enqueue_*) em uma sessão própria e curta."""
+    db_gen = get_db_session()
+    db: Session = next(db_gen)
+    try:
+        return producer(db)
+    finally:
+        next(db_gen, None) # Garante que o finally do gerador de sessão seja chamado.
 
-                message = (
-                    f"📢 ALERTA DE PRAZO PARA HOJE ({today.strftime('%d/%m/%Y')})!\n\n"
-                    f"📄 Nº Processo: {process.process_number}\n"
-                    f"👤 Cliente: {client_name}\n"
-                    f"⚖️ Tipo de Prazo: {deadline_type_str}\n"
-                    f"📝 Ação: {process.action_type or 'Não especificada'}"
-                )
 
-                logger.info(f"[ASYNC] Preparando para enviar notificação para Adv. {lawyer.name} (TG ID: {lawyer.telegram_id}) sobre processo {process.process_number}")
-                await send_telegram_message(bot, lawyer.telegram_id, message) # Passa a instância do bot
+async def _produce_and_drain(producer, bot: telegram.Bot) -> None:
+    """Enfileira (sessão curta, em thread) e em seguida drena o outbox com o bot informado."""
+    from core.outbox import drain_outbox, OUTBOX_BATCH_SIZE
+    await asyncio.to_thread(run_notification_producer, producer)
+    worker_id = f"inline:{producer.__name__}"
+    while await drain_outbox(bot, worker_id) == OUTBOX_BATCH_SIZE:
+        pass
 
-            elif not lawyer:
-                logger.warning(f"[ASYNC] Processo {process.process_number} (ID: {process.id}) não possui advogado responsável cadastrado.")
-            elif not lawyer.telegram_id:
-                logger.info(f"[ASYNC] Advogado {lawyer.name} (ID: {lawyer.id}) do processo {process.process_number} não possui Telegram ID cadastrado.")
 
+async def check_and_notify_daily_deadlines_async(bot: telegram.Bot):
+    """
+    Verifica processos com prazos para hoje e notifica o advogado responsável. (Versão Async)
+
+    Enfileira os alertas no outbox e os envia em seguida. O worker usa diretamente
+    enqueue_daily_deadline_notifications e deixa o envio com o drainer do outbox.
+
+    Args:
+        bot (telegram.Bot): A instância do bot do Telegram.
+    """
+    if not bot:
+        logger.error("[ASYNC] Instância do bot do Telegram não fornecida para check_and_notify_daily_deadlines_async. Ignorando.")
+        return
+    try:
+        await _produce_and_drain(enqueue_daily_deadline_notifications, bot)
     except Exception as e:
         logger.error(f"[ASYNC] Erro ao verificar prazos do dia: {e}", exc_info=True)
-    finally:
-        next(db_gen, None) # Garante que o finally do gerador de sessão seja chamado.
 
 
 async def check_and_notify_upcoming_fatal_deadlines_async(bot: telegram.Bot):
     """
     Verifica processos com prazos fatais se aproximando e notifica o advogado responsável. (Versão Async)
 
+    Enfileira os alertas no outbox e os envia em seguida (ver check_and_notify_daily_deadlines_async).
+
     Args:
         bot (telegram.Bot): A instância do bot do Telegram.
     """
     if not bot:
         logger.error("[ASYNC] Instância do bot do Telegram não fornecida para check_and_notify_upcoming_fatal_deadlines_async. Ignorando.")
         return
-
-    db_gen = get_db_session()
-    db: Session = next(db_gen)
-    today = date.today()
-    limit_date = today + timedelta(days=TELEGRAM_ADVANCE_NOTIFICATION_DAYS)
-
-    logger.info(f"[ASYNC] Verificando prazos fatais futuros entre {today.strftime('%d/%m/%Y')} e {limit_date.strftime('%d/%m/%Y')} ({TELEGRAM_ADVANCE_NOTIFICATION_DAYS} dias de antecedência).")
-
     try:
-        upcoming_processes = db.query(LegalProcessDB).options(
-            joinedload(LegalProcessDB.lawyer),
-            joinedload(LegalProcessDB.client)
-        ).filter(
-            LegalProcessDB.status == 'ativo',
-            LegalProcessDB.fatal_deadline >= today,
-            LegalProcessDB.fatal_deadline <= limit_date
-        ).order_by(LegalProcessDB.fatal_deadline).all()
-
-        if not upcoming_processes:
-            logger.info(f"Nenhum processo com prazo fatal nos próximos {TELEGRAM_ADVANCE_NOTIFICATION_DAYS} dias.")
-            return
-
-        for process in upcoming_processes:
-            lawyer = process.lawyer
-            client_name = process.client.name if process.client else "Cliente não especificado"
-
-            if lawyer and lawyer.telegram_id:
-                message = (
-                    f"🔔 ALERTA DE PRAZO FATAL PRÓXIMO!\n\n"
-                    f"📄 Nº Processo: {process.process_number}\n"
-                    f"👤 Cliente: {client_name}\n"
-                    f"🗓️ Prazo Fatal: {process.fatal_deadline.strftime('%d/%m/%Y')}\n"
-                    f"📝 Ação: {process.action_type or 'Não especificada'}"
-                )
-
-                logger.info(f"[ASYNC] Preparando para enviar notificação de prazo fatal futuro para Adv. {lawyer.name} (TG ID: {lawyer.telegram_id}) sobre processo {process.process_number}")
-                await send_telegram_message(bot, lawyer.telegram_id, message) # Passa a instância do bot
-
-            elif not lawyer:
-                logger.warning(f"[ASYNC] Processo {process.process_number} (ID: {process.id}) com prazo fatal futuro não possui advogado responsável.")
-            elif not lawyer.telegram_id:
-                logger.info(f"Advogado {lawyer.name} (ID: {lawyer.id}) do processo {process.process_number} (prazo fatal futuro) não possui Telegram ID.")
-
+        await _produce_and_drain(enqueue_upcoming_fatal_deadline_notifications, bot)
     except Exception as e:
         logger.error(f"Erro ao verificar prazos fatais futuros: {e}", exc_info=True)
-    finally:
-        next(db_gen, None) # Garante que o finally do gerador de sessão seja chamado.
 
 # Exemplo de como poderia ser chamado para teste (requer configuração de BD):
 if __name__ == '__main__':
@@ -0,0 +1,209 @@
+"""
+Outbox transacional de notificações (tabela notification_outbox).
+
+Produtores chamam add_outbox_messages dentro da própria transação (a mensagem só existe se os
+dados que a originaram forem gravados). O drainer (drain_outbox, executado pelo worker) reserva
+lotes com SELECT ... FOR UPDATE SKIP LOCKED, envia fora de qualquer sessão de banco, com
+concorrência limitada, e grava o resultado: sucesso, nova tentativa com backoff ou falha definitiva.
+Mensagens entregues (ou que falharam definitivamente) são removidas após OUTBOX_RETENTION_DAYS dias
+(purge_outbox_messages); o resultado de cada alerta continua registrado no ledger.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from core.notification_ledger import CHANNEL_TELEGRAM, mark_notifications_for_outbox
+from database import SessionLocal
+from models.outbox import OutboxMessageDB, OutboxStatusEnum
+
+logger = logging.getLogger(__name__)
+
+try:
+    OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+except ValueError:
+    logger.error("OUTBOX_BATCH_SIZE inválido. Usando padrão de 50.")
+    OUTBOX_BATCH_SIZE = 50
+
+# Envios simultâneos por drainer (a API do Telegram limita ~30 mensagens/s por bot).
+OUTBOX_SEND_CONCURRENCY = 10
+
+# Espera base entre tentativas (dobra a cada falha).
+OUTBOX_RETRY_BACKOFF = timedelta(minutes=1)
+
+# Mensagem "enviando" há mais tempo que isto é considerada abandonada (drainer morreu) e volta a ser enviada.
+OUTBOX_LOCK_TIMEOUT = timedelta(minutes=10)
+
+try:
+    OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+except ValueError:
+    logger.error("OUTBOX_RETENTION_DAYS inválido. Usando padrão de 7 dias.")
+    OUTBOX_RETENTION_DAYS = 7
+
+# Linhas removidas por DELETE na limpeza.
+OUTBOX_PURGE_BATCH_SIZE = 1000
+
+
+def add_outbox_messages(db: Session, messages: List[dict]) -> List[OutboxMessageDB]:
+    """
+    Grava mensagens no outbox (cada dict com channel, recipient e body) na transação corrente.
+    Faz flush para que os ids fiquem disponíveis, mas não faz commit.
+    """
+    now = datetime.utcnow()
+    rows = [
+        OutboxMessageDB(
+            channel=message.get("channel", CHANNEL_TELEGRAM), recipient=str(message["recipient"]), body=message["body"],
+            status=OutboxStatusEnum.PENDENTE.value, attempts=0, next_attempt_at=now, created_at=now,
+        )
+        for message in messages
+    ]
+    if rows:
+        db.add_all(rows)
+        db.flush()
+    return rows
+
+
+def claim_outbox_messages(db: Session, worker_id: str, limit: int = OUTBOX_BATCH_SIZE) -> List[Tuple[int, str, str, str]]:
+    """Reserva até `limit` mensagens prontas para envio. Retorna (id, channel, recipient, body). Faz commit."""
+    now = datetime.utcnow()
+    ready = or_(
+        and_(OutboxMessageDB.status == OutboxStatusEnum.PENDENTE.value, OutboxMessageDB.next_attempt_at <= now),
+        and_(OutboxMessageDB.status == OutboxStatusEnum.ENVIANDO.value, OutboxMessageDB.locked_at < now - OUTBOX_LOCK_TIMEOUT),
+    )
+    candidate_ids = [row.id for row in db.query(OutboxMessageDB.id).filter(ready).order_by(
+        OutboxMessageDB.next_attempt_at, OutboxMessageDB.id
+    ).limit(limit).with_for_update(skip_locked=True)]
+
+    claimed_ids = []
+    for message_id in candidate_ids:
+        # A condição repetida mantém a reserva exclusiva também em bancos sem SKIP LOCKED (ex.: SQLite).
+        claimed = db.query(OutboxMessageDB).filter(OutboxMessageDB.id == message_id, ready).update({
+            OutboxMessageDB.status: OutboxStatusEnum.ENVIANDO.value,
+            OutboxMessageDB.locked_by: worker_id,
+            OutboxMessageDB.locked_at: now,
+            OutboxMessageDB.attempts: OutboxMessageDB.attempts + 1,
+        }, synchronize_session=False)
+        if claimed:
+            claimed_ids.append(message_id)
+    db.commit()
+
+    if not claimed_ids:
+        return []
+    return [
+        (row.id, row.channel, row.recipient, row.body)
+        for row in db.query(OutboxMessageDB.id, OutboxMessageDB.channel, OutboxMessageDB.recipient, OutboxMessageDB.body)
+        .filter(OutboxMessageDB.id.in_(claimed_ids)).order_by(OutboxMessageDB.id)
+    ]
+
+
+def record_outbox_results(db: Session, sent_ids: List[int], failures: Dict[int, str]) -> None:
+    """Grava o resultado de um lote de envios (e propaga ao ledger os resultados finais). Faz commit."""
+    now = datetime.utcnow()
+    if sent_ids:
+        db.query(OutboxMessageDB).filter(OutboxMessageDB.id.in_(sent_ids)).update({
+            OutboxMessageDB.status: OutboxStatusEnum.ENVIADO.value,
+            OutboxMessageDB.sent_at: now,
+            OutboxMessageDB.locked_by: None,
+            OutboxMessageDB.locked_at: None,
+            OutboxMessageDB.last_error: None,
+        }, synchronize_session=False)
+        mark_notifications_for_outbox(db, sent_ids, sent=True)
+
+    given_up_ids = []
+    if failures:
+        for message in db.query(OutboxMessageDB).filter(OutboxMessageDB.id.in_(list(failures))):
+            message.last_error = failures[message.id]
+            message.locked_by = None
+            message.locked_at = None
+            if message.attempts >= message.max_attempts:
+                message.status = OutboxStatusEnum.FALHOU.value
+                given_up_ids.append(message.id)
+            else:
+                message.status = OutboxStatusEnum.PENDENTE.value
+                message.next_attempt_at = now + OUTBOX_RETRY_BACKOFF * (2 ** (message.attempts - 1))
+        mark_notifications_for_outbox(db, given_up_ids, sent=False)
+    db.commit()
+
+    if given_up_ids:
+        logger.error(f"Outbox: {len(given_up_ids)} mensagem(ns) falharam definitivamente: {given_up_ids}")
+
+
+def purge_outbox_messages(db: Session, retention_days: int = OUTBOX_RETENTION_DAYS) -> int:
+    """
+    Remove as mensagens enviadas há mais de `retention_days` dias e as que falharam definitivamente
+    e foram criadas antes disso. Retorna quantas foram removidas. Faz commit a cada lote.
+    (notification_ledger.outbox_id é ON DELETE SET NULL.)
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    finished = or_(
+        and_(OutboxMessageDB.status == OutboxStatusEnum.ENVIADO.value, OutboxMessageDB.sent_at < cutoff),
+        and_(OutboxMessageDB.status == OutboxStatusEnum.FALHOU.value, OutboxMessageDB.created_at < cutoff),
+    )
+    removed = 0
+    while True:
+        ids = [row.id for row in db.query(OutboxMessageDB.id).filter(finished).order_by(OutboxMessageDB.id).limit(OUTBOX_PURGE_BATCH_SIZE)]
+        if not ids:
+            return removed
+        removed += db.query(OutboxMessageDB).filter(OutboxMessageDB.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+
+
+def _claim(worker_id: str, limit: int):
+    db = SessionLocal()
+    try:
+        return claim_outbox_messages(db, worker_id, limit)
+    finally:
+        db.close()
+
+
+def _record(sent_ids: List[int], failures: Dict[int, str]) -> None:
+    db = SessionLocal()
+    try:
+        record_outbox_results(db, sent_ids, failures)
+    finally:
+        db.close()
+
+
+async def drain_outbox(bot, worker_id: str, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """
+    Envia um lote de mensagens do outbox. Retorna quantas mensagens foram processadas
+    (se igual a batch_size, provavelmente há mais na fila).
+
+    As sessões de banco duram apenas a reserva e a gravação do resultado; o envio acontece sem sessão aberta.
+    """
+    from telegram_bot import send_telegram_message
+
+    messages = await asyncio.to_thread(_claim, worker_id, batch_size)
+    if not messages:
+        return 0
+
+    semaphore = asyncio.Semaphore(OUTBOX_SEND_CONCURRENCY)
+    sent_ids: List[int] = []
+    failures: Dict[int, str] = {}
+
+    async def deliver(message_id: int, channel: str, recipient: str, body: str) -> None:
+        async with semaphore:
+            error: Optional[str] = None
+            if channel != CHANNEL_TELEGRAM:
+                error = f"Canal não suportado: '{channel}'."
+            elif not bot:
+                error = "Bot do Telegram indisponível."
+            else:
+                try:
+                    if not await send_telegram_message(bot, recipient, body):
+                        error = "Falha no envio pelo Telegram (ver logs do worker)."
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+            if error is None:
+                sent_ids.append(message_id)
+            else:
+                failures[message_id] = error
+
+    await asyncio.gather(*(deliver(*message) for message in messages))
+    await asyncio.to_thread(_record, sent_ids, failures)
+    logger.info(f"Outbox: {len(sent_ids)} enviada(s), {len(failures)} com falha, de {len(messages)} reservada(s).")
+    return len(messages)
@@ -0,0 +1,429 @@
+"""
+Índice colunar em memória dos processos da tabela principal (legal_processes), para atender os
+filtros de GET /processes/ sem consultar o banco. Opcional: PROCESS_INDEX_ENABLED=true.
+
+Cada processo ocupa uma posição ("slot") em colunas compactas (array): id, advogado, cliente,
+datas como ordinais e status/tipo de ação como códigos de dicionário. Há listas ordenadas de
+posições por advogado e por cliente e um índice ordenado do prazo fatal para os intervalos
+(fatal_deadline_de/ate). Os nomes de advogados e clientes (expand) ficam em dicionários.
+
+Consistência: o índice corresponde a exatamente uma versão dos dados (models/data_version.py) e
+GET /processes/ só o usa quando essa é a versão lida pela requisição; caso contrário, consulta o
+banco como antes. As escritas feitas pelo ORM neste processo são aplicadas no commit, e o índice
+avança para a versão gravada. Escritas em massa ou de outros processos (worker, outros workers
+do uvicorn) deixam o índice para trás, e ele é recarregado em segundo plano.
+
+Processos arquivados (include_archived=true) são sempre consultados no banco.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, end_savepoint_state, pop_transaction_state, transaction_state
+from models.client import ClientDB
+from models.data_version import COMMITTED_VERSIONS_KEY, PROCESSES_DATA_VERSION, get_data_version
+from models.lawyer import LawyerDB
+from models.legal_process import LegalProcess, LegalProcessDB
+
+logger = logging.getLogger(__name__)
+
+PROCESS_INDEX_ENABLED = os.getenv("PROCESS_INDEX_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Linhas lidas por vez na carga do índice.
+LOAD_BATCH_SIZE = 5000
+
+# Chave do índice de prazo fatal: (ordinal da data << 32) | slot, em um único array ordenado.
+_SLOT_BITS = 32
+_SLOT_MASK = (1 << _SLOT_BITS) - 1
+
+_PROCESS_COLUMNS = ("id", "process_number", "lawyer_id", "client_id", "status", "action_type",
+                    "entry_date", "delivery_deadline", "fatal_deadline", "data_conclusao_real")
+
+
+def _ordinal(value: Optional[date]) -> int:
+    return value.toordinal() if value else 0
+
+def _date(ordinal: int) -> Optional[date]:
+    return date.fromordinal(ordinal) if ordinal else None
+
+
+class _Dictionary:
+    """Códigos inteiros para valores de texto repetidos (status, tipo de ação). O código 0 é None."""
+
+    def __init__(self) -> None:
+        self.values: List[Optional[str]] = [None]
+        self.codes: Dict[Optional[str], int] = {None: 0}
+
+    def code(self, value: Optional[str]) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class _Columns:
+    """Os dados do índice. Uma carga completa monta um objeto novo, trocado de uma só vez."""
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.lawyer_ids = array("q")
+        self.client_ids = array("q")
+        self.statuses = array("I")
+        self.action_types = array("I")
+        self.entry_dates = array("l")
+        self.delivery_deadlines = array("l")
+        self.fatal_deadlines = array("l")
+        self.conclusion_dates = array("l")
+        self.process_numbers: List[Optional[str]] = []
+        self.status_dict = _Dictionary()
+        self.action_type_dict = _Dictionary()
+        self.slot_by_id: Dict[int, int] = {}
+        self.free_slots: List[int] = []
+        self.by_lawyer: Dict[int, array] = {}
+        self.by_client: Dict[int, array] = {}
+        self.fatal_index = array("q")
+        self.lawyers: Dict[int, Tuple[Optional[str], Optional[str]]] = {} # id -> (nome, OAB)
+        self.clients: Dict[int, Optional[str]] = {} # id -> nome
+
+    @property
+    def _arrays(self) -> Tuple[array, ...]:
+        return (self.ids, self.lawyer_ids, self.client_ids, self.statuses, self.action_types,
+                self.entry_dates, self.delivery_deadlines, self.fatal_deadlines, self.conclusion_dates)
+
+    # --- Escrita ---
+
+    def upsert(self, row) -> None:
+        """Insere ou atualiza um processo (objeto com os atributos de _PROCESS_COLUMNS)."""
+        slot = self.slot_by_id.get(row.id)
+        if slot is None:
+            if self.free_slots:
+                slot = self.free_slots.pop()
+            else:
+                slot = len(self.ids)
+                for column in self._arrays:
+                    column.append(0)
+                self.process_numbers.append(None)
+            self.slot_by_id[row.id] = slot
+        else:
+            self._unlink(slot)
+        self.ids[slot] = row.id
+        self.lawyer_ids[slot] = row.lawyer_id or 0
+        self.client_ids[slot] = row.client_id or 0
+        self.statuses[slot] = self.status_dict.code(row.status)
+        self.action_types[slot] = self.action_type_dict.code(row.action_type)
+        self.entry_dates[slot] = _ordinal(row.entry_date)
+        self.delivery_deadlines[slot] = _ordinal(row.delivery_deadline)
+        self.fatal_deadlines[slot] = _ordinal(row.fatal_deadline)
+        self.conclusion_dates[slot] = _ordinal(row.data_conclusao_real)
+        self.process_numbers[slot] = row.process_number
+        self._link(slot)
+
+    def remove(self, process_id: int) -> None:
+        slot = self.slot_by_id.pop(process_id, None)
+        if slot is None:
+            return
+        self._unlink(slot)
+        self.ids[slot] = 0
+        self.process_numbers[slot] = None
+        self.free_slots.append(slot)
+
+    def _link(self, slot: int) -> None:
+        for postings, key in ((self.by_lawyer, self.lawyer_ids[slot]), (self.by_client, self.client_ids[slot])):
+            if key:
+                insort(postings.setdefault(key, array("l")), slot)
+        if self.fatal_deadlines[slot]:
+            insort(self.fatal_index, (self.fatal_deadlines[slot] << _SLOT_BITS) | slot)
+
+    def _unlink(self, slot: int) -> None:
+        for postings, key in ((self.by_lawyer, self.lawyer_ids[slot]), (self.by_client, self.client_ids[slot])):
+            slots = postings.get(key)
+            if slots is not None:
+                position = bisect_left(slots, slot)
+                if position < len(slots) and slots[position] == slot:
+                    del slots[position]
+                if not slots:
+                    del postings[key]
+        if self.fatal_deadlines[slot]:
+            fatal_key = (self.fatal_deadlines[slot] << _SLOT_BITS) | slot
+            position = bisect_left(self.fatal_index, fatal_key)
+            if position < len(self.fatal_index) and self.fatal_index[position] == fatal_key:
+                del self.fatal_index[position]
+
+    # --- Consulta ---
+
+    def search(self, lawyer_id: Optional[int], client_id: Optional[int], status: Optional[str], action_type: Optional[str],
+               fatal_from: Optional[date], fatal_to: Optional[date]) -> List[int]:
+        """Posições dos processos que atendem a todos os filtros, em ordem de id."""
+        status_code = None
+        if status:
+            status_code = self.status_dict.codes.get(status)
+            if status_code is None:
+                return []
+        action_codes = None
+        if action_type:
+            # Como o LIKE do banco (contains), sem diferenciar maiúsculas de minúsculas.
+            needle = action_type.lower()
+            action_codes = {code for code, value in enumerate(self.action_type_dict.values) if value and needle in value.lower()}
+            if not action_codes:
+                return []
+        fatal_range = fatal_from is not None or fatal_to is not None
+        low = _ordinal(fatal_from) if fatal_from else 1
+        high = _ordinal(fatal_to) if fatal_to else date.max.toordinal()
+
+        # Parte da menor fonte disponível (lista do advogado, do cliente ou faixa de prazo fatal)
+        # e confere os demais filtros nas colunas.
+        sources: List[Iterable[int]] = []
+        if lawyer_id is not None:
+            sources.append(self.by_lawyer.get(lawyer_id, ()))
+        if client_id is not None:
+            sources.append(self.by_client.get(client_id, ()))
+        if fatal_range:
+            start = bisect_left(self.fatal_index, low << _SLOT_BITS)
+            end = bisect_left(self.fatal_index, (high + 1) << _SLOT_BITS)
+            sources.append([key & _SLOT_MASK for key in self.fatal_index[start:end]])
+        candidates = min(sources, key=len) if sources else self.slot_by_id.values()
+
+        matches = []
+        for slot in candidates:
+            if lawyer_id is not None and self.lawyer_ids[slot] != lawyer_id:
+                continue
+            if client_id is not None and self.client_ids[slot] != client_id:
+                continue
+            if status_code is not None and self.statuses[slot] != status_code:
+                continue
+            if action_codes is not None and self.action_types[slot] not in action_codes:
+                continue
+            if fatal_range and not (self.fatal_deadlines[slot] and low <= self.fatal_deadlines[slot] <= high):
+                continue
+            matches.append(slot)
+        matches.sort(key=self.ids.__getitem__)
+        return matches
+
+    def to_model(self, slot: int, expand_fields: set) -> LegalProcess:
+        lawyer_id = self.lawyer_ids[slot] or None
+        client_id = self.client_ids[slot] or None
+        extra = {}
+        if "lawyer" in expand_fields:
+            extra["lawyer_name"], extra["lawyer_oab"] = self.lawyers.get(lawyer_id, (None, None))
+        if "client" in expand_fields:
+            extra["client_name"] = self.clients.get(client_id)
+        # Valores já tipados (vieram do banco): model_construct dispensa a validação.
+        return LegalProcess.model_construct(
+            id=self.ids[slot], process_number=self.process_numbers[slot], lawyer_id=lawyer_id, client_id=client_id,
+            entry_date=_date(self.entry_dates[slot]), delivery_deadline=_date(self.delivery_deadlines[slot]),
+            fatal_deadline=_date(self.fatal_deadlines[slot]), data_conclusao_real=_date(self.conclusion_dates[slot]),
+            status=self.status_dict.values[self.statuses[slot]], action_type=self.action_type_dict.values[self.action_types[slot]],
+            delay_risk=None, **extra,
+        )
+
+    def memory_bytes(self) -> Dict[str, int]:
+        """Memória ocupada (aproximada), em bytes, por parte do índice."""
+        def strings(values: Iterable[Optional[str]]) -> int:
+            return sum(sys.getsizeof(value) for value in values if value is not None)
+
+        usage = {
+            "columns": sum(column.buffer_info()[1] * column.itemsize for column in self._arrays),
+            "posting_lists": sum(slots.buffer_info()[1] * slots.itemsize
+                                 for postings in (self.by_lawyer, self.by_client) for slots in postings.values()),
+            "fatal_deadline_index": self.fatal_index.buffer_info()[1] * self.fatal_index.itemsize,
+            "process_numbers": sys.getsizeof(self.process_numbers) + strings(self.process_numbers),
+            "dictionaries": strings(self.status_dict.values) + strings(self.action_type_dict.values)
+                            + strings(name for name, _ in self.lawyers.values()) + strings(self.clients.values()),
+            "lookup_tables": sys.getsizeof(self.slot_by_id) + sys.getsizeof(self.by_lawyer) + sys.getsizeof(self.by_client)
+                             + sys.getsizeof(self.lawyers) + sys.getsizeof(self.clients),
+        }
+        usage["total"] = sum(usage.values())
+        return usage
+
+
+class ProcessIndex:
+    def __init__(self, enabled: bool = PROCESS_INDEX_ENABLED) -> None:
+        self.enabled = enabled
+        self._columns: Optional[_Columns] = None
+        self._version: Optional[int] = None
+        self._lock = threading.RLock()
+        self._loading = False
+        self.loads = 0
+        self.last_load_ms: Optional[float] = None
+        self.served = 0
+        self.fallbacks = 0
+
+    def load(self) -> None:
+        """Carga completa a partir do banco (startup e quando o índice fica para trás)."""
+        started = time.perf_counter()
+        columns = _Columns()
+        db = SessionLocal()
+        try:
+            # A versão é lida antes das linhas: os dados carregados são dessa versão ou mais novos.
+            version = get_data_version(db, PROCESSES_DATA_VERSION)
+            query = db.query(*(getattr(LegalProcessDB, name) for name in _PROCESS_COLUMNS)).order_by(LegalProcessDB.id)
+            for row in query.yield_per(LOAD_BATCH_SIZE):
+                columns.upsert(row)
+            columns.lawyers = {row.id: (row.name, row.oab) for row in db.query(LawyerDB.id, LawyerDB.name, LawyerDB.oab)}
+            columns.clients = {row.id: row.name for row in db.query(ClientDB.id, ClientDB.name)}
+        finally:
+            db.close()
+        with self._lock:
+            self._columns = columns
+            self._version = version
+            self.loads += 1
+            self.last_load_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"Índice de processos carregado: {len(columns.slot_by_id)} processo(s), versão {version}, "
+                    f"{columns.memory_bytes()['total'] / 1024:.0f} KiB em {self.last_load_ms} ms.")
+
+    def _reload_in_background(self) -> None:
+        def run() -> None:
+            try:
+                self.load()
+            except Exception as e:
+                logger.error(f"Erro ao recarregar o índice de processos: {e}", exc_info=True)
+            finally:
+                self._loading = False
+
+        with self._lock:
+            if self._loading:
+                return
+            self._loading = True
+        threading.Thread(target=run, name="process-index-reload", daemon=True).start()
+
+    def search(self, data_version: int, expand_fields: set, **filters) -> Optional[List[LegalProcess]]:
+        """
+        Processos da tabela principal que atendem aos filtros, ou None se o índice não estiver na
+        versão `data_version` (quem chama consulta o banco; a recarga é disparada em segundo plano).
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._columns is not None and self._version == data_version:
+                columns = self._columns
+                self.served += 1
+                return [columns.to_model(slot, expand_fields) for slot in columns.search(**filters)]
+            self.fallbacks += 1
+            behind = self._version is None or self._version < data_version
+        if behind:
+            self._reload_in_background()
+        return None
+
+    def apply_commit(self, committed_version: int, processes: Dict[int, Optional[tuple]], lawyers: Dict[int, Optional[tuple]],
+                     clients: Dict[int, Optional[str]]) -> bool:
+        """
+        Aplica as alterações de um commit que gravou a versão `committed_version`. Só é possível
+        se o índice estiver na versão imediatamente anterior; senão ele fica para trás (recarga).
+        """
+        with self._lock:
+            if self._columns is None or self._version != committed_version - 1:
+                return False
+            columns = self._columns
+            for process_id, values in processes.items():
+                if values is None:
+                    columns.remove(process_id)
+                else:
+                    columns.upsert(_ProcessRow(*values))
+            for lawyer_id, values in lawyers.items():
+                if values is None:
+                    columns.lawyers.pop(lawyer_id, None)
+                else:
+                    columns.lawyers[lawyer_id] = values
+            for client_id, name in clients.items():
+                if name is None:
+                    columns.clients.pop(client_id, None)
+                else:
+                    columns.clients[client_id] = name
+            self._version = committed_version
+            return True
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            columns = self._columns
+            return {
+                "enabled": self.enabled,
+                "ready": columns is not None,
+                "version": self._version,
+                "processes": len(columns.slot_by_id) if columns else 0,
+                "memory_bytes": columns.memory_bytes() if columns else None,
+                "loads": self.loads,
+                "last_load_ms": self.last_load_ms,
+                "served": self.served,
+                "fallbacks": self.fallbacks,
+            }
+
+
+class _ProcessRow(tuple):
+    """Valores de _PROCESS_COLUMNS capturados no flush, com acesso por atributo (como as linhas do banco)."""
+    __slots__ = ()
+
+    def __new__(cls, *values):
+        return super().__new__(cls, values)
+
+    def __getattr__(self, name):
+        return self[_PROCESS_COLUMNS.index(name)]
+
+
+process_index = ProcessIndex()
+
+
+# --- Sincronização com as escritas deste processo ---
+# O flush registra o estado gravado de processos, advogados e clientes; o commit da transação
+# externa aplica ao índice (com a versão gravada por models/data_version.py). O registrado dentro
+# de um SAVEPOINT desfeito é descartado com ele (database.transaction_state). Escritas em massa
+# desses modelos não são descritas pelo flush: o índice fica para trás e é recarregado.
+
+_PENDING_KEY = "process_index_pending"
+_INDEXED_BULK_MODELS = (LegalProcessDB, LawyerDB, ClientDB, None)
+
+def _new_pending():
+    return {}, {}, {}
+
+def _merge_pending(target, source) -> None:
+    for target_values, source_values in zip(target, source):
+        target_values.update(source_values)
+
+@event.listens_for(Session, "after_flush")
+def _process_index_after_flush(session, flush_context):
+    if not process_index.enabled:
+        return
+    pending = None
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, (LegalProcessDB, LawyerDB, ClientDB)):
+            continue
+        if pending is None:
+            pending = transaction_state(session, _PENDING_KEY, _new_pending)
+        processes, lawyers, clients = pending
+        deleted = obj in session.deleted
+        if isinstance(obj, LegalProcessDB):
+            processes[obj.id] = None if deleted else tuple(getattr(obj, name) for name in _PROCESS_COLUMNS)
+        elif isinstance(obj, LawyerDB):
+            lawyers[obj.id] = None if deleted else (obj.name, obj.oab)
+        else:
+            clients[obj.id] = None if deleted else obj.name
+
+@event.listens_for(Session, "after_commit")
+def _process_index_after_commit(session):
+    if end_savepoint_state(session, _PENDING_KEY, _merge_pending):
+        return # RELEASE de um SAVEPOINT: a transação externa ainda pode ser desfeita.
+    pending = pop_transaction_state(session, _PENDING_KEY)
+    committed = session.info.pop(COMMITTED_VERSIONS_KEY, None)
+    if not process_index.enabled or committed is None:
+        return
+    version = committed["versions"].get(PROCESSES_DATA_VERSION)
+    if version is None:
+        return
+    if any(model in _INDEXED_BULK_MODELS for model in committed["bulk_models"]):
+        return # Alterações que o índice não conhece: fica para trás e será recarregado.
+    process_index.apply_commit(version, *(pending or _new_pending()))
+
+@event.listens_for(Session, "after_rollback")
+def _process_index_after_rollback(session):
+    if end_savepoint_state(session, _PENDING_KEY):
+        return
+    pop_transaction_state(session, _PENDING_KEY)
@@ -0,0 +1,90 @@
+"""
+Cache de resultados das consultas de processos (GET /processes/).
+
+Guarda a resposta já serializada (bytes do JSON) de cada combinação de escopo do usuário e filtros
+normalizados, com a versão dos dados (models/data_version.py) lida no início da requisição na
+chave. Toda escrita em processos, advogados, clientes ou estatísticas de atraso incrementa a
+versão no commit: a partir daí as entradas antigas deixam de ser usadas e saem do cache pelo
+descarte LRU ou pelo TTL (PROCESS_QUERY_CACHE_TTL_SECONDS; 0 desativa o cache).
+
+As entradas ficam no backend de core/cache.py: com CACHE_BACKEND=redis ou tiered, são
+compartilhadas pelos workers do uvicorn.
+"""
+import hashlib
+import logging
+import os
+import threading
+from typing import Dict, Hashable, Optional
+
+from core.cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+try:
+    PROCESS_QUERY_CACHE_TTL_SECONDS = int(os.getenv("PROCESS_QUERY_CACHE_TTL_SECONDS", "600"))
+except ValueError:
+    logger.error("PROCESS_QUERY_CACHE_TTL_SECONDS inválido. Usando padrão de 600 segundos.")
+    PROCESS_QUERY_CACHE_TTL_SECONDS = 600
+
+
+def normalize_filters(**filters) -> tuple:
+    """Filtros informados (sem os None), em ordem fixa, para compor a chave do cache."""
+    normalized = []
+    for name in sorted(filters):
+        value = filters[name]
+        if value is None:
+            continue
+        if isinstance(value, (set, frozenset, list, tuple)):
+            value = tuple(sorted(value))
+            if not value:
+                continue
+        normalized.append((name, value))
+    return tuple(normalized)
+
+
+class QueryResultCache:
+    """Respostas serializadas por (versão dos dados, chave), com contadores de acertos e falhas."""
+
+    def __init__(self, namespace: str, ttl_seconds: int) -> None:
+        self.namespace = namespace
+        self.ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _cache_key(self, version: int, key: Hashable) -> str:
+        # repr() dos filtros normalizados é estável entre processos (só tipos simples e datas).
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{version}:{digest}"
+
+    def get(self, version: int, key: Hashable) -> Optional[bytes]:
+        body = get_cache().get(self._cache_key(version, key))
+        with self._lock:
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return body
+
+    def set(self, version: int, key: Hashable, body: bytes) -> None:
+        get_cache().set(self._cache_key(version, key), body, self.ttl)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "enabled": self.enabled,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+        stats["backend"] = get_cache().stats()
+        return stats
+
+
+process_query_cache = QueryResultCache("processes", PROCESS_QUERY_CACHE_TTL_SECONDS)
@@ -0,0 +1,116 @@
+"""
+Refresh tokens com rotação (models/refresh_token.py).
+
+O login (POST /auth/token) emite, junto com o token de acesso, um refresh token opaco. Quando o
+token de acesso expira, o frontend chama POST /auth/refresh com o refresh token e recebe um novo
+par, sem verificar a senha de novo (bcrypt é a operação mais cara da API). Cada refresh token vale
+uma única renovação:
+  * o token apresentado é marcado como usado e substituído por um novo da mesma família;
+  * um token já usado apresentado de novo, passado REFRESH_TOKEN_REUSE_GRACE_SECONDS, indica que
+    ele vazou: a família inteira (a sessão) é revogada. Dentro desse intervalo a renovação é apenas
+    recusada, sem revogar, para tolerar abas do navegador renovando ao mesmo tempo.
+Logout e troca de senha revogam os tokens; os expirados são removidos pelo worker.
+"""
+import hashlib
+import logging
+import os
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+import models.lawyer as lawyer_models
+from models.refresh_token import RefreshTokenDB
+
+logger = logging.getLogger(__name__)
+
+try:
+    REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+except ValueError:
+    logger.error("REFRESH_TOKEN_EXPIRE_DAYS inválido. Usando padrão de 7 dias.")
+    REFRESH_TOKEN_EXPIRE_DAYS = 7
+
+try:
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS = int(os.getenv("REFRESH_TOKEN_REUSE_GRACE_SECONDS", "30"))
+except ValueError:
+    logger.error("REFRESH_TOKEN_REUSE_GRACE_SECONDS inválido. Usando padrão de 30 segundos.")
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS = 30
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def _invalid_refresh_token(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+def issue_refresh_token(db: Session, lawyer_id: int, family_id: Optional[str] = None) -> str:
+    """Cria um refresh token (nova família, se `family_id` não for informado). O commit fica com quem chama."""
+    token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    db.add(RefreshTokenDB(
+        lawyer_id=lawyer_id,
+        family_id=family_id or secrets.token_hex(16),
+        token_hash=_hash_token(token),
+        created_at=now,
+        expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+def rotate_refresh_token(db: Session, token: str) -> Tuple[lawyer_models.LawyerDB, str]:
+    """Troca um refresh token válido por um novo da mesma família. Retorna (advogado, novo token)."""
+    now = datetime.utcnow()
+    # FOR UPDATE: duas renovações simultâneas com o mesmo token não emitem dois sucessores.
+    record = db.query(RefreshTokenDB).filter(RefreshTokenDB.token_hash == _hash_token(token)).with_for_update().first()
+    if record is None or record.revoked_at is not None or record.expires_at <= now:
+        db.rollback()
+        raise _invalid_refresh_token("Refresh token inválido ou expirado.")
+
+    if record.used_at is not None:
+        if now - record.used_at <= timedelta(seconds=REFRESH_TOKEN_REUSE_GRACE_SECONDS):
+            db.rollback()
+            raise _invalid_refresh_token("Refresh token já renovado.")
+        revoked = _revoke_family(db, record.family_id, now)
+        db.commit()
+        logger.warning(f"Refresh token reutilizado (advogado {record.lawyer_id}); {revoked} token(s) da sessão revogado(s).")
+        raise _invalid_refresh_token("Refresh token reutilizado. A sessão foi encerrada; faça login novamente.")
+
+    lawyer = db.query(lawyer_models.LawyerDB).filter(lawyer_models.LawyerDB.id == record.lawyer_id).first()
+    if lawyer is None:
+        db.rollback()
+        raise _invalid_refresh_token("Refresh token inválido ou expirado.")
+    record.used_at = now
+    new_token = issue_refresh_token(db, record.lawyer_id, record.family_id)
+    db.commit()
+    return lawyer, new_token
+
+
+def _revoke_family(db: Session, family_id: str, now: datetime) -> int:
+    return db.query(RefreshTokenDB).filter(
+        RefreshTokenDB.family_id == family_id, RefreshTokenDB.revoked_at.is_(None)
+    ).update({RefreshTokenDB.revoked_at: now}, synchronize_session=False)
+
+
+def revoke_refresh_token_family(db: Session, token: str) -> None:
+    """Logout: revoga a sessão do token (todos os tokens da família). Token desconhecido é ignorado."""
+    record = db.query(RefreshTokenDB.family_id).filter(RefreshTokenDB.token_hash == _hash_token(token)).first()
+    if record is not None:
+        _revoke_family(db, record.family_id, datetime.utcnow())
+        db.commit()
+
+
+def revoke_lawyer_refresh_tokens(db: Session, lawyer_id: int) -> int:
+    """Revoga todas as sessões do advogado (ex.: troca de senha). O commit fica com quem chama."""
+    return db.query(RefreshTokenDB).filter(
+        RefreshTokenDB.lawyer_id == lawyer_id, RefreshTokenDB.revoked_at.is_(None)
+    ).update({RefreshTokenDB.revoked_at: datetime.utcnow()}, synchronize_session=False)
+
+
+def purge_expired_refresh_tokens(db: Session) -> int:
+    """Remove os refresh tokens expirados. Retorna quantos foram removidos."""
+    removed = db.query(RefreshTokenDB).filter(RefreshTokenDB.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+    db.commit()
+    return removed
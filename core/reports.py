@@ -0,0 +1,287 @@
+"""
+Geração assíncrona de relatórios (exportação de processos em CSV/XLSX).
+
+A API grava o pedido em report_jobs e responde na hora. Cada worker reserva pedidos pendentes
+(claim_report_jobs, com SELECT ... FOR UPDATE SKIP LOCKED) e os executa em um pool de processos
+(REPORT_PROCESS_POOL_SIZE relatórios em paralelo), fora do event loop e das threads que atendem
+a fila de jobs. generate_report percorre legal_processes por keyset (id > último id, em páginas de
+REPORT_PAGE_SIZE), grava cada página no arquivo assim que lida e registra o progresso.
+
+Os arquivos ficam em REPORTS_DIR, que precisa ser compartilhado entre workers e API quando
+estiverem em máquinas diferentes, e são removidos após REPORT_RETENTION_HOURS horas.
+"""
+import csv
+import logging
+import os
+import tempfile
+import traceback
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, false, func, or_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.client import ClientDB
+from models.lawyer import LawyerDB
+from models.legal_process import LegalProcessDB, normalize_process_status
+from models.report_job import ReportFormatEnum, ReportJobDB, ReportStatusEnum, ReportTypeEnum
+
+logger = logging.getLogger(__name__)
+
+REPORTS_DIR = os.getenv("REPORTS_DIR") or os.path.join(tempfile.gettempdir(), "relatorios_processos")
+
+try:
+    REPORT_PROCESS_POOL_SIZE = int(os.getenv("REPORT_PROCESS_POOL_SIZE", "2"))
+except ValueError:
+    logger.error("REPORT_PROCESS_POOL_SIZE inválido. Usando padrão de 2.")
+    REPORT_PROCESS_POOL_SIZE = 2
+
+try:
+    REPORT_RETENTION_HOURS = int(os.getenv("REPORT_RETENTION_HOURS", "24"))
+except ValueError:
+    logger.error("REPORT_RETENTION_HOURS inválido. Usando padrão de 24 horas.")
+    REPORT_RETENTION_HOURS = 24
+
+# Processos lidos (e gravados no arquivo) por consulta.
+REPORT_PAGE_SIZE = 1000
+
+# Relatório "executando" sem progresso há mais tempo que isto é considerado abandonado e volta para a fila.
+REPORT_LOCK_TIMEOUT = timedelta(minutes=10)
+
+# Status usados para classificar processos atrasados.
+ACTIVE_PROCESS_STATUS = "ativo"
+CONCLUDED_PROCESS_STATUS = "concluído"
+
+MEDIA_TYPES = {
+    ReportFormatEnum.CSV.value: "text/csv",
+    ReportFormatEnum.XLSX.value: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+_HEADER = [
+    "ID", "Número do Processo", "Advogado", "OAB", "Cliente", "Área", "Tipo de Ação", "Status",
+    "Data de Entrada", "Prazo de Entrega", "Prazo Fatal", "Data de Conclusão",
+]
+
+
+# --- Pedidos ---
+
+def create_report_job(db: Session, requested_by: int, report_type: ReportTypeEnum, report_format: ReportFormatEnum, params: dict) -> ReportJobDB:
+    job = ReportJobDB(
+        report_type=report_type.value, format=report_format.value, params=params, requested_by=requested_by,
+        status=ReportStatusEnum.PENDENTE.value, created_at=datetime.utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def claim_report_jobs(db: Session, worker_id: str, limit: int) -> List[int]:
+    """Reserva até `limit` relatórios pendentes (ou abandonados) para este worker. Faz commit."""
+    now = datetime.utcnow()
+    ready = or_(
+        ReportJobDB.status == ReportStatusEnum.PENDENTE.value,
+        and_(ReportJobDB.status == ReportStatusEnum.EXECUTANDO.value, ReportJobDB.locked_at < now - REPORT_LOCK_TIMEOUT),
+    )
+    candidate_ids = [row.id for row in db.query(ReportJobDB.id).filter(ready).order_by(
+        ReportJobDB.created_at, ReportJobDB.id
+    ).limit(limit).with_for_update(skip_locked=True)]
+
+    claimed_ids = []
+    for report_id in candidate_ids:
+        # A condição repetida mantém a reserva exclusiva também em bancos sem SKIP LOCKED (ex.: SQLite).
+        claimed = db.query(ReportJobDB).filter(ReportJobDB.id == report_id, ready).update({
+            ReportJobDB.status: ReportStatusEnum.EXECUTANDO.value,
+            ReportJobDB.locked_by: worker_id,
+            ReportJobDB.locked_at: now,
+            ReportJobDB.attempts: ReportJobDB.attempts + 1,
+        }, synchronize_session=False)
+        if claimed:
+            claimed_ids.append(report_id)
+    db.commit()
+    return claimed_ids
+
+
+# --- Arquivos ---
+
+class _CsvWriter:
+    def __init__(self, path: str):
+        # utf-8-sig e ';': o Excel em português abre o arquivo com acentos e colunas corretos.
+        self._file = open(path, "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.writer(self._file, delimiter=";")
+
+    def write_rows(self, rows: List[list]) -> None:
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _XlsxWriter:
+    def __init__(self, path: str):
+        from openpyxl import Workbook # Importado apenas pelos processos que geram XLSX
+
+        self._path = path
+        # write_only: as linhas vão para arquivos temporários em vez de ficarem todas em memória.
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Processos")
+
+    def write_rows(self, rows: List[list]) -> None:
+        for row in rows:
+            self._sheet.append(row)
+
+    def close(self) -> None:
+        self._workbook.save(self._path)
+
+
+def _open_writer(report_format: str, path: str):
+    if report_format == ReportFormatEnum.XLSX.value:
+        return _XlsxWriter(path)
+    return _CsvWriter(path)
+
+
+# --- Consultas ---
+
+def _report_filters(job: ReportJobDB, today: date) -> list:
+    params = job.params or {}
+    filters = []
+    if params.get("lawyer_id") is not None:
+        filters.append(LegalProcessDB.lawyer_id == params["lawyer_id"])
+    if job.report_type == ReportTypeEnum.LATE_PROCESSES.value:
+        filters.append(LegalProcessDB.delivery_deadline.isnot(None))
+        filters.append(or_(
+            and_(LegalProcessDB.status == ACTIVE_PROCESS_STATUS, LegalProcessDB.delivery_deadline < today),
+            and_(LegalProcessDB.status == CONCLUDED_PROCESS_STATUS, LegalProcessDB.data_conclusao_real > LegalProcessDB.delivery_deadline),
+        ))
+    elif params.get("status"):
+        # Pedidos anteriores à validação do status podem ter um valor que não existe: relatório vazio.
+        status_value = normalize_process_status(params["status"])
+        filters.append(LegalProcessDB.status == status_value if status_value else false())
+    return filters
+
+
+def _format_date(value: Optional[date]) -> str:
+    return value.strftime("%d/%m/%Y") if value else ""
+
+
+def _report_row(row, late_report: bool, today: date, report_format: str) -> list:
+    # No XLSX as datas ficam como datas (filtráveis no Excel); no CSV, no formato dd/mm/aaaa.
+    as_cell = (lambda value: value) if report_format == ReportFormatEnum.XLSX.value else _format_date
+    values = [
+        row.id, row.process_number, row.lawyer_name or "", row.lawyer_oab or "", row.client_name or "",
+        row.area_of_expertise.value if row.area_of_expertise else "", row.action_type or "", row.status or "",
+        as_cell(row.entry_date), as_cell(row.delivery_deadline), as_cell(row.fatal_deadline), as_cell(row.data_conclusao_real),
+    ]
+    if late_report:
+        values.append(((row.data_conclusao_real or today) - row.delivery_deadline).days)
+    return values
+
+
+# --- Geração (executada no pool de processos do worker) ---
+
+def generate_report(report_id: int, worker_id: str) -> int:
+    """Gera o arquivo de um relatório reservado por `worker_id`. Retorna a quantidade de linhas."""
+    db = SessionLocal()
+    part_path = None
+    try:
+        job = db.query(ReportJobDB).filter(ReportJobDB.id == report_id, ReportJobDB.locked_by == worker_id).first()
+        if job is None:
+            return 0 # Reserva perdida (ex.: considerada abandonada e assumida por outro worker)
+
+        today = date.today()
+        late_report = job.report_type == ReportTypeEnum.LATE_PROCESSES.value
+        filters = _report_filters(job, today)
+        job.total_rows = db.query(func.count(LegalProcessDB.id)).filter(*filters).scalar()
+        job.rows_written = 0
+        job.started_at = datetime.utcnow()
+        job.error = None
+        db.commit()
+
+        os.makedirs(REPORTS_DIR, exist_ok=True)
+        final_path = os.path.join(REPORTS_DIR, f"relatorio_{job.id}.{job.format}")
+        part_path = f"{final_path}.{os.getpid()}.part"
+        writer = _open_writer(job.format, part_path)
+        try:
+            writer.write_rows([_HEADER + (["Dias de Atraso"] if late_report else [])])
+            query = db.query(
+                LegalProcessDB.id, LegalProcessDB.process_number, LawyerDB.name.label("lawyer_name"), LawyerDB.oab.label("lawyer_oab"),
+                ClientDB.name.label("client_name"), ClientDB.area_of_expertise, LegalProcessDB.action_type, LegalProcessDB.status,
+                LegalProcessDB.entry_date, LegalProcessDB.delivery_deadline, LegalProcessDB.fatal_deadline, LegalProcessDB.data_conclusao_real,
+            ).outerjoin(LawyerDB, LawyerDB.id == LegalProcessDB.lawyer_id).outerjoin(
+                ClientDB, ClientDB.id == LegalProcessDB.client_id
+            ).filter(*filters).order_by(LegalProcessDB.id)
+
+            last_id, written = 0, 0
+            while True:
+                # Keyset: cada página parte do último id lido, pelo índice da chave primária (sem OFFSET).
+                page = query.filter(LegalProcessDB.id > last_id).limit(REPORT_PAGE_SIZE).all()
+                if not page:
+                    break
+                writer.write_rows([_report_row(row, late_report, today, job.format) for row in page])
+                last_id, written = page[-1].id, written + len(page)
+                # Progresso e heartbeat da reserva (uma escrita por página).
+                db.query(ReportJobDB).filter(ReportJobDB.id == report_id).update({
+                    ReportJobDB.rows_written: written, ReportJobDB.locked_at: datetime.utcnow(),
+                }, synchronize_session=False)
+                db.commit()
+        finally:
+            writer.close()
+
+        os.replace(part_path, final_path)
+        part_path = None
+        finished_at = datetime.utcnow()
+        db.query(ReportJobDB).filter(ReportJobDB.id == report_id).update({
+            ReportJobDB.status: ReportStatusEnum.CONCLUIDO.value,
+            ReportJobDB.rows_written: written,
+            ReportJobDB.file_path: final_path,
+            ReportJobDB.file_size: os.path.getsize(final_path),
+            ReportJobDB.finished_at: finished_at,
+            ReportJobDB.expires_at: finished_at + timedelta(hours=REPORT_RETENTION_HOURS),
+            ReportJobDB.locked_by: None,
+            ReportJobDB.locked_at: None,
+        }, synchronize_session=False)
+        db.commit()
+        return written
+    except Exception as e:
+        db.rollback()
+        _record_failure(db, report_id, e)
+        raise
+    finally:
+        if part_path and os.path.exists(part_path):
+            os.remove(part_path)
+        db.close()
+
+
+def _record_failure(db: Session, report_id: int, error: BaseException) -> None:
+    job = db.query(ReportJobDB).filter(ReportJobDB.id == report_id).first()
+    if not job:
+        return
+    job.error = "".join(traceback.format_exception(type(error), error, error.__traceback__))[-4000:]
+    job.locked_by = None
+    job.locked_at = None
+    if job.attempts >= job.max_attempts:
+        job.status = ReportStatusEnum.FALHOU.value
+        job.finished_at = datetime.utcnow()
+    else:
+        job.status = ReportStatusEnum.PENDENTE.value
+    db.commit()
+
+
+# --- Limpeza ---
+
+def cleanup_expired_reports(db: Session) -> int:
+    """Remove os arquivos e os registros de relatórios expirados. Retorna quantos foram removidos."""
+    expired = db.query(ReportJobDB).filter(ReportJobDB.expires_at < datetime.utcnow()).all()
+    for job in expired:
+        if job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+        db.delete(job)
+    # Relatórios que falharam não têm arquivo; são removidos após o mesmo prazo.
+    removed_failed = db.query(ReportJobDB).filter(
+        ReportJobDB.status == ReportStatusEnum.FALHOU.value,
+        ReportJobDB.finished_at < datetime.utcnow() - timedelta(hours=REPORT_RETENTION_HOURS),
+    ).delete(synchronize_session=False)
+    db.commit()
+    return len(expired) + removed_failed
@@ -0,0 +1,175 @@
+"""
+Serialização e compressão das respostas da API.
+
+FastJSONResponse é a classe de resposta padrão do app (main.py): gera o JSON com orjson, bem mais
+rápido que o json da biblioteca padrão nas listas grandes (/processes/, /lawyers/, /clients/).
+Sem orjson instalado, cai no JSONResponse padrão.
+
+CompressionMiddleware comprime as respostas a partir de RESPONSE_COMPRESSION_MIN_SIZE bytes,
+negociando o formato pelo Accept-Encoding do cliente: brotli (se o pacote `brotli` estiver
+instalado) ou gzip. Para medir o efeito de ambos: python -m benchmarks.api_payloads
+"""
+import logging
+import os
+import zlib
+from typing import Any, List, Optional
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "true").lower() in ("1", "true", "yes")
+
+try:
+    RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))
+except ValueError:
+    logger.error("RESPONSE_COMPRESSION_MIN_SIZE inválido. Usando padrão de 1024 bytes.")
+    RESPONSE_COMPRESSION_MIN_SIZE = 1024
+
+# Níveis médios: nas listas de processos, os níveis máximos custam várias vezes mais CPU
+# para reduzir o tamanho só mais alguns por cento.
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+# Formatos que já são comprimidos (ex.: relatórios XLSX, que são zip) ou que não ganham com compressão.
+_SKIP_CONTENT_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip", "application/vnd.openxmlformats")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serializado com orjson (datas e datetimes em ISO 8601, como o padrão)."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def supported_encodings() -> List[str]:
+    """Codificações que este servidor sabe gerar, em ordem de preferência."""
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: str, available: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Escolhe a codificação da resposta a partir do header Accept-Encoding (com pesos q=), entre
+    `available` (padrão: supported_encodings()). Entre as aceitas com o mesmo peso, vale a ordem
+    de `available` (brotli antes de gzip). Retorna None para enviar sem compressão.
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in (supported_encodings() if available is None else available):
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def _compressor(encoding: str):
+    if encoding == "br":
+        return brotli.Compressor(quality=BROTLI_QUALITY)
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31) # wbits=31: formato gzip
+
+
+class CompressionMiddleware:
+    """Middleware ASGI de compressão (brotli ou gzip), inclusive de respostas em streaming."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = RESPONSE_COMPRESSION_MIN_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("Accept-Encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressionResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int) -> None:
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Optional[Send] = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.compressor = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _compress(self, body: bytes, final: bool) -> bytes:
+        data = self.compressor.process(body) if self.encoding == "br" else self.compressor.compress(body)
+        if final:
+            data += self.compressor.finish() if self.encoding == "br" else self.compressor.flush()
+        return data
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # O início só é enviado depois do primeiro corpo, quando se sabe se haverá compressão.
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = "content-encoding" in headers or content_type.startswith(_SKIP_CONTENT_TYPES)
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            self.started = True
+            if self.passthrough or (not more_body and len(body) < self.minimum_size):
+                self.passthrough = True
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            self.compressor = _compressor(self.encoding)
+            body = self._compress(body, final=not more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            await self.send(self.initial_message)
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        await self.send({"type": "http.response.body", "body": self._compress(body, final=not more_body), "more_body": more_body})
@@ -0,0 +1,300 @@
+"""
+Agregados diários e mensais de processos (process_daily_rollups, process_monthly_rollups) para as
+análises de tendência.
+
+As escritas de processos via ORM registram o id do processo em process_rollup_changes (eventos em
+models/process_rollup.py). O worker (job refresh_process_rollups) consome as entradas acima da
+marca d'água em lotes: para cada processo alterado, subtrai dos agregados a contribuição anterior
+(process_rollup_snapshots) e soma a atual. O primeiro processamento (sem marca d'água) reconstrói
+tudo a partir da tabela principal e do arquivo.
+
+A marca d'água só avança até entradas com mais de ROLLUP_SETTLE_SECONDS segundos: uma transação
+que ainda não fez commit pode ter recebido um id menor do que entradas já visíveis. As entradas
+mais recentes são reprocessadas na execução seguinte, sem efeito (o processamento é idempotente).
+"""
+import logging
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import extract, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from models.client import ClientDB
+from models.legal_process import LegalProcessDB
+from models.legal_process_archive import LegalProcessArchiveDB
+from models.process_rollup import (
+    ROLLUP_CONCLUDED_STATUS, ProcessDailyRollupDB, ProcessMonthlyRollupDB, ProcessRollupChangeDB, ProcessRollupSnapshotDB, RollupWatermarkDB,
+    TrendGranularityEnum, TrendGroupByEnum, TrendPoint,
+)
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_NAME = "process_daily"
+
+try:
+    ROLLUP_BATCH_SIZE = int(os.getenv("ROLLUP_BATCH_SIZE", "1000"))
+except ValueError:
+    logger.error("ROLLUP_BATCH_SIZE inválido. Usando padrão de 1000.")
+    ROLLUP_BATCH_SIZE = 1000
+
+# Tempo máximo esperado entre o registro de uma alteração e o commit da transação que a gravou.
+ROLLUP_SETTLE_SECONDS = 60
+
+_DIMENSIONS = ("lawyer_id", "area_of_expertise", "action_type", "status")
+_MEASURES = ("opened_count", "concluded_count", "late_count", "slippage_days_sum")
+_SNAPSHOT_COLUMNS = ("process_id", *_DIMENSIONS, "opened_on", "concluded_on", "late", "slippage_days")
+
+
+# --- Contribuição de cada processo ---
+
+def _source_query(db: Session, model):
+    """Colunas de um processo (tabela principal ou arquivo) necessárias para os agregados."""
+    return db.query(
+        model.id, model.lawyer_id, ClientDB.area_of_expertise, model.action_type, model.status,
+        model.entry_date, model.delivery_deadline, model.data_conclusao_real,
+    ).outerjoin(ClientDB, ClientDB.id == model.client_id)
+
+def _contribution(row) -> dict:
+    """Linha de process_rollup_snapshots correspondente ao estado atual do processo."""
+    concluded_on = row.data_conclusao_real if row.status == ROLLUP_CONCLUDED_STATUS else None
+    late = bool(concluded_on and row.delivery_deadline and concluded_on > row.delivery_deadline)
+    return {
+        "process_id": row.id,
+        "lawyer_id": row.lawyer_id or 0,
+        "area_of_expertise": row.area_of_expertise.value if row.area_of_expertise else "",
+        "action_type": row.action_type or "",
+        "status": row.status or "",
+        "opened_on": row.entry_date,
+        "concluded_on": concluded_on,
+        "late": late,
+        "slippage_days": (concluded_on - row.delivery_deadline).days if late else 0,
+    }
+
+def _accumulate(deltas: Dict[tuple, List[int]], snapshot: dict, sign: int) -> None:
+    dimensions = tuple(snapshot[name] for name in _DIMENSIONS)
+    if snapshot["opened_on"] is not None:
+        deltas[(snapshot["opened_on"], *dimensions)][0] += sign
+    if snapshot["concluded_on"] is not None:
+        measures = deltas[(snapshot["concluded_on"], *dimensions)]
+        measures[1] += sign
+        measures[2] += sign * int(snapshot["late"])
+        measures[3] += sign * snapshot["slippage_days"]
+
+
+# --- Manutenção incremental ---
+
+def mark_processes_changed(db: Session, *filters) -> None:
+    """
+    Registra como alterados os processos da tabela principal que atendem aos filtros.
+    Necessário antes de escritas em massa (query.update), que não disparam os eventos do ORM.
+    """
+    db.execute(insert(ProcessRollupChangeDB).from_select(
+        ["process_id", "created_at"],
+        select(LegalProcessDB.id, literal(datetime.utcnow())).where(*filters)
+    ))
+
+def _by_month(deltas: Dict[tuple, List[int]]) -> Dict[tuple, List[int]]:
+    """Soma os deltas diários por mês (chave com o primeiro dia do mês)."""
+    monthly: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0, 0, 0])
+    for (day, *dimensions), measures in deltas.items():
+        totals = monthly[(day.replace(day=1), *dimensions)]
+        for index, value in enumerate(measures):
+            totals[index] += value
+    return monthly
+
+def _apply_deltas(db: Session, model, deltas: Dict[tuple, List[int]]) -> None:
+    """Soma os deltas às linhas de `model` (agregado diário ou mensal), criando ou removendo linhas."""
+    deltas = {key: measures for key, measures in deltas.items() if any(measures)}
+    if not deltas:
+        return
+    period = model.day if model is ProcessDailyRollupDB else model.month
+    key_columns = (period.key, *_DIMENSIONS)
+    existing = {
+        tuple(getattr(row, column) for column in key_columns): row
+        for row in db.query(model).filter(
+            period.in_({key[0] for key in deltas}),
+            model.lawyer_id.in_({key[1] for key in deltas}),
+        )
+    }
+    for key, measures in deltas.items():
+        row = existing.get(key)
+        if row is None:
+            db.add(model(**dict(zip(key_columns, key)), **dict(zip(_MEASURES, measures))))
+            continue
+        for name, delta in zip(_MEASURES, measures):
+            setattr(row, name, getattr(row, name) + delta)
+        if not any(getattr(row, name) for name in _MEASURES):
+            db.delete(row) # Nenhum processo contribui mais para este dia/grupo
+
+def _refresh_processes(db: Session, process_ids: Iterable[int]) -> None:
+    """Substitui nos agregados a contribuição anterior de cada processo pela atual."""
+    process_ids = set(process_ids)
+    current = {}
+    for model in (LegalProcessDB, LegalProcessArchiveDB):
+        for row in _source_query(db, model).filter(model.id.in_(process_ids)):
+            current[row.id] = _contribution(row)
+    snapshots = {
+        snapshot.process_id: snapshot
+        for snapshot in db.query(ProcessRollupSnapshotDB).filter(ProcessRollupSnapshotDB.process_id.in_(process_ids))
+    }
+
+    deltas: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0, 0, 0])
+    for process_id in process_ids:
+        snapshot, new = snapshots.get(process_id), current.get(process_id)
+        if snapshot is not None:
+            _accumulate(deltas, {column: getattr(snapshot, column) for column in _SNAPSHOT_COLUMNS}, -1)
+        if new is not None:
+            _accumulate(deltas, new, 1)
+            if snapshot is None:
+                db.add(ProcessRollupSnapshotDB(**new))
+            else:
+                for column, value in new.items():
+                    setattr(snapshot, column, value)
+        elif snapshot is not None:
+            db.delete(snapshot) # Processo excluído
+    _apply_deltas(db, ProcessDailyRollupDB, deltas)
+    _apply_deltas(db, ProcessMonthlyRollupDB, _by_month(deltas))
+
+def refresh_process_rollups(db: Session, batch_size: int = ROLLUP_BATCH_SIZE) -> int:
+    """Aplica as alterações registradas desde a marca d'água. Retorna quantas entradas foram processadas."""
+    # FOR UPDATE: execuções concorrentes (ex.: job atrasado e o seguinte) são serializadas.
+    watermark = db.query(RollupWatermarkDB).filter(RollupWatermarkDB.name == ROLLUP_NAME).with_for_update().first()
+    if watermark is None:
+        return rebuild_process_rollups(db, batch_size=batch_size)
+
+    processed = 0
+    while True:
+        changes = db.query(ProcessRollupChangeDB).filter(
+            ProcessRollupChangeDB.id > watermark.last_change_id
+        ).order_by(ProcessRollupChangeDB.id).limit(batch_size).all()
+        if not changes:
+            break
+        _refresh_processes(db, (change.process_id for change in changes))
+        processed += len(changes)
+
+        settled_before = datetime.utcnow() - timedelta(seconds=ROLLUP_SETTLE_SECONDS)
+        settled_ids = [change.id for change in changes if change.created_at < settled_before]
+        advanced = bool(settled_ids) and max(settled_ids) > watermark.last_change_id
+        if advanced:
+            watermark.last_change_id = max(settled_ids)
+            # Mantém a entrada da marca d'água: com a tabela vazia, o banco poderia reutilizar ids
+            # abaixo dela (SQLite, e o MySQL anterior ao 8.0 após reiniciar).
+            db.query(ProcessRollupChangeDB).filter(
+                ProcessRollupChangeDB.id < watermark.last_change_id
+            ).delete(synchronize_session=False)
+        watermark.refreshed_at = datetime.utcnow()
+        db.commit()
+        watermark = db.query(RollupWatermarkDB).filter(RollupWatermarkDB.name == ROLLUP_NAME).with_for_update().one()
+        if len(changes) < batch_size or not advanced:
+            break
+    db.commit()
+    return processed
+
+def rebuild_process_rollups(db: Session, batch_size: int = ROLLUP_BATCH_SIZE) -> int:
+    """Reconstrói os agregados a partir de todos os processos (ativos e arquivados). Retorna quantos processos leu."""
+    # Marca d'água lida antes dos processos: alterações concorrentes ficam acima dela e serão reaplicadas.
+    last_change_id = db.query(func.max(ProcessRollupChangeDB.id)).scalar() or 0
+    db.query(ProcessDailyRollupDB).delete(synchronize_session=False)
+    db.query(ProcessMonthlyRollupDB).delete(synchronize_session=False)
+    db.query(ProcessRollupSnapshotDB).delete(synchronize_session=False)
+
+    totals: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0, 0, 0])
+    processed = 0
+    for model in (LegalProcessDB, LegalProcessArchiveDB):
+        last_id = 0
+        while True:
+            rows = _source_query(db, model).filter(model.id > last_id).order_by(model.id).limit(batch_size).all()
+            if not rows:
+                break
+            snapshots = [_contribution(row) for row in rows]
+            db.execute(insert(ProcessRollupSnapshotDB), snapshots)
+            for snapshot in snapshots:
+                _accumulate(totals, snapshot, 1)
+            last_id = rows[-1].id
+            processed += len(rows)
+
+    row_counts = []
+    for model, period, period_totals in (
+        (ProcessDailyRollupDB, "day", totals),
+        (ProcessMonthlyRollupDB, "month", _by_month(totals)),
+    ):
+        rollups = [
+            {**dict(zip((period, *_DIMENSIONS), key)), **dict(zip(_MEASURES, measures))}
+            for key, measures in period_totals.items() if any(measures)
+        ]
+        for start in range(0, len(rollups), batch_size):
+            db.execute(insert(model), rollups[start:start + batch_size])
+        row_counts.append(len(rollups))
+
+    db.merge(RollupWatermarkDB(name=ROLLUP_NAME, last_change_id=last_change_id, refreshed_at=datetime.utcnow()))
+    db.query(ProcessRollupChangeDB).filter(ProcessRollupChangeDB.id < last_change_id).delete(synchronize_session=False)
+    db.commit()
+    logger.info(f"Agregados reconstruídos: {processed} processo(s), {row_counts[0]} linha(s) diárias e {row_counts[1]} mensais.")
+    return processed
+
+
+# --- Consultas ---
+
+def get_trends(
+    db: Session,
+    date_from: date,
+    date_to: date,
+    granularity: TrendGranularityEnum = TrendGranularityEnum.MONTH,
+    group_by: Optional[TrendGroupByEnum] = None,
+    lawyer_id: Optional[int] = None,
+    area_of_expertise: Optional[str] = None,
+    action_type: Optional[str] = None,
+    status: Optional[str] = None,
+) -> List[TrendPoint]:
+    """
+    Totais por período (e, opcionalmente, por uma dimensão) entre date_from e date_to.
+    Tendências mensais e anuais de meses inteiros (date_from no dia 1, date_to no último dia do mês)
+    somam os agregados mensais; as demais, os diários.
+    """
+    whole_months = date_from.day == 1 and (date_to + timedelta(days=1)).day == 1
+    if granularity != TrendGranularityEnum.DAY and whole_months:
+        rollup, day = ProcessMonthlyRollupDB, ProcessMonthlyRollupDB.month
+    else:
+        rollup, day = ProcessDailyRollupDB, ProcessDailyRollupDB.day
+
+    if granularity == TrendGranularityEnum.DAY or (granularity == TrendGranularityEnum.MONTH and rollup is ProcessMonthlyRollupDB):
+        period_columns = [day]
+    elif granularity == TrendGranularityEnum.MONTH:
+        period_columns = [extract("year", day), extract("month", day)]
+    else:
+        period_columns = [extract("year", day)]
+    group_columns = [getattr(rollup, group_by.value)] if group_by else []
+
+    query = db.query(
+        *period_columns, *group_columns,
+        *(func.sum(getattr(rollup, name)) for name in _MEASURES),
+    ).filter(day >= date_from, day <= date_to)
+    for column, value in (
+        (rollup.lawyer_id, lawyer_id), (rollup.area_of_expertise, area_of_expertise),
+        (rollup.action_type, action_type), (rollup.status, status),
+    ):
+        if value is not None:
+            query = query.filter(column == value)
+    query = query.group_by(*period_columns, *group_columns).order_by(*period_columns, *group_columns)
+
+    points = []
+    for row in query:
+        if len(period_columns) == 1 and granularity != TrendGranularityEnum.YEAR:
+            period = row[0] # Dia, ou primeiro dia do mês no agregado mensal
+        elif granularity == TrendGranularityEnum.MONTH:
+            period = date(int(row[0]), int(row[1]), 1)
+        else:
+            period = date(int(row[0]), 1, 1)
+        opened, concluded, late, slippage = (int(value or 0) for value in row[len(period_columns) + len(group_columns):])
+        points.append(TrendPoint(
+            period=period,
+            group=str(row[len(period_columns)]) if group_by else None,
+            opened=opened,
+            concluded=concluded,
+            late=late,
+            late_rate=(late / concluded) if concluded else 0.0,
+            avg_slippage_days=(slippage / concluded) if concluded else 0.0,
+        ))
+    return points
@@ -0,0 +1,254 @@
+"""
+Agendamento dos jobs periódicos com eleição de líder entre workers.
+
+Com vários processos de worker (worker.py), cada um executaria os jobs das 08:00/08:30 e o
+polling do Telegram. Aqui, os workers disputam um lease no banco (tabela scheduler_leases):
+apenas o detentor do lease, renovado por heartbeat, inicia o scheduler e o bot. Se o líder cair,
+o lease expira e outro worker assume.
+
+Os jobs ficam em um job store SQLAlchemy (tabela apscheduler_jobs), de modo que agendamentos e
+execuções perdidas (misfires) sobrevivem a reinícios e trocas de líder. Por isso os jobs são
+funções de módulo sem argumentos (referenciadas por nome no banco).
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+from typing import Awaitable, Callable, Optional
+
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from dotenv import load_dotenv
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from core.job_queue import enqueue_job
+from database import SessionLocal, engine
+from models.job_queue import JobTypeEnum
+from models.scheduler_lease import SchedulerLeaseDB
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_TIMEZONE = "America/Sao_Paulo"
+SCHEDULER_LEASE_NAME = "scheduler"
+
+try:
+    SCHEDULER_LEASE_TTL_SECONDS = int(os.getenv("SCHEDULER_LEASE_TTL_SECONDS", "30"))
+except ValueError:
+    logger.error("SCHEDULER_LEASE_TTL_SECONDS inválido. Usando padrão de 30 segundos.")
+    SCHEDULER_LEASE_TTL_SECONDS = 30
+
+
+# --- Jobs ---
+# Os jobs agendados apenas enfileiram trabalho na fila durável (core.job_queue); a execução
+# fica com qualquer worker livre (worker.py). A dedup_key impede enfileiramento duplicado
+# do mesmo período, mesmo que o job dispare duas vezes (misfire, troca de líder).
+
+try:
+    ANALYTICS_REFRESH_MINUTES = int(os.getenv("ANALYTICS_REFRESH_MINUTES", "15"))
+except ValueError:
+    logger.error("ANALYTICS_REFRESH_MINUTES inválido. Usando padrão de 15 minutos.")
+    ANALYTICS_REFRESH_MINUTES = 15
+
+try:
+    ROLLUP_REFRESH_MINUTES = int(os.getenv("ROLLUP_REFRESH_MINUTES", "5"))
+except ValueError:
+    logger.error("ROLLUP_REFRESH_MINUTES inválido. Usando padrão de 5 minutos.")
+    ROLLUP_REFRESH_MINUTES = 5
+
+def scheduler_today() -> date:
+    """
+    Data atual em SCHEDULER_TIMEZONE, o fuso dos gatilhos. As dedup_keys diárias usam essa data, e
+    não a do servidor: num host em UTC, date.today() já é o dia seguinte a partir das 21:00 locais.
+    """
+    return datetime.now(ZoneInfo(SCHEDULER_TIMEZONE)).date()
+
+def _enqueue(job_type: JobTypeEnum, dedup_key: str) -> None:
+    db = SessionLocal()
+    try:
+        if enqueue_job(db, job_type.value, dedup_key=dedup_key):
+            logger.info(f"Job '{job_type.value}' enfileirado ({dedup_key}).")
+    finally:
+        db.close()
+
+def daily_deadlines_job():
+    _enqueue(JobTypeEnum.DAILY_DEADLINES, f"{JobTypeEnum.DAILY_DEADLINES.value}:{scheduler_today().isoformat()}")
+
+def upcoming_fatal_deadlines_job():
+    _enqueue(JobTypeEnum.UPCOMING_FATAL_DEADLINES, f"{JobTypeEnum.UPCOMING_FATAL_DEADLINES.value}:{scheduler_today().isoformat()}")
+
+def refresh_delay_statistics_job():
+    slot = int(datetime.utcnow().timestamp() // (ANALYTICS_REFRESH_MINUTES * 60))
+    _enqueue(JobTypeEnum.REFRESH_DELAY_STATISTICS, f"{JobTypeEnum.REFRESH_DELAY_STATISTICS.value}:{slot}")
+
+def refresh_process_rollups_job():
+    slot = int(datetime.utcnow().timestamp() // (ROLLUP_REFRESH_MINUTES * 60))
+    _enqueue(JobTypeEnum.REFRESH_PROCESS_ROLLUPS, f"{JobTypeEnum.REFRESH_PROCESS_ROLLUPS.value}:{slot}")
+
+def archive_concluded_processes_job():
+    _enqueue(JobTypeEnum.ARCHIVE_CONCLUDED_PROCESSES, f"{JobTypeEnum.ARCHIVE_CONCLUDED_PROCESSES.value}:{scheduler_today().isoformat()}")
+
+def cleanup_reports_job():
+    slot = datetime.utcnow().strftime("%Y-%m-%dT%H")
+    _enqueue(JobTypeEnum.CLEANUP_REPORTS, f"{JobTypeEnum.CLEANUP_REPORTS.value}:{slot}")
+
+def purge_refresh_tokens_job():
+    _enqueue(JobTypeEnum.PURGE_REFRESH_TOKENS, f"{JobTypeEnum.PURGE_REFRESH_TOKENS.value}:{scheduler_today().isoformat()}")
+
+def purge_finished_jobs_job():
+    _enqueue(JobTypeEnum.PURGE_FINISHED_JOBS, f"{JobTypeEnum.PURGE_FINISHED_JOBS.value}:{scheduler_today().isoformat()}")
+
+
+def create_scheduler() -> AsyncIOScheduler:
+    """Scheduler no event loop do worker, com os jobs persistidos no banco."""
+    return AsyncIOScheduler(
+        jobstores={"default": SQLAlchemyJobStore(engine=engine, tablename="apscheduler_jobs")},
+        job_defaults={"coalesce": True, "misfire_grace_time": 600, "max_instances": 1},
+        timezone=SCHEDULER_TIMEZONE,
+    )
+
+def register_scheduled_jobs(scheduler: AsyncIOScheduler) -> None:
+    """Registra (ou atualiza) os jobs periódicos; ids fixos evitam duplicatas no job store."""
+    # Prazos do dia às 08:00.
+    scheduler.add_job(daily_deadlines_job, "cron", hour=8, minute=0,
+                      id="daily_deadlines", replace_existing=True)
+    # Prazos fatais próximos às 08:30.
+    scheduler.add_job(upcoming_fatal_deadlines_job, "cron", hour=8, minute=30,
+                      id="upcoming_fatal_deadlines", replace_existing=True)
+    # Estatísticas de atraso usadas no risco de atraso de /processes/.
+    scheduler.add_job(refresh_delay_statistics_job, "interval", minutes=ANALYTICS_REFRESH_MINUTES,
+                      id="refresh_delay_statistics", replace_existing=True, next_run_time=datetime.now(scheduler.timezone))
+    # Agregados diários usados pelos endpoints de tendência (/analytics/trends).
+    scheduler.add_job(refresh_process_rollups_job, "interval", minutes=ROLLUP_REFRESH_MINUTES,
+                      id="refresh_process_rollups", replace_existing=True, next_run_time=datetime.now(scheduler.timezone))
+    # Arquivamento dos processos concluídos às 03:00, fora do horário de uso.
+    scheduler.add_job(archive_concluded_processes_job, "cron", hour=3, minute=0,
+                      id="archive_concluded_processes", replace_existing=True)
+    # Remoção dos relatórios expirados (REPORT_RETENTION_HOURS) a cada hora.
+    scheduler.add_job(cleanup_reports_job, "cron", minute=15,
+                      id="cleanup_reports", replace_existing=True)
+    # Remoção dos refresh tokens expirados às 03:30.
+    scheduler.add_job(purge_refresh_tokens_job, "cron", hour=3, minute=30,
+                      id="purge_refresh_tokens", replace_existing=True)
+    # Remoção dos jobs finalizados (JOB_RETENTION_DAYS) e das mensagens entregues do outbox (OUTBOX_RETENTION_DAYS) às 03:45.
+    scheduler.add_job(purge_finished_jobs_job, "cron", hour=3, minute=45,
+                      id="purge_finished_jobs", replace_existing=True)
+
+
+# --- Eleição de líder ---
+class LeaderElection:
+    """
+    Disputa periódica de um lease no banco.
+
+    A cada ttl/3 segundos o worker tenta adquirir ou renovar o lease com um UPDATE condicional
+    (só vence se já for o detentor ou se o lease tiver expirado). Ao ganhar, chama on_elected;
+    ao perder (ou se não conseguir renovar antes de o lease expirar), chama on_revoked.
+    """
+
+    def __init__(
+        self,
+        on_elected: Callable[[], Awaitable[None]],
+        on_revoked: Callable[[], Awaitable[None]],
+        name: str = SCHEDULER_LEASE_NAME,
+        ttl_seconds: int = SCHEDULER_LEASE_TTL_SECONDS,
+        holder: Optional[str] = None,
+    ):
+        self.name = name
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.on_elected = on_elected
+        self.on_revoked = on_revoked
+        self.is_leader = False
+        self._lease_expires_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def try_acquire(self) -> bool:
+        """Adquire ou renova o lease. Retorna True se este worker é o líder."""
+        now = datetime.utcnow()
+        expires_at = now + self.ttl
+        db = SessionLocal()
+        try:
+            updated = db.query(SchedulerLeaseDB).filter(
+                SchedulerLeaseDB.name == self.name,
+                or_(SchedulerLeaseDB.holder == self.holder, SchedulerLeaseDB.expires_at < now),
+            ).update({
+                SchedulerLeaseDB.holder: self.holder,
+                SchedulerLeaseDB.expires_at: expires_at,
+                SchedulerLeaseDB.heartbeat_at: now,
+            }, synchronize_session=False)
+            if not updated and not db.query(SchedulerLeaseDB.name).filter(SchedulerLeaseDB.name == self.name).first():
+                # Primeira disputa: a chave primária garante um único vencedor.
+                db.add(SchedulerLeaseDB(name=self.name, holder=self.holder, expires_at=expires_at, heartbeat_at=now))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()
+                    return False
+                updated = 1
+            else:
+                db.commit()
+            if updated:
+                self._lease_expires_at = expires_at
+            return bool(updated)
+        finally:
+            db.close()
+
+    def release(self) -> None:
+        """Libera o lease (se for o detentor) para que outro worker assuma sem esperar a expiração."""
+        db = SessionLocal()
+        try:
+            db.query(SchedulerLeaseDB).filter(
+                SchedulerLeaseDB.name == self.name, SchedulerLeaseDB.holder == self.holder
+            ).update({SchedulerLeaseDB.expires_at: datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    async def _set_leader(self, is_leader: bool) -> None:
+        if is_leader == self.is_leader:
+            return
+        self.is_leader = is_leader
+        if is_leader:
+            logger.info(f"Worker {self.holder} assumiu a liderança do lease '{self.name}'.")
+            await self.on_elected()
+        else:
+            logger.warning(f"Worker {self.holder} perdeu a liderança do lease '{self.name}'.")
+            await self.on_revoked()
+
+    async def run(self) -> None:
+        interval = self.ttl.total_seconds() / 3
+        while True:
+            try:
+                acquired = await asyncio.to_thread(self.try_acquire)
+            except Exception as e:
+                logger.error(f"Erro ao renovar o lease '{self.name}': {e}", exc_info=True)
+                # Sem acesso ao banco, o líder só abdica quando o próprio lease estiver para expirar.
+                acquired = self.is_leader and self._lease_expires_at is not None and \
+                    datetime.utcnow() + timedelta(seconds=interval) < self._lease_expires_at
+            try:
+                await self._set_leader(acquired)
+            except Exception as e:
+                logger.error(f"Erro ao trocar o estado de liderança do lease '{self.name}': {e}", exc_info=True)
+            await asyncio.sleep(interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self.is_leader:
+            await self._set_leader(False)
+            try:
+                await asyncio.to_thread(self.release)
+            except Exception as e:
+                logger.error(f"Erro ao liberar o lease '{self.name}': {e}", exc_info=True)
@@ -1,18 +1,44 @@
+import json
+import logging
+import os
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
+from urllib.parse import quote
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from pydantic import BaseModel # Para TokenData
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 # Assumindo que 'core' está no PYTHONPATH ou a execução é da raiz
 # Se executando scripts de dentro de 'core', isso pode precisar de ajuste (ex: from ..config import ...)
 from core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-from database import get_db # Para buscar usuário no BD
+from database import end_savepoint_state, get_db, pop_transaction_state, transaction_state # Para buscar usuário no BD
 import models.lawyer as lawyer_models # Alias para o modelo SQLAlchemy LawyerDB
+from core.cache import CACHE_BACKEND, get_cache
+
+logger = logging.getLogger(__name__)
+
+# Validade padrão do usuário em cache conforme o backend. Alterar ou remover um advogado só
+# invalida o cache do processo que fez a escrita (e, no modo tiered, o L1 dos demais via pub/sub).
+# Com o cache local e vários workers do uvicorn, os outros workers continuam aceitando o usuário
+# alterado ou removido até a entrada expirar, por isso o padrão local é de poucos segundos: menos
+# SELECTs economizados em troca de uma janela curta de dados desatualizados. Com redis/tiered a
+# remoção vale para todos os workers e a validade pode ser longa.
+_DEFAULT_USER_CACHE_TTL_SECONDS = 300 if CACHE_BACKEND in ("redis", "tiered") else 5
+
+try:
+    USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", str(_DEFAULT_USER_CACHE_TTL_SECONDS)))
+except ValueError:
+    logger.error(f"USER_CACHE_TTL_SECONDS inválido. Usando padrão de {_DEFAULT_USER_CACHE_TTL_SECONDS} segundos.")
+    USER_CACHE_TTL_SECONDS = _DEFAULT_USER_CACHE_TTL_SECONDS
+
+# Colunas do usuário autenticado guardadas no cache (core/cache.py). A senha (hashed_password)
+# fica fora: é carregada do banco apenas quando usada (ex.: troca de senha).
+_USER_CACHE_COLUMNS = ("id", "name", "oab", "email", "username", "telegram_id")
 
 # Esquema OAuth2 para dependência de token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
@@ -24,7 +50,11 @@ class TokenData(BaseModel):
 # Configuração de Hashing de Senha
 # Usando bcrypt como o esquema para hashing de senha.
 # "auto" significa que usará bcrypt para novos hashes e pode verificar outros esquemas obsoletos, se presentes.
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Criado no primeiro uso: passlib/bcrypt só são carregados quando uma senha é verificada ou gerada.
+@lru_cache(maxsize=1)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -37,7 +67,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True se a senha corresponder, False caso contrário.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """
@@ -49,7 +79,7 @@ def get_password_hash(password: str) -> str:
     Returns:
         A versão "hasheada" da senha.
     """
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 # Criação de Token JWT
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -104,11 +134,52 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except JWTError:
         raise credentials_exception
 
+    cache_key = _user_cache_key(token_data.oab)
+    cached = get_cache().get(cache_key) if USER_CACHE_TTL_SECONDS > 0 else None
+    if cached is not None:
+        # Instância ligada à sessão como se tivesse sido carregada do banco, sem o SELECT.
+        user = lawyer_models.LawyerDB(**json.loads(cached))
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
     user = db.query(lawyer_models.LawyerDB).filter(lawyer_models.LawyerDB.oab == token_data.oab).first()
     if user is None:
         raise credentials_exception
+    if USER_CACHE_TTL_SECONDS > 0:
+        get_cache().set(cache_key, json.dumps({column: getattr(user, column) for column in _USER_CACHE_COLUMNS}).encode("utf-8"), USER_CACHE_TTL_SECONDS)
     return user
 
+def _user_cache_key(oab: str) -> str:
+    return f"user:{quote(oab, safe='')}"
+
+# --- Invalidação do cache de usuários ---
+# Escritas de advogados pelo ORM removem do cache, após o commit da transação externa, as entradas
+# da OAB atual e da anterior (as de um SAVEPOINT desfeito são descartadas com ele).
+
+_USER_CACHE_KEYS = "user_cache_keys"
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, lawyer_models.LawyerDB):
+            history = inspect(obj).attrs.oab.history
+            oabs = {obj.oab, *history.deleted}
+            transaction_state(session, _USER_CACHE_KEYS, set).update(_user_cache_key(oab) for oab in oabs if oab)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    if end_savepoint_state(session, _USER_CACHE_KEYS, set.update):
+        return
+    keys = pop_transaction_state(session, _USER_CACHE_KEYS)
+    if keys:
+        get_cache().delete(*keys)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    if end_savepoint_state(session, _USER_CACHE_KEYS):
+        return
+    pop_transaction_state(session, _USER_CACHE_KEYS)
+
 # A função get_current_admin_user foi removida para simplificação.
 # Todos os usuários autenticados terão o mesmo nível de acesso a rotas protegidas.
 # (Comentário original já estava parcialmente em português ou referenciando código em português)
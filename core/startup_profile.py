@@ -0,0 +1,87 @@
+"""
+Perfil da inicialização da API (STARTUP_PROFILE=true).
+
+Mede, a partir da primeira linha de main.py, o tempo de cada fase da inicialização (imports,
+criação do app, verificação do schema, usuários iniciais, etc.) e os imports mais lentos,
+no estilo de `python -X importtime` (tempo acumulado de cada módulo, incluindo os que ele importa).
+Ao final do startup, registra no log o total e o compara com COLD_START_TARGET_MS, a meta
+usada para dimensionar o autoscaling (tempo até a réplica aceitar requisições).
+
+Desativado (padrão), as funções não fazem nada.
+"""
+import builtins
+import logging
+import os
+import sys
+import time
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "false").lower() in ("1", "true", "yes")
+
+try:
+    COLD_START_TARGET_MS = int(os.getenv("COLD_START_TARGET_MS", "1500"))
+except ValueError:
+    logger.error("COLD_START_TARGET_MS inválido. Usando padrão de 1500 ms.")
+    COLD_START_TARGET_MS = 1500
+
+# Quantidade de imports listados no relatório.
+_TOP_IMPORTS = 15
+
+_started_at: Optional[float] = None
+_last_mark: Optional[float] = None
+_phases: List[Tuple[str, float]] = []
+_imports: List[Tuple[str, float]] = [] # (módulo, ms acumulados), apenas módulos carregados pela primeira vez
+_original_import = None
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    started = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        _imports.append((name, (time.perf_counter() - started) * 1000))
+
+
+def start() -> None:
+    """Inicia a medição (chamado no topo de main.py, antes dos demais imports)."""
+    global _started_at, _last_mark, _original_import
+    if not STARTUP_PROFILE or _started_at is not None:
+        return
+    _started_at = _last_mark = time.perf_counter()
+    _original_import = builtins.__import__
+    builtins.__import__ = _timed_import
+
+
+def mark(phase: str) -> None:
+    """Registra o fim de uma fase da inicialização."""
+    global _last_mark
+    if _started_at is None:
+        return
+    now = time.perf_counter()
+    _phases.append((phase, (now - _last_mark) * 1000))
+    _last_mark = now
+
+
+def report() -> None:
+    """Encerra a medição e registra o relatório no log."""
+    global _started_at
+    if _started_at is None:
+        return
+    builtins.__import__ = _original_import
+    total_ms = (time.perf_counter() - _started_at) * 1000
+    _started_at = None
+
+    lines = [f"Perfil de inicialização: {total_ms:.0f} ms (meta: {COLD_START_TARGET_MS} ms)"]
+    lines.extend(f"  {phase:<40} {elapsed:8.1f} ms" for phase, elapsed in _phases)
+    lines.append(f"  Imports mais lentos (acumulado, {len(_imports)} módulos carregados):")
+    lines.extend(
+        f"    {elapsed:8.1f} ms  {name}"
+        for name, elapsed in sorted(_imports, key=lambda item: item[1], reverse=True)[:_TOP_IMPORTS]
+    )
+    logger.info("\n".join(lines))
+    if total_ms > COLD_START_TARGET_MS:
+        logger.warning(f"Inicialização levou {total_ms:.0f} ms, acima da meta de {COLD_START_TARGET_MS} ms (COLD_START_TARGET_MS).")
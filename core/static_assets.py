@@ -0,0 +1,147 @@
+"""
+Arquivos estáticos do frontend (static_frontend/) com impressão digital e pré-compressão.
+
+No startup da API, build_static_assets gera o frontend em STATIC_BUILD_DIR:
+  * cada .js/.css ganha uma cópia com o hash do conteúdo no nome (script.3f9a1c2b7e.js);
+  * os .html passam a referenciar essas cópias;
+  * os arquivos de texto ganham versões .gz (e .br, se o pacote `brotli` estiver instalado),
+    comprimidas no nível máximo uma única vez, e não a cada requisição.
+
+FingerprintedStaticFiles serve a versão pré-comprimida aceita pelo navegador e marca os arquivos
+com hash como imutáveis (o nome muda quando o conteúdo muda); HTML e arquivos sem hash são
+revalidados a cada acesso (ETag). Arquivos que não mudaram desde o último startup não são refeitos.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from core.responses import brotli, negotiate_encoding
+
+logger = logging.getLogger(__name__)
+
+STATIC_SOURCE_DIR = "static_frontend"
+STATIC_BUILD_DIR = os.getenv("STATIC_BUILD_DIR") or os.path.join(tempfile.gettempdir(), "frontend_estatico")
+
+FINGERPRINTED_EXTENSIONS = (".js", ".css")
+COMPRESSED_EXTENSIONS = (".js", ".css", ".html", ".svg", ".json", ".txt")
+# Abaixo disso a versão comprimida economiza menos do que os headers da resposta.
+MIN_COMPRESS_SIZE = 1024
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Variantes pré-comprimidas, em ordem de preferência.
+_VARIANT_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+_FINGERPRINT_RE = re.compile(r"\.[0-9a-f]{10}\.(js|css)$")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    # Vários processos da API podem gerar os arquivos ao mesmo tempo: cada um grava em um
+    # temporário e renomeia, de modo que nenhum navegador recebe um arquivo pela metade.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "wb") as tmp_file:
+        tmp_file.write(data)
+    os.replace(tmp_path, path)
+
+
+def _is_current(path: str, data: bytes) -> bool:
+    try:
+        with open(path, "rb") as existing:
+            return existing.read() == data
+    except FileNotFoundError:
+        return False
+
+
+def _write_asset(path: str, data: bytes) -> None:
+    """Grava o arquivo e suas variantes comprimidas, se o conteúdo mudou desde a última geração."""
+    compress = path.endswith(COMPRESSED_EXTENSIONS) and len(data) >= MIN_COMPRESS_SIZE
+    variants = {".gz": lambda: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = lambda: brotli.compress(data, quality=11)
+
+    changed = not _is_current(path, data)
+    if changed:
+        _write_atomic(path, data)
+    for suffix in _VARIANT_SUFFIXES.values():
+        variant_path = path + suffix
+        if not compress or suffix not in variants:
+            if os.path.exists(variant_path):
+                os.remove(variant_path) # Sobra de uma versão anterior (ou brotli desinstalado)
+        elif changed or not os.path.exists(variant_path):
+            _write_atomic(variant_path, variants[suffix]())
+
+
+def build_static_assets(source_dir: str = STATIC_SOURCE_DIR, build_dir: str = STATIC_BUILD_DIR) -> Dict[str, str]:
+    """Gera o frontend com impressão digital em `build_dir`. Retorna {arquivo original: arquivo com hash}."""
+    os.makedirs(build_dir, exist_ok=True)
+    sources = {}
+    for name in sorted(os.listdir(source_dir)):
+        if not name.startswith(".") and os.path.isfile(os.path.join(source_dir, name)):
+            with open(os.path.join(source_dir, name), "rb") as source_file:
+                sources[name] = source_file.read()
+
+    manifest = {}
+    for name, data in sources.items():
+        if name.endswith(FINGERPRINTED_EXTENSIONS):
+            stem, ext = os.path.splitext(name)
+            manifest[name] = f"{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+            _write_asset(os.path.join(build_dir, manifest[name]), data)
+
+    # Referências do tipo src="script.js", href="style.css" ou href="/frontend/style.css".
+    reference_re = re.compile(r'\b((?:src|href)="(?:/frontend/)?)(' + "|".join(re.escape(name) for name in manifest) + r')"')
+    for name, data in sources.items():
+        if name.endswith(".html") and manifest:
+            data = reference_re.sub(lambda m: f'{m.group(1)}{manifest[m.group(2)]}"', data.decode("utf-8")).encode("utf-8")
+        # Os .js/.css também ficam com o nome original (sem cache longo), para páginas antigas ainda abertas.
+        _write_asset(os.path.join(build_dir, name), data)
+
+    logger.info(f"Frontend gerado em {build_dir}: {len(manifest)} arquivo(s) com impressão digital.")
+    return manifest
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """
+    StaticFiles que serve as variantes .br/.gz geradas por build_static_assets e define o
+    Cache-Control. `fallback_directory` é consultado quando o arquivo não existe em `directory`
+    (ex.: a geração falhou no startup e os arquivos originais são servidos como estão).
+    """
+
+    def __init__(self, *, directory: str, fallback_directory: Optional[str] = None, **kwargs) -> None:
+        os.makedirs(directory, exist_ok=True)
+        super().__init__(directory=directory, **kwargs)
+        if fallback_directory:
+            self.all_directories.append(fallback_directory)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        immutable = bool(_FINGERPRINT_RE.search(os.path.basename(full_path)))
+
+        response = None
+        available = [encoding for encoding, suffix in _VARIANT_SUFFIXES.items() if os.path.exists(full_path + suffix)]
+        encoding = negotiate_encoding(request_headers.get("Accept-Encoding", ""), available) if available else None
+        if encoding:
+            variant_path = full_path + _VARIANT_SUFFIXES[encoding]
+            # O tipo é o do arquivo original (ex.: text/css), não o do .gz/.br.
+            media_type = FileResponse(full_path, stat_result=stat_result).media_type
+            response = FileResponse(variant_path, status_code=status_code, stat_result=os.stat(variant_path),
+                                    method=scope["method"], media_type=media_type)
+            response.headers["Content-Encoding"] = encoding
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, method=scope["method"])
+
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+        if available:
+            response.headers["Vary"] = "Accept-Encoding"
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -21,6 +21,15 @@ if DATABASE_URL is None:
 # A engine SQLAlchemy identificará o dialeto mysql+pymysql a partir da URL.
 engine = create_engine(DATABASE_URL)
 
+# O SQLite (desenvolvimento) só aplica chaves estrangeiras com este PRAGMA; a API depende delas
+# (como no MySQL/InnoDB) para rejeitar processos com advogado ou cliente inexistente.
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -32,3 +41,44 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# --- Estado acumulado até o commit ---
+# Listeners que juntam em session.info o que a transação gravou e só agem no commit precisam
+# distinguir os SAVEPOINTs (begin_nested): o SQLAlchemy 2.0 dispara before_commit/after_commit e
+# after_rollback também quando um SAVEPOINT é liberado ou desfeito. O estado fica separado por
+# SAVEPOINT: o RELEASE junta o do SAVEPOINT ao nível de fora, o ROLLBACK TO descarta só o dele, e
+# apenas o fim da transação externa entrega (ou descarta) o total.
+
+def transaction_state(session, key, factory):
+    """Estado `key` do SAVEPOINT atual (ou da transação, fora de SAVEPOINTs), criado com factory()."""
+    levels = session.info.setdefault(key, {})
+    level = session.get_nested_transaction()
+    if level not in levels:
+        levels[level] = factory()
+    return levels[level]
+
+def end_savepoint_state(session, key, merge=None) -> bool:
+    """
+    Em after_commit/after_rollback: se o evento é de um SAVEPOINT, junta o estado `key` dele ao nível
+    de fora com merge(destino, origem) (RELEASE) ou o descarta (merge=None, ROLLBACK TO) e devolve
+    True. Devolve False no fim da transação externa.
+    """
+    savepoint = session.get_nested_transaction()
+    if savepoint is None:
+        return False
+    levels = session.info.get(key)
+    state = levels.pop(savepoint, None) if levels else None
+    if merge is not None and state is not None:
+        parent = savepoint.parent
+        while parent is not None and not parent.nested:
+            parent = parent.parent
+        if parent in levels:
+            merge(levels[parent], state)
+        else:
+            levels[parent] = state
+    return True
+
+def pop_transaction_state(session, key):
+    """Estado `key` da transação externa (os SAVEPOINTs liberados já foram juntados a ele), ou None."""
+    levels = session.info.pop(key, None)
+    return levels.get(None) if levels else None
@@ -1,8 +1,10 @@
+from core import startup_profile # Antes dos demais imports, para medi-los (STARTUP_PROFILE=true)
+startup_profile.start()
+
 from typing import List, Optional
 
 from fastapi import FastAPI, HTTPException, Depends, status # Adicionado status
-from fastapi.staticfiles import StaticFiles # Adicionado para arquivos estáticos
-from pydantic import EmailStr
+from pydantic import EmailStr, TypeAdapter
 from datetime import date
 
 # Database imports
@@ -11,7 +13,7 @@ from sqlalchemy.orm import Session # Adicionado Session
 from sqlalchemy.exc import IntegrityError # <-- Adicionar esta linha
 
 # Model imports
-from fastapi.responses import RedirectResponse # Adicionado para redirecionamento
+from fastapi.responses import RedirectResponse, Response # Adicionado para redirecionamento
 from models.lawyer import Lawyer, LawyerCreate, Lawyer as LawyerResponse # Pydantic models, LawyerResponse for type hint
 from models.client import Client, ClientCreate, AreaOfExpertiseEnum # Pydantic models
 from models.legal_process import LegalProcess, LegalProcessCreate, LegalProcessBase # Pydantic models
@@ -19,244 +21,134 @@ from models.legal_process import LegalProcess, LegalProcessCreate, LegalProcessB
 from models import lawyer as lawyer_model
 from models import client as client_model
 from models import legal_process as process_model
+from models import deadline_calendar as deadline_calendar_model
+from models import notification_ledger as notification_ledger_model
+from models import outbox as outbox_model
+from models import scheduler_lease as scheduler_lease_model
+from models import job_queue as job_queue_model
+from models import lawyer_delay_stats as lawyer_delay_stats_model
+from models import legal_process_archive as legal_process_archive_model
+from models import process_rollup as process_rollup_model
+from models.data_version import get_data_version
+from models.action_type import action_type_ids_matching
 from routers import auth as auth_router # Import the auth router
 from core.security import get_current_user # get_current_admin_user removed
 from core.security import get_password_hash # For placeholder password in create_lawyer
-
-# Scheduler imports
-import asyncio # Import asyncio for running async jobs if needed from sync context
-from apscheduler.schedulers.background import BackgroundScheduler
-# Importar as versões async das funções de notificação
-from core.notifications import check_and_notify_daily_deadlines_async, check_and_notify_upcoming_fatal_deadlines_async
+from core.responses import RESPONSE_COMPRESSION, CompressionMiddleware, FastJSONResponse
+from core.archive import archived_process_numbers
+from core.integrity import raise_integrity_error
+from core.query_cache import normalize_filters, process_query_cache
+from core.process_index import process_index
+
+import asyncio
+import os
 import logging # Import logging
 
-app = FastAPI(title="Gerenciador de Processos Jurídicos")
-
-# Configure logging for APScheduler
-apscheduler_logger = logging.getLogger('apscheduler')
-apscheduler_logger.setLevel(logging.WARNING) # Set to WARNING or ERROR for less verbose logs in production
-
-# Scheduler instance
-scheduler = BackgroundScheduler(timezone="America/Sao_Paulo") # Use a relevant timezone
+# Respostas JSON serializadas com orjson (core/responses.py) e comprimidas (brotli/gzip) conforme o Accept-Encoding.
+app = FastAPI(title="Gerenciador de Processos Jurídicos", default_response_class=FastJSONResponse)
+if RESPONSE_COMPRESSION:
+    app.add_middleware(CompressionMiddleware)
 
 @app.on_event("startup")
 async def startup_event():
     app_logger = logging.getLogger(__name__)
-
-    # --- Criação automática do Admin User ---
-    db: Session = next(get_db()) # Obtém uma sessão de DB
-    try:
-        admin_oab = "00001SP"
-        admin_username = "admin"
-        admin_user = db.query(lawyer_model.LawyerDB).filter(
-            (lawyer_model.LawyerDB.oab == admin_oab) | (lawyer_model.LawyerDB.username == admin_username)
-        ).first()
-
-        if not admin_user:
-            app_logger.info(f"Usuário admin (OAB: {admin_oab} / Username: {admin_username}) não encontrado. Criando...")
-            hashed_password = get_password_hash("admin")
-            new_admin = lawyer_model.LawyerDB(
-                name="Admin User",
-                oab=admin_oab,
-                email="admin@example.com", # Email padrão
-                username=admin_username,
-                hashed_password=hashed_password,
-                telegram_id=None # Admin não precisa de ID de telegram por padrão
-            )
-            db.add(new_admin)
-            db.commit()
-            app_logger.info(f"Usuário admin (OAB: {admin_oab} / Username: {admin_username}) criado com sucesso.")
-        else:
-            app_logger.info(f"Usuário admin (OAB: {admin_user.oab} / Username: {admin_user.username}) já existe.")
-    except Exception as e:
-        app_logger.error(f"Erro durante a criação/verificação do usuário admin no startup: {e}", exc_info=True)
-        db.rollback() # Garante rollback em caso de erro durante a criação do admin
-    finally:
-        db.close() # Fecha a sessão do DB usada para o admin
-    # --- Fim da Criação automática do Admin User ---
-
-    # --- Criação automática do Usuário "advogado" para Testes ---
-    db_test_user: Session = next(get_db())
+    startup_profile.mark("servidor até o evento de startup")
+
+    # --- Versão do schema ---
+    # Em produção, as migrações rodam no deploy (python -m migrations upgrade) e aqui só se confere a revisão.
+    # DB_AUTO_MIGRATE=true aplica as migrações pendentes no startup (desenvolvimento).
+    from migrations import check_schema_version, upgrade
+    if os.getenv("DB_AUTO_MIGRATE", "false").lower() in ("1", "true", "yes"):
+        applied = upgrade(engine)
+        if applied:
+            app_logger.info(f"Migrações aplicadas no startup: {', '.join(applied)}.")
+    else:
+        check_schema_version(engine)
+    startup_profile.mark("startup: versão do schema")
+
+    # --- Usuários iniciais (admin e advogado de teste), em uma única consulta ---
+    # BOOTSTRAP_USERS=false pula a verificação (produção, com os usuários já cadastrados).
+    from core.bootstrap import BOOTSTRAP_USERS, ensure_bootstrap_users
+    if BOOTSTRAP_USERS:
+        db: Session = SessionLocal()
+        try:
+            created = ensure_bootstrap_users(db)
+            if created:
+                app_logger.info(f"Usuários iniciais criados: {', '.join(created)}.")
+        except Exception as e:
+            app_logger.error(f"Erro durante a criação/verificação dos usuários iniciais no startup: {e}", exc_info=True)
+            db.rollback()
+        finally:
+            db.close()
+        startup_profile.mark("startup: usuários iniciais")
+
+    # --- Frontend com impressão digital e pré-compressão ---
+    from core.static_assets import build_static_assets
     try:
-        test_user_username = "advogado"
-        test_user_oab = "12345SP" # OAB válida e única para teste
-        test_user_email = "advogado@example.com"
-
-        # Verificar se já existe por username ou OAB ou email
-        existing_test_user = db_test_user.query(lawyer_model.LawyerDB).filter(
-            (lawyer_model.LawyerDB.username == test_user_username) |
-            (lawyer_model.LawyerDB.oab == test_user_oab) |
-            (lawyer_model.LawyerDB.email == test_user_email)
-        ).first()
-
-        if not existing_test_user:
-            app_logger.info(f"Usuário de teste (Username: {test_user_username} / OAB: {test_user_oab}) não encontrado. Criando...")
-            hashed_password_test_user = get_password_hash("advogado")
-            new_test_user = lawyer_model.LawyerDB(
-                name="Advogado de Teste",
-                oab=test_user_oab,
-                email=test_user_email,
-                username=test_user_username,
-                hashed_password=hashed_password_test_user,
-                telegram_id=None
-            )
-            db_test_user.add(new_test_user)
-            db_test_user.commit()
-            app_logger.info(f"Usuário de teste (Username: {test_user_username} / OAB: {test_user_oab}) criado com sucesso.")
-        else:
-            app_logger.info(f"Usuário de teste (Username: {existing_test_user.username} / OAB: {existing_test_user.oab}) já existe.")
-    except IntegrityError as ie:
-        app_logger.warning(f"IntegrityError ao tentar criar usuário de teste (pode já existir parcialmente ou conflito de dados únicos): {ie}")
-        db_test_user.rollback()
+        await asyncio.to_thread(build_static_assets)
     except Exception as e:
-        app_logger.error(f"Erro durante a criação/verificação do usuário de teste no startup: {e}", exc_info=True)
-        db_test_user.rollback()
-    finally:
-        db_test_user.close() # Fecha a sessão do DB usada para o usuário de teste
-    # --- Fim da Criação automática do Usuário "advogado" ---
-
-    # Initialize Telegram bot
-    # Import here to avoid circular imports if telegram_bot itself imports something from main at module level
-    from telegram_bot import create_telegram_application, start_command_handler, help_command_handler # Updated import
-    from telegram.ext import CommandHandler # Added import
-
-    telegram_app = create_telegram_application()
-    if telegram_app:
-        app.state.telegram_app = telegram_app # Store the application instance
-        app.state.telegram_bot = telegram_app.bot # Store the bot instance for convenience
-
-        # Add command handlers
-        telegram_app.add_handler(CommandHandler("start", start_command_handler))
-        telegram_app.add_handler(CommandHandler("help", help_command_handler))
-        # Add other handlers here if needed in the future
-
-        # Initialize and start polling in the background
-        # Wrap run_polling in a way that it can be managed by FastAPI's lifecycle
-        async def run_telegram_polling():
-            try:
-                await telegram_app.initialize()
-                await telegram_app.updater.start_polling() # type: ignore
-                await telegram_app.start()
-                app_logger.info("Telegram bot polling started successfully.")
-                # Keep it running in the background.
-                # The application itself (FastAPI) will keep the event loop alive.
-                # We just need this task to continue running.
-                # A common pattern is to await a future that never completes,
-                # or simply let it run until shutdown.
-                # For PTB, start_polling itself will run until stopped.
-            except Exception as e:
-                app_logger.error(f"Error starting Telegram bot polling: {e}", exc_info=True)
-
-        # Schedule the polling task to run in the background
-        app.state.telegram_polling_task = asyncio.create_task(run_telegram_polling())
-        app_logger.info("Telegram bot application created and polling task scheduled.")
-    else:
-        app.state.telegram_app = None
-        app.state.telegram_bot = None
-        app_logger.error("Failed to create Telegram application. Bot will not run.")
-        # Optionally, raise an error or prevent FastAPI startup if bot is critical
-        # raise RuntimeError("Failed to initialize Telegram Bot, application cannot start.")
-
-
-    # Schedule jobs
-    # For daily deadlines, run once a day, e.g., at 8:00 AM
-    if app.state.telegram_bot:
-        scheduler.add_job(
-            check_and_notify_daily_deadlines_async,
-            'cron',
-            hour=8,
-            minute=0,
-            misfire_grace_time=600,
-            args=[app.state.telegram_bot] # Pass the bot instance
-        )
-        app_logger.info("Scheduled daily deadline notifications job with bot instance.")
-
-        # For upcoming fatal deadlines, run once a day, e.g., at 8:30 AM
-        scheduler.add_job(
-            check_and_notify_upcoming_fatal_deadlines_async,
-            'cron',
-            hour=8,
-            minute=30,
-            misfire_grace_time=600,
-            args=[app.state.telegram_bot] # Pass the bot instance
-        )
-        app_logger.info("Scheduled upcoming fatal deadline notifications job with bot instance.")
-    else:
-        app_logger.warning("Telegram bot instance not available. Notification jobs not scheduled.")
-
-    # Example for testing (run more frequently):
-    # if app.state.telegram_bot:
-    #     scheduler.add_job(check_and_notify_daily_deadlines_async, 'interval', minutes=2, id="daily_deadline_test", args=[app.state.telegram_bot])
-    # scheduler.add_job(check_and_notify_upcoming_fatal_deadlines_async, 'interval', minutes=3, id="upcoming_deadline_test")
+        app_logger.error(f"Erro ao gerar os arquivos do frontend; servindo os originais de static_frontend: {e}", exc_info=True)
+    startup_profile.mark("startup: arquivos do frontend")
 
-    if not scheduler.running:
-        scheduler.start()
-        app_logger.info("Scheduler started and jobs added.")
-        print("Scheduler started and jobs added for notifications.")
-    else:
-        app_logger.info("Scheduler already running.")
-        print("Scheduler already running.")
+    # --- Índice de processos em memória (PROCESS_INDEX_ENABLED=true) ---
+    if process_index.enabled:
+        try:
+            await asyncio.to_thread(process_index.load)
+        except Exception as e:
+            # Sem o índice, GET /processes/ consulta o banco; a próxima requisição tenta carregá-lo de novo.
+            app_logger.error(f"Erro ao carregar o índice de processos em memória: {e}", exc_info=True)
+        startup_profile.mark("startup: índice de processos")
+
+    # Scheduler, notificações do Telegram e analytics rodam no worker (python -m worker), fora da API.
+    # Para desenvolvimento em um único processo, RUN_WORKER_IN_API=true embute o worker aqui.
+    app.state.worker = None
+    if os.getenv("RUN_WORKER_IN_API", "false").lower() in ("1", "true", "yes"):
+        from worker import Worker
+        app.state.worker = Worker()
+        await app.state.worker.start()
+        app_logger.info("Worker embutido iniciado no processo da API (RUN_WORKER_IN_API).")
+        print("Embedded worker started (scheduler, Telegram and analytics).")
+
+    # Modo webhook do Telegram: os updates chegam por POST em /telegram/webhook, neste processo.
+    from core.config import TELEGRAM_UPDATE_MODE
+    if TELEGRAM_UPDATE_MODE == "webhook":
+        await telegram_webhook_router.webhook_dispatcher.start()
+        app_logger.info("Telegram webhook mode enabled (/telegram/webhook).")
+    startup_profile.mark("startup: worker e Telegram")
+    startup_profile.report()
 
 @app.on_event("shutdown")
 async def shutdown_event(): # Changed to async
     app_logger = logging.getLogger(__name__)
-    if scheduler.running:
-       scheduler.shutdown()
-       app_logger.info("Scheduler shut down successfully.")
-       print("Scheduler shut down successfully.")
-    else:
-       app_logger.info("Scheduler was not running or already shut down.")
-       print("Scheduler was not running or already shut down.")
-
-    # Shutdown Telegram bot application
-    if hasattr(app.state, 'telegram_polling_task') and app.state.telegram_polling_task:
-        app_logger.info("Attempting to stop Telegram bot polling task...")
-        # How to properly stop depends on how run_telegram_polling is structured.
-        # If telegram_app.updater.stop() is sufficient and start_polling() respects it:
-        telegram_app_instance = getattr(app.state, 'telegram_app', None)
-        if telegram_app_instance and telegram_app_instance.updater and telegram_app_instance.updater.running: # type: ignore
-            await telegram_app_instance.updater.stop() # type: ignore
-            app_logger.info("Telegram updater.stop() called.")
-
-        # Cancel the task if it's still running and wait for it
-        # This might be redundant if updater.stop() causes the task to exit cleanly
-        if not app.state.telegram_polling_task.done():
-            app.state.telegram_polling_task.cancel()
-            try:
-                await app.state.telegram_polling_task
-                app_logger.info("Telegram polling task cancelled and awaited.")
-            except asyncio.CancelledError:
-                app_logger.info("Telegram polling task successfully cancelled (as expected).")
-            except Exception as e:
-                app_logger.error(f"Error during Telegram polling task cancellation: {e}", exc_info=True)
-        else:
-            app_logger.info("Telegram polling task was already done.")
-
-    if hasattr(app.state, 'telegram_app') and app.state.telegram_app:
-        app_logger.info("Attempting to shut down Telegram application...")
-        telegram_app_instance = app.state.telegram_app
-        try:
-            if telegram_app_instance.running: # Check if it's running before stopping
-                await telegram_app_instance.stop()
-            await telegram_app_instance.shutdown()
-            app_logger.info("Telegram application shut down successfully.")
-        except Exception as e:
-            app_logger.error(f"Error during Telegram application shutdown: {e}", exc_info=True)
-    else:
-        app_logger.info("No Telegram application instance found in app.state to shut down.")
+    if getattr(app.state, 'worker', None):
+        await app.state.worker.stop()
+        app_logger.info("Embedded worker stopped.")
+        print("Embedded worker stopped.")
+    await telegram_webhook_router.webhook_dispatcher.stop()
 
 # Include routers
 app.include_router(auth_router.router)
 from routers import admin as admin_router # Importar o novo router admin
 app.include_router(admin_router.router) # Incluir o router admin
+from routers import batch as batch_router # Operações de CRUD em lote (/batch)
+app.include_router(batch_router.router)
+from routers import deadlines as deadlines_router # Calendário de prazos (/deadlines)
+app.include_router(deadlines_router.router)
+from routers import analytics as analytics_router # Tendências a partir dos agregados diários (/analytics/trends)
+app.include_router(analytics_router.router)
+from routers import reports as reports_router # Relatórios assíncronos (/reports)
+app.include_router(reports_router.router)
+from routers import telegram_webhook as telegram_webhook_router # Webhook do bot do Telegram (/telegram/webhook)
+app.include_router(telegram_webhook_router.router)
 
 # Montar diretório de arquivos estáticos
-app.mount("/frontend", StaticFiles(directory="static_frontend"), name="frontend")
+# O frontend é servido a partir da cópia com impressão digital gerada no startup (core/static_assets.py);
+# se a geração falhar, os arquivos originais de static_frontend são servidos como estão.
+from core.static_assets import STATIC_BUILD_DIR, STATIC_SOURCE_DIR, FingerprintedStaticFiles
+app.mount("/frontend", FingerprintedStaticFiles(directory=STATIC_BUILD_DIR, fallback_directory=STATIC_SOURCE_DIR), name="frontend")
 
-# Criar tabelas do banco de dados
-lawyer_model.Base.metadata.create_all(bind=engine)
-client_model.Base.metadata.create_all(bind=engine)
-process_model.Base.metadata.create_all(bind=engine)
+# O schema do banco é criado e atualizado pelas migrações (python -m migrations upgrade);
+# o startup apenas confere a revisão.
 
 # As funções auxiliares get_lawyer_by_id e get_client_by_id foram removidas.
 # A lógica de verificação de existência de advogado/cliente
@@ -271,6 +163,18 @@ async def root_redirect():
 def get_areas_of_expertise():
     return [area.value for area in AreaOfExpertiseEnum]
 
+# Mensagens por coluna para as violações de constraint (core/integrity.py).
+CREATE_LAWYER_CONFLICTS = {
+    "oab": (status.HTTP_400_BAD_REQUEST, "OAB already registered."),
+    "email": (status.HTTP_400_BAD_REQUEST, "Email already registered."),
+    "username": (status.HTTP_400_BAD_REQUEST, "Nickname (username) já registrado."),
+}
+UPDATE_LAWYER_CONFLICTS = {
+    "oab": (status.HTTP_400_BAD_REQUEST, "OAB já registrada por outro usuário."),
+    "email": (status.HTTP_400_BAD_REQUEST, "Email já registrado por outro usuário."),
+    "username": (status.HTTP_400_BAD_REQUEST, "Nickname (username) já registrado por outro usuário."),
+}
+
 @app.post("/lawyers/", response_model=LawyerResponse)
 def create_lawyer(lawyer_in: LawyerCreate, db: Session = Depends(get_db), current_user: lawyer_model.LawyerDB = Depends(get_current_user)):
     is_admin = (current_user.oab == "00001SP" or current_user.username == "admin")
@@ -294,20 +198,6 @@ def create_lawyer(lawyer_in: LawyerCreate, db: Session = Depends(get_db), curren
     # 2. Hash that password and set is_admin if needed.
     # For now, let's proceed with the protection, acknowledging this limitation.
 
-    # Check if OAB already exists, as this endpoint doesn't go through the /auth/register logic
-    existing_lawyer_oab = db.query(lawyer_model.LawyerDB).filter(lawyer_model.LawyerDB.oab == lawyer_in.oab).first()
-    if existing_lawyer_oab:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="OAB already registered."
-        )
-    existing_lawyer_email = db.query(lawyer_model.LawyerDB).filter(lawyer_model.LawyerDB.email == lawyer_in.email).first()
-    if existing_lawyer_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered."
-        )
-
     # This lawyer creation is problematic as it doesn't set a password.
     # For now, focusing on protection. A real implementation would need to handle this.
     # Defaulting hashed_password to a non-functional value or requiring a different input model.
@@ -320,14 +210,6 @@ def create_lawyer(lawyer_in: LawyerCreate, db: Session = Depends(get_db), curren
     default_password_for_new_lawyers = "advogado"
     hashed_password = get_password_hash(default_password_for_new_lawyers)
 
-    # Adicionar verificação de unicidade do username (Nickname)
-    existing_lawyer_username = db.query(lawyer_model.LawyerDB).filter(lawyer_model.LawyerDB.username == lawyer_in.username).first()
-    if existing_lawyer_username:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Nickname (username) já registrado."
-        )
-
     db_lawyer = lawyer_model.LawyerDB(
         **lawyer_in.model_dump(),
         hashed_password=hashed_password # Senha padrão "advogado"
@@ -336,11 +218,8 @@ def create_lawyer(lawyer_in: LawyerCreate, db: Session = Depends(get_db), curren
     try:
         db.commit()
         db.refresh(db_lawyer)
-    except IntegrityError: # Captura outras violações de unicidade (OAB, email) que podem não ter sido pegas acima
-        db.rollback()
-        # A mensagem de erro do Pydantic para username já é específica.
-        # Esta é uma mensagem genérica para OAB/email se a verificação explícita falhar ou para outras constraints.
-        raise HTTPException(status_code=400, detail="Erro ao criar advogado. Verifique se OAB, Email ou Nickname já existem.")
+    except IntegrityError as e: # OAB, email e username são únicos no banco; sem SELECTs de verificação antes do INSERT
+        raise_integrity_error(db, e, CREATE_LAWYER_CONFLICTS, "Erro ao criar advogado. Verifique se OAB, Email ou Nickname já existem.")
     return db_lawyer
 
 @app.get("/lawyers/", response_model=List[LawyerResponse])
@@ -377,43 +256,20 @@ def update_lawyer(lawyer_id: int, lawyer_update: LawyerCreate, db: Session = Dep
 
     update_data = lawyer_update.model_dump(exclude_unset=True)
 
-    # Verificar duplicação de email ou OAB se estiverem sendo alterados
-    if 'email' in update_data and update_data['email'] != db_lawyer_to_update.email:
-        existing_email = db.query(lawyer_model.LawyerDB).filter(
-            lawyer_model.LawyerDB.email == update_data['email'],
-            lawyer_model.LawyerDB.id != lawyer_id # Excluir o próprio usuário da checagem
-        ).first()
-        if existing_email:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email já registrado por outro usuário.")
-
-    if 'oab' in update_data and update_data['oab'] != db_lawyer_to_update.oab:
-        existing_oab = db.query(lawyer_model.LawyerDB).filter(
-            lawyer_model.LawyerDB.oab == update_data['oab'],
-            lawyer_model.LawyerDB.id != lawyer_id # Excluir o próprio usuário da checagem
-        ).first()
-        if existing_oab:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="OAB já registrada por outro usuário.")
-        if db_lawyer_to_update.oab == "00001SP" and update_data['oab'] != "00001SP": # Protege OAB do admin
-             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A OAB do administrador principal não pode ser alterada para um valor diferente de '00001SP'.")
-
-    # Verificar e lidar com a atualização do username (Nickname)
-    if 'username' in update_data and update_data['username'] != db_lawyer_to_update.username:
-        # Admin não pode mudar o username do "Admin User" por aqui.
-        if db_lawyer_to_update.username == "admin" and update_data['username'] != "admin":
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="O Nickname (username) do administrador principal ('admin') não pode ser alterado por este endpoint.")
-
-        existing_username = db.query(lawyer_model.LawyerDB).filter(
-            lawyer_model.LawyerDB.username == update_data['username'],
-            lawyer_model.LawyerDB.id != lawyer_id # Excluir o próprio usuário da checagem
-        ).first()
-        if existing_username:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nickname (username) já registrado por outro usuário.")
+    # Proteções do administrador principal. A unicidade de email, OAB e username fica a cargo do banco.
+    if 'oab' in update_data and db_lawyer_to_update.oab == "00001SP" and update_data['oab'] != "00001SP":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A OAB do administrador principal não pode ser alterada para um valor diferente de '00001SP'.")
+    if 'username' in update_data and db_lawyer_to_update.username == "admin" and update_data['username'] != "admin":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="O Nickname (username) do administrador principal ('admin') não pode ser alterado por este endpoint.")
 
     for key, value in update_data.items():
         setattr(db_lawyer_to_update, key, value)
 
     db.add(db_lawyer_to_update)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as e:
+        raise_integrity_error(db, e, UPDATE_LAWYER_CONFLICTS, "Erro ao atualizar advogado. Verifique se OAB, Email ou Nickname já existem.")
     db.refresh(db_lawyer_to_update)
     return db_lawyer_to_update
 
@@ -437,15 +293,16 @@ def delete_lawyer(lawyer_id: int, db: Session = Depends(get_db), current_user: l
             detail="O usuário admin principal não pode ser excluído."
         )
 
-    # Verificar processos associados
+    # Verificar processos associados (inclusive os arquivados, que também referenciam o advogado)
     associated_processes = db.query(process_model.LegalProcessDB).filter(process_model.LegalProcessDB.lawyer_id == lawyer_id).count()
+    associated_processes += db.query(legal_process_archive_model.LegalProcessArchiveDB).filter(legal_process_archive_model.LegalProcessArchiveDB.lawyer_id == lawyer_id).count()
     if associated_processes > 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, # Usar status
             detail="Lawyer cannot be deleted as they are associated with one or more legal processes."
         )
 
-    db.delete(db_lawyer)
+    db.delete(db_lawyer_to_delete)
     db.commit()
     return {"message": "Lawyer deleted successfully"}
 
@@ -527,15 +384,16 @@ def delete_client(client_id: int, db: Session = Depends(get_db), current_user: l
     if db_client_to_delete is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado.")
 
-    # Verificar processos associados
+    # Verificar processos associados (inclusive os arquivados, que também referenciam o cliente)
     associated_processes = db.query(process_model.LegalProcessDB).filter(process_model.LegalProcessDB.client_id == client_id).count()
+    associated_processes += db.query(legal_process_archive_model.LegalProcessArchiveDB).filter(legal_process_archive_model.LegalProcessArchiveDB.client_id == client_id).count()
     if associated_processes > 0:
         raise HTTPException(
             status_code=400,
             detail="Client cannot be deleted as they are associated with one or more legal processes."
         )
 
-    db.delete(db_client)
+    db.delete(db_client_to_delete)
     db.commit()
     return {"message": "Client deleted successfully"}
 
@@ -550,10 +408,8 @@ def create_legal_process(process_in: LegalProcessCreate, db: Session = Depends(g
 
     if is_admin:
         # Se for admin, pode definir o lawyer_id a partir do payload, mas precisa existir
+        # (a existência do advogado é garantida pela chave estrangeira no INSERT)
         if process_in.lawyer_id:
-            target_lawyer = db.query(lawyer_model.LawyerDB).filter(lawyer_model.LawyerDB.id == process_in.lawyer_id).first()
-            if not target_lawyer:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Advogado com id {process_in.lawyer_id} não encontrado.")
             final_lawyer_id = process_in.lawyer_id
         else:
             # Se admin não fornecer lawyer_id, pode-se atribuir a ele mesmo ou levantar erro.
@@ -569,26 +425,76 @@ def create_legal_process(process_in: LegalProcessCreate, db: Session = Depends(g
             app_logger = logging.getLogger(__name__)
             app_logger.warning(f"Usuário não-admin {current_user.username} tentou criar processo para lawyer_id {process_in.lawyer_id}. Será sobrescrito para {current_user.id}.")
 
-    # Validar client_id
-    client = db.query(client_model.ClientDB).filter(client_model.ClientDB.id == process_in.client_id).first()
-    if not client:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Cliente com id {process_in.client_id} não encontrado.")
-
     # Criar o dicionário de dados para o novo processo, garantindo o lawyer_id correto
     process_data = process_in.model_dump()
     process_data['lawyer_id'] = final_lawyer_id
 
+    # O índice único cobre só a tabela principal; o número também não pode ser de um processo arquivado.
+    if archived_process_numbers(db, [process_data['process_number']]):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Erro: Número do processo já existente.")
+
     db_process = process_model.LegalProcessDB(**process_data)
     db.add(db_process)
     try:
         db.commit()
-        db.refresh(db_process)
-    except IntegrityError:
-        db.rollback()
-        # A constraint unique está em process_number
-        raise HTTPException(status_code=400, detail="Erro: Número do processo já existente.")
+    except IntegrityError as e:
+        # Número do processo duplicado (índice único) ou advogado/cliente inexistente (chaves estrangeiras).
+        raise_integrity_error(db, e, {
+            "process_number": (status.HTTP_400_BAD_REQUEST, "Erro: Número do processo já existente."),
+            "lawyer_id": (status.HTTP_404_NOT_FOUND, f"Advogado com id {final_lawyer_id} não encontrado."),
+            "client_id": (status.HTTP_404_NOT_FOUND, f"Cliente com id {process_in.client_id} não encontrado."),
+        }, "Erro: Número do processo já existente.",
+            find_column=lambda: missing_process_reference(db, final_lawyer_id, process_in.client_id))
+    db.refresh(db_process)
     return db_process
 
+def missing_process_reference(db: Session, lawyer_id: Optional[int], client_id: Optional[int]) -> Optional[str]:
+    """
+    Coluna (lawyer_id ou client_id) que aponta para um registro inexistente. Usada só depois de uma
+    IntegrityError em que o banco não informa qual chave estrangeira falhou (SQLite).
+    """
+    if lawyer_id is not None and db.query(lawyer_model.LawyerDB.id).filter(lawyer_model.LawyerDB.id == lawyer_id).first() is None:
+        return "lawyer_id"
+    if client_id is not None and db.query(client_model.ClientDB.id).filter(client_model.ClientDB.id == client_id).first() is None:
+        return "client_id"
+    return None
+
+# Relacionamentos que podem ser embutidos nas respostas de processos (?expand=lawyer,client).
+PROCESS_EXPAND_OPTIONS = ("lawyer", "client")
+
+def parse_process_expand(expand: Optional[str]) -> set:
+    fields = {field.strip() for field in (expand or "").split(",") if field.strip()}
+    invalid = fields - set(PROCESS_EXPAND_OPTIONS)
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Valor inválido em expand: {', '.join(sorted(invalid))}. Use: {', '.join(PROCESS_EXPAND_OPTIONS)}."
+        )
+    return fields
+
+def expand_process_query(query, model, fields: set):
+    """
+    Acrescenta à consulta de processos (principal ou arquivo) apenas as colunas de nome/OAB do
+    advogado e do cliente, por LEFT JOIN. Cada linha passa a ser (processo, lawyer_name, ...).
+    """
+    if "lawyer" in fields:
+        query = query.outerjoin(lawyer_model.LawyerDB, lawyer_model.LawyerDB.id == model.lawyer_id).add_columns(
+            lawyer_model.LawyerDB.name.label("lawyer_name"), lawyer_model.LawyerDB.oab.label("lawyer_oab"))
+    if "client" in fields:
+        query = query.outerjoin(client_model.ClientDB, client_model.ClientDB.id == model.client_id).add_columns(
+            client_model.ClientDB.name.label("client_name"))
+    return query
+
+def split_expanded_row(row, fields: set):
+    """Separa o processo das colunas embutidas por expand_process_query."""
+    if not fields:
+        return row, {}
+    extra = row._asdict()
+    return row[0], {key: value for key, value in extra.items() if key in ("lawyer_name", "lawyer_oab", "client_name")}
+
+# Serializa a listagem direto para JSON (mesmo formato do response_model), para guardar no cache.
+PROCESS_LIST_ADAPTER = TypeAdapter(List[LegalProcess])
+
 @app.get("/processes/", response_model=List[LegalProcess])
 def get_legal_processes(
     client_id: Optional[int] = None,
@@ -597,66 +503,139 @@ def get_legal_processes(
     status: Optional[str] = None, # Este 'status' é o parâmetro de filtro, não o módulo fastapi.status
     fatal_deadline_de: Optional[date] = None,
     fatal_deadline_ate: Optional[date] = None,
+    include_archived: bool = False, # Inclui os processos concluídos movidos para o arquivo (core/archive.py)
+    expand: Optional[str] = None, # "lawyer", "client" ou "lawyer,client": embute nome/OAB do advogado e nome do cliente
     db: Session = Depends(get_db),
     current_user: lawyer_model.LawyerDB = Depends(get_current_user) # Alterado para lawyer_model.LawyerDB
 ):
-    from core.analytics import calculate_lawyer_delay_statistics, get_process_delay_risk
-
-    query = db.query(process_model.LegalProcessDB)
+    from core.analytics import get_lawyer_delay_statistics, get_process_delay_risk
 
     # Se o usuário não for admin, filtre sempre pelos seus próprios processos
     # e ignore qualquer filtro lawyer_id que venha da query string.
     is_admin = (current_user.oab == "00001SP" or current_user.username == "admin")
+    expand_fields = parse_process_expand(expand)
+
+    if status:
+        # Grafia canônica do status ("Ativo" -> "ativo"); nenhum processo tem um status inexistente.
+        status = process_model.normalize_process_status(status)
+        if status is None:
+            return []
+
+    # Cache da resposta serializada (core/query_cache.py): escopo do usuário + filtros, na versão atual dos dados.
+    cache_key = data_version = None
+    if process_query_cache.enabled:
+        cache_key = ("admin" if is_admin else current_user.id, normalize_filters(
+            client_id=client_id, lawyer_id=lawyer_id if is_admin else None, action_type=action_type or None,
+            status=status or None, fatal_deadline_de=fatal_deadline_de, fatal_deadline_ate=fatal_deadline_ate,
+            include_archived=include_archived, expand=expand_fields,
+        ))
+        data_version = get_data_version(db)
+        cached_body = process_query_cache.get(data_version, cache_key)
+        if cached_body is not None:
+            return Response(content=cached_body, media_type="application/json", headers={"X-Cache": "HIT"})
+
+    def filtered_query(model):
+        # Os mesmos filtros valem para a tabela principal e para o arquivo (colunas com os mesmos nomes).
+        query = expand_process_query(db.query(model), model, expand_fields)
+        if not is_admin:
+            query = query.filter(model.lawyer_id == current_user.id)
+        elif lawyer_id is not None: # Se for admin, permitir filtrar por lawyer_id
+            query = query.filter(model.lawyer_id == lawyer_id)
+
+        if client_id is not None:
+            query = query.filter(model.client_id == client_id)
+        if action_type:
+            query = query.filter(model.action_type_id.in_(action_type_ids_matching(action_type)))
+        if status: # Este 'status' é o parâmetro de filtro
+            query = query.filter(model.status == status)
+        if fatal_deadline_de:
+            query = query.filter(model.fatal_deadline >= fatal_deadline_de)
+        if fatal_deadline_ate:
+            query = query.filter(model.fatal_deadline <= fatal_deadline_ate)
+        # Ordem por id (a mesma do índice em memória), independente do índice usado pelo banco.
+        return query.order_by(model.id)
+
+    # Índice em memória (core/process_index.py): atende a tabela principal sem consultar o banco
+    # quando está na mesma versão dos dados; senão (ou com include_archived), consulta o banco.
+    processes = None
+    if process_index.enabled and not include_archived:
+        if data_version is None:
+            data_version = get_data_version(db)
+        processes = process_index.search(
+            data_version, expand_fields, lawyer_id=lawyer_id if is_admin else current_user.id, client_id=client_id,
+            status=status or None, action_type=action_type or None, fatal_from=fatal_deadline_de, fatal_to=fatal_deadline_ate,
+        )
 
-    if not is_admin:
-        query = query.filter(process_model.LegalProcessDB.lawyer_id == current_user.id)
-    elif lawyer_id is not None: # Se for admin, permitir filtrar por lawyer_id
-        query = query.filter(process_model.LegalProcessDB.lawyer_id == lawyer_id)
-
-    if client_id is not None:
-        query = query.filter(process_model.LegalProcessDB.client_id == client_id)
-    if action_type:
-        query = query.filter(process_model.LegalProcessDB.action_type.contains(action_type))
-    if status: # Este 'status' é o parâmetro de filtro
-        query = query.filter(process_model.LegalProcessDB.status == status)
-    if fatal_deadline_de:
-        query = query.filter(process_model.LegalProcessDB.fatal_deadline >= fatal_deadline_de)
-    if fatal_deadline_ate:
-        query = query.filter(process_model.LegalProcessDB.fatal_deadline <= fatal_deadline_ate)
-
-    processes_db = query.all()
-
-    # Calcular estatísticas de atraso dos advogados
-    # Idealmente, isso poderia ser cacheado ou calculado menos frequentemente se for custoso
-    lawyer_delay_stats = calculate_lawyer_delay_statistics(db)
+    if processes is None:
+        processes_db = filtered_query(process_model.LegalProcessDB).all()
+        if include_archived:
+            processes_db += filtered_query(legal_process_archive_model.LegalProcessArchiveDB).all()
+
+        processes = []
+        for row in processes_db:
+            process_db_item, expanded = split_expanded_row(row, expand_fields)
+            # Converter o objeto SQLAlchemy para o modelo Pydantic LegalProcess
+            # para que possamos adicionar o campo delay_risk.
+            # O FastAPI faria isso automaticamente na serialização da resposta,
+            # mas como precisamos modificar o objeto antes, fazemos manualmente.
+            process_pydantic = LegalProcess.model_validate(process_db_item) # Usar model_validate em Pydantic v2
+            for key, value in expanded.items():
+                setattr(process_pydantic, key, value)
+            processes.append(process_pydantic)
+
+    # Estatísticas de atraso dos advogados, recalculadas periodicamente pelo worker (worker.py)
+    lawyer_delay_stats = get_lawyer_delay_statistics(db, data_version)
 
     # Enriquecer cada processo com o risco de atraso
     processes_with_risk = []
-    for process_db_item in processes_db:
-        # Converter o objeto SQLAlchemy para o modelo Pydantic LegalProcess
-        # para que possamos adicionar o campo delay_risk.
-        # O FastAPI faria isso automaticamente na serialização da resposta,
-        # mas como precisamos modificar o objeto antes, fazemos manualmente.
-        process_pydantic = LegalProcess.model_validate(process_db_item) # Usar model_validate em Pydantic v2
-
-        lawyer_stats_for_process = lawyer_delay_stats.get(process_db_item.lawyer_id)
+    for process_pydantic in processes:
+        lawyer_stats_for_process = lawyer_delay_stats.get(process_pydantic.lawyer_id)
 
         if lawyer_stats_for_process:
             # A função get_process_delay_risk em analytics.py espera lawyer_id e o dict de stats completo
-            process_pydantic.delay_risk = get_process_delay_risk(process_db_item.lawyer_id, lawyer_delay_stats)
+            process_pydantic.delay_risk = get_process_delay_risk(process_pydantic.lawyer_id, lawyer_delay_stats)
         else:
             process_pydantic.delay_risk = "N/A" # Advogado não encontrado no dict de estatísticas (improvável se stats são de todos os advogados)
 
         processes_with_risk.append(process_pydantic)
 
-    return processes_with_risk
+    if cache_key is None:
+        return processes_with_risk
+    body = PROCESS_LIST_ADAPTER.dump_json(processes_with_risk)
+    process_query_cache.set(data_version, cache_key, body)
+    return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+@app.get("/processes/cache/stats")
+def get_process_query_cache_stats(current_user: lawyer_model.LawyerDB = Depends(get_current_user)):
+    """Acertos, falhas e ocupação do cache de GET /processes/ neste processo da API (somente admin)."""
+    is_admin = (current_user.oab == "00001SP" or current_user.username == "admin")
+    if not is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado. Apenas administradores podem ver as estatísticas do cache.")
+    return process_query_cache.stats()
+
+@app.get("/processes/index/stats")
+def get_process_index_stats(current_user: lawyer_model.LawyerDB = Depends(get_current_user)):
+    """Versão, tamanho, memória ocupada e uso do índice de processos em memória deste processo da API (somente admin)."""
+    is_admin = (current_user.oab == "00001SP" or current_user.username == "admin")
+    if not is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado. Apenas administradores podem ver as estatísticas do índice.")
+    return process_index.stats()
 
 @app.get("/processes/{process_id}", response_model=LegalProcess)
-def get_legal_process(process_id: int, db: Session = Depends(get_db), current_user: LawyerResponse = Depends(get_current_user)):
-    db_process = db.query(process_model.LegalProcessDB).filter(process_model.LegalProcessDB.id == process_id).first()
-    if db_process is None:
+def get_legal_process(process_id: int, expand: Optional[str] = None, db: Session = Depends(get_db), current_user: LawyerResponse = Depends(get_current_user)):
+    expand_fields = parse_process_expand(expand)
+    row = None
+    # Processos arquivados mantêm o id e continuam disponíveis para consulta (somente leitura).
+    for model in (process_model.LegalProcessDB, legal_process_archive_model.LegalProcessArchiveDB):
+        row = expand_process_query(db.query(model), model, expand_fields).filter(model.id == process_id).first()
+        if row is not None:
+            break
+    if row is None:
         raise HTTPException(status_code=404, detail="Legal process not found")
-    return db_process
+    db_process, expanded = split_expanded_row(row, expand_fields)
+    if not expanded:
+        return db_process
+    return LegalProcess.model_validate(db_process).model_copy(update=expanded)
 
 @app.put("/processes/{process_id}", response_model=LegalProcess)
 def update_legal_process(process_id: int, process_update: LegalProcessCreate, db: Session = Depends(get_db), current_user: LawyerResponse = Depends(get_current_user)):
@@ -676,23 +655,30 @@ def update_legal_process(process_id: int, process_update: LegalProcessCreate, db
     if not is_admin and 'lawyer_id' in update_data and update_data['lawyer_id'] != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Não autorizado a alterar o advogado responsável deste processo.")
 
-    # Se for admin e tentar mudar lawyer_id, validar o novo advogado
-    if is_admin and 'lawyer_id' in update_data and update_data['lawyer_id'] != db_process.lawyer_id:
-        new_lawyer = db.query(lawyer_model.LawyerDB).filter(lawyer_model.LawyerDB.id == update_data['lawyer_id']).first()
-        if not new_lawyer:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Novo advogado com id {update_data['lawyer_id']} não encontrado.")
+    if update_data.get('process_number') not in (None, db_process.process_number):
+        if archived_process_numbers(db, [update_data['process_number']]):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Erro: Número do processo já existente.")
 
-    # Validar client_id se estiver sendo alterado
-    if 'client_id' in update_data and update_data['client_id'] != db_process.client_id:
-        new_client = db.query(client_model.ClientDB).filter(client_model.ClientDB.id == update_data['client_id']).first()
-        if not new_client:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Novo cliente com id {update_data['client_id']} não encontrado.")
+    previous_lawyer_id = db_process.lawyer_id
+    previous_deadlines = (db_process.delivery_deadline, db_process.fatal_deadline)
 
     for key, value in update_data.items():
         setattr(db_process, key, value)
 
     db.add(db_process)
-    db.commit()
+    # Aviso ao advogado responsável (atribuição ou mudança de prazos), gravado no outbox na mesma transação.
+    # Advogado ou cliente inexistente e número duplicado são barrados pelas constraints no UPDATE.
+    from core.notifications import enqueue_process_update_notifications
+    enqueue_process_update_notifications(db, db_process, previous_lawyer_id, previous_deadlines, current_user.id)
+    try:
+        db.commit()
+    except IntegrityError as e:
+        raise_integrity_error(db, e, {
+            "process_number": (status.HTTP_400_BAD_REQUEST, "Erro: Número do processo já existente."),
+            "lawyer_id": (status.HTTP_404_NOT_FOUND, f"Novo advogado com id {update_data.get('lawyer_id')} não encontrado."),
+            "client_id": (status.HTTP_404_NOT_FOUND, f"Novo cliente com id {update_data.get('client_id')} não encontrado."),
+        }, "Erro ao atualizar processo.",
+            find_column=lambda: missing_process_reference(db, update_data.get('lawyer_id'), update_data.get('client_id')))
     db.refresh(db_process)
     return db_process
 
@@ -711,3 +697,5 @@ def delete_legal_process(process_id: int, db: Session = Depends(get_db), current
     db.delete(db_process)
     db.commit()
     return {"message": "Processo legal excluído com sucesso"}
+
+startup_profile.mark("imports e criação do app")
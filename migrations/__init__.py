@@ -0,0 +1,167 @@
+"""
+Migrações de schema versionadas (no estilo do Alembic, sem dependência extra).
+
+Cada arquivo em migrations/versions/ define `revision`, `down_revision` (a revisão anterior,
+ou None na primeira), `description` e `upgrade(connection)`. As revisões formam uma cadeia
+linear; a revisão aplicada fica na tabela schema_version (uma linha).
+
+Uso:
+    python -m migrations upgrade        # aplica as revisões pendentes
+    python -m migrations current        # mostra a revisão do banco e a mais recente (head)
+    python -m migrations history        # lista as revisões
+    python -m migrations stamp <rev>    # registra a revisão sem executar nada
+
+Os processos da API e do worker apenas conferem a revisão (check_schema_version, uma consulta)
+em vez de refletir e criar as tabelas a cada inicialização.
+
+No MySQL, DDL faz commit implícito: uma migração interrompida no meio não é desfeita. Por isso as
+migrações devem ser re-executáveis (as funções de migrations.operations ignoram o que já existe).
+"""
+import importlib
+import logging
+import pkgutil
+from contextlib import contextmanager
+from types import ModuleType
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import Column, MetaData, String, Table, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+# Nome do lock (GET_LOCK do MySQL) que impede dois `upgrade` simultâneos (ex.: deploy com várias réplicas).
+MIGRATION_LOCK_NAME = "schema_migrations"
+MIGRATION_LOCK_TIMEOUT_SECONDS = 300
+
+schema_version_table = Table(
+    SCHEMA_VERSION_TABLE, MetaData(),
+    Column("version_num", String(32), primary_key=True),
+)
+
+
+class SchemaVersionError(RuntimeError):
+    """O banco não está na revisão esperada pelo código."""
+
+
+class Migration(NamedTuple):
+    revision: str
+    down_revision: Optional[str]
+    description: str
+    module: ModuleType
+
+
+def load_migrations() -> List[Migration]:
+    """Carrega as revisões de migrations/versions, da mais antiga para a mais recente."""
+    from migrations import versions
+
+    by_down_revision = {}
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        module = importlib.import_module(f"{versions.__name__}.{module_info.name}")
+        migration = Migration(module.revision, module.down_revision, getattr(module, "description", ""), module)
+        if migration.down_revision in by_down_revision:
+            raise RuntimeError(
+                f"Migrações '{by_down_revision[migration.down_revision].revision}' e '{migration.revision}' "
+                f"partem da mesma revisão '{migration.down_revision}'."
+            )
+        by_down_revision[migration.down_revision] = migration
+
+    chain = []
+    current = None
+    while current in by_down_revision:
+        migration = by_down_revision.pop(current)
+        chain.append(migration)
+        current = migration.revision
+    if by_down_revision:
+        orphans = ", ".join(sorted(migration.revision for migration in by_down_revision.values()))
+        raise RuntimeError(f"Migrações fora da cadeia de revisões: {orphans}.")
+    return chain
+
+
+def head_revision() -> Optional[str]:
+    migrations = load_migrations()
+    return migrations[-1].revision if migrations else None
+
+
+def current_revision(connection: Connection) -> Optional[str]:
+    """Revisão registrada no banco, ou None se ele ainda não foi migrado."""
+    if not inspect(connection).has_table(SCHEMA_VERSION_TABLE):
+        return None
+    return connection.execute(schema_version_table.select()).scalar()
+
+
+def _set_revision(connection: Connection, revision: str) -> None:
+    connection.execute(schema_version_table.delete())
+    connection.execute(schema_version_table.insert().values(version_num=revision))
+
+
+@contextmanager
+def _migration_lock(engine: Engine):
+    if engine.dialect.name != "mysql":
+        yield
+        return
+    with engine.connect() as lock_connection:
+        acquired = lock_connection.execute(
+            text("SELECT GET_LOCK(:name, :timeout)"), {"name": MIGRATION_LOCK_NAME, "timeout": MIGRATION_LOCK_TIMEOUT_SECONDS}
+        ).scalar()
+        if acquired != 1:
+            raise RuntimeError("Não foi possível obter o lock de migração: outro `upgrade` está em andamento.")
+        try:
+            yield
+        finally:
+            lock_connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": MIGRATION_LOCK_NAME})
+
+
+def upgrade(engine: Engine, target: str = "head") -> List[str]:
+    """Aplica, em ordem, as revisões pendentes até `target`. Retorna as revisões aplicadas."""
+    migrations = load_migrations()
+    revisions = [migration.revision for migration in migrations]
+    if target != "head" and target not in revisions:
+        raise ValueError(f"Revisão desconhecida: '{target}'.")
+
+    applied = []
+    with _migration_lock(engine):
+        with engine.connect() as connection:
+            current = current_revision(connection)
+        if current is not None and current not in revisions:
+            raise SchemaVersionError(f"O banco está na revisão '{current}', que não existe neste código.")
+
+        start = revisions.index(current) + 1 if current is not None else 0
+        stop = len(revisions) if target == "head" else revisions.index(target) + 1
+        for migration in migrations[start:stop]:
+            logger.info(f"Aplicando migração {migration.revision}: {migration.description}")
+            with engine.begin() as connection:
+                if migration.down_revision is None:
+                    schema_version_table.create(connection, checkfirst=True)
+                migration.module.upgrade(connection)
+                _set_revision(connection, migration.revision)
+            applied.append(migration.revision)
+    return applied
+
+
+def stamp(engine: Engine, revision: str) -> None:
+    """Registra `revision` como aplicada, sem executar migrações."""
+    if revision == "head":
+        revision = head_revision()
+    elif revision not in [migration.revision for migration in load_migrations()]:
+        raise ValueError(f"Revisão desconhecida: '{revision}'.")
+    with engine.begin() as connection:
+        schema_version_table.create(connection, checkfirst=True)
+        _set_revision(connection, revision)
+
+
+def check_schema_version(engine: Engine) -> str:
+    """
+    Confere se o banco está na revisão mais recente (uma consulta à tabela schema_version).
+    Levanta SchemaVersionError caso contrário. Retorna a revisão.
+    """
+    expected = head_revision()
+    with engine.connect() as connection:
+        current = current_revision(connection)
+    if current != expected:
+        raise SchemaVersionError(
+            f"Schema do banco na revisão '{current}', mas o código espera '{expected}'. "
+            "Execute `python -m migrations upgrade` antes de iniciar a aplicação."
+        )
+    return current
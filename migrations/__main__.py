@@ -0,0 +1,39 @@
+"""Linha de comando das migrações: python -m migrations {upgrade,current,history,stamp}."""
+import argparse
+import logging
+import sys
+
+from database import engine
+from migrations import current_revision, head_revision, load_migrations, stamp, upgrade
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m migrations", description="Migrações de schema do banco de dados.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = subparsers.add_parser("upgrade", help="Aplica as migrações pendentes.")
+    upgrade_parser.add_argument("target", nargs="?", default="head", help="Revisão final (padrão: head).")
+    subparsers.add_parser("current", help="Mostra a revisão atual do banco.")
+    subparsers.add_parser("history", help="Lista as revisões disponíveis.")
+    stamp_parser = subparsers.add_parser("stamp", help="Registra a revisão sem executar migrações.")
+    stamp_parser.add_argument("revision")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
+
+    if args.command == "upgrade":
+        applied = upgrade(engine, args.target)
+        print(f"Migrações aplicadas: {', '.join(applied)}." if applied else "Banco já está atualizado.")
+    elif args.command == "current":
+        with engine.connect() as connection:
+            print(f"Revisão atual: {current_revision(connection)} (head: {head_revision()})")
+    elif args.command == "history":
+        for migration in load_migrations():
+            print(f"{migration.down_revision or '<base>'} -> {migration.revision}: {migration.description}")
+    elif args.command == "stamp":
+        stamp(engine, args.revision)
+        print(f"Banco marcado na revisão {args.revision}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
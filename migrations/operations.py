@@ -0,0 +1,117 @@
+"""
+Operações de schema usadas pelas migrações.
+
+Todas ignoram o que já existe, para que uma migração interrompida possa ser executada de novo.
+No MySQL, índices e colunas são criados com ALGORITHM=INPLACE, LOCK=NONE: a tabela continua
+aceitando leituras e escritas durante a operação (o MySQL recusa a DDL em vez de bloquear a
+tabela se a operação não puder ser feita online).
+"""
+from typing import Sequence
+
+from sqlalchemy import Column, MetaData, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateColumn
+
+_MYSQL_ONLINE_DDL = "ALGORITHM=INPLACE, LOCK=NONE"
+
+
+def has_table(connection: Connection, table_name: str) -> bool:
+    return inspect(connection).has_table(table_name)
+
+
+def has_index(connection: Connection, table_name: str, index_name: str) -> bool:
+    inspector = inspect(connection)
+    names = {index["name"] for index in inspector.get_indexes(table_name)}
+    names.update(constraint["name"] for constraint in inspector.get_unique_constraints(table_name))
+    return index_name in names
+
+
+def has_column(connection: Connection, table_name: str, column_name: str) -> bool:
+    return column_name in {column["name"] for column in inspect(connection).get_columns(table_name)}
+
+
+def create_tables(connection: Connection, metadata: MetaData) -> None:
+    """Cria as tabelas de `metadata` que ainda não existem (com seus índices)."""
+    metadata.create_all(connection, checkfirst=True)
+
+
+def create_view(connection: Connection, view_name: str, select_sql: str) -> None:
+    """Cria a view (ou a substitui pela nova definição, exceto no SQLite, que não tem CREATE OR REPLACE)."""
+    quote = connection.dialect.identifier_preparer.quote
+    if connection.dialect.name == "sqlite":
+        ddl = f"CREATE VIEW IF NOT EXISTS {quote(view_name)} AS {select_sql}"
+    else:
+        ddl = f"CREATE OR REPLACE VIEW {quote(view_name)} AS {select_sql}"
+    connection.execute(text(ddl))
+
+
+def create_index_online(connection: Connection, table_name: str, index_name: str, columns: Sequence[str], unique: bool = False) -> bool:
+    """Cria um índice se ele não existir. Retorna True se criou."""
+    if has_index(connection, table_name, index_name):
+        return False
+    quote = connection.dialect.identifier_preparer.quote
+    ddl = (
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX {quote(index_name)} ON {quote(table_name)} "
+        f"({', '.join(quote(column) for column in columns)})"
+    )
+    if connection.dialect.name == "mysql":
+        ddl += f" {_MYSQL_ONLINE_DDL}"
+    connection.execute(text(ddl))
+    return True
+
+
+def add_column(connection: Connection, table_name: str, column: Column) -> bool:
+    """Adiciona uma coluna se ela não existir. Retorna True se adicionou."""
+    if has_column(connection, table_name, column.name):
+        return False
+    quote = connection.dialect.identifier_preparer.quote
+    ddl = f"ALTER TABLE {quote(table_name)} ADD COLUMN {CreateColumn(column).compile(dialect=connection.dialect)}"
+    if connection.dialect.name == "mysql":
+        ddl += f", {_MYSQL_ONLINE_DDL}"
+    connection.execute(text(ddl))
+    return True
+
+
+def drop_column(connection: Connection, table_name: str, column_name: str) -> bool:
+    """Remove uma coluna se ela existir (no SQLite, requer 3.35+). Retorna True se removeu."""
+    if not has_column(connection, table_name, column_name):
+        return False
+    quote = connection.dialect.identifier_preparer.quote
+    ddl = f"ALTER TABLE {quote(table_name)} DROP COLUMN {quote(column_name)}"
+    if connection.dialect.name == "mysql":
+        ddl += f", {_MYSQL_ONLINE_DDL}"
+    connection.execute(text(ddl))
+    return True
+
+
+def drop_view(connection: Connection, view_name: str) -> None:
+    quote = connection.dialect.identifier_preparer.quote
+    connection.execute(text(f"DROP VIEW IF EXISTS {quote(view_name)}"))
+
+
+def add_foreign_key(connection: Connection, table_name: str, constraint_name: str, column_name: str, referred_table: str, referred_column: str = "id") -> bool:
+    """
+    Cria uma chave estrangeira em uma coluna existente, se ainda não houver uma com esse nome.
+    Retorna True se criou. O SQLite não permite acrescentar constraints a uma tabela existente:
+    lá a operação é ignorada (a integridade fica por conta da aplicação).
+    """
+    if connection.dialect.name == "sqlite":
+        return False
+    if constraint_name in {fk["name"] for fk in inspect(connection).get_foreign_keys(table_name)}:
+        return False
+    quote = connection.dialect.identifier_preparer.quote
+    ddl = (
+        f"ALTER TABLE {quote(table_name)} ADD CONSTRAINT {quote(constraint_name)} "
+        f"FOREIGN KEY ({quote(column_name)}) REFERENCES {quote(referred_table)} ({quote(referred_column)})"
+    )
+    if connection.dialect.name == "mysql":
+        # O MySQL só cria a FK sem copiar a tabela com foreign_key_checks desligado; quem chama
+        # garante que os valores existentes são válidos.
+        connection.execute(text("SET foreign_key_checks = 0"))
+        try:
+            connection.execute(text(f"{ddl}, {_MYSQL_ONLINE_DDL}"))
+        finally:
+            connection.execute(text("SET foreign_key_checks = 1"))
+    else:
+        connection.execute(text(ddl))
+    return True
@@ -0,0 +1,136 @@
+"""
+Schema inicial: as tabelas que existiam quando as migrações foram introduzidas.
+
+Bancos criados antes disso pelo create_all são adotados sem alteração: apenas as tabelas e
+índices ausentes são criados (ex.: ix_lawyers_telegram_id, que o create_all não adiciona a
+uma tabela existente).
+
+As tabelas são declaradas aqui, e não importadas de models/, para que esta revisão continue
+descrevendo o schema desta data mesmo depois que os modelos mudarem.
+"""
+from sqlalchemy import (
+    JSON, Column, Date, DateTime, Enum, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text, UniqueConstraint,
+)
+
+from migrations.operations import create_index_online, create_tables
+
+revision = "0001"
+down_revision = None
+description = "Schema inicial"
+
+metadata = MetaData()
+
+Table(
+    "lawyers", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(100), index=True),
+    Column("oab", String(20), unique=True, index=True),
+    Column("email", String(100), unique=True, index=True),
+    Column("username", String(50), unique=True, index=True, nullable=False),
+    Column("telegram_id", String(50), nullable=True, index=True),
+    Column("hashed_password", String(255), nullable=False),
+)
+
+Table(
+    "clients", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(150), index=True),
+    Column("area_of_expertise", Enum("REGULATORIO", "CONTRATOS", "AMBIENTAL", "TRIBUTARIO", "LITIGIOS", name="areaofexpertiseenum")),
+)
+
+Table(
+    "legal_processes", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("process_number", String(50), unique=True, index=True),
+    Column("entry_date", Date),
+    Column("delivery_deadline", Date),
+    Column("fatal_deadline", Date),
+    Column("data_conclusao_real", Date, nullable=True),
+    Column("status", String(30)),
+    Column("action_type", String(100), nullable=True),
+    Column("lawyer_id", Integer, ForeignKey("lawyers.id")),
+    Column("client_id", Integer, ForeignKey("clients.id")),
+)
+
+Table(
+    "deadline_calendar", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("deadline_date", Date, nullable=False),
+    Column("deadline_type", String(10), nullable=False),
+    Column("process_id", Integer, ForeignKey("legal_processes.id"), nullable=False, index=True),
+    Index("ix_deadline_calendar_date_type", "deadline_date", "deadline_type"),
+)
+
+Table(
+    "notification_outbox", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("channel", String(20), nullable=False),
+    Column("recipient", String(100), nullable=False),
+    Column("body", Text, nullable=False),
+    Column("status", String(10), nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("max_attempts", Integer, nullable=False),
+    Column("next_attempt_at", DateTime, nullable=False),
+    Column("locked_by", String(255), nullable=True),
+    Column("locked_at", DateTime, nullable=True),
+    Column("last_error", Text, nullable=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("sent_at", DateTime, nullable=True),
+    Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at"),
+)
+
+Table(
+    "notification_ledger", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("process_id", Integer, ForeignKey("legal_processes.id", ondelete="CASCADE"), nullable=False),
+    Column("deadline_type", String(10), nullable=False),
+    Column("deadline_date", Date, nullable=False),
+    Column("channel", String(20), nullable=False),
+    Column("alert_kind", String(20), nullable=False),
+    Column("outbox_id", Integer, ForeignKey("notification_outbox.id", ondelete="SET NULL"), nullable=True, index=True),
+    Column("status", String(10), nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    UniqueConstraint("process_id", "deadline_type", "deadline_date", "channel", "alert_kind", name="uq_notification_ledger_key"),
+)
+
+Table(
+    "scheduler_leases", metadata,
+    Column("name", String(50), primary_key=True),
+    Column("holder", String(255), nullable=False),
+    Column("expires_at", DateTime, nullable=False),
+    Column("heartbeat_at", DateTime, nullable=False),
+)
+
+Table(
+    "job_queue", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("job_type", String(50), nullable=False),
+    Column("payload", JSON, nullable=True),
+    Column("status", String(10), nullable=False),
+    Column("dedup_key", String(100), unique=True, nullable=True),
+    Column("attempts", Integer, nullable=False),
+    Column("max_attempts", Integer, nullable=False),
+    Column("run_after", DateTime, nullable=False),
+    Column("locked_by", String(255), nullable=True),
+    Column("locked_at", DateTime, nullable=True),
+    Column("last_error", Text, nullable=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("finished_at", DateTime, nullable=True),
+    Index("ix_job_queue_status_run_after", "status", "run_after"),
+)
+
+Table(
+    "lawyer_delay_stats", metadata,
+    Column("lawyer_id", Integer, ForeignKey("lawyers.id", ondelete="CASCADE"), primary_key=True),
+    Column("delay_rate", Float, nullable=False),
+    Column("completed_with_info", Integer, nullable=False),
+    Column("refreshed_at", DateTime, nullable=False),
+)
+
+
+def upgrade(connection) -> None:
+    create_tables(connection, metadata)
+    # Bancos anteriores ao índice de telegram_id (usado pelo /my_deadlines do bot).
+    create_index_online(connection, "lawyers", "ix_lawyers_telegram_id", ["telegram_id"])
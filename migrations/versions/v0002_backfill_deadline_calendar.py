@@ -0,0 +1,26 @@
+"""
+Carga inicial do calendário de prazos para bancos anteriores à tabela deadline_calendar.
+
+Antes feita a cada startup da API (duas consultas por inicialização); como só é necessária
+uma vez, passa a ser uma migração de dados. Em bancos novos, ou com o calendário já populado,
+não faz nada.
+"""
+from sqlalchemy import text
+
+revision = "0002"
+down_revision = "0001"
+description = "Carga inicial do calendário de prazos"
+
+
+def upgrade(connection) -> None:
+    if connection.execute(text("SELECT 1 FROM deadline_calendar LIMIT 1")).first() is not None:
+        return
+    # Mesmas linhas mantidas pelos eventos de LegalProcessDB: prazos de entrega e fatal dos processos ativos.
+    connection.execute(text(
+        "INSERT INTO deadline_calendar (deadline_date, deadline_type, process_id) "
+        "SELECT delivery_deadline, 'entrega', id FROM legal_processes "
+        "WHERE status = 'ativo' AND delivery_deadline IS NOT NULL "
+        "UNION ALL "
+        "SELECT fatal_deadline, 'fatal', id FROM legal_processes "
+        "WHERE status = 'ativo' AND fatal_deadline IS NOT NULL"
+    ))
@@ -0,0 +1,51 @@
+"""
+Arquivo de processos concluídos (legal_processes_archive) e a view legal_processes_all.
+
+Optou-se por uma tabela de arquivo em vez de particionar legal_processes por
+data_conclusao_real: no MySQL, a coluna de particionamento precisaria fazer parte de todas as
+chaves únicas (id, process_number), e tabelas InnoDB particionadas não admitem chaves
+estrangeiras (deadline_calendar e notification_ledger referenciam legal_processes).
+"""
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, MetaData, String, Table
+
+from migrations.operations import create_tables, create_view
+
+revision = "0003"
+down_revision = "0002"
+description = "Arquivo de processos concluídos e view legal_processes_all"
+
+metadata = MetaData()
+
+# Referenciadas pelas chaves estrangeiras (já existem; create_tables não as recria).
+Table("lawyers", metadata, Column("id", Integer, primary_key=True))
+Table("clients", metadata, Column("id", Integer, primary_key=True))
+
+legal_processes_archive = Table(
+    "legal_processes_archive", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("process_number", String(50), index=True),
+    Column("entry_date", Date),
+    Column("delivery_deadline", Date),
+    Column("fatal_deadline", Date),
+    Column("data_conclusao_real", Date, nullable=True, index=True),
+    Column("status", String(30)),
+    Column("action_type", String(100), nullable=True),
+    Column("lawyer_id", Integer, ForeignKey("lawyers.id"), index=True),
+    Column("client_id", Integer, ForeignKey("clients.id"), index=True),
+    Column("archived_at", DateTime, nullable=False),
+)
+
+_COLUMNS = (
+    "id, process_number, entry_date, delivery_deadline, fatal_deadline, "
+    "data_conclusao_real, status, action_type, lawyer_id, client_id"
+)
+
+
+def upgrade(connection) -> None:
+    create_tables(connection, metadata)
+    create_view(
+        connection, "legal_processes_all",
+        f"SELECT {_COLUMNS}, CAST(NULL AS DATETIME) AS archived_at FROM legal_processes "
+        f"UNION ALL "
+        f"SELECT {_COLUMNS}, archived_at FROM legal_processes_archive",
+    )
@@ -0,0 +1,76 @@
+"""
+Agregados diários e mensais de processos (process_daily_rollups, process_monthly_rollups) e as
+tabelas da manutenção incremental:
+contribuição de cada processo (process_rollup_snapshots), registro de alterações
+(process_rollup_changes) e marca d'água (rollup_watermarks).
+
+Os agregados são preenchidos pelo worker na primeira execução do job refresh_process_rollups.
+"""
+from sqlalchemy import Boolean, Column, Date, DateTime, Index, Integer, MetaData, String, Table
+
+from migrations.operations import create_tables
+
+revision = "0004"
+down_revision = "0003"
+description = "Agregados diários de processos"
+
+metadata = MetaData()
+
+Table(
+    "process_daily_rollups", metadata,
+    Column("day", Date, primary_key=True),
+    Column("lawyer_id", Integer, primary_key=True, autoincrement=False),
+    Column("area_of_expertise", String(20), primary_key=True),
+    Column("action_type", String(100), primary_key=True),
+    Column("status", String(30), primary_key=True),
+    Column("opened_count", Integer, nullable=False),
+    Column("concluded_count", Integer, nullable=False),
+    Column("late_count", Integer, nullable=False),
+    Column("slippage_days_sum", Integer, nullable=False),
+    Index("ix_process_daily_rollups_lawyer_day", "lawyer_id", "day"),
+)
+
+Table(
+    "process_monthly_rollups", metadata,
+    Column("month", Date, primary_key=True),
+    Column("lawyer_id", Integer, primary_key=True, autoincrement=False),
+    Column("area_of_expertise", String(20), primary_key=True),
+    Column("action_type", String(100), primary_key=True),
+    Column("status", String(30), primary_key=True),
+    Column("opened_count", Integer, nullable=False),
+    Column("concluded_count", Integer, nullable=False),
+    Column("late_count", Integer, nullable=False),
+    Column("slippage_days_sum", Integer, nullable=False),
+    Index("ix_process_monthly_rollups_lawyer_month", "lawyer_id", "month"),
+)
+
+Table(
+    "process_rollup_snapshots", metadata,
+    Column("process_id", Integer, primary_key=True, autoincrement=False),
+    Column("lawyer_id", Integer, nullable=False),
+    Column("area_of_expertise", String(20), nullable=False),
+    Column("action_type", String(100), nullable=False),
+    Column("status", String(30), nullable=False),
+    Column("opened_on", Date, nullable=True),
+    Column("concluded_on", Date, nullable=True),
+    Column("late", Boolean, nullable=False),
+    Column("slippage_days", Integer, nullable=False),
+)
+
+Table(
+    "process_rollup_changes", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("process_id", Integer, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+)
+
+Table(
+    "rollup_watermarks", metadata,
+    Column("name", String(50), primary_key=True),
+    Column("last_change_id", Integer, nullable=False),
+    Column("refreshed_at", DateTime, nullable=False),
+)
+
+
+def upgrade(connection) -> None:
+    create_tables(connection, metadata)
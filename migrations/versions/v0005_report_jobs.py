@@ -0,0 +1,43 @@
+"""
+Pedidos de relatório assíncronos (report_jobs), gerados pelos workers em um pool de processos.
+"""
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text
+
+from migrations.operations import create_tables
+
+revision = "0005"
+down_revision = "0004"
+description = "Pedidos de relatório assíncronos"
+
+metadata = MetaData()
+
+# Referenciada pela chave estrangeira (já existe; create_tables não a recria).
+Table("lawyers", metadata, Column("id", Integer, primary_key=True))
+
+Table(
+    "report_jobs", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("report_type", String(30), nullable=False),
+    Column("format", String(10), nullable=False),
+    Column("params", JSON, nullable=True),
+    Column("requested_by", Integer, ForeignKey("lawyers.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("status", String(10), nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("max_attempts", Integer, nullable=False),
+    Column("locked_by", String(255), nullable=True),
+    Column("locked_at", DateTime, nullable=True),
+    Column("rows_written", Integer, nullable=False),
+    Column("total_rows", Integer, nullable=True),
+    Column("file_path", String(500), nullable=True),
+    Column("file_size", Integer, nullable=True),
+    Column("error", Text, nullable=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("started_at", DateTime, nullable=True),
+    Column("finished_at", DateTime, nullable=True),
+    Column("expires_at", DateTime, nullable=True),
+    Index("ix_report_jobs_status_created", "status", "created_at"),
+)
+
+
+def upgrade(connection) -> None:
+    create_tables(connection, metadata)
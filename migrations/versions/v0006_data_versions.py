@@ -0,0 +1,24 @@
+"""
+Contadores de versão dos dados (data_versions), usados na chave do cache de consultas de processos.
+"""
+from sqlalchemy import BigInteger, Column, MetaData, String, Table, text
+
+from migrations.operations import create_tables
+
+revision = "0006"
+down_revision = "0005"
+description = "Versões dos dados para o cache de consultas"
+
+metadata = MetaData()
+
+Table(
+    "data_versions", metadata,
+    Column("name", String(50), primary_key=True),
+    Column("version", BigInteger, nullable=False),
+)
+
+
+def upgrade(connection) -> None:
+    create_tables(connection, metadata)
+    if connection.execute(text("SELECT 1 FROM data_versions WHERE name = 'processes'")).first() is None:
+        connection.execute(text("INSERT INTO data_versions (name, version) VALUES ('processes', 0)"))
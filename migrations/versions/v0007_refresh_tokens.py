@@ -0,0 +1,31 @@
+"""
+Refresh tokens (refresh_tokens), renovados com rotação em POST /auth/refresh.
+"""
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, MetaData, String, Table
+
+from migrations.operations import create_tables
+
+revision = "0007"
+down_revision = "0006"
+description = "Refresh tokens com rotação"
+
+metadata = MetaData()
+
+# Referenciada pela chave estrangeira (já existe; create_tables não a recria).
+Table("lawyers", metadata, Column("id", Integer, primary_key=True))
+
+Table(
+    "refresh_tokens", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("lawyer_id", Integer, ForeignKey("lawyers.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("family_id", String(32), nullable=False, index=True),
+    Column("token_hash", String(64), nullable=False, unique=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("expires_at", DateTime, nullable=False, index=True),
+    Column("used_at", DateTime, nullable=True),
+    Column("revoked_at", DateTime, nullable=True),
+)
+
+
+def upgrade(connection) -> None:
+    create_tables(connection, metadata)
@@ -0,0 +1,115 @@
+"""
+Status e tipo de ação dos processos codificados (legal_processes e legal_processes_archive).
+
+status (VARCHAR(30)) vira status_code (SMALLINT, códigos de models/legal_process.py) e action_type
+(VARCHAR(100)) vira action_type_id, referência à nova tabela action_types (uma linha por nome).
+As linhas e os índices ficam menores, e o filtro por tipo de ação procura a substring só na
+tabela de tipos. A API continua recebendo e devolvendo os textos.
+
+O status era texto livre: grafias diferentes de um status conhecido ("Ativo", "concluido") são
+convertidas. Valores fora da lista interrompem a migração antes da remoção das colunas de texto,
+com a lista dos valores e das quantidades: corrija-os para um status aceito (UPDATE ... SET
+status = 'ativo' WHERE status = '...') e execute o upgrade de novo. As colunas de texto são
+removidas no final, então a API e o worker precisam estar na versão nova.
+"""
+import unicodedata
+
+from sqlalchemy import Column, Integer, MetaData, SmallInteger, String, Table, text
+
+from migrations.operations import (
+    add_column, add_foreign_key, create_index_online, create_tables, create_view, drop_column, drop_view, has_column,
+)
+
+revision = "0008"
+down_revision = "0007"
+description = "Status e tipo de ação dos processos como códigos inteiros"
+
+metadata = MetaData()
+
+Table(
+    "action_types", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(100), unique=True, nullable=False),
+)
+
+# Códigos de models/legal_process.py (PROCESS_STATUS_CODES) na data desta migração.
+_STATUS_CODES = {"ativo": 1, "suspenso": 2, "concluído": 3, "arquivado": 4, "vencido": 5}
+
+_TABLES = ("legal_processes", "legal_processes_archive")
+
+_VIEW_COLUMNS = (
+    "id, process_number, entry_date, delivery_deadline, fatal_deadline, "
+    "data_conclusao_real, status_code, action_type_id, lawyer_id, client_id"
+)
+
+def _fold(value: str) -> str:
+    return unicodedata.normalize("NFD", value).encode("ascii", "ignore").decode("ascii").strip().lower()
+
+_STATUS_CODES_BY_FOLDED = {_fold(name): code for name, code in _STATUS_CODES.items()}
+
+
+def _backfill(connection, table: str) -> dict:
+    """Converte as colunas de texto de `table` e devolve os status desconhecidos (valor -> quantidade)."""
+    # Re-execução depois de as colunas de texto já terem sido removidas: nada a converter.
+    if not has_column(connection, table, "status"):
+        return {}
+
+    connection.execute(text(
+        f"INSERT INTO action_types (name) SELECT DISTINCT p.action_type FROM {table} p "
+        f"WHERE p.action_type IS NOT NULL AND NOT EXISTS (SELECT 1 FROM action_types t WHERE t.name = p.action_type)"
+    ))
+    connection.execute(text(
+        f"UPDATE {table} SET action_type_id = (SELECT t.id FROM action_types t WHERE t.name = {table}.action_type) "
+        f"WHERE action_type IS NOT NULL AND action_type_id IS NULL"
+    ))
+
+    unknown = {}
+    for value, count in connection.execute(text(
+        f"SELECT status, COUNT(*) FROM {table} WHERE status IS NOT NULL AND status_code IS NULL GROUP BY status"
+    )):
+        code = _STATUS_CODES_BY_FOLDED.get(_fold(value))
+        if code is None:
+            unknown[value] = count
+            continue
+        connection.execute(
+            text(f"UPDATE {table} SET status_code = :code WHERE status = :value AND status_code IS NULL"),
+            {"code": code, "value": value},
+        )
+    return unknown
+
+
+def upgrade(connection) -> None:
+    create_tables(connection, metadata)
+    unknown = {}
+    for table in _TABLES:
+        add_column(connection, table, Column("status_code", SmallInteger))
+        add_column(connection, table, Column("action_type_id", Integer))
+        unknown[table] = _backfill(connection, table)
+        add_foreign_key(connection, table, f"fk_{table}_action_type_id", "action_type_id", "action_types")
+
+    # Sem status_code, o valor se perderia com a remoção da coluna status.
+    if any(unknown.values()):
+        listed = "; ".join(
+            f"{table}: " + ", ".join(f"'{value}' ({count})" for value, count in sorted(values.items()))
+            for table, values in unknown.items() if values
+        )
+        raise RuntimeError(
+            f"Status desconhecidos nos processos: {listed}. Corrija-os para um dos status aceitos "
+            f"({', '.join(_STATUS_CODES)}) e execute o upgrade novamente."
+        )
+
+    create_index_online(connection, "legal_processes", "ix_legal_processes_lawyer_status", ["lawyer_id", "status_code"])
+    create_index_online(connection, "legal_processes", "ix_legal_processes_status_fatal", ["status_code", "fatal_deadline"])
+    create_index_online(connection, "legal_processes", "ix_legal_processes_action_type_id", ["action_type_id"])
+
+    # A view referencia as colunas de texto: é removida antes delas e recriada com as novas.
+    drop_view(connection, "legal_processes_all")
+    for table in _TABLES:
+        drop_column(connection, table, "status")
+        drop_column(connection, table, "action_type")
+    create_view(
+        connection, "legal_processes_all",
+        f"SELECT {_VIEW_COLUMNS}, CAST(NULL AS DATETIME) AS archived_at FROM legal_processes "
+        f"UNION ALL "
+        f"SELECT {_VIEW_COLUMNS}, archived_at FROM legal_processes_archive",
+    )
@@ -0,0 +1,134 @@
+"""
+Ids de legal_processes nunca reutilizados.
+
+O arquivamento (core/archive.py) move processos para legal_processes_archive mantendo o id. Sem
+AUTOINCREMENT, o SQLite gera o próximo id a partir do maior id *presente* na tabela: arquivado o
+processo de maior id, o próximo processo criado recebia o mesmo id, e a view legal_processes_all
+passava a ter ids repetidos (e o arquivamento do novo processo falhava por chave primária duplicada).
+
+  * SQLite: a tabela é reconstruída com AUTOINCREMENT (sqlite_sequence guarda o maior id já usado),
+    e a sequência começa acima do maior id do arquivo.
+  * MySQL: nada muda no schema. A partir do MySQL 8.0 o contador AUTO_INCREMENT é persistido e
+    nunca volta atrás (nem com exclusões, nem depois de reiniciar o servidor). No 5.7 o contador é
+    recalculado pelo maior id da tabela ao reiniciar o servidor, e a reutilização ainda é possível.
+
+Processos da tabela principal que já compartilham o id com um processo arquivado recebem um id novo
+(com o calendário de prazos e o histórico de notificações), listado no log.
+"""
+import logging
+from datetime import datetime
+
+from sqlalchemy import MetaData, Table, inspect, text
+
+from migrations.operations import create_index_online, create_view, drop_view
+
+logger = logging.getLogger(__name__)
+
+revision = "0009"
+down_revision = "0008"
+description = "Ids de processos monotônicos (sem reutilização após o arquivamento)"
+
+# Tabelas com process_id apontando para legal_processes.
+_PROCESS_CHILD_TABLES = ("deadline_calendar", "notification_ledger")
+
+_VIEW_COLUMNS = (
+    "id, process_number, entry_date, delivery_deadline, fatal_deadline, "
+    "data_conclusao_real, status_code, action_type_id, lawyer_id, client_id"
+)
+
+
+def _max_id(connection, table: str) -> int:
+    return connection.execute(text(f"SELECT MAX(id) FROM {table}")).scalar() or 0
+
+
+def _renumber_duplicate_ids(connection) -> None:
+    duplicate_ids = [row[0] for row in connection.execute(text(
+        "SELECT p.id FROM legal_processes p WHERE EXISTS (SELECT 1 FROM legal_processes_archive a WHERE a.id = p.id) ORDER BY p.id"
+    ))]
+    if not duplicate_ids:
+        return
+    next_id = max(_max_id(connection, "legal_processes"), _max_id(connection, "legal_processes_archive")) + 1
+    if connection.dialect.name == "mysql":
+        # Pai e filhos mudam de id no mesmo passo; as FKs seriam violadas entre um UPDATE e outro.
+        connection.execute(text("SET foreign_key_checks = 0"))
+    try:
+        renumbered = []
+        for old_id in duplicate_ids:
+            params = {"old_id": old_id, "new_id": next_id}
+            for table in _PROCESS_CHILD_TABLES:
+                connection.execute(text(f"UPDATE {table} SET process_id = :new_id WHERE process_id = :old_id"), params)
+            connection.execute(text("UPDATE legal_processes SET id = :new_id WHERE id = :old_id"), params)
+            # Os agregados diários reprocessam os dois ids (o arquivado e o novo).
+            connection.execute(
+                text("INSERT INTO process_rollup_changes (process_id, created_at) VALUES (:process_id, :created_at)"),
+                [{"process_id": old_id, "created_at": datetime.utcnow()}, {"process_id": next_id, "created_at": datetime.utcnow()}],
+            )
+            renumbered.append(f"{old_id} -> {next_id}")
+            next_id += 1
+    finally:
+        if connection.dialect.name == "mysql":
+            connection.execute(text("SET foreign_key_checks = 1"))
+    logger.warning(
+        "legal_processes: processos com o mesmo id de um processo arquivado receberam um id novo: " + ", ".join(renumbered)
+    )
+
+
+def _has_sqlite_autoincrement(connection) -> bool:
+    sql = connection.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'legal_processes'")).scalar()
+    return "AUTOINCREMENT" in (sql or "").upper()
+
+
+def _rebuild_sqlite_table(connection) -> None:
+    """Reconstrução recomendada pelo SQLite (criar a nova tabela, copiar, remover a antiga, renomear)."""
+    inspector = inspect(connection)
+    indexes = inspector.get_indexes("legal_processes")
+    metadata = MetaData() # Recebe também as tabelas referenciadas pelas FKs (lawyers, clients)
+    table = Table("legal_processes", metadata, autoload_with=connection)
+    new_table = table.to_metadata(metadata, name="legal_processes_new")
+    for index in list(new_table.indexes):
+        new_table.indexes.discard(index) # Recriados com os nomes originais depois da troca
+    new_table.dialect_kwargs["sqlite_autoincrement"] = True
+    new_table.create(connection)
+
+    columns = ", ".join(column.name for column in table.columns)
+    connection.execute(text(f"INSERT INTO legal_processes_new ({columns}) SELECT {columns} FROM legal_processes"))
+    # A view referencia a tabela; o SQLite recusa o RENAME com uma view apontando para uma tabela inexistente.
+    drop_view(connection, "legal_processes_all")
+    connection.execute(text("DROP TABLE legal_processes"))
+    connection.execute(text("ALTER TABLE legal_processes_new RENAME TO legal_processes"))
+    for index in indexes:
+        create_index_online(connection, "legal_processes", index["name"], index["column_names"], unique=bool(index["unique"]))
+    create_view(
+        connection, "legal_processes_all",
+        f"SELECT {_VIEW_COLUMNS}, CAST(NULL AS DATETIME) AS archived_at FROM legal_processes "
+        f"UNION ALL "
+        f"SELECT {_VIEW_COLUMNS}, archived_at FROM legal_processes_archive",
+    )
+
+    violations = connection.execute(text("PRAGMA foreign_key_check")).fetchall()
+    if violations:
+        raise RuntimeError(f"Reconstrução de legal_processes deixaria chaves estrangeiras inválidas: {violations[:10]}")
+
+
+def upgrade(connection) -> None:
+    if connection.dialect.name == "sqlite":
+        rebuild = not _has_sqlite_autoincrement(connection)
+        if rebuild:
+            # A tabela é removida e recriada: com as FKs ligadas, o DROP apagaria (CASCADE) o histórico
+            # de notificações. O PRAGMA só vale fora de uma transação, por isso vem antes de qualquer escrita,
+            # e a conexão é descartada ao final em vez de voltar ao pool com as FKs desligadas.
+            connection.execute(text("PRAGMA foreign_keys = OFF"))
+            if connection.execute(text("PRAGMA foreign_keys")).scalar():
+                raise RuntimeError("Não foi possível desligar as chaves estrangeiras do SQLite para reconstruir legal_processes.")
+            connection.detach()
+        _renumber_duplicate_ids(connection)
+        if rebuild:
+            _rebuild_sqlite_table(connection)
+        # Próximo id gerado: acima do maior id já usado nas duas tabelas.
+        max_id = max(_max_id(connection, "legal_processes"), _max_id(connection, "legal_processes_archive"))
+        connection.execute(text("UPDATE sqlite_sequence SET seq = :seq WHERE name = 'legal_processes' AND seq < :seq"), {"seq": max_id})
+        if not connection.execute(text("SELECT 1 FROM sqlite_sequence WHERE name = 'legal_processes'")).first():
+            connection.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('legal_processes', :seq)"), {"seq": max_id})
+        return
+
+    _renumber_duplicate_ids(connection)
@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Integer, String, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import Base # Importa Base de database.py
+
+# Modelo SQLAlchemy
+class ActionTypeDB(Base):
+    """
+    Tipos de ação distintos (tabela de consulta). Os processos guardam apenas action_type_id; o nome
+    continua sendo o valor de `action_type` na API. Os tipos são criados conforme aparecem nos
+    processos (models/legal_process.py) e não são removidos.
+    """
+    __tablename__ = "action_types"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), unique=True, nullable=False)
+
+
+def action_type_name_select(action_type_id_column):
+    """Subconsulta escalar com o nome do tipo de ação (busca pela chave primária de action_types)."""
+    return select(ActionTypeDB.name).where(ActionTypeDB.id == action_type_id_column).scalar_subquery()
+
+
+def action_type_ids_matching(text: str):
+    """
+    Subconsulta com os ids dos tipos de ação cujo nome contém `text`. O filtro de /processes/ por
+    tipo de ação vira `action_type_id IN (...)`: a busca por substring varre só a tabela de tipos.
+    """
+    return select(ActionTypeDB.id).where(ActionTypeDB.name.contains(text))
+
+
+def get_or_create_action_type_id(db: Session, name: str) -> int:
+    """
+    Id do tipo de ação `name`, criando-o se ainda não existir. Usa a conexão da transação atual
+    (pode ser chamada durante o flush); a inserção fica em um savepoint, para que duas transações
+    criando o mesmo tipo ao mesmo tempo não falhem por causa do índice único.
+    """
+    connection = db.connection()
+    # Leitura com lock: no MySQL (REPEATABLE READ) enxerga também um tipo recém-criado por outra transação.
+    lookup = select(ActionTypeDB.id).where(ActionTypeDB.name == name).with_for_update(read=True)
+    action_type_id = connection.execute(lookup).scalar()
+    if action_type_id is None:
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(ActionTypeDB).values(name=name))
+        except IntegrityError:
+            pass # Criado por outra transação: lido abaixo.
+        action_type_id = connection.execute(lookup).scalar()
+    return action_type_id
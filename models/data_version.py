@@ -0,0 +1,103 @@
+from sqlalchemy import BigInteger, Column, String, event, insert, select, update
+from sqlalchemy.orm import Session
+
+from database import Base, end_savepoint_state, pop_transaction_state, transaction_state # Importa Base de database.py
+from models.client import ClientDB
+from models.lawyer import LawyerDB
+from models.lawyer_delay_stats import LawyerDelayStatsDB
+from models.legal_process import LegalProcessDB
+from models.legal_process_archive import LegalProcessArchiveDB
+
+# Nome da versão que cobre tudo o que aparece na listagem de processos: processos (inclusive
+# arquivados), nomes de advogados e clientes (expand) e estatísticas de atraso (delay_risk).
+PROCESSES_DATA_VERSION = "processes"
+
+# Modelo SQLAlchemy
+class DataVersionDB(Base):
+    """
+    Contador de versão de um conjunto de dados, incrementado no commit de toda transação que
+    escreve nele. Caches de consultas (core/query_cache.py) incluem a versão na chave.
+    """
+    __tablename__ = "data_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+def get_data_version(db: Session, name: str = PROCESSES_DATA_VERSION) -> int:
+    version = db.query(DataVersionDB.version).filter(DataVersionDB.name == name).scalar()
+    return version or 0
+
+
+# --- Incremento automático ---
+# Escritas pelo ORM (flush) e instruções em massa do ORM (query.update/delete, insert/delete com
+# entidade) nos modelos abaixo marcam a transação; o incremento acontece uma única vez, no commit
+# da transação externa, para que a linha do contador fique bloqueada pelo menor tempo possível.
+# Marcas feitas dentro de um SAVEPOINT desfeito são descartadas com ele (database.transaction_state).
+# Escritas com SQL puro (text() ou tabelas Core) não são detectadas: chame mark_data_changed.
+
+_VERSIONED_MODELS = (LegalProcessDB, LegalProcessArchiveDB, LawyerDB, ClientDB, LawyerDelayStatsDB)
+# Por SAVEPOINT: (nomes das versões a incrementar, modelos alterados sem passar pelo flush).
+_CHANGES_KEY = "data_versions_changes"
+# Após o commit: {"versions": {nome: versão gravada}, "bulk_models": modelos alterados sem passar pelo
+# flush (None quando desconhecidos)}. Lido por quem mantém cópias dos dados (core/process_index.py).
+COMMITTED_VERSIONS_KEY = "data_versions_committed"
+
+def _new_changes():
+    return set(), set()
+
+def _merge_changes(target, source) -> None:
+    target[0].update(source[0])
+    target[1].update(source[1])
+
+def mark_data_changed(db: Session, name: str = PROCESSES_DATA_VERSION, model=None) -> None:
+    """Faz o commit da transação atual incrementar a versão `name` (escrita de `model` fora do flush do ORM)."""
+    names, bulk_models = transaction_state(db, _CHANGES_KEY, _new_changes)
+    names.add(name)
+    bulk_models.add(model)
+
+@event.listens_for(Session, "after_flush")
+def _data_version_after_flush(session, flush_context):
+    # Em after_flush, new/dirty/deleted ainda refletem o que acabou de ser gravado.
+    if any(isinstance(obj, _VERSIONED_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        transaction_state(session, _CHANGES_KEY, _new_changes)[0].add(PROCESSES_DATA_VERSION)
+
+@event.listens_for(Session, "do_orm_execute")
+def _data_version_bulk_statement(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    for mapper in orm_execute_state.all_mappers:
+        if mapper.class_ in _VERSIONED_MODELS:
+            mark_data_changed(orm_execute_state.session, model=mapper.class_)
+
+@event.listens_for(Session, "before_commit")
+def _data_version_before_commit(session):
+    if session.in_nested_transaction():
+        return # RELEASE de um SAVEPOINT: o incremento fica para o commit da transação externa.
+    session.flush() # Garante que after_flush já viu as alterações pendentes.
+    session.info.pop(COMMITTED_VERSIONS_KEY, None)
+    names, bulk_models = pop_transaction_state(session, _CHANGES_KEY) or _new_changes()
+    if not names:
+        return
+    connection = session.connection()
+    versions = {}
+    for name in sorted(names):
+        bumped = connection.execute(
+            update(DataVersionDB.__table__).where(DataVersionDB.name == name).values(version=DataVersionDB.version + 1)
+        )
+        if bumped.rowcount == 0: # Banco criado antes da migração 0006 ter semeado a linha
+            connection.execute(insert(DataVersionDB.__table__).values(name=name, version=1))
+        # A linha está bloqueada por esta transação: a leitura devolve exatamente a versão gravada.
+        versions[name] = connection.execute(select(DataVersionDB.version).where(DataVersionDB.name == name)).scalar()
+    session.info[COMMITTED_VERSIONS_KEY] = {"versions": versions, "bulk_models": bulk_models}
+
+@event.listens_for(Session, "after_commit")
+def _data_version_after_commit(session):
+    end_savepoint_state(session, _CHANGES_KEY, _merge_changes)
+
+@event.listens_for(Session, "after_rollback")
+def _data_version_after_rollback(session):
+    if end_savepoint_state(session, _CHANGES_KEY):
+        return
+    pop_transaction_state(session, _CHANGES_KEY)
+    session.info.pop(COMMITTED_VERSIONS_KEY, None)
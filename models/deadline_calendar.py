@@ -0,0 +1,90 @@
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index, event, inspect, delete, insert
+from pydantic import BaseModel
+from datetime import date
+from typing import Optional
+import enum
+
+from database import Base # Importa Base de database.py
+from models.legal_process import LegalProcessDB
+
+# Tipos de prazo registrados no calendário
+class DeadlineTypeEnum(str, enum.Enum):
+    ENTREGA = "entrega"
+    FATAL = "fatal"
+
+# Apenas processos com este status têm prazos no calendário (os mesmos considerados pelos notificadores).
+CALENDAR_PROCESS_STATUS = "ativo"
+
+# Modelo SQLAlchemy
+class DeadlineCalendarDB(Base):
+    """
+    Índice de prazos por dia: uma linha por (processo, tipo de prazo) dos processos ativos.
+    Mantido incrementalmente pelos eventos de escrita de LegalProcessDB (abaixo), permite
+    responder "o que vence entre D1 e D2" por busca no índice (deadline_date, deadline_type)
+    em vez de varrer legal_processes.
+    """
+    __tablename__ = "deadline_calendar"
+
+    id = Column(Integer, primary_key=True, index=True)
+    deadline_date = Column(Date, nullable=False) # Data do prazo
+    deadline_type = Column(String(10), nullable=False) # 'entrega' ou 'fatal'
+    process_id = Column(Integer, ForeignKey("legal_processes.id"), nullable=False, index=True)
+
+    __table_args__ = (
+        Index("ix_deadline_calendar_date_type", "deadline_date", "deadline_type"),
+    )
+
+# Modelos Pydantic para resposta
+class DeadlineEntry(BaseModel):
+    deadline_date: date
+    deadline_type: DeadlineTypeEnum
+    process_id: int
+    process_number: str
+    lawyer_id: Optional[int] = None
+    client_id: Optional[int] = None
+    action_type: Optional[str] = None
+    business_days_left: Optional[int] = None # Dias úteis de hoje até o prazo (negativo se vencido)
+
+    class Config:
+        from_attributes = True
+
+
+def _calendar_rows_for(target: LegalProcessDB) -> list:
+    """Linhas de calendário esperadas para um processo."""
+    if target.status != CALENDAR_PROCESS_STATUS:
+        return []
+    rows = []
+    if target.delivery_deadline is not None:
+        rows.append({"deadline_date": target.delivery_deadline, "deadline_type": DeadlineTypeEnum.ENTREGA.value, "process_id": target.id})
+    if target.fatal_deadline is not None:
+        rows.append({"deadline_date": target.fatal_deadline, "deadline_type": DeadlineTypeEnum.FATAL.value, "process_id": target.id})
+    return rows
+
+
+# --- Manutenção incremental do calendário ---
+# Os eventos de mapper rodam dentro do flush, na mesma conexão/transação da escrita do processo.
+# Atualizações em massa (query.update/delete) não disparam estes eventos; quem as usa
+# sobre status ou prazos deve chamar core.deadline_calendar.refresh_process_deadlines.
+
+# Colunas de LegalProcessDB que afetam o calendário.
+CALENDAR_SOURCE_ATTRIBUTES = ("status", "delivery_deadline", "fatal_deadline")
+
+@event.listens_for(LegalProcessDB, "after_insert")
+def _calendar_after_insert(mapper, connection, target):
+    rows = _calendar_rows_for(target)
+    if rows:
+        connection.execute(insert(DeadlineCalendarDB), rows)
+
+@event.listens_for(LegalProcessDB, "after_update")
+def _calendar_after_update(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[attr].history.has_changes() for attr in CALENDAR_SOURCE_ATTRIBUTES):
+        return # Ex.: reatribuição de advogado não muda os prazos.
+    connection.execute(delete(DeadlineCalendarDB).where(DeadlineCalendarDB.process_id == target.id))
+    rows = _calendar_rows_for(target)
+    if rows:
+        connection.execute(insert(DeadlineCalendarDB), rows)
+
+@event.listens_for(LegalProcessDB, "before_delete")
+def _calendar_before_delete(mapper, connection, target):
+    connection.execute(delete(DeadlineCalendarDB).where(DeadlineCalendarDB.process_id == target.id))
@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from datetime import datetime
+import enum
+
+from database import Base # Importa Base de database.py
+
+# Tipos de job executados pelo worker (worker.py)
+class JobTypeEnum(str, enum.Enum):
+    DAILY_DEADLINES = "daily_deadlines" # Notificação dos prazos do dia
+    UPCOMING_FATAL_DEADLINES = "upcoming_fatal_deadlines" # Notificação de prazos fatais próximos
+    REFRESH_DELAY_STATISTICS = "refresh_delay_statistics" # Recalcula as estatísticas de atraso dos advogados
+    ARCHIVE_CONCLUDED_PROCESSES = "archive_concluded_processes" # Move processos concluídos antigos para o arquivo
+    REFRESH_PROCESS_ROLLUPS = "refresh_process_rollups" # Atualiza os agregados diários de processos
+    CLEANUP_REPORTS = "cleanup_reports" # Remove os arquivos de relatórios expirados
+    PURGE_REFRESH_TOKENS = "purge_refresh_tokens" # Remove os refresh tokens expirados
+    PURGE_FINISHED_JOBS = "purge_finished_jobs" # Remove jobs finalizados e mensagens entregues do outbox antigos
+
+# Situação de um job na fila
+class JobStatusEnum(str, enum.Enum):
+    PENDENTE = "pendente"
+    EXECUTANDO = "executando"
+    CONCLUIDO = "concluido"
+    FALHOU = "falhou" # Esgotou as tentativas
+
+# Modelo SQLAlchemy
+class JobDB(Base):
+    """
+    Fila durável de jobs em background. Os workers reservam jobs pendentes com
+    SELECT ... FOR UPDATE SKIP LOCKED, de modo que vários workers consomem a fila em paralelo
+    sem disputar as mesmas linhas.
+    """
+    __tablename__ = "job_queue"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=True)
+    status = Column(String(10), nullable=False, default=JobStatusEnum.PENDENTE.value)
+    dedup_key = Column(String(100), unique=True, nullable=True) # Evita enfileirar o mesmo job duas vezes (ex.: "daily_deadlines:2025-01-31")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow) # Não executar antes de (UTC); usado no backoff
+    locked_by = Column(String(255), nullable=True) # Worker que reservou o job
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_job_queue_status_run_after", "status", "run_after"),
+    )
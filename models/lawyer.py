@@ -16,7 +16,7 @@ class LawyerDB(Base):
     oab = Column(String(20), unique=True, index=True) # Comprimento 20
     email = Column(String(100), unique=True, index=True) # Comprimento 100
     username = Column(String(50), unique=True, index=True, nullable=False) # Nickname, agora obrigatório
-    telegram_id = Column(String(50), nullable=True) # Comprimento 50
+    telegram_id = Column(String(50), nullable=True, index=True) # Comprimento 50; indexado para o bot achar o advogado pelo chat
     hashed_password = Column(String(255), nullable=False) # Senha "hasheada"
     # Coluna is_admin removida
 
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from datetime import datetime
+
+from database import Base # Importa Base de database.py
+
+# Modelo SQLAlchemy
+class LawyerDelayStatsDB(Base):
+    """
+    Estatísticas de atraso por advogado, recalculadas periodicamente pelo worker
+    (core.analytics.refresh_lawyer_delay_statistics) e apenas lidas pela API.
+    """
+    __tablename__ = "lawyer_delay_stats"
+
+    lawyer_id = Column(Integer, ForeignKey("lawyers.id", ondelete="CASCADE"), primary_key=True)
+    delay_rate = Column(Float, nullable=False, default=0.0) # Taxa de atraso (0.0 a 1.0)
+    completed_with_info = Column(Integer, nullable=False, default=0) # Processos concluídos com dados para o cálculo
+    refreshed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,10 +1,54 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, SmallInteger, String, Date, ForeignKey, Index, event
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import Session, column_property, relationship, validates
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.types import TypeDecorator
 from pydantic import BaseModel, validator # Alterado de field_validator para validator
 from datetime import date, datetime # Adicionado datetime para strptime
 from typing import Any, Union, Optional # Adicionado Optional
+import unicodedata
 
 from database import Base # Importa Base de database.py
+from models.action_type import action_type_name_select, get_or_create_action_type_id
+
+# Status de processo e seus códigos no banco (coluna status_code, SMALLINT). Na API e no código o
+# status continua sendo o texto; os códigos gravados não podem mudar (novos status recebem novos códigos).
+PROCESS_STATUS_CODES = {"ativo": 1, "suspenso": 2, "concluído": 3, "arquivado": 4, "vencido": 5}
+PROCESS_STATUS_NAMES = {code: name for name, code in PROCESS_STATUS_CODES.items()}
+
+def _fold(text: str) -> str:
+    return unicodedata.normalize("NFD", text).encode("ascii", "ignore").decode("ascii").strip().lower()
+
+_PROCESS_STATUS_BY_FOLDED = {_fold(name): name for name in PROCESS_STATUS_CODES}
+
+def normalize_process_status(value: str) -> Optional[str]:
+    """Grafia canônica de um status ('Concluido' -> 'concluído'), ou None se o status não existir."""
+    return _PROCESS_STATUS_BY_FOLDED.get(_fold(value))
+
+def validate_process_status(value: Optional[str]) -> Optional[str]:
+    """Validador dos modelos Pydantic: status na grafia canônica; ValueError se não existir."""
+    if value is None:
+        return None
+    canonical = normalize_process_status(value)
+    if canonical is None:
+        raise ValueError(f"Status inválido: '{value}'. Use: {', '.join(PROCESS_STATUS_CODES)}.")
+    return canonical
+
+class ProcessStatusType(TypeDecorator):
+    """Status de processo gravado como código inteiro (PROCESS_STATUS_CODES) e lido de volta como texto."""
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        code = PROCESS_STATUS_CODES.get(normalize_process_status(value))
+        if code is None:
+            raise ValueError(f"Status de processo desconhecido: {value!r}.")
+        return code
+
+    def process_result_value(self, value, dialect):
+        return PROCESS_STATUS_NAMES.get(value)
 
 # Modelo SQLAlchemy
 class LegalProcessDB(Base):
@@ -16,8 +60,10 @@ class LegalProcessDB(Base):
     delivery_deadline = Column(Date) # Prazo de entrega
     fatal_deadline = Column(Date) # Prazo fatal
     data_conclusao_real = Column(Date, nullable=True) # Novo campo: Data real de conclusão
-    status = Column(String(30), default="ativo") # Status do processo, Comprimento 30
-    action_type = Column(String(100), nullable=True) # Tipo de ação, Comprimento 100
+    status = Column("status_code", ProcessStatusType, default="ativo") # Status do processo (texto na API, código no banco)
+    action_type_id = Column(Integer, ForeignKey("action_types.id"), nullable=True, index=True) # Tipo de ação (tabela action_types)
+    # Nome do tipo de ação, lido junto com o processo. Mantido pelo setter de action_type (não expira no flush).
+    action_type_name = column_property(action_type_name_select(action_type_id), expire_on_flush=False)
 
     lawyer_id = Column(Integer, ForeignKey("lawyers.id")) # ID do advogado responsável
     client_id = Column(Integer, ForeignKey("clients.id")) # ID do cliente
@@ -25,6 +71,48 @@ class LegalProcessDB(Base):
     lawyer = relationship("LawyerDB", back_populates="processes") # Relacionamento com Advogado
     client = relationship("ClientDB", back_populates="processes") # Relacionamento com Cliente
 
+    __table_args__ = (
+        # Listagem do advogado (com ou sem filtro de status) e processos ativos por prazo fatal.
+        Index("ix_legal_processes_lawyer_status", "lawyer_id", "status_code"),
+        Index("ix_legal_processes_status_fatal", "status_code", "fatal_deadline"),
+        # Ids nunca reutilizados: o arquivamento mantém o id do processo (migração 0009).
+        {"sqlite_autoincrement": True},
+    )
+
+    @validates("status")
+    def _validate_status(self, key, value):
+        return validate_process_status(value) # Grava sempre a grafia canônica
+
+    @hybrid_property
+    def action_type(self) -> Optional[str]:
+        """Tipo de ação (texto). Um nome novo é registrado em action_types no flush (abaixo)."""
+        return self.action_type_name
+
+    @action_type.setter
+    def action_type(self, value: Optional[str]) -> None:
+        if "action_type_id" in self.__dict__ and value == self.action_type_name:
+            return
+        set_committed_value(self, "action_type_name", value)
+        self._pending_action_type = value
+        self.action_type_id = None # Definido no flush; também marca o processo como alterado
+
+    @action_type.expression
+    def action_type(cls):
+        return cls.action_type_name
+
+# O id do tipo de ação de um processo criado ou alterado é resolvido (ou o tipo é criado) no flush,
+# na mesma transação da escrita do processo.
+@event.listens_for(Session, "before_flush")
+def _resolve_action_types(session, flush_context, instances):
+    resolved = {}
+    for obj in (*session.new, *session.dirty):
+        if not isinstance(obj, LegalProcessDB) or "_pending_action_type" not in obj.__dict__:
+            continue
+        name = obj.__dict__.pop("_pending_action_type")
+        if name is not None and name not in resolved:
+            resolved[name] = get_or_create_action_type_id(session, name)
+        obj.action_type_id = resolved.get(name)
+
 # Modelos Pydantic para validação de requisição/resposta
 # Modelos Pydantic para validação de requisição/resposta (Comentário original já em PT)
 class LegalProcessBase(BaseModel):
@@ -35,7 +123,7 @@ class LegalProcessBase(BaseModel):
     delivery_deadline: date
     fatal_deadline: date
     data_conclusao_real: Optional[date] = None # Novo campo Pydantic: Data real de conclusão
-    status: Optional[str] = "ativo"
+    status: Optional[str] = "ativo" # Um de PROCESS_STATUS_CODES
     action_type: Optional[str] = None
 
     # Validador para converter datas de string "dd/mm/aaaa" para objetos date (Sintaxe Pydantic V1).
@@ -55,12 +143,28 @@ class LegalProcessBase(BaseModel):
         # Se não for uma string ou a conversão falhou, retorna o valor como está.
         return value
 
+    # Status na grafia canônica ("Ativo" -> "ativo"); status inexistentes são recusados.
+    @validator('status', check_fields=False)
+    @classmethod
+    def validate_status(cls, value: Optional[str]) -> Optional[str]:
+        return validate_process_status(value)
+
 class LegalProcessCreate(LegalProcessBase):
     pass
 
 class LegalProcess(LegalProcessBase):
     id: int
     delay_risk: Optional[str] = None # Novo campo para risco de atraso (IA)
+    # Preenchidos apenas com ?expand=lawyer,client em GET /processes/ (mesma consulta, via JOIN).
+    lawyer_name: Optional[str] = None
+    lawyer_oab: Optional[str] = None
+    client_name: Optional[str] = None
 
     class Config:
         from_attributes = True # Alterado de orm_mode = True para Pydantic v2.
+
+# Registra o calendário de prazos e seus eventos de manutenção junto com o modelo de processo,
+# para que toda escrita via ORM (API, scripts, seed) mantenha o calendário atualizado.
+import models.deadline_calendar # noqa: E402,F401
+# Idem para o registro de alterações usado pelos agregados diários (core/rollups.py).
+import models.process_rollup # noqa: E402,F401
@@ -0,0 +1,54 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, MetaData, Table
+from sqlalchemy.orm import column_property
+from datetime import datetime
+
+from database import Base # Importa Base de database.py
+from models.action_type import action_type_name_select
+from models.legal_process import ProcessStatusType
+
+# Status dos processos que, concluídos há mais de ARCHIVE_AFTER_DAYS dias, saem da tabela principal.
+ARCHIVED_PROCESS_STATUS = "concluído"
+
+# Modelo SQLAlchemy
+class LegalProcessArchiveDB(Base):
+    """
+    Processos concluídos há muito tempo, movidos de legal_processes em lotes pelo worker
+    (core/archive.py). Mesmas colunas (e o mesmo id) da tabela principal, mais archived_at.
+    A tabela principal fica apenas com os processos do dia a dia, o que mantém pequenas as
+    varreduras de /processes/, dos notificadores e dos painéis.
+    """
+    __tablename__ = "legal_processes_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False) # Mesmo id que o processo tinha em legal_processes (que não reutiliza ids)
+    process_number = Column(String(50), index=True)
+    entry_date = Column(Date)
+    delivery_deadline = Column(Date)
+    fatal_deadline = Column(Date)
+    data_conclusao_real = Column(Date, nullable=True, index=True)
+    status = Column("status_code", ProcessStatusType) # Mesma codificação de legal_processes
+    action_type_id = Column(Integer, ForeignKey("action_types.id"), nullable=True)
+    action_type = column_property(action_type_name_select(action_type_id)) # Somente leitura
+
+    lawyer_id = Column(Integer, ForeignKey("lawyers.id"), index=True)
+    client_id = Column(Integer, ForeignKey("clients.id"), index=True)
+
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow) # Momento do arquivamento (UTC)
+
+
+# View legal_processes_all (criada pela migração 0003, refeita na 0008 e na 0009): processos ativos e arquivados juntos,
+# para analytics que precisam do histórico completo. archived_at é NULL nos processos não arquivados.
+# Fica em um MetaData próprio para que create_all/drop_all não a tratem como tabela.
+legal_processes_all = Table(
+    "legal_processes_all", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("process_number", String(50)),
+    Column("entry_date", Date),
+    Column("delivery_deadline", Date),
+    Column("fatal_deadline", Date),
+    Column("data_conclusao_real", Date),
+    Column("status_code", ProcessStatusType, key="status"),
+    Column("action_type_id", Integer),
+    Column("lawyer_id", Integer),
+    Column("client_id", Integer),
+    Column("archived_at", DateTime),
+)
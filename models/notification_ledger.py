@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, UniqueConstraint
+from datetime import datetime
+import enum
+
+from database import Base # Importa Base de database.py
+
+# Tipos de alerta enviados para um mesmo prazo
+class AlertKindEnum(str, enum.Enum):
+    VENCIMENTO = "vencimento" # Alerta no dia do prazo (check_and_notify_daily_deadlines_async)
+    ANTECEDENCIA = "antecedencia" # Alerta de prazo fatal próximo (check_and_notify_upcoming_fatal_deadlines_async)
+
+# Situação de uma notificação no ledger
+class NotificationStatusEnum(str, enum.Enum):
+    PENDENTE = "pendente" # Mensagem no outbox, aguardando entrega
+    ENVIADO = "enviado"
+    FALHOU = "falhou" # O outbox esgotou as tentativas; pode ser reenfileirada na próxima varredura
+
+# Modelo SQLAlchemy
+class NotificationLedgerDB(Base):
+    """
+    Registro persistente das notificações de prazo. A constraint única sobre
+    (processo, tipo de prazo, data do prazo, canal, tipo de alerta) garante que cada
+    alerta seja enviado uma única vez, mesmo com jobs duplicados ou vários workers.
+    """
+    __tablename__ = "notification_ledger"
+
+    id = Column(Integer, primary_key=True, index=True)
+    process_id = Column(Integer, ForeignKey("legal_processes.id", ondelete="CASCADE"), nullable=False)
+    deadline_type = Column(String(10), nullable=False) # 'entrega' ou 'fatal'
+    deadline_date = Column(Date, nullable=False)
+    channel = Column(String(20), nullable=False, default="telegram")
+    alert_kind = Column(String(20), nullable=False)
+    outbox_id = Column(Integer, ForeignKey("notification_outbox.id", ondelete="SET NULL"), nullable=True, index=True) # Mensagem que entrega este alerta
+    status = Column(String(10), nullable=False, default=NotificationStatusEnum.PENDENTE.value)
+    attempts = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("process_id", "deadline_type", "deadline_date", "channel", "alert_kind", name="uq_notification_ledger_key"),
+    )
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from datetime import datetime
+import enum
+
+from database import Base # Importa Base de database.py
+
+# Situação de uma mensagem no outbox
+class OutboxStatusEnum(str, enum.Enum):
+    PENDENTE = "pendente" # Aguardando envio (ou nova tentativa)
+    ENVIANDO = "enviando" # Reservada por um drainer
+    ENVIADO = "enviado"
+    FALHOU = "falhou" # Esgotou as tentativas
+
+# Modelo SQLAlchemy
+class OutboxMessageDB(Base):
+    """
+    Outbox transacional de notificações. Os produtores (varreduras de prazos, atualização de
+    processos) gravam as mensagens na mesma transação dos seus dados; o drainer do worker
+    (core.outbox.drain_outbox) envia em lotes e registra o estado de cada tentativa.
+    """
+    __tablename__ = "notification_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    channel = Column(String(20), nullable=False, default="telegram")
+    recipient = Column(String(100), nullable=False) # Ex.: chat_id do Telegram
+    body = Column(Text, nullable=False)
+    status = Column(String(10), nullable=False, default=OutboxStatusEnum.PENDENTE.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow) # Não enviar antes de (UTC); usado no backoff
+    locked_by = Column(String(255), nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
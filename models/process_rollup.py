@@ -0,0 +1,158 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Index, event, inspect, insert, select, literal
+from pydantic import BaseModel
+from datetime import date, datetime
+from typing import Optional
+import enum
+
+from database import Base # Importa Base de database.py
+from models.client import ClientDB
+from models.legal_process import LegalProcessDB
+from models.legal_process_archive import LegalProcessArchiveDB
+
+# Status que conta um processo como concluído nos agregados.
+ROLLUP_CONCLUDED_STATUS = "concluído"
+
+# Modelos SQLAlchemy
+class ProcessDailyRollupDB(Base):
+    """
+    Agregados diários de processos por (dia, advogado, área do cliente, tipo de ação, status atual):
+    processos abertos (entry_date no dia), concluídos (data_conclusao_real no dia), concluídos após
+    o prazo de entrega e a soma dos dias de atraso. Mantidos incrementalmente pelo worker
+    (core/rollups.py); os endpoints de tendência (/analytics/trends) leem apenas esta tabela.
+    Valores ausentes nas dimensões são gravados como 0/'' para que façam parte da chave primária.
+    """
+    __tablename__ = "process_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    lawyer_id = Column(Integer, primary_key=True, autoincrement=False)
+    area_of_expertise = Column(String(20), primary_key=True) # Valor de AreaOfExpertiseEnum (ex.: "Ambiental")
+    action_type = Column(String(100), primary_key=True)
+    status = Column(String(30), primary_key=True)
+    opened_count = Column(Integer, nullable=False, default=0)
+    concluded_count = Column(Integer, nullable=False, default=0)
+    late_count = Column(Integer, nullable=False, default=0) # Concluídos depois do prazo de entrega
+    slippage_days_sum = Column(Integer, nullable=False, default=0) # Soma dos dias de atraso dos concluídos
+
+    __table_args__ = (
+        Index("ix_process_daily_rollups_lawyer_day", "lawyer_id", "day"),
+    )
+
+class ProcessMonthlyRollupDB(Base):
+    """
+    Os mesmos agregados de process_daily_rollups somados por mês (month = primeiro dia do mês),
+    mantidos junto com eles. Atendem às tendências mensais e anuais de períodos de meses inteiros,
+    com bem menos linhas a somar do que a tabela diária.
+    """
+    __tablename__ = "process_monthly_rollups"
+
+    month = Column(Date, primary_key=True)
+    lawyer_id = Column(Integer, primary_key=True, autoincrement=False)
+    area_of_expertise = Column(String(20), primary_key=True)
+    action_type = Column(String(100), primary_key=True)
+    status = Column(String(30), primary_key=True)
+    opened_count = Column(Integer, nullable=False, default=0)
+    concluded_count = Column(Integer, nullable=False, default=0)
+    late_count = Column(Integer, nullable=False, default=0)
+    slippage_days_sum = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_process_monthly_rollups_lawyer_month", "lawyer_id", "month"),
+    )
+
+class ProcessRollupSnapshotDB(Base):
+    """
+    Contribuição de cada processo já somada em process_daily_rollups. Ao reprocessar um processo,
+    o worker subtrai esta contribuição e soma a atual, de modo que reprocessar é idempotente.
+    """
+    __tablename__ = "process_rollup_snapshots"
+
+    process_id = Column(Integer, primary_key=True, autoincrement=False)
+    lawyer_id = Column(Integer, nullable=False)
+    area_of_expertise = Column(String(20), nullable=False)
+    action_type = Column(String(100), nullable=False)
+    status = Column(String(30), nullable=False)
+    opened_on = Column(Date, nullable=True)
+    concluded_on = Column(Date, nullable=True)
+    late = Column(Boolean, nullable=False, default=False)
+    slippage_days = Column(Integer, nullable=False, default=0)
+
+class ProcessRollupChangeDB(Base):
+    """
+    Registro de processos alterados, gravado pelos eventos abaixo na mesma transação da escrita.
+    O worker consome as entradas acima da marca d'água (RollupWatermarkDB) e remove as já aplicadas.
+    Sem chave estrangeira: processos excluídos continuam registrados até serem processados.
+    """
+    __tablename__ = "process_rollup_changes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    process_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class RollupWatermarkDB(Base):
+    """Marca d'água de cada agregado: última entrada de process_rollup_changes já aplicada."""
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(50), primary_key=True)
+    last_change_id = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+# Granularidade dos períodos de /analytics/trends
+class TrendGranularityEnum(str, enum.Enum):
+    DAY = "day"
+    MONTH = "month"
+    YEAR = "year"
+
+# Dimensões pelas quais /analytics/trends pode agrupar cada período
+class TrendGroupByEnum(str, enum.Enum):
+    LAWYER = "lawyer_id"
+    AREA = "area_of_expertise"
+    ACTION_TYPE = "action_type"
+    STATUS = "status"
+
+# Modelos Pydantic para resposta
+class TrendPoint(BaseModel):
+    period: date # Primeiro dia do período (dia, mês ou ano)
+    group: Optional[str] = None # Valor da dimensão de agrupamento (group_by), se informada
+    opened: int
+    concluded: int
+    late: int
+    late_rate: float # late / concluded (0.0 sem concluídos)
+    avg_slippage_days: float # Média de dias de atraso por processo concluído
+
+
+# --- Registro de alterações ---
+# Os eventos de mapper rodam dentro do flush, na mesma conexão/transação da escrita do processo.
+# Atualizações em massa (query.update) não disparam estes eventos; quem as usa sobre as colunas
+# abaixo deve chamar core.rollups.mark_processes_changed.
+
+# Colunas de LegalProcessDB que alteram os agregados.
+ROLLUP_SOURCE_ATTRIBUTES = ("lawyer_id", "client_id", "action_type_id", "status", "entry_date", "delivery_deadline", "data_conclusao_real")
+
+def _log_change(connection, process_id: int) -> None:
+    connection.execute(insert(ProcessRollupChangeDB), [{"process_id": process_id, "created_at": datetime.utcnow()}])
+
+@event.listens_for(LegalProcessDB, "after_insert")
+def _rollup_after_insert(mapper, connection, target):
+    _log_change(connection, target.id)
+
+@event.listens_for(LegalProcessDB, "after_update")
+def _rollup_after_update(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[attr].history.has_changes() for attr in ROLLUP_SOURCE_ATTRIBUTES):
+        _log_change(connection, target.id)
+
+@event.listens_for(LegalProcessDB, "after_delete")
+def _rollup_after_delete(mapper, connection, target):
+    _log_change(connection, target.id)
+
+@event.listens_for(ClientDB, "after_update")
+def _rollup_after_client_update(mapper, connection, target):
+    # A área do cliente é uma dimensão dos agregados: todos os seus processos (inclusive arquivados) mudam de grupo.
+    if not inspect(target).attrs.area_of_expertise.history.has_changes():
+        return
+    now = datetime.utcnow()
+    for model in (LegalProcessDB, LegalProcessArchiveDB):
+        connection.execute(insert(ProcessRollupChangeDB).from_select(
+            ["process_id", "created_at"],
+            select(model.id, literal(now)).where(model.client_id == target.id)
+        ))
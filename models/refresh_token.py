@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime
+
+from database import Base # Importa Base de database.py
+
+# Modelo SQLAlchemy
+class RefreshTokenDB(Base):
+    """
+    Refresh tokens emitidos no login (POST /auth/token) e a cada renovação (POST /auth/refresh).
+    Só o hash SHA-256 do token é guardado: o token é aleatório e longo, então basta um hash rápido
+    (busca pelo índice único), sem bcrypt. Os tokens de uma mesma sessão compartilham family_id;
+    cada renovação marca o token apresentado como usado e emite o próximo da família. Um token já
+    usado apresentado de novo indica vazamento e revoga a família inteira (core/refresh_tokens.py).
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    lawyer_id = Column(Integer, ForeignKey("lawyers.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    used_at = Column(DateTime, nullable=True) # Trocado por um novo token em /auth/refresh
+    revoked_at = Column(DateTime, nullable=True) # Logout, troca de senha ou reutilização detectada
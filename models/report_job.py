@@ -0,0 +1,88 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Index
+from pydantic import BaseModel, field_validator
+from datetime import datetime
+from typing import Optional
+import enum
+
+from database import Base # Importa Base de database.py
+from models.legal_process import validate_process_status
+
+# Relatórios disponíveis
+class ReportTypeEnum(str, enum.Enum):
+    LAWYER_PORTFOLIO = "lawyer_portfolio" # Carteira de processos de um advogado (ou de todos, para o admin)
+    LATE_PROCESSES = "late_processes" # Processos ativos com prazo de entrega vencido e concluídos após o prazo
+
+# Formatos de arquivo
+class ReportFormatEnum(str, enum.Enum):
+    CSV = "csv"
+    XLSX = "xlsx"
+
+# Situação de um relatório
+class ReportStatusEnum(str, enum.Enum):
+    PENDENTE = "pendente"
+    EXECUTANDO = "executando"
+    CONCLUIDO = "concluido"
+    FALHOU = "falhou" # Esgotou as tentativas
+
+# Modelo SQLAlchemy
+class ReportJobDB(Base):
+    """
+    Pedidos de relatório (exportação de processos). A API apenas grava o pedido; os workers
+    reservam os pendentes com SELECT ... FOR UPDATE SKIP LOCKED e geram o arquivo em um pool de
+    processos (core/reports.py), atualizando o progresso a cada página lida.
+    """
+    __tablename__ = "report_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    report_type = Column(String(30), nullable=False)
+    format = Column(String(10), nullable=False)
+    params = Column(JSON, nullable=True) # Filtros do relatório (lawyer_id, status)
+    requested_by = Column(Integer, ForeignKey("lawyers.id", ondelete="CASCADE"), nullable=False, index=True)
+    status = Column(String(10), nullable=False, default=ReportStatusEnum.PENDENTE.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=2)
+    locked_by = Column(String(255), nullable=True) # Worker que está gerando o relatório
+    locked_at = Column(DateTime, nullable=True) # Renovado a cada página gerada (heartbeat)
+    rows_written = Column(Integer, nullable=False, default=0)
+    total_rows = Column(Integer, nullable=True) # Contado no início da geração
+    file_path = Column(String(500), nullable=True)
+    file_size = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True) # Após esta data o arquivo é removido
+
+    __table_args__ = (
+        Index("ix_report_jobs_status_created", "status", "created_at"),
+    )
+
+# Modelos Pydantic para validação de requisição/resposta
+class ReportJobCreate(BaseModel):
+    report_type: ReportTypeEnum
+    format: ReportFormatEnum = ReportFormatEnum.CSV
+    lawyer_id: Optional[int] = None # Ignorado para não-admins (sempre os próprios processos)
+    status: Optional[str] = None # Filtro por status do processo (apenas lawyer_portfolio)
+
+    @field_validator('status')
+    @classmethod
+    def validate_status(cls, value: Optional[str]) -> Optional[str]:
+        return validate_process_status(value)
+
+class ReportJob(BaseModel):
+    id: int
+    report_type: ReportTypeEnum
+    format: ReportFormatEnum
+    status: ReportStatusEnum
+    rows_written: int
+    total_rows: Optional[int] = None
+    progress: float = 0.0 # 0.0 a 1.0
+    file_size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    download_url: Optional[str] = None # Disponível quando o status é "concluido"
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+
+from database import Base # Importa Base de database.py
+
+# Modelo SQLAlchemy
+class SchedulerLeaseDB(Base):
+    """
+    Lease de liderança entre os workers da aplicação (uma linha por recurso, ex.: "scheduler").
+    O worker que detém o lease renova expires_at periodicamente (heartbeat); se ele parar,
+    o lease expira e outro worker assume.
+    """
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(50), primary_key=True) # Recurso disputado
+    holder = Column(String(255), nullable=False) # Identificador do worker líder (host:pid:sufixo)
+    expires_at = Column(DateTime, nullable=False) # Fim do lease (UTC)
+    heartbeat_at = Column(DateTime, nullable=False, default=datetime.utcnow) # Última renovação (UTC)
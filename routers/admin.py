@@ -1,10 +1,16 @@
+from datetime import date
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, constr
+from pydantic import BaseModel, constr, field_validator
 from sqlalchemy.orm import Session
 
 from database import get_db
 import models.lawyer as lawyer_models
+import models.legal_process as process_models
+from core.rollups import mark_processes_changed
 from core.security import get_current_user, get_password_hash
+from core.refresh_tokens import revoke_lawyer_refresh_tokens
 
 router = APIRouter(
     prefix="/admin",
@@ -62,7 +68,94 @@ async def admin_reset_lawyer_password(
     #     )
 
     target_lawyer.hashed_password = get_password_hash(payload.new_password)
+    # Sessões abertas com a senha antiga não podem mais ser renovadas (core/refresh_tokens.py).
+    revoke_lawyer_refresh_tokens(db, target_lawyer.id)
     db.add(target_lawyer)
     db.commit()
 
     return {"message": f"Senha para o advogado {target_lawyer.name} (OAB: {target_lawyer.oab}) redefinida com sucesso."}
+
+
+# --- Reatribuição de processos em massa ---
+class ProcessReassignPayload(BaseModel):
+    to_lawyer_id: int # Advogado que assumirá os processos.
+    # Filtros (combinados com AND). Pelo menos um deve ser informado.
+    from_lawyer_id: Optional[int] = None
+    client_id: Optional[int] = None
+    status: Optional[str] = None
+    fatal_deadline_de: Optional[date] = None
+    fatal_deadline_ate: Optional[date] = None
+    dry_run: bool = False # Se True, apenas conta os processos afetados, sem alterar nada.
+
+    @field_validator('status')
+    @classmethod
+    def validate_status(cls, value: Optional[str]) -> Optional[str]:
+        return process_models.validate_process_status(value)
+
+
+@router.post("/processes/reassign",
+             summary="Admin reatribui processos em massa para outro advogado")
+def admin_reassign_processes(
+    payload: ProcessReassignPayload,
+    db: Session = Depends(get_db),
+    current_admin: lawyer_models.LawyerDB = Depends(get_current_admin_user),
+):
+    """
+    Reatribui, com um único UPDATE ... WHERE, todos os processos que atendem aos filtros
+    (advogado atual, cliente, status e janela de prazo fatal) para o advogado de destino.
+    Com `dry_run=true`, retorna apenas a quantidade de processos que seriam afetados.
+    O advogado de destino recebe um único aviso (outbox) com os processos reatribuídos.
+    """
+    filters = []
+    if payload.from_lawyer_id is not None:
+        filters.append(process_models.LegalProcessDB.lawyer_id == payload.from_lawyer_id)
+    if payload.client_id is not None:
+        filters.append(process_models.LegalProcessDB.client_id == payload.client_id)
+    if payload.status:
+        filters.append(process_models.LegalProcessDB.status == payload.status)
+    if payload.fatal_deadline_de:
+        filters.append(process_models.LegalProcessDB.fatal_deadline >= payload.fatal_deadline_de)
+    if payload.fatal_deadline_ate:
+        filters.append(process_models.LegalProcessDB.fatal_deadline <= payload.fatal_deadline_ate)
+
+    if not filters:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe pelo menos um filtro (advogado, cliente, status ou janela de prazo fatal) para a reatribuição."
+        )
+    if payload.from_lawyer_id is not None and payload.from_lawyer_id == payload.to_lawyer_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O advogado de destino deve ser diferente do advogado de origem."
+        )
+
+    target_lawyer = db.query(lawyer_models.LawyerDB.id).filter(lawyer_models.LawyerDB.id == payload.to_lawyer_id).first()
+    if not target_lawyer:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Advogado de destino com ID {payload.to_lawyer_id} não encontrado."
+        )
+
+    # Processos que já pertencem ao destino não contam como reatribuídos.
+    filters.append(process_models.LegalProcessDB.lawyer_id != payload.to_lawyer_id)
+    query = db.query(process_models.LegalProcessDB).filter(*filters)
+
+    if payload.dry_run:
+        return {"dry_run": True, "matched": query.count(), "updated": 0}
+
+    # O UPDATE em massa não dispara os eventos do ORM: registra os processos para os agregados diários
+    # e grava o aviso ao advogado de destino no outbox, na mesma transação.
+    mark_processes_changed(db, *filters)
+    from core.notifications import REASSIGNMENT_MESSAGE_MAX_PROCESSES, enqueue_bulk_reassignment_notification
+    listed = db.query(
+        process_models.LegalProcessDB.process_number, process_models.LegalProcessDB.fatal_deadline
+    ).filter(*filters).order_by(process_models.LegalProcessDB.fatal_deadline).limit(REASSIGNMENT_MESSAGE_MAX_PROCESSES).all()
+    # UPDATE único no banco, sem carregar os processos na sessão.
+    updated = query.update(
+        {process_models.LegalProcessDB.lawyer_id: payload.to_lawyer_id},
+        synchronize_session=False
+    )
+    enqueue_bulk_reassignment_notification(db, payload.to_lawyer_id, listed, updated, current_admin.id)
+    db.commit()
+
+    return {"dry_run": False, "matched": updated, "updated": updated}
@@ -0,0 +1,46 @@
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from database import get_db
+import models.lawyer as lawyer_models
+from models.process_rollup import TrendGranularityEnum, TrendGroupByEnum, TrendPoint
+from core.rollups import get_trends
+from core.security import get_current_user
+
+router = APIRouter(prefix="/analytics", tags=["Análises"])
+
+
+@router.get("/trends", response_model=List[TrendPoint], summary="Tendência de processos abertos, concluídos e atrasados por período")
+def get_process_trends(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    granularity: TrendGranularityEnum = TrendGranularityEnum.MONTH,
+    group_by: Optional[TrendGroupByEnum] = None,
+    lawyer_id: Optional[int] = None,
+    area_of_expertise: Optional[str] = None,
+    action_type: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    db: Session = Depends(get_db),
+    current_user: lawyer_models.LawyerDB = Depends(get_current_user)
+):
+    """
+    Totais por dia, mês ou ano entre `from` e `to` (inclusive): processos abertos (data de entrada),
+    concluídos (data de conclusão), concluídos após o prazo de entrega, taxa de atraso e média de
+    dias de atraso. Com `group_by`, cada período é dividido por advogado, área do cliente, tipo de
+    ação ou status atual. Lê apenas os agregados diários mantidos pelo worker, atualizados a cada
+    ROLLUP_REFRESH_MINUTES minutos. Advogados não-admin veem apenas os próprios processos.
+    """
+    if date_to < date_from:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A data final deve ser igual ou posterior à data inicial.")
+
+    is_admin = (current_user.oab == "00001SP" or current_user.username == "admin")
+    if not is_admin:
+        lawyer_id = current_user.id
+
+    return get_trends(
+        db, date_from, date_to, granularity=granularity, group_by=group_by, lawyer_id=lawyer_id,
+        area_of_expertise=area_of_expertise, action_type=action_type, status=status_filter,
+    )
@@ -6,6 +6,9 @@ from sqlalchemy.exc import IntegrityError
 from database import get_db
 import models.lawyer as lawyer_models # Alias para evitar conflito de nome com modelo Pydantic.
 from core.security import get_password_hash, verify_password, create_access_token, get_current_user # Adicionado get_current_user.
+from core.integrity import raise_integrity_error
+from core.config import ACCESS_TOKEN_EXPIRE_MINUTES
+from core.refresh_tokens import issue_refresh_token, rotate_refresh_token, revoke_refresh_token_family, revoke_lawyer_refresh_tokens
 
 router = APIRouter(prefix="/auth", tags=["Autenticação"]) # Tag já traduzida.
 
@@ -46,10 +49,37 @@ def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Cria o token de acesso usando a OAB do advogado como "sub" (subject).
-    access_token = create_access_token(data={"sub": db_lawyer.oab})
+    # Refresh token para renovar o acesso sem a senha (POST /auth/refresh).
+    refresh_token = issue_refresh_token(db, db_lawyer.id)
+    db.commit()
+    return token_response(db_lawyer, refresh_token)
 
-    return {"access_token": access_token, "token_type": "bearer"}
+def token_response(lawyer: lawyer_models.LawyerDB, refresh_token: str) -> dict:
+    # Cria o token de acesso usando a OAB do advogado como "sub" (subject).
+    access_token = create_access_token(data={"sub": lawyer.oab})
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "refresh_token": refresh_token,
+    }
+
+# --- Renovação e encerramento da sessão ---
+from pydantic import BaseModel
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+@router.post("/refresh", response_model=dict)
+def refresh_access_token(payload: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Troca o refresh token por um novo token de acesso e um novo refresh token (o anterior deixa de valer)."""
+    lawyer, refresh_token = rotate_refresh_token(db, payload.refresh_token)
+    return token_response(lawyer, refresh_token)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(payload: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Revoga a sessão do refresh token informado. O token de acesso continua válido até expirar."""
+    revoke_refresh_token_family(db, payload.refresh_token)
 
 @router.get("/users/me", response_model=lawyer_models.Lawyer) # Usando modelo Pydantic Lawyer para a resposta.
 async def read_users_me(current_user: lawyer_models.LawyerDB = Depends(get_current_user)):
@@ -59,7 +89,7 @@ async def read_users_me(current_user: lawyer_models.LawyerDB = Depends(get_curre
     return current_user
 
 # --- Configurações do Usuário ---
-from pydantic import BaseModel, EmailStr, field_validator
+from pydantic import EmailStr, field_validator
 from typing import Optional
 import re
 
@@ -130,18 +160,8 @@ async def update_user_settings( # Renomeado de update_admin_settings.
 
     # Atualizar Email.
     if settings_update.email is not None:
-        if settings_update.email != user_to_update.email:
-            # Verificar se o novo email já está em uso por OUTRO usuário.
-            existing_lawyer_email = db.query(lawyer_models.LawyerDB).filter(
-                lawyer_models.LawyerDB.email == settings_update.email,
-                lawyer_models.LawyerDB.id != user_to_update.id
-            ).first()
-            if existing_lawyer_email:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Este email já está em uso por outro usuário."
-                )
-            user_to_update.email = settings_update.email
+        # Email em uso por outro usuário é barrado pelo índice único no UPDATE (ver o except IntegrityError abaixo).
+        user_to_update.email = settings_update.email
 
     # Atualizar Telegram ID.
     # O validador Pydantic já tratou o formato e a limpeza (string vazia para None).
@@ -163,6 +183,8 @@ async def update_user_settings( # Renomeado de update_admin_settings.
                 detail="Senha atual incorreta."
             )
         user_to_update.hashed_password = get_password_hash(settings_update.new_password)
+        # Sessões abertas com a senha antiga não podem mais ser renovadas.
+        revoke_lawyer_refresh_tokens(db, user_to_update.id)
     elif settings_update.current_password and not settings_update.new_password:
         # Caso onde current_password é fornecida mas new_password não.
         # Isso pode ser um erro de UI, mas não deve causar falha aqui.
@@ -174,11 +196,10 @@ async def update_user_settings( # Renomeado de update_admin_settings.
         db.add(user_to_update)
         db.commit()
         db.refresh(user_to_update)
-    except IntegrityError: # Pode acontecer se houver uma condição de corrida rara na verificação de email.
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Erro ao salvar alterações. Verifique se o email já não está em uso."
+    except IntegrityError as e:
+        raise_integrity_error(
+            db, e, {"email": (status.HTTP_400_BAD_REQUEST, "Este email já está em uso por outro usuário.")},
+            "Erro ao salvar alterações. Verifique se o email já não está em uso."
         )
     except Exception as e:
         db.rollback()
@@ -0,0 +1,536 @@
+import enum
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import get_db
+import models.lawyer as lawyer_models
+import models.client as client_models
+import models.legal_process as process_models
+from models.legal_process_archive import LegalProcessArchiveDB
+from core.archive import archived_process_numbers
+from core.security import get_current_user, get_password_hash
+
+router = APIRouter(tags=["Lote"])
+
+# Limite de operações por requisição, para manter a transação curta.
+MAX_BATCH_OPERATIONS = 1000
+
+# Senha padrão dos advogados criados pelo admin (mesma usada em POST /lawyers/).
+DEFAULT_PASSWORD_FOR_NEW_LAWYERS = "advogado"
+
+# Campos únicos de LawyerDB e a mensagem de erro correspondente (mesmas mensagens dos endpoints individuais).
+LAWYER_UNIQUE_FIELDS = {
+    "oab": "OAB already registered.",
+    "email": "Email already registered.",
+    "username": "Nickname (username) já registrado.",
+}
+
+
+class BatchEntityEnum(str, enum.Enum):
+    LAWYER = "lawyer"
+    CLIENT = "client"
+    PROCESS = "process"
+
+
+class BatchActionEnum(str, enum.Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class BatchOperation(BaseModel):
+    entity: BatchEntityEnum
+    action: BatchActionEnum
+    id: Optional[int] = None # Obrigatório para update/delete.
+    data: Optional[Dict[str, Any]] = None # Obrigatório para create/update. Em update, pode ser parcial.
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., max_length=MAX_BATCH_OPERATIONS)
+    # Se True, qualquer falha desfaz o lote inteiro. Se False, cada operação é isolada por um SAVEPOINT.
+    atomic: bool = False
+
+
+class BatchOperationResult(BaseModel):
+    index: int
+    entity: BatchEntityEnum
+    action: BatchActionEnum
+    status_code: int
+    id: Optional[int] = None
+    detail: Optional[Any] = None
+    data: Optional[Dict[str, Any]] = None
+
+
+class BatchResponse(BaseModel):
+    committed: bool
+    results: List[BatchOperationResult]
+
+
+class _BatchState:
+    """
+    Estado pré-carregado do lote (consultas set-based) e mantido atualizado
+    à medida que as operações são aplicadas, para que conflitos entre
+    operações do próprio lote também sejam detectados.
+    """
+
+    def __init__(self):
+        self.lawyers: Dict[int, lawyer_models.LawyerDB] = {}
+        self.clients: Dict[int, client_models.ClientDB] = {}
+        self.processes: Dict[int, process_models.LegalProcessDB] = {}
+        # valor -> id do advogado que o possui, por campo único.
+        self.lawyer_keys: Dict[str, Dict[str, int]] = {field: {} for field in LAWYER_UNIQUE_FIELDS}
+        # process_number -> id do processo que o possui.
+        self.process_numbers: Dict[str, int] = {}
+        self.existing_lawyer_ids: set = set()
+        self.existing_client_ids: set = set()
+        # Quantidade de processos vinculados aos advogados/clientes que serão excluídos.
+        self.lawyer_process_counts: Dict[int, int] = {}
+        self.client_process_counts: Dict[int, int] = {}
+        self.default_password_hash: Optional[str] = None
+
+
+class _DeferredPayload:
+    """Payload de update cujo alvo não existia antes do lote (ex.: criado por uma operação anterior do mesmo lote)."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+
+
+def _model_values(db_obj, model_cls) -> Dict[str, Any]:
+    return {field: getattr(db_obj, field) for field in model_cls.model_fields if hasattr(db_obj, field)}
+
+
+def _validate_payload(model_cls, data: Dict[str, Any], current: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Valida o payload de uma operação com o mesmo modelo Pydantic do endpoint individual.
+    Em updates, o payload parcial é mesclado aos valores atuais antes da validação e
+    apenas os campos enviados são retornados.
+    """
+    merged = {**(current or {}), **data}
+    try:
+        validated = model_cls.model_validate(merged)
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.errors(include_url=False, include_context=False))
+    if current is None:
+        return validated.model_dump()
+    return validated.model_dump(include=set(data) & set(model_cls.model_fields))
+
+
+def _prepare(operations: List[BatchOperation], db: Session) -> tuple:
+    """
+    Primeira fase: carrega em poucas consultas IN tudo o que as operações referenciam
+    e valida os payloads. Retorna o estado pré-carregado e, por operação, o payload
+    validado ou a HTTPException de validação.
+    """
+    state = _BatchState()
+    ids_by_entity: Dict[BatchEntityEnum, set] = {entity: set() for entity in BatchEntityEnum}
+    for op in operations:
+        if op.action != BatchActionEnum.CREATE and op.id is not None:
+            ids_by_entity[op.entity].add(op.id)
+
+    if ids_by_entity[BatchEntityEnum.LAWYER]:
+        for lawyer in db.query(lawyer_models.LawyerDB).filter(lawyer_models.LawyerDB.id.in_(ids_by_entity[BatchEntityEnum.LAWYER])):
+            state.lawyers[lawyer.id] = lawyer
+    if ids_by_entity[BatchEntityEnum.CLIENT]:
+        for client in db.query(client_models.ClientDB).filter(client_models.ClientDB.id.in_(ids_by_entity[BatchEntityEnum.CLIENT])):
+            state.clients[client.id] = client
+    if ids_by_entity[BatchEntityEnum.PROCESS]:
+        for process in db.query(process_models.LegalProcessDB).filter(process_models.LegalProcessDB.id.in_(ids_by_entity[BatchEntityEnum.PROCESS])):
+            state.processes[process.id] = process
+
+    models_by_entity = {
+        BatchEntityEnum.LAWYER: (lawyer_models.LawyerCreate, state.lawyers),
+        BatchEntityEnum.CLIENT: (client_models.ClientCreate, state.clients),
+        BatchEntityEnum.PROCESS: (process_models.LegalProcessCreate, state.processes),
+    }
+
+    payloads: List[Any] = []
+    for op in operations:
+        if op.action == BatchActionEnum.DELETE:
+            payloads.append(None)
+            continue
+        model_cls, targets = models_by_entity[op.entity]
+        try:
+            if op.data is None:
+                raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="O campo 'data' é obrigatório para create/update.")
+            current = None
+            if op.action == BatchActionEnum.UPDATE:
+                if op.id not in targets:
+                    # A validação fica para a fase de aplicação, quando o alvo já pode ter sido criado.
+                    payloads.append(_DeferredPayload(op.data))
+                    continue
+                current = _model_values(targets[op.id], model_cls)
+            payloads.append(_validate_payload(model_cls, op.data, current))
+        except HTTPException as e:
+            payloads.append(e)
+
+    # Valores únicos de advogados: uma única consulta IN por OAB/email/username,
+    # no lugar das três consultas sequenciais por advogado.
+    lawyer_values: Dict[str, set] = {field: set() for field in LAWYER_UNIQUE_FIELDS}
+    process_numbers: set = set()
+    referenced_lawyer_ids: set = set()
+    referenced_client_ids: set = set()
+    for op, payload in zip(operations, payloads):
+        if not isinstance(payload, dict):
+            continue
+        if op.entity == BatchEntityEnum.LAWYER:
+            for field in LAWYER_UNIQUE_FIELDS:
+                if payload.get(field) is not None:
+                    lawyer_values[field].add(payload[field])
+        elif op.entity == BatchEntityEnum.PROCESS:
+            if payload.get("process_number") is not None:
+                process_numbers.add(payload["process_number"])
+            if payload.get("lawyer_id") is not None:
+                referenced_lawyer_ids.add(payload["lawyer_id"])
+            if payload.get("client_id") is not None:
+                referenced_client_ids.add(payload["client_id"])
+
+    for lawyer in state.lawyers.values():
+        for field in LAWYER_UNIQUE_FIELDS:
+            state.lawyer_keys[field][getattr(lawyer, field)] = lawyer.id
+    conditions = [getattr(lawyer_models.LawyerDB, field).in_(values) for field, values in lawyer_values.items() if values]
+    if conditions:
+        rows = db.query(
+            lawyer_models.LawyerDB.id, lawyer_models.LawyerDB.oab, lawyer_models.LawyerDB.email, lawyer_models.LawyerDB.username
+        ).filter(or_(*conditions)).all()
+        for row in rows:
+            for field in LAWYER_UNIQUE_FIELDS:
+                state.lawyer_keys[field][getattr(row, field)] = row.id
+
+    for process in state.processes.values():
+        state.process_numbers[process.process_number] = process.id
+    if process_numbers:
+        rows = db.query(process_models.LegalProcessDB.id, process_models.LegalProcessDB.process_number).filter(
+            process_models.LegalProcessDB.process_number.in_(process_numbers)
+        ).all()
+        for row in rows:
+            state.process_numbers[row.process_number] = row.id
+        # Números de processos arquivados também estão em uso (ids do arquivo não se repetem na tabela principal).
+        for process_number, process_id in archived_process_numbers(db, process_numbers).items():
+            state.process_numbers.setdefault(process_number, process_id)
+
+    state.existing_lawyer_ids = set(state.lawyers)
+    missing_lawyer_ids = referenced_lawyer_ids - state.existing_lawyer_ids
+    if missing_lawyer_ids:
+        state.existing_lawyer_ids.update(
+            row.id for row in db.query(lawyer_models.LawyerDB.id).filter(lawyer_models.LawyerDB.id.in_(missing_lawyer_ids))
+        )
+    state.existing_client_ids = set(state.clients)
+    missing_client_ids = referenced_client_ids - state.existing_client_ids
+    if missing_client_ids:
+        state.existing_client_ids.update(
+            row.id for row in db.query(client_models.ClientDB.id).filter(client_models.ClientDB.id.in_(missing_client_ids))
+        )
+
+    # Contagem de processos vinculados (GROUP BY) para os advogados/clientes a excluir.
+    lawyers_to_delete = {op.id for op in operations if op.entity == BatchEntityEnum.LAWYER and op.action == BatchActionEnum.DELETE and op.id in state.lawyers}
+    clients_to_delete = {op.id for op in operations if op.entity == BatchEntityEnum.CLIENT and op.action == BatchActionEnum.DELETE and op.id in state.clients}
+    if lawyers_to_delete:
+        state.lawyer_process_counts = {lawyer_id: 0 for lawyer_id in lawyers_to_delete}
+        rows = db.query(process_models.LegalProcessDB.lawyer_id, func.count(process_models.LegalProcessDB.id)).filter(
+            process_models.LegalProcessDB.lawyer_id.in_(lawyers_to_delete)
+        ).group_by(process_models.LegalProcessDB.lawyer_id).all()
+        state.lawyer_process_counts.update({lawyer_id: count for lawyer_id, count in rows})
+        # Processos arquivados também impedem a exclusão (chave estrangeira no arquivo).
+        rows = db.query(LegalProcessArchiveDB.lawyer_id, func.count(LegalProcessArchiveDB.id)).filter(
+            LegalProcessArchiveDB.lawyer_id.in_(lawyers_to_delete)
+        ).group_by(LegalProcessArchiveDB.lawyer_id).all()
+        for lawyer_id, count in rows:
+            state.lawyer_process_counts[lawyer_id] += count
+    if clients_to_delete:
+        state.client_process_counts = {client_id: 0 for client_id in clients_to_delete}
+        rows = db.query(process_models.LegalProcessDB.client_id, func.count(process_models.LegalProcessDB.id)).filter(
+            process_models.LegalProcessDB.client_id.in_(clients_to_delete)
+        ).group_by(process_models.LegalProcessDB.client_id).all()
+        state.client_process_counts.update({client_id: count for client_id, count in rows})
+        rows = db.query(LegalProcessArchiveDB.client_id, func.count(LegalProcessArchiveDB.id)).filter(
+            LegalProcessArchiveDB.client_id.in_(clients_to_delete)
+        ).group_by(LegalProcessArchiveDB.client_id).all()
+        for client_id, count in rows:
+            state.client_process_counts[client_id] += count
+
+    return state, payloads
+
+
+def _require_admin(is_admin: bool, message: str):
+    if not is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=message)
+
+
+def _check_lawyer_unique(state: _BatchState, payload: Dict[str, Any], lawyer_id: Optional[int]):
+    for field, message in LAWYER_UNIQUE_FIELDS.items():
+        value = payload.get(field)
+        if value is None:
+            continue
+        owner = state.lawyer_keys[field].get(value)
+        if owner is not None and owner != lawyer_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
+
+
+def _track_lawyer_keys(state: _BatchState, lawyer: lawyer_models.LawyerDB, old_values: Dict[str, Any]):
+    for field in LAWYER_UNIQUE_FIELDS:
+        old_value = old_values.get(field)
+        if old_value is not None and state.lawyer_keys[field].get(old_value) == lawyer.id:
+            del state.lawyer_keys[field][old_value]
+        state.lawyer_keys[field][getattr(lawyer, field)] = lawyer.id
+
+
+def _adjust_process_counts(state: _BatchState, lawyer_id: Optional[int], client_id: Optional[int], delta: int):
+    if lawyer_id in state.lawyer_process_counts:
+        state.lawyer_process_counts[lawyer_id] += delta
+    if client_id in state.client_process_counts:
+        state.client_process_counts[client_id] += delta
+
+
+def _apply_lawyer(op: BatchOperation, payload: Dict[str, Any], state: _BatchState, db: Session, is_admin: bool):
+    if op.action == BatchActionEnum.CREATE:
+        _require_admin(is_admin, "Acesso negado. Apenas administradores podem criar novos advogados.")
+        _check_lawyer_unique(state, payload, None)
+        if state.default_password_hash is None:
+            # O hash bcrypt é calculado uma única vez por lote.
+            state.default_password_hash = get_password_hash(DEFAULT_PASSWORD_FOR_NEW_LAWYERS)
+        db_lawyer = lawyer_models.LawyerDB(**payload, hashed_password=state.default_password_hash)
+        db.add(db_lawyer)
+        db.flush()
+
+        def commit_state():
+            _track_lawyer_keys(state, db_lawyer, {})
+            state.existing_lawyer_ids.add(db_lawyer.id)
+            state.lawyers[db_lawyer.id] = db_lawyer
+            state.lawyer_process_counts[db_lawyer.id] = 0
+        return db_lawyer, commit_state
+
+    db_lawyer = state.lawyers.get(op.id)
+    if op.action == BatchActionEnum.UPDATE:
+        _require_admin(is_admin, "Acesso negado. Apenas administradores podem atualizar dados de advogados.")
+        if db_lawyer is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Advogado não encontrado.")
+        if 'oab' in payload and db_lawyer.oab == "00001SP" and payload['oab'] != "00001SP":
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A OAB do administrador principal não pode ser alterada para um valor diferente de '00001SP'.")
+        if 'username' in payload and db_lawyer.username == "admin" and payload['username'] != "admin":
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="O Nickname (username) do administrador principal ('admin') não pode ser alterado por este endpoint.")
+        _check_lawyer_unique(state, payload, db_lawyer.id)
+        old_values = {field: getattr(db_lawyer, field) for field in LAWYER_UNIQUE_FIELDS}
+        for key, value in payload.items():
+            setattr(db_lawyer, key, value)
+        db.flush()
+        return db_lawyer, lambda: _track_lawyer_keys(state, db_lawyer, old_values)
+
+    _require_admin(is_admin, "Acesso negado. Apenas administradores podem excluir advogados.")
+    if db_lawyer is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Advogado não encontrado.")
+    if db_lawyer.oab == "00001SP" or db_lawyer.username == "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="O usuário admin principal não pode ser excluído.")
+    if state.lawyer_process_counts.get(db_lawyer.id, 0) > 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lawyer cannot be deleted as they are associated with one or more legal processes.")
+    old_values = {field: getattr(db_lawyer, field) for field in LAWYER_UNIQUE_FIELDS}
+    db.delete(db_lawyer)
+    db.flush()
+
+    def commit_state():
+        for field, value in old_values.items():
+            state.lawyer_keys[field].pop(value, None)
+        state.existing_lawyer_ids.discard(db_lawyer.id)
+        state.lawyers.pop(db_lawyer.id, None)
+    return None, commit_state
+
+
+def _apply_client(op: BatchOperation, payload: Dict[str, Any], state: _BatchState, db: Session, is_admin: bool):
+    if op.action == BatchActionEnum.CREATE:
+        _require_admin(is_admin, "Acesso negado. Apenas administradores podem criar novos clientes.")
+        db_client = client_models.ClientDB(**payload)
+        db.add(db_client)
+        db.flush()
+
+        def commit_state():
+            state.existing_client_ids.add(db_client.id)
+            state.clients[db_client.id] = db_client
+            state.client_process_counts[db_client.id] = 0
+        return db_client, commit_state
+
+    db_client = state.clients.get(op.id)
+    if op.action == BatchActionEnum.UPDATE:
+        _require_admin(is_admin, "Acesso negado. Apenas administradores podem atualizar dados de clientes.")
+        if db_client is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado.")
+        for key, value in payload.items():
+            setattr(db_client, key, value)
+        db.flush()
+        return db_client, None
+
+    _require_admin(is_admin, "Acesso negado. Apenas administradores podem excluir clientes.")
+    if db_client is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não encontrado.")
+    if state.client_process_counts.get(db_client.id, 0) > 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Client cannot be deleted as they are associated with one or more legal processes.")
+    db.delete(db_client)
+    db.flush()
+
+    def commit_state():
+        state.existing_client_ids.discard(db_client.id)
+        state.clients.pop(db_client.id, None)
+    return None, commit_state
+
+
+def _apply_process(op: BatchOperation, payload: Dict[str, Any], state: _BatchState, db: Session, current_user: lawyer_models.LawyerDB, is_admin: bool):
+    if op.action == BatchActionEnum.CREATE:
+        # Mesmas regras de POST /processes/: não-admin sempre cria para si mesmo.
+        if not is_admin or not payload.get('lawyer_id'):
+            payload['lawyer_id'] = current_user.id
+        elif payload['lawyer_id'] not in state.existing_lawyer_ids:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Advogado com id {payload['lawyer_id']} não encontrado.")
+        if payload['client_id'] not in state.existing_client_ids:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Cliente com id {payload['client_id']} não encontrado.")
+        if payload['process_number'] in state.process_numbers:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Erro: Número do processo já existente.")
+        db_process = process_models.LegalProcessDB(**payload)
+        db.add(db_process)
+        db.flush()
+
+        def commit_state():
+            state.process_numbers[db_process.process_number] = db_process.id
+            state.processes[db_process.id] = db_process
+            _adjust_process_counts(state, db_process.lawyer_id, db_process.client_id, 1)
+        return db_process, commit_state
+
+    db_process = state.processes.get(op.id)
+    if db_process is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Processo legal não encontrado")
+    if not is_admin and db_process.lawyer_id != current_user.id:
+        detail = "Não autorizado a modificar este processo." if op.action == BatchActionEnum.UPDATE else "Não autorizado a excluir este processo."
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+    old_lawyer_id, old_client_id, old_number = db_process.lawyer_id, db_process.client_id, db_process.process_number
+    if op.action == BatchActionEnum.UPDATE:
+        old_deadlines = (db_process.delivery_deadline, db_process.fatal_deadline)
+        if 'lawyer_id' in payload and payload['lawyer_id'] != old_lawyer_id:
+            if not is_admin:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Não autorizado a alterar o advogado responsável deste processo.")
+            if payload['lawyer_id'] not in state.existing_lawyer_ids:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Novo advogado com id {payload['lawyer_id']} não encontrado.")
+        if 'client_id' in payload and payload['client_id'] != old_client_id and payload['client_id'] not in state.existing_client_ids:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Novo cliente com id {payload['client_id']} não encontrado.")
+        if 'process_number' in payload and state.process_numbers.get(payload['process_number'], db_process.id) != db_process.id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Erro: Número do processo já existente.")
+        for key, value in payload.items():
+            setattr(db_process, key, value)
+        db.flush()
+        # Mesmo aviso de PUT /processes/{id}, gravado no outbox dentro do SAVEPOINT da operação.
+        from core.notifications import enqueue_process_update_notifications
+        enqueue_process_update_notifications(db, db_process, old_lawyer_id, old_deadlines, current_user.id)
+
+        def commit_state():
+            state.process_numbers.pop(old_number, None)
+            state.process_numbers[db_process.process_number] = db_process.id
+            _adjust_process_counts(state, old_lawyer_id, old_client_id, -1)
+            _adjust_process_counts(state, db_process.lawyer_id, db_process.client_id, 1)
+        return db_process, commit_state
+
+    db.delete(db_process)
+    db.flush()
+
+    def commit_state():
+        state.process_numbers.pop(old_number, None)
+        state.processes.pop(db_process.id, None)
+        _adjust_process_counts(state, old_lawyer_id, old_client_id, -1)
+    return None, commit_state
+
+
+def _resolve_deferred(op: BatchOperation, payload: _DeferredPayload, state: _BatchState) -> Dict[str, Any]:
+    model_cls, targets = {
+        BatchEntityEnum.LAWYER: (lawyer_models.LawyerCreate, state.lawyers),
+        BatchEntityEnum.CLIENT: (client_models.ClientCreate, state.clients),
+        BatchEntityEnum.PROCESS: (process_models.LegalProcessCreate, state.processes),
+    }[op.entity]
+    if op.id not in targets:
+        # O alvo não existe; a função de aplicação correspondente retorna o 404 com a mensagem adequada.
+        return {}
+    return _validate_payload(model_cls, payload.data, _model_values(targets[op.id], model_cls))
+
+
+RESPONSE_MODELS = {
+    BatchEntityEnum.LAWYER: lawyer_models.Lawyer,
+    BatchEntityEnum.CLIENT: client_models.Client,
+    BatchEntityEnum.PROCESS: process_models.LegalProcess,
+}
+
+
+@router.post("/batch", response_model=BatchResponse, summary="Executa operações de CRUD em lote")
+def run_batch(
+    batch: BatchRequest,
+    db: Session = Depends(get_db),
+    current_user: lawyer_models.LawyerDB = Depends(get_current_user)
+):
+    """
+    Executa, em uma única transação, uma lista de operações de criação, atualização e
+    exclusão de advogados, clientes e processos. As verificações de unicidade e de
+    existência são feitas com uma consulta IN por conjunto de valores, e o resultado
+    de cada operação é retornado na mesma ordem do pedido.
+
+    Com `atomic=false` (padrão), cada operação roda em um SAVEPOINT e falhas individuais
+    não afetam as demais. Com `atomic=true`, qualquer falha desfaz o lote inteiro.
+    """
+    is_admin = (current_user.oab == "00001SP" or current_user.username == "admin")
+    state, payloads = _prepare(batch.operations, db)
+
+    results: List[BatchOperationResult] = []
+    failed = False
+    for index, (op, payload) in enumerate(zip(batch.operations, payloads)):
+        result = BatchOperationResult(index=index, entity=op.entity, action=op.action, status_code=status.HTTP_200_OK, id=op.id)
+        results.append(result)
+        if failed and batch.atomic:
+            result.status_code = status.HTTP_424_FAILED_DEPENDENCY
+            result.detail = "Operação não executada: o lote atômico foi abortado."
+            continue
+        try:
+            if isinstance(payload, HTTPException):
+                raise payload
+            if isinstance(payload, _DeferredPayload):
+                payload = _resolve_deferred(op, payload, state)
+            if op.action != BatchActionEnum.CREATE and op.id is None:
+                raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="O campo 'id' é obrigatório para update/delete.")
+            # No modo atômico a transação do lote já é tudo ou nada, e a primeira falha encerra o lote: o
+            # SAVEPOINT só é necessário para isolar as operações no modo parcial. (No SQLite o pysqlite não
+            # envia BEGIN antes de um SAVEPOINT, e cada RELEASE faria o commit do que veio antes.)
+            with (nullcontext() if batch.atomic else db.begin_nested()):
+                if op.entity == BatchEntityEnum.LAWYER:
+                    db_obj, commit_state = _apply_lawyer(op, payload, state, db, is_admin)
+                elif op.entity == BatchEntityEnum.CLIENT:
+                    db_obj, commit_state = _apply_client(op, payload, state, db, is_admin)
+                else:
+                    db_obj, commit_state = _apply_process(op, payload, state, db, current_user, is_admin)
+            # O estado do lote só é atualizado depois que o SAVEPOINT foi liberado com sucesso.
+            if commit_state:
+                commit_state()
+            if op.action == BatchActionEnum.CREATE:
+                result.status_code = status.HTTP_201_CREATED
+            if db_obj is not None:
+                result.id = db_obj.id
+                result.data = RESPONSE_MODELS[op.entity].model_validate(db_obj).model_dump(mode="json")
+        except HTTPException as e:
+            result.status_code = e.status_code
+            result.detail = e.detail
+            failed = True
+        except IntegrityError:
+            # Violação de constraint não detectada pelas verificações prévias (ex.: condição de corrida).
+            result.status_code = status.HTTP_400_BAD_REQUEST
+            result.detail = "Erro de integridade: dados duplicados ou referência inválida."
+            failed = True
+
+    if failed and batch.atomic:
+        db.rollback()
+        for result in results:
+            result.data = None
+            if result.status_code < 400:
+                result.status_code = status.HTTP_424_FAILED_DEPENDENCY
+                result.detail = "Operação desfeita: o lote atômico foi abortado."
+        return BatchResponse(committed=False, results=results)
+
+    db.commit()
+    return BatchResponse(committed=True, results=results)
@@ -0,0 +1,52 @@
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from database import get_db
+import models.lawyer as lawyer_models
+from models.deadline_calendar import DeadlineEntry, DeadlineTypeEnum
+from core.deadline_calendar import get_deadline_entries
+from core.business_days import get_business_day_table_for
+from core.security import get_current_user
+
+router = APIRouter(tags=["Prazos"])
+
+# Janela máxima de uma consulta, para limitar o tamanho da resposta.
+MAX_DEADLINE_RANGE_DAYS = 366
+
+
+@router.get("/deadlines", response_model=List[DeadlineEntry], summary="Lista prazos de processos ativos por período")
+def get_deadlines(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    deadline_type: Optional[DeadlineTypeEnum] = None,
+    lawyer_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: lawyer_models.LawyerDB = Depends(get_current_user)
+):
+    """
+    Retorna os prazos de entrega e fatais de processos ativos entre `from` e `to` (inclusive),
+    a partir do calendário de prazos. Advogados não-admin veem apenas os próprios processos.
+    Cada prazo traz `business_days_left`, calculado pela tabela de dias úteis (O(1) por linha).
+    """
+    if date_to < date_from:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A data final deve ser igual ou posterior à data inicial.")
+    if (date_to - date_from).days > MAX_DEADLINE_RANGE_DAYS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"O período consultado não pode exceder {MAX_DEADLINE_RANGE_DAYS} dias.")
+
+    is_admin = (current_user.oab == "00001SP" or current_user.username == "admin")
+    if not is_admin:
+        lawyer_id = current_user.id
+
+    rows = get_deadline_entries(db, date_from, date_to, deadline_type=deadline_type, lawyer_id=lawyer_id)
+
+    today = date.today()
+    business_days = get_business_day_table_for(today, date_from, date_to)
+    today_ordinal = business_days.ordinal(today)
+    deadline_ordinals = business_days.ordinals_for(row.deadline_date for row in rows)
+    return [
+        DeadlineEntry(**row._asdict(), business_days_left=deadline_ordinal - today_ordinal)
+        for row, deadline_ordinal in zip(rows, deadline_ordinals)
+    ]
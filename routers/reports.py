@@ -0,0 +1,104 @@
+import os
+from datetime import datetime
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from database import get_db
+import models.lawyer as lawyer_models
+from models.report_job import ReportJob, ReportJobCreate, ReportJobDB, ReportStatusEnum, ReportTypeEnum
+from core.reports import MEDIA_TYPES, create_report_job
+from core.security import get_current_user
+
+router = APIRouter(prefix="/reports", tags=["Relatórios"])
+
+# Relatórios ainda não concluídos permitidos por usuário.
+MAX_PENDING_REPORTS_PER_USER = 3
+
+
+def _to_response(job: ReportJobDB) -> ReportJob:
+    response = ReportJob.model_validate(job)
+    if job.total_rows:
+        response.progress = round(min(job.rows_written / job.total_rows, 1.0), 4)
+    elif job.status == ReportStatusEnum.CONCLUIDO.value:
+        response.progress = 1.0
+    if job.status == ReportStatusEnum.CONCLUIDO.value:
+        response.download_url = f"/reports/{job.id}/download"
+    return response
+
+
+def _get_own_report(db: Session, report_id: int, current_user: lawyer_models.LawyerDB) -> ReportJobDB:
+    job = db.query(ReportJobDB).filter(ReportJobDB.id == report_id).first()
+    is_admin = (current_user.oab == "00001SP" or current_user.username == "admin")
+    # Relatório de outro usuário responde como inexistente para não revelar ids.
+    if job is None or (not is_admin and job.requested_by != current_user.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Relatório não encontrado.")
+    return job
+
+
+@router.post("/", response_model=ReportJob, status_code=status.HTTP_202_ACCEPTED, summary="Solicitar a geração de um relatório")
+def request_report(
+    report: ReportJobCreate,
+    db: Session = Depends(get_db),
+    current_user: lawyer_models.LawyerDB = Depends(get_current_user)
+):
+    """
+    Registra o pedido e responde imediatamente; o arquivo é gerado por um worker em background.
+    Acompanhe o progresso em GET /reports/{id} e baixe o arquivo em `download_url` quando o status
+    for "concluido". Advogados não-admin só exportam os próprios processos.
+    """
+    is_admin = (current_user.oab == "00001SP" or current_user.username == "admin")
+    lawyer_id = report.lawyer_id if is_admin else current_user.id
+
+    pending = db.query(ReportJobDB).filter(
+        ReportJobDB.requested_by == current_user.id,
+        ReportJobDB.status.in_([ReportStatusEnum.PENDENTE.value, ReportStatusEnum.EXECUTANDO.value]),
+    ).count()
+    if pending >= MAX_PENDING_REPORTS_PER_USER:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Já existem {pending} relatório(s) em andamento. Aguarde a conclusão antes de solicitar outro."
+        )
+
+    params = {"lawyer_id": lawyer_id}
+    if report.report_type == ReportTypeEnum.LAWYER_PORTFOLIO and report.status:
+        params["status"] = report.status
+    job = create_report_job(db, current_user.id, report.report_type, report.format, params)
+    return _to_response(job)
+
+
+@router.get("/", response_model=List[ReportJob], summary="Listar os relatórios solicitados")
+def list_reports(
+    db: Session = Depends(get_db),
+    current_user: lawyer_models.LawyerDB = Depends(get_current_user)
+):
+    jobs = db.query(ReportJobDB).filter(ReportJobDB.requested_by == current_user.id).order_by(ReportJobDB.created_at.desc()).all()
+    return [_to_response(job) for job in jobs]
+
+
+@router.get("/{report_id}", response_model=ReportJob, summary="Consultar o status e o progresso de um relatório")
+def get_report(
+    report_id: int,
+    db: Session = Depends(get_db),
+    current_user: lawyer_models.LawyerDB = Depends(get_current_user)
+):
+    return _to_response(_get_own_report(db, report_id, current_user))
+
+
+@router.get("/{report_id}/download", summary="Baixar o arquivo de um relatório concluído")
+def download_report(
+    report_id: int,
+    db: Session = Depends(get_db),
+    current_user: lawyer_models.LawyerDB = Depends(get_current_user)
+):
+    """O arquivo é enviado em partes direto do disco (FileResponse), sem ser carregado em memória."""
+    job = _get_own_report(db, report_id, current_user)
+    if job.status != ReportStatusEnum.CONCLUIDO.value:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"O relatório ainda não está disponível (status: {job.status}).")
+    if (job.expires_at and job.expires_at < datetime.utcnow()) or not job.file_path or not os.path.exists(job.file_path):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="O arquivo do relatório expirou. Solicite um novo relatório.")
+
+    filename = f"{job.report_type}_{job.created_at.strftime('%Y%m%d_%H%M%S')}.{job.format}"
+    return FileResponse(job.file_path, media_type=MEDIA_TYPES.get(job.format), filename=filename)
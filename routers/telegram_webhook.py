@@ -0,0 +1,129 @@
+import asyncio
+import hmac
+import logging
+import os
+from typing import TYPE_CHECKING, Optional, Set
+
+from fastapi import APIRouter, Header, HTTPException, Request, status
+
+from core.config import TELEGRAM_UPDATE_MODE, TELEGRAM_WEBHOOK_OFFLINE, TELEGRAM_WEBHOOK_SECRET
+
+# python-telegram-bot só é importado quando o modo webhook está ativo (start/dispatch), não na carga da API.
+if TYPE_CHECKING:
+    from telegram import Update
+    from telegram.ext import Application
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/telegram",
+    tags=["Telegram"],
+)
+
+try:
+    TELEGRAM_WEBHOOK_MAX_CONCURRENCY = int(os.getenv("TELEGRAM_WEBHOOK_MAX_CONCURRENCY", "32"))
+except ValueError:
+    logger.error("TELEGRAM_WEBHOOK_MAX_CONCURRENCY inválido. Usando padrão de 32.")
+    TELEGRAM_WEBHOOK_MAX_CONCURRENCY = 32
+
+
+class TelegramWebhookDispatcher:
+    """
+    Recebe os updates do webhook e os processa com Application.process_update, cada um em sua
+    própria task (até TELEGRAM_WEBHOOK_MAX_CONCURRENCY simultâneos): a rota responde ao Telegram
+    imediatamente e um comando lento não atrasa os demais chats.
+    """
+
+    def __init__(self, max_concurrency: int = TELEGRAM_WEBHOOK_MAX_CONCURRENCY):
+        self.application: Optional["Application"] = None
+        self._initialized = False
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        self._init_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        from telegram_bot import create_telegram_application, register_command_handlers
+
+        # TELEGRAM_WEBHOOK_OFFLINE: bot sem rede, para testar a rota localmente com updates gravados.
+        self.application = create_telegram_application(offline=TELEGRAM_WEBHOOK_OFFLINE)
+        if not self.application:
+            logger.error("Failed to create Telegram application. Webhook updates will be rejected.")
+            return
+        register_command_handlers(self.application)
+        await self._ensure_initialized()
+
+    async def _ensure_initialized(self) -> bool:
+        """Inicializa a aplicação (consulta getMe); se o Telegram estiver inacessível, tenta de novo no próximo update."""
+        if self.application is None:
+            return False
+        if self._initialized:
+            return True
+        async with self._init_lock:
+            if not self._initialized:
+                try:
+                    await self.application.initialize()
+                    # start() sem updater: apenas para que handlers não bloqueantes (block=False) rodem como tasks gerenciadas.
+                    await self.application.start()
+                    self._initialized = True
+                    logger.info("Telegram application initialized for webhook mode.")
+                except Exception as e:
+                    logger.error(f"Error initializing Telegram application for webhook mode: {e}", exc_info=True)
+                    return False
+        return True
+
+    async def _process(self, update: "Update") -> None:
+        async with self._semaphore:
+            try:
+                await self.application.process_update(update)
+            except Exception as e:
+                logger.error(f"Error processing Telegram update {update.update_id}: {e}", exc_info=True)
+
+    async def dispatch(self, payload: dict) -> None:
+        from telegram import Update
+
+        if not await self._ensure_initialized():
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Bot do Telegram indisponível.")
+        update = Update.de_json(payload, self.application.bot)
+        if update is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Update do Telegram inválido.")
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def stop(self) -> None:
+        if self._tasks:
+            await asyncio.wait(self._tasks, timeout=10)
+        if self.application and self._initialized:
+            if self.application.running:
+                await self.application.stop()
+            await self.application.shutdown()
+            self._initialized = False
+
+
+webhook_dispatcher = TelegramWebhookDispatcher()
+
+
+@router.post("/webhook", include_in_schema=False)
+async def telegram_webhook(
+    request: Request,
+    x_telegram_bot_api_secret_token: Optional[str] = Header(None),
+):
+    """
+    Recebe updates do Telegram (TELEGRAM_UPDATE_MODE=webhook). O header
+    X-Telegram-Bot-Api-Secret-Token deve conferir com TELEGRAM_WEBHOOK_SECRET.
+    """
+    if TELEGRAM_UPDATE_MODE != "webhook":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Modo webhook do Telegram desativado.")
+    if not TELEGRAM_WEBHOOK_SECRET or not x_telegram_bot_api_secret_token or \
+            not hmac.compare_digest(x_telegram_bot_api_secret_token, TELEGRAM_WEBHOOK_SECRET):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token secreto do webhook inválido.")
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Corpo da requisição não é um JSON válido.")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Update do Telegram inválido.")
+
+    await webhook_dispatcher.dispatch(payload)
+    return {"ok": True}
@@ -6,6 +6,9 @@ from sqlalchemy.exc import IntegrityError # Import para tratamento de erros
 from models.lawyer import LawyerDB
 from models.client import ClientDB, AreaOfExpertiseEnum
 from models.legal_process import LegalProcessDB
+# Demais tabelas, para que o drop_all também as apague (várias referenciam legal_processes e lawyers).
+from models import deadline_calendar, notification_ledger, outbox, scheduler_lease, job_queue, lawyer_delay_stats, legal_process_archive, process_rollup, report_job, data_version, refresh_token, action_type # noqa
+from migrations import schema_version_table, upgrade
 from core.security import get_password_hash # Import para hashear senhas
 import random
 from datetime import datetime, timedelta
@@ -99,10 +102,11 @@ def create_synthetic_data(db: Session):
     # Apaga todas as tabelas existentes que são gerenciadas pelo Base.metadata
     print("Limpando tabelas existentes...")
     Base.metadata.drop_all(bind=engine)
+    schema_version_table.drop(bind=engine, checkfirst=True)
 
-    # Cria as tabelas novamente
+    # Cria as tabelas novamente, pelas migrações
     print("Criando tabelas...")
-    Base.metadata.create_all(bind=engine)
+    upgrade(engine)
 
     # --- Criação/Verificação do Usuário Admin ---
     ADMIN_OAB = "00001SP" # Alterado para formato válido
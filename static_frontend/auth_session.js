@@ -0,0 +1,121 @@
+// Sessão do usuário no frontend, compartilhada pelas páginas (carregar antes do script da página).
+// O login devolve um token de acesso (curto) e um refresh token. Antes de o token de acesso expirar,
+// ele é renovado em POST /auth/refresh, sem pedir a senha de novo; uma requisição da API que receber
+// 401 com um token expirado também dispara a renovação e é repetida com o token novo. Cada refresh
+// token vale uma única renovação (a resposta traz o próximo).
+
+const ACCESS_TOKEN_STORAGE_KEY = 'authToken';
+const REFRESH_TOKEN_STORAGE_KEY = 'refreshToken';
+const TOKEN_RENEWAL_MARGIN_SECONDS = 60; // Renova quando faltar menos do que isso para expirar
+const AUTH_ENDPOINTS = ['/auth/token', '/auth/refresh', '/auth/logout'];
+
+const originalFetch = window.fetch.bind(window);
+let tokenRenewalInFlight = null;
+let tokenRenewalTimer = null;
+
+function saveSessionTokens(tokenResponse) {
+    localStorage.setItem(ACCESS_TOKEN_STORAGE_KEY, tokenResponse.access_token);
+    if (tokenResponse.refresh_token) localStorage.setItem(REFRESH_TOKEN_STORAGE_KEY, tokenResponse.refresh_token);
+    scheduleTokenRenewal();
+}
+
+function clearSessionTokens() {
+    clearTimeout(tokenRenewalTimer);
+    localStorage.removeItem(ACCESS_TOKEN_STORAGE_KEY);
+    localStorage.removeItem(REFRESH_TOKEN_STORAGE_KEY);
+}
+
+// Logout: revoga a sessão no servidor (sem aguardar a resposta) e apaga os tokens.
+function endSession() {
+    const refreshToken = localStorage.getItem(REFRESH_TOKEN_STORAGE_KEY);
+    clearSessionTokens();
+    if (refreshToken) {
+        originalFetch('/auth/logout', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ refresh_token: refreshToken }),
+            keepalive: true, // Conclui mesmo com o redirecionamento para login.html
+        }).catch(error => console.warn('Falha ao encerrar a sessão no servidor:', error));
+    }
+}
+
+// Segundos (epoch) em que o token de acesso expira, lidos do JWT.
+function accessTokenExpiry(token) {
+    try {
+        const payload = JSON.parse(atob(token.split('.')[1].replace(/-/g, '+').replace(/_/g, '/')));
+        return typeof payload.exp === 'number' ? payload.exp : null;
+    } catch (error) {
+        return null;
+    }
+}
+
+// Renova o token de acesso. Resolve com true se houver um token válido ao final. Chamadas
+// simultâneas na mesma página compartilham a mesma renovação.
+function renewAccessToken() {
+    if (tokenRenewalInFlight) return tokenRenewalInFlight;
+    const refreshToken = localStorage.getItem(REFRESH_TOKEN_STORAGE_KEY);
+    if (!refreshToken) return Promise.resolve(false);
+
+    tokenRenewalInFlight = (async () => {
+        try {
+            const response = await originalFetch('/auth/refresh', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ refresh_token: refreshToken }),
+            });
+            if (response.ok) {
+                saveSessionTokens(await response.json());
+                return true;
+            }
+            // Outra aba pode ter renovado com o mesmo refresh token: vale o par que ela gravou.
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            if (localStorage.getItem(REFRESH_TOKEN_STORAGE_KEY) !== refreshToken) return true;
+            console.warn('Não foi possível renovar a sessão:', response.status);
+            return false;
+        } catch (error) {
+            console.error('Erro ao renovar a sessão:', error);
+            return false;
+        } finally {
+            tokenRenewalInFlight = null;
+        }
+    })();
+    return tokenRenewalInFlight;
+}
+
+// Agenda a renovação para pouco antes da expiração do token de acesso atual.
+function scheduleTokenRenewal() {
+    clearTimeout(tokenRenewalTimer);
+    const accessToken = localStorage.getItem(ACCESS_TOKEN_STORAGE_KEY);
+    const expiry = accessToken && localStorage.getItem(REFRESH_TOKEN_STORAGE_KEY) ? accessTokenExpiry(accessToken) : null;
+    if (!expiry) return;
+    // Um pequeno atraso aleatório evita que várias abas abertas renovem exatamente ao mesmo tempo.
+    const jitterMs = Math.random() * 10000;
+    const delayMs = Math.max(0, (expiry - TOKEN_RENEWAL_MARGIN_SECONDS) * 1000 - Date.now() + jitterMs);
+    tokenRenewalTimer = setTimeout(() => {
+        // Se outra aba já renovou, o token atual ainda tem folga: só reagenda.
+        const currentExpiry = accessTokenExpiry(localStorage.getItem(ACCESS_TOKEN_STORAGE_KEY) || '');
+        if (currentExpiry && currentExpiry * 1000 - Date.now() > TOKEN_RENEWAL_MARGIN_SECONDS * 1000) {
+            scheduleTokenRenewal();
+        } else {
+            renewAccessToken();
+        }
+    }, delayMs);
+}
+
+// Requisições autenticadas que recebem 401 renovam o token e são repetidas uma vez.
+window.fetch = async (input, init = {}) => {
+    const response = await originalFetch(input, init);
+    const url = typeof input === 'string' ? input : input.url;
+    if (response.status !== 401 || AUTH_ENDPOINTS.some(endpoint => url.includes(endpoint))) return response;
+    const headers = new Headers(init.headers || {});
+    if (!headers.has('Authorization') || !(await renewAccessToken())) return response;
+    headers.set('Authorization', `Bearer ${localStorage.getItem(ACCESS_TOKEN_STORAGE_KEY)}`);
+    return originalFetch(input, { ...init, headers });
+};
+
+// Tokens renovados em outra aba: reagenda a partir do novo token.
+window.addEventListener('storage', (event) => {
+    if (event.key === ACCESS_TOKEN_STORAGE_KEY) scheduleTokenRenewal();
+});
+
+scheduleTokenRenewal();
@@ -15,7 +15,7 @@ function getToken() {
     return localStorage.getItem('authToken');
 }
 function removeToken() {
-    localStorage.removeItem('authToken');
+    clearSessionTokens(); // Token de acesso e refresh token (auth_session.js)
 }
 function getAuthHeaders(isFormData = false) {
     const token = getToken();
@@ -29,7 +29,7 @@ function getAuthHeaders(isFormData = false) {
     return headers;
 }
 function logout() {
-    removeToken();
+    endSession(); // Revoga o refresh token e apaga os tokens (auth_session.js)
     console.log("[Dashboard Debug] Logout chamado. Token removido. Redirecionando para login.html.");
     window.location.href = 'login.html'; // Redirecionamento imediato
 }
@@ -46,6 +46,7 @@ const deadlineAlertsListEl = document.getElementById('deadline-alerts-list');
 
 // Tabela de Processos
 const processesTableBodyEl = document.getElementById('processes-table-body');
+const processesSearchInputEl = document.getElementById('search-dashboard-processes');
 
 // Selects para Filtros (serão usados depois, mas bom ter a referência)
 const filterStatusEl = document.getElementById('filter-status');
@@ -169,20 +170,30 @@ async function fetchData(url) {
 async function fetchAllData() {
     console.log('[Dashboard Debug] Iniciando fetchAllData...');
     try {
-        const processesPromise = fetchData('/processes/');
-        const lawyersPromise = fetchData('/lawyers/');
-        const clientsPromise = fetchData('/clients/');
-
-        // Espera todas as promises resolverem
-        [allProcesses, allLawyers, allClients] = await Promise.all([processesPromise, lawyersPromise, clientsPromise]);
-        console.log('[Dashboard Debug] Dados brutos recebidos de Promise.all:', { processes: allProcesses, lawyers: allLawyers, clients: allClients });
+        // Nomes do advogado e do cliente vêm embutidos em cada processo (expand), na mesma consulta,
+        // em vez de baixar as listas completas de /lawyers/ e /clients/ só para montar os mapas.
+        allProcesses = await fetchData('/processes/?expand=lawyer,client');
+        console.log('[Dashboard Debug] Dados brutos recebidos:', { processes: allProcesses });
     } catch (error) {
-        console.error('[Dashboard Debug] Erro durante Promise.all em fetchAllData. Provável erro de autenticação ou rede.', error);
-        logout(); // Se qualquer uma das chamadas principais falhar (ex: 401), faz logout.
+        console.error('[Dashboard Debug] Erro ao buscar processos em fetchAllData. Provável erro de autenticação ou rede.', error);
+        logout(); // Se a chamada principal falhar (ex: 401), faz logout.
         return; // Interrompe a execução adicional de fetchAllData
     }
 
-    // Criar mapas para fácil acesso a nomes
+    // Criar mapas para fácil acesso a nomes e as listas dos filtros, a partir dos processos
+    const lawyersById = {};
+    const clientsById = {};
+    allProcesses.forEach(process => {
+        if (process.lawyer_id != null && process.lawyer_name) {
+            lawyersById[process.lawyer_id] = { id: process.lawyer_id, name: process.lawyer_name, oab: process.lawyer_oab };
+        }
+        if (process.client_id != null && process.client_name) {
+            clientsById[process.client_id] = { id: process.client_id, name: process.client_name };
+        }
+    });
+    const byName = (a, b) => a.name.localeCompare(b.name, 'pt-BR');
+    allLawyers = Object.values(lawyersById).sort(byName);
+    allClients = Object.values(clientsById).sort(byName);
     allLawyers.forEach(lawyer => lawyerMap[lawyer.id] = lawyer.name);
     allClients.forEach(client => clientMap[client.id] = client.name);
     console.log('[Dashboard Debug] Mapas populados:', { lawyerMap, clientMap });
@@ -235,77 +246,103 @@ function renderSummaryCards() {
     }).length;
     processesNearDeadlineEl.textContent = nearDeadlineCount;
 
-    // Filtrar o admin antes de contar o total de advogados
-    const actualLawyers = allLawyers.filter(lawyer => lawyer.oab !== "00001SP" && lawyer.username !== "admin");
+    // Advogados e clientes com processos (derivados dos processos carregados); o admin não entra na contagem
+    const actualLawyers = allLawyers.filter(lawyer => lawyer.oab !== "00001SP");
     totalLawyersEl.textContent = actualLawyers.length;
 
     totalClientsEl.textContent = allClients.length;
 }
 
-function renderProcessTable(processesToRender) {
-    console.log('[Dashboard Debug] Iniciando renderProcessTable...');
-    processesTableBodyEl.innerHTML = ''; // Limpar tabela
-
-    if (processesToRender.length === 0) {
-        processesTableBodyEl.innerHTML = '<tr><td colspan="8" class="text-center">Nenhum processo encontrado.</td></tr>';
-        return;
+// Tabela virtualizada (virtual_table.js): só as linhas visíveis ficam no DOM, e a busca por texto
+// roda no Web Worker, sobre os processos exibidos (já filtrados pela API).
+const processTable = new VirtualTable({
+    container: processesTableBodyEl.closest('.table-responsive'),
+    tbody: processesTableBodyEl,
+    columnCount: 9,
+    renderRow: fillProcessRow,
+    emptyMessage: 'Nenhum processo encontrado.',
+});
+const processTableSearch = new TableSearch(process => [
+    process.process_number || 'N/A',
+    process.client_name || clientMap[process.client_id] || 'N/A',
+    process.lawyer_name || lawyerMap[process.lawyer_id] || 'N/A',
+    formatDate(process.entry_date),
+    formatDate(process.delivery_deadline),
+    formatDate(process.fatal_deadline),
+    process.status || 'N/A',
+    process.action_type || 'N/A',
+    process.delay_risk || 'N/A',
+].join('\n'));
+
+function fillProcessRow(row, process) {
+    row.insertCell().textContent = process.process_number || 'N/A';
+    row.insertCell().textContent = process.client_name || clientMap[process.client_id] || 'N/A';
+    row.insertCell().textContent = process.lawyer_name || lawyerMap[process.lawyer_id] || 'N/A';
+    row.insertCell().textContent = formatDate(process.entry_date);
+    row.insertCell().textContent = formatDate(process.delivery_deadline);
+    row.insertCell().textContent = formatDate(process.fatal_deadline);
+    row.insertCell().textContent = process.status || 'N/A';
+    row.insertCell().textContent = process.action_type || 'N/A';
+
+    // Nova célula para Risco de Atraso
+    const riskCell = row.insertCell();
+    const riskValue = process.delay_risk || "N/A";
+    riskCell.textContent = riskValue;
+    if (riskValue === "Alto") {
+        riskCell.style.color = "red";
+        riskCell.style.fontWeight = "bold";
+    } else if (riskValue === "Médio") {
+        riskCell.style.color = "orange";
+    } else if (riskValue === "Baixo") {
+        riskCell.style.color = "green";
     }
+}
 
-    processesToRender.forEach(process => {
-        const row = processesTableBodyEl.insertRow();
-        row.insertCell().textContent = process.process_number || 'N/A';
-        row.insertCell().textContent = clientMap[process.client_id] || 'N/A';
-        row.insertCell().textContent = lawyerMap[process.lawyer_id] || 'N/A';
-        row.insertCell().textContent = formatDate(process.entry_date);
-        row.insertCell().textContent = formatDate(process.delivery_deadline);
-        row.insertCell().textContent = formatDate(process.fatal_deadline);
-        row.insertCell().textContent = process.status || 'N/A';
-        row.insertCell().textContent = process.action_type || 'N/A';
-
-        // Nova célula para Risco de Atraso
-        const riskCell = row.insertCell();
-        const riskValue = process.delay_risk || "N/A";
-        riskCell.textContent = riskValue;
-        if (riskValue === "Alto") {
-            riskCell.style.color = "red";
-            riskCell.style.fontWeight = "bold";
-        } else if (riskValue === "Médio") {
-            riskCell.style.color = "orange";
-        } else if (riskValue === "Baixo") {
-            riskCell.style.color = "green";
-        }
+function renderProcessTable(processesToRender) {
+    console.log('[Dashboard Debug] Iniciando renderProcessTable...');
+    processTableSearch.setItems(processesToRender);
+    // Reaplica à nova lista o termo já digitado no campo de busca.
+    const searchTerm = processesSearchInputEl ? processesSearchInputEl.value : '';
+    processTableSearch.search(searchTerm).then(matches => {
+        if (matches) processTable.setItems(matches);
     });
 }
 
-function renderDeadlineAlerts() {
+// Converte um objeto Date (local) para "yyyy-mm-dd".
+function toISODateLocal(dateObj) {
+    return `${dateObj.getFullYear()}-${String(dateObj.getMonth() + 1).padStart(2, '0')}-${String(dateObj.getDate()).padStart(2, '0')}`;
+}
+
+async function renderDeadlineAlerts() {
     console.log('[Dashboard Debug] Iniciando renderDeadlineAlerts...');
-    deadlineAlertsListEl.innerHTML = ''; // Limpar alertas antigos
 
     const today = new Date();
     today.setHours(0,0,0,0);
     const sevenDaysFromNow = new Date(today);
     sevenDaysFromNow.setDate(today.getDate() + 7);
+    const todayISO = toISODateLocal(today);
 
-    const criticalProcesses = allProcesses.filter(p => {
-        if (!p.fatal_deadline) return false;
-        const deadlineDate = new Date(p.fatal_deadline);
-        deadlineDate.setDate(deadlineDate.getDate() + 1); // Ajuste de timezone/UTC
-        deadlineDate.setHours(0,0,0,0);
-        return deadlineDate >= today && deadlineDate <= sevenDaysFromNow;
-    }).sort((a,b) => new Date(a.fatal_deadline) - new Date(b.fatal_deadline)); // Ordenar por data
+    // Os prazos da janela vêm do calendário de prazos da API (já ordenados por data),
+    // em vez de varrer todos os processos carregados.
+    let criticalDeadlines = [];
+    try {
+        criticalDeadlines = await fetchData(`/deadlines?from=${todayISO}&to=${toISODateLocal(sevenDaysFromNow)}&deadline_type=fatal`);
+    } catch (error) {
+        console.error('[Dashboard Debug] Erro ao buscar prazos para os alertas:', error);
+        deadlineAlertsListEl.innerHTML = '<p class="text-danger">Erro ao carregar alertas de prazos.</p>';
+        return;
+    }
 
-    if (criticalProcesses.length === 0) {
+    deadlineAlertsListEl.innerHTML = ''; // Limpar alertas antigos
+
+    if (criticalDeadlines.length === 0) {
         deadlineAlertsListEl.innerHTML = '<p class="text-muted">Nenhum prazo crítico nos próximos 7 dias.</p>';
         return;
     }
 
-    criticalProcesses.forEach(process => {
-        const deadlineDate = new Date(process.fatal_deadline);
-        deadlineDate.setDate(deadlineDate.getDate() + 1); // Ajuste de timezone/UTC
-        deadlineDate.setHours(0,0,0,0);
-
+    criticalDeadlines.forEach(deadline => {
         let alertClass = 'list-group-item-warning'; // Padrão para próximos 7 dias
-        if (deadlineDate.getTime() === today.getTime()) {
+        if (deadline.deadline_date === todayISO) {
             alertClass = 'list-group-item-danger'; // Vence hoje
         }
 
@@ -314,10 +351,10 @@ function renderDeadlineAlerts() {
         listItem.className = `list-group-item list-group-item-action ${alertClass}`;
         listItem.innerHTML = `
             <div class="d-flex w-100 justify-content-between">
-                <h5 class="mb-1">Proc: ${process.process_number} (Cliente: ${clientMap[process.client_id] || 'N/A'})</h5>
-                <small>Prazo Fatal: ${formatDate(process.fatal_deadline)}</small>
+                <h5 class="mb-1">Proc: ${deadline.process_number} (Cliente: ${clientMap[deadline.client_id] || 'N/A'})</h5>
+                <small>Prazo Fatal: ${formatDate(deadline.deadline_date)}</small>
             </div>
-            <p class="mb-1">Advogado: ${lawyerMap[process.lawyer_id] || 'N/A'}. Tipo: ${process.action_type || 'N/A'}</p>
+            <p class="mb-1">Advogado: ${lawyerMap[deadline.lawyer_id] || 'N/A'}. Tipo: ${deadline.action_type || 'N/A'}</p>
         `;
         deadlineAlertsListEl.appendChild(listItem);
     });
@@ -337,7 +374,7 @@ async function filterProcesses(status, lawyerId, clientId) {
     console.log(`[Dashboard Debug] Filtrando processos com: status=${status}, lawyerId=${lawyerId}, clientId=${clientId}, fatalDeadlineDe=${fatalDeadlineDeStr} (ISO: ${fatalDeadlineDeISO}), fatalDeadlineAte=${fatalDeadlineAteStr} (ISO: ${fatalDeadlineAteISO})`);
 
     let queryString = '/processes/?';
-    const params = [];
+    const params = ['expand=lawyer,client'];
 
     if (status) {
         params.push(`status=${encodeURIComponent(status)}`);
@@ -359,14 +396,14 @@ async function filterProcesses(status, lawyerId, clientId) {
     console.log(`[Dashboard Debug] Query string para filtro: ${queryString}`);
 
     // Mostra um feedback de carregamento na tabela
-    processesTableBodyEl.innerHTML = '<tr><td colspan="8" class="text-center">Filtrando processos...</td></tr>';
+    processTable.setMessage('Filtrando processos...');
 
     try {
         const filteredProcesses = await fetchData(queryString);
         renderProcessTable(filteredProcesses);
     } catch (error) {
         console.error('Erro ao filtrar processos:', error);
-        processesTableBodyEl.innerHTML = '<tr><td colspan="8" class="text-center">Erro ao aplicar filtros.</td></tr>';
+        processTable.setMessage('Erro ao aplicar filtros.');
     }
 }
 
@@ -390,7 +427,7 @@ function processDataForStatusChart(processes) {
 function processDataForLawyerChart(processes, lawyersMap) {
     const lawyerCounts = {};
     processes.forEach(p => {
-        const lawyerName = lawyersMap[p.lawyer_id] || 'Não atribuído';
+        const lawyerName = p.lawyer_name || lawyersMap[p.lawyer_id] || 'Não atribuído';
         lawyerCounts[lawyerName] = (lawyerCounts[lawyerName] || 0) + 1;
     });
     return {
@@ -682,40 +719,11 @@ document.addEventListener('DOMContentLoaded', async () => { // Tornar async para
     }
 
     // --- Lógica de Pesquisa para a Tabela de Processos do Dashboard ---
-    function setupDashboardTableSearch(inputId, tableBodyId) {
-        const searchInput = document.getElementById(inputId);
-        const tableBody = document.getElementById(tableBodyId);
-
-        if (!searchInput) {
-            console.warn(`[Dashboard Debug] Elemento de input de busca da tabela não encontrado: ${inputId}`);
-            return;
-        }
-        if (!tableBody) {
-            console.warn(`[Dashboard Debug] Corpo da tabela não encontrado: ${tableBodyId}`);
-            return;
-        }
-
-        searchInput.addEventListener('input', function() {
-            const searchTerm = this.value.toLowerCase();
-            const rows = tableBody.getElementsByTagName('tr');
-
-            for (let i = 0; i < rows.length; i++) {
-                const row = rows[i];
-                const rowText = row.textContent.toLowerCase();
-                if (rowText.includes(searchTerm)) {
-                    row.classList.remove('d-none');
-                } else {
-                    row.classList.add('d-none');
-                }
-            }
-        });
-
-        searchInput.addEventListener('keydown', function(event) {
-            if (event.key === 'Enter') {
-                event.preventDefault();
-                searchInput.blur();
-            }
-        });
+    // A busca roda no Web Worker (TableSearch) e a tabela mostra os processos encontrados.
+    if (processesSearchInputEl) {
+        bindTableSearch(processesSearchInputEl, processTableSearch, processTable);
+    } else {
+        console.warn('[Dashboard Debug] Elemento de input de busca da tabela não encontrado: search-dashboard-processes');
     }
 
     // Função para configurar o clique no ícone de busca para focar no input (específico do Dashboard)
@@ -733,8 +741,7 @@ document.addEventListener('DOMContentLoaded', async () => { // Tornar async para
         }
     }
 
-    // Configurar a pesquisa para a tabela de processos no dashboard
-    setupDashboardTableSearch('search-dashboard-processes', 'processes-table-body');
+    // Configurar o ícone de busca da tabela de processos no dashboard
     setupDashboardSearchIconClick('search-dashboard-processes-icon', 'search-dashboard-processes');
 
 });
@@ -9,7 +9,7 @@ function getToken() {
     return localStorage.getItem('authToken');
 }
 function removeToken() {
-    localStorage.removeItem('authToken');
+    clearSessionTokens(); // Token de acesso e refresh token (auth_session.js)
 }
 function getAuthHeaders(isFormData = false) {
     const token = getToken();
@@ -86,7 +86,7 @@ function parseDisplayDate(dateString_ddmmyyyy) {
 
 // --- Lógica de Autenticação e UI ---
 function logout() {
-    removeToken();
+    endSession(); // Revoga o refresh token e apaga os tokens (auth_session.js)
     currentUser = null;
     window.location.href = 'login.html';
 }
@@ -183,107 +183,115 @@ async function fetchAndSetCurrentUser_forIndexPage() {
 let allLawyers = [];
 let allClients = [];
 
-async function fetchLawyers() {
-    const lawyersTableBody = document.getElementById('lawyers-table-body'); // Obter o tbody primeiro
-    if (!getToken() || !lawyersTableBody) { // Usar lawyersTableBody na condição
-        if (!lawyersTableBody) console.error("Elemento lawyers-table-body não encontrado em fetchLawyers!");
+// --- Listas de index.html: tabelas virtualizadas e busca no Web Worker (virtual_table.js) ---
+// Só as linhas visíveis ficam no DOM; os botões das linhas são tratados por delegação no tbody.
+const managementLists = {};
+
+function createManagementList(name, { tbodyId, searchInputId, columnCount, renderRow, searchText, emptyMessage }) {
+    const tbody = document.getElementById(tbodyId);
+    if (!tbody) {
+        console.warn(`Table body not found: ${tbodyId}`);
         return;
     }
-    try {
-        const response = await fetch(`${API_BASE_URL}/lawyers/`, { headers: getAuthHeaders() });
-        if (response.status === 401) { logout(); return; }
-        if (!response.ok) throw new Error(`Erro HTTP: ${response.status}`);
-        const lawyers = await response.json();
-        const lawyersTableBody = document.getElementById('lawyers-table-body'); // ID do tbody da tabela
-        if (!lawyersTableBody) {
-            console.error("Elemento lawyers-table-body não encontrado!");
-            return;
-        }
-        lawyersTableBody.innerHTML = ''; // Limpar conteúdo anterior
+    const list = {
+        table: new VirtualTable({ container: tbody.closest('.table-responsive'), tbody, columnCount, renderRow, emptyMessage }),
+        search: new TableSearch(searchText),
+        searchInput: document.getElementById(searchInputId),
+    };
+    if (list.searchInput) {
+        bindTableSearch(list.searchInput, list.search, list.table);
+    } else {
+        console.warn(`Search input not found for table: ${searchInputId}`);
+    }
+    managementLists[name] = list;
+}
 
-        const isAdminUser = currentUser && (currentUser.oab === "00001SP" || currentUser.username === "admin");
+// Exibe os itens na lista, reaplicando o termo já digitado no campo de busca.
+function showManagementList(name, items) {
+    const list = managementLists[name];
+    if (!list) return;
+    list.search.setItems(items);
+    list.search.search(list.searchInput ? list.searchInput.value : '').then(matches => {
+        if (matches) list.table.setItems(matches);
+    });
+}
 
-        lawyers.forEach(lawyer => {
-            if (lawyer.oab === "00001SP" || lawyer.username === "admin") { // Não listar o admin user para gerenciamento
-                return;
-            }
+function showManagementListMessage(name, message) {
+    if (managementLists[name]) managementLists[name].table.setMessage(message);
+}
 
-            const escapedName = lawyer.name.replace(/'/g, "&apos;").replace(/"/g, "&quot;");
-            const escapedOab = lawyer.oab.replace(/'/g, "&apos;").replace(/"/g, "&quot;");
-            const escapedEmail = lawyer.email.replace(/'/g, "&apos;").replace(/"/g, "&quot;");
-            const escapedTelegramId = (lawyer.telegram_id || '').replace(/'/g, "&apos;").replace(/"/g, "&quot;");
-            const escapedUsername = (lawyer.username || '').replace(/'/g, "&apos;").replace(/"/g, "&quot;");
-
-            const tr = lawyersTableBody.insertRow();
-
-            // Coluna Nome (Nickname)
-            const cellName = tr.insertCell();
-            cellName.innerHTML = `<strong>${lawyer.name}</strong><br><small>(Nickname: ${lawyer.username || 'N/A'})</small>`;
-
-            // Coluna Detalhes (OAB, Email, Telegram)
-            const cellDetails = tr.insertCell();
-            cellDetails.innerHTML = `<small>OAB: ${lawyer.oab}<br>Email: ${lawyer.email}<br>Telegram: ${lawyer.telegram_id || 'N/A'}</small>`;
-
-            // Coluna Ações
-            const cellActions = tr.insertCell();
-            cellActions.style.verticalAlign = "middle";
-            let actionsHtml = `
-                <button class="btn btn-sm btn-outline-primary btn-edit-lawyer"
-                        data-id="${lawyer.id}"
-                        data-name="${escapedName}"
-                        data-oab="${escapedOab}"
-                        data-email="${escapedEmail}"
-                        data-username="${escapedUsername}"
-                        data-telegram="${escapedTelegramId}">Editar</button>
-                <button class="btn btn-sm btn-outline-danger btn-delete-lawyer delete-btn ms-1" data-id="${lawyer.id}">Excluir</button>`;
-
-            if (isAdminUser) {
-                actionsHtml += `<button class="btn btn-sm btn-outline-warning ms-1 btn-admin-reset-password" data-lawyer-id="${lawyer.id}" data-lawyer-name="${escapedName}" data-lawyer-oab="${escapedOab}">Redefinir Senha</button>`;
-            }
-            cellActions.innerHTML = actionsHtml;
-        });
-    } catch (error) {
-        console.error('Falha ao buscar advogados:', error);
-        const lawyersTableBody = document.getElementById('lawyers-table-body');
-        if(lawyersTableBody) lawyersTableBody.innerHTML = '<tr><td colspan="3" class="text-center">Erro ao carregar advogados.</td></tr>';
-    }
+function initializeManagementLists() {
+    createManagementList('lawyers', {
+        tbodyId: 'lawyers-table-body', searchInputId: 'search-lawyers', columnCount: 3,
+        renderRow: renderLawyerRow, emptyMessage: 'Nenhum advogado encontrado.',
+        searchText: lawyer => [lawyer.name, lawyer.username || 'N/A', lawyer.oab, lawyer.email, lawyer.telegram_id || 'N/A'].join('\n'),
+    });
+    createManagementList('clients', {
+        tbodyId: 'clients-table-body', searchInputId: 'search-clients', columnCount: 3,
+        renderRow: renderClientRow, emptyMessage: 'Nenhum cliente encontrado.',
+        searchText: client => [client.name, client.area_of_expertise].join('\n'),
+    });
+    createManagementList('processes', {
+        tbodyId: 'processes-table-body', searchInputId: 'search-processes', columnCount: 8,
+        renderRow: renderProcessRow, emptyMessage: 'Nenhum processo encontrado.',
+        searchText: process => [
+            process.process_number, processListLawyerMap[process.lawyer_id] || 'N/A', processListClientMap[process.client_id] || 'N/A',
+            process.status, formatDate(process.fatal_deadline), process.action_type || 'N/A',
+        ].join('\n'),
+    });
 }
 
-// --- Lógica de Busca em Tabelas para Index.html ---
-function setupTableSearchIndex(inputId, tableBodyId) {
-    const searchInput = document.getElementById(inputId);
-    const tableBody = document.getElementById(tableBodyId);
+function renderLawyerRow(tr, lawyer) {
+    const isAdminUser = currentUser && (currentUser.oab === "00001SP" || currentUser.username === "admin");
+    const escapedName = lawyer.name.replace(/'/g, "&apos;").replace(/"/g, "&quot;");
+    const escapedOab = lawyer.oab.replace(/'/g, "&apos;").replace(/"/g, "&quot;");
+    const escapedEmail = lawyer.email.replace(/'/g, "&apos;").replace(/"/g, "&quot;");
+    const escapedTelegramId = (lawyer.telegram_id || '').replace(/'/g, "&apos;").replace(/"/g, "&quot;");
+    const escapedUsername = (lawyer.username || '').replace(/'/g, "&apos;").replace(/"/g, "&quot;");
+
+    // Coluna Nome (Nickname)
+    const cellName = tr.insertCell();
+    cellName.innerHTML = `<strong>${lawyer.name}</strong><br><small>(Nickname: ${lawyer.username || 'N/A'})</small>`;
+
+    // Coluna Detalhes (OAB, Email, Telegram)
+    const cellDetails = tr.insertCell();
+    cellDetails.innerHTML = `<small>OAB: ${lawyer.oab}<br>Email: ${lawyer.email}<br>Telegram: ${lawyer.telegram_id || 'N/A'}</small>`;
+
+    // Coluna Ações
+    const cellActions = tr.insertCell();
+    cellActions.style.verticalAlign = "middle";
+    let actionsHtml = `
+        <button class="btn btn-sm btn-outline-primary btn-edit-lawyer"
+                data-id="${lawyer.id}"
+                data-name="${escapedName}"
+                data-oab="${escapedOab}"
+                data-email="${escapedEmail}"
+                data-username="${escapedUsername}"
+                data-telegram="${escapedTelegramId}">Editar</button>
+        <button class="btn btn-sm btn-outline-danger btn-delete-lawyer delete-btn ms-1" data-id="${lawyer.id}">Excluir</button>`;
+
+    if (isAdminUser) {
+        actionsHtml += `<button class="btn btn-sm btn-outline-warning ms-1 btn-admin-reset-password" data-lawyer-id="${lawyer.id}" data-lawyer-name="${escapedName}" data-lawyer-oab="${escapedOab}">Redefinir Senha</button>`;
+    }
+    cellActions.innerHTML = actionsHtml;
+}
 
-    if (!searchInput) {
-        console.warn(`Search input not found for table: ${inputId}`);
+async function fetchLawyers() {
+    if (!getToken() || !managementLists.lawyers) {
+        if (!managementLists.lawyers) console.error("Elemento lawyers-table-body não encontrado em fetchLawyers!");
         return;
     }
-    if (!tableBody) {
-        console.warn(`Table body not found: ${tableBodyId}`);
-        return;
+    try {
+        const response = await fetch(`${API_BASE_URL}/lawyers/`, { headers: getAuthHeaders() });
+        if (response.status === 401) { logout(); return; }
+        if (!response.ok) throw new Error(`Erro HTTP: ${response.status}`);
+        const lawyers = await response.json();
+        // Não listar o admin user para gerenciamento
+        showManagementList('lawyers', lawyers.filter(lawyer => !(lawyer.oab === "00001SP" || lawyer.username === "admin")));
+    } catch (error) {
+        console.error('Falha ao buscar advogados:', error);
+        showManagementListMessage('lawyers', 'Erro ao carregar advogados.');
     }
-
-    searchInput.addEventListener('input', function() {
-        const searchTerm = this.value.toLowerCase();
-        const rows = tableBody.getElementsByTagName('tr');
-
-        for (let i = 0; i < rows.length; i++) {
-            const row = rows[i];
-            const rowText = row.textContent.toLowerCase();
-            if (rowText.includes(searchTerm)) {
-                row.classList.remove('d-none');
-            } else {
-                row.classList.add('d-none');
-            }
-        }
-    });
-
-    searchInput.addEventListener('keydown', function(event) {
-        if (event.key === 'Enter') {
-            event.preventDefault();
-            searchInput.blur();
-        }
-    });
 }
 
 // --- Lógica de Clique no Ícone de Busca ---
@@ -380,40 +388,36 @@ async function loadAreasOfExpertise() {
         areas.forEach(area => { const option = document.createElement('option'); option.value = area; option.textContent = area; clientAreaOfExpertiseSelect.appendChild(option); });
     } catch (error) { console.error('Falha ao buscar áreas de atuação:', error); clientAreaOfExpertiseSelect.innerHTML = '<option value="">Erro</option>'; }
 }
+function renderClientRow(tr, client) {
+    const escapedClientName = client.name.replace(/'/g, "&apos;").replace(/"/g, "&quot;");
+    const escapedArea = client.area_of_expertise.replace(/'/g, "&apos;").replace(/"/g, "&quot;");
+
+    // Coluna Nome/Razão Social
+    tr.insertCell().textContent = client.name;
+
+    // Coluna Área de Atuação
+    tr.insertCell().textContent = client.area_of_expertise;
+
+    // Coluna Ações
+    const cellActions = tr.insertCell();
+    cellActions.style.verticalAlign = "middle";
+    cellActions.innerHTML = `
+        <button class="btn btn-sm btn-outline-primary btn-edit-client" data-id="${client.id}" data-name="${escapedClientName}" data-area="${escapedArea}">Editar</button>
+        <button class="btn btn-sm btn-outline-danger btn-delete-client delete-btn ms-1" data-id="${client.id}">Excluir</button>`;
+}
 async function fetchClients() {
-    const clientsTableBody = document.getElementById('clients-table-body');
-    if (!getToken() || !clientsTableBody) {
-        if (!clientsTableBody) console.error("Elemento clients-table-body não encontrado!");
+    if (!getToken() || !managementLists.clients) {
+        if (!managementLists.clients) console.error("Elemento clients-table-body não encontrado!");
         return;
     }
     try {
         const response = await fetch(`${API_BASE_URL}/clients/`, { headers: getAuthHeaders() });
         if (response.status === 401) { logout(); return; }
         if (!response.ok) throw new Error(`Erro HTTP: ${response.status}`);
-        const clients = await response.json();
-        clientsTableBody.innerHTML = ''; // Limpar conteúdo anterior
-        clients.forEach(client => {
-            const escapedClientName = client.name.replace(/'/g, "&apos;").replace(/"/g, "&quot;");
-            const escapedArea = client.area_of_expertise.replace(/'/g, "&apos;").replace(/"/g, "&quot;");
-
-            const tr = clientsTableBody.insertRow();
-
-            // Coluna Nome/Razão Social
-            tr.insertCell().textContent = client.name;
-
-            // Coluna Área de Atuação
-            tr.insertCell().textContent = client.area_of_expertise;
-
-            // Coluna Ações
-            const cellActions = tr.insertCell();
-            cellActions.style.verticalAlign = "middle";
-            cellActions.innerHTML = `
-                <button class="btn btn-sm btn-outline-primary btn-edit-client" data-id="${client.id}" data-name="${escapedClientName}" data-area="${escapedArea}">Editar</button>
-                <button class="btn btn-sm btn-outline-danger btn-delete-client delete-btn ms-1" data-id="${client.id}">Excluir</button>`;
-        });
+        showManagementList('clients', await response.json());
     } catch (error) {
         console.error('Falha ao buscar clientes:', error);
-        if(clientsTableBody) clientsTableBody.innerHTML = '<tr><td colspan="3" class="text-center">Erro ao carregar clientes.</td></tr>';
+        showManagementListMessage('clients', 'Erro ao carregar clientes.');
     }
 }
 async function populateLawyerOptions() {
@@ -448,10 +452,56 @@ async function populateClientOptions() {
         return allClients;
     } catch (error) { console.error('Falha ao buscar clientes para select:', error); return []; }
 }
+// Nomes exibidos na lista de processos (montados em fetchProcesses) e processos marcados para exclusão:
+// a seleção fica aqui, e não nos checkboxes, porque as linhas fora da tela não existem no DOM.
+let processListLawyerMap = {};
+let processListClientMap = {};
+const selectedProcessIds = new Set();
+
+function renderProcessRow(tr, process) {
+    const escapedProcessNumber = process.process_number.replace(/'/g, "&apos;").replace(/"/g, "&quot;");
+    const escapedStatus = process.status.replace(/'/g, "&apos;").replace(/"/g, "&quot;");
+    const escapedActionType = (process.action_type || '').replace(/'/g, "&apos;").replace(/"/g, "&quot;");
+
+    // Coluna Sel. (Checkbox)
+    const cellCheckbox = tr.insertCell();
+    cellCheckbox.innerHTML = `<input type="checkbox" class="process-checkbox" data-id="${process.id}" style="vertical-align: middle;"${selectedProcessIds.has(process.id) ? ' checked' : ''}>`;
+    cellCheckbox.style.textAlign = "center";
+
+
+    // Coluna Nº Processo
+    tr.insertCell().textContent = process.process_number;
+    // Coluna Advogado
+    tr.insertCell().textContent = processListLawyerMap[process.lawyer_id] || 'N/A';
+    // Coluna Cliente
+    tr.insertCell().textContent = processListClientMap[process.client_id] || 'N/A';
+    // Coluna Status
+    tr.insertCell().textContent = process.status;
+    // Coluna Prazo Fatal
+    tr.insertCell().textContent = formatDate(process.fatal_deadline);
+    // Coluna Tipo Ação
+    tr.insertCell().textContent = process.action_type || 'N/A';
+
+    // Coluna Ações
+    const cellActions = tr.insertCell();
+    cellActions.style.verticalAlign = "middle";
+    cellActions.innerHTML = `
+        <button class="btn btn-sm btn-outline-primary btn-edit-process"
+                data-id="${process.id}"
+                data-number="${escapedProcessNumber}"
+                data-lawyerid="${process.lawyer_id}"
+                data-clientid="${process.client_id}"
+                data-entrydate="${process.entry_date}"
+                data-deliverydeadline="${process.delivery_deadline}"
+                data-fataldeadline="${process.fatal_deadline}"
+                data-status="${escapedStatus}"
+                data-actiontype="${escapedActionType}"
+                data-completiondate="${process.data_conclusao_real || ''}">Editar</button>
+        <button class="btn btn-sm btn-outline-danger btn-delete-process delete-btn ms-1" data-id="${process.id}">Excluir</button>`;
+}
 async function fetchProcesses() {
-    const processesTableBody = document.getElementById('processes-table-body');
-    if (!getToken() || !processesTableBody) {
-        if(!processesTableBody) console.error("Elemento processes-table-body não encontrado!");
+    if (!getToken() || !managementLists.processes) {
+        if (!managementLists.processes) console.error("Elemento processes-table-body não encontrado!");
         return;
     }
     try {
@@ -459,60 +509,21 @@ async function fetchProcesses() {
         if (response.status === 401) { logout(); return; }
         if (!response.ok) throw new Error(`Erro HTTP: ${response.status}`);
         const processes = await response.json();
-        processesTableBody.innerHTML = ''; // Limpar conteúdo anterior
 
         // Certifique-se que allLawyers e allClients estão populados.
         // Idealmente, fetchLawyers e fetchClients deveriam ser chamados antes e garantir que allLawyers/allClients são preenchidos.
         // Para este exemplo, assumimos que já foram preenchidos e são arrays.
-        const lawyerMap = Array.isArray(allLawyers) ? allLawyers.reduce((map, lawyer) => { map[lawyer.id] = lawyer.name; return map; }, {}) : {};
-        const clientMap = Array.isArray(allClients) ? allClients.reduce((map, client) => { map[client.id] = client.name; return map; }, {}) : {};
-
-        processes.forEach(process => {
-            const escapedProcessNumber = process.process_number.replace(/'/g, "&apos;").replace(/"/g, "&quot;");
-            const escapedStatus = process.status.replace(/'/g, "&apos;").replace(/"/g, "&quot;");
-            const escapedActionType = (process.action_type || '').replace(/'/g, "&apos;").replace(/"/g, "&quot;");
-
-            const tr = processesTableBody.insertRow();
-
-            // Coluna Sel. (Checkbox)
-            const cellCheckbox = tr.insertCell();
-            cellCheckbox.innerHTML = `<input type="checkbox" class="process-checkbox" data-id="${process.id}" style="vertical-align: middle;">`;
-            cellCheckbox.style.textAlign = "center";
-
-
-            // Coluna Nº Processo
-            tr.insertCell().textContent = process.process_number;
-            // Coluna Advogado
-            tr.insertCell().textContent = lawyerMap[process.lawyer_id] || 'N/A';
-            // Coluna Cliente
-            tr.insertCell().textContent = clientMap[process.client_id] || 'N/A';
-            // Coluna Status
-            tr.insertCell().textContent = process.status;
-            // Coluna Prazo Fatal
-            tr.insertCell().textContent = formatDate(process.fatal_deadline);
-            // Coluna Tipo Ação
-            tr.insertCell().textContent = process.action_type || 'N/A';
-
-            // Coluna Ações
-            const cellActions = tr.insertCell();
-            cellActions.style.verticalAlign = "middle";
-            cellActions.innerHTML = `
-                <button class="btn btn-sm btn-outline-primary btn-edit-process"
-                        data-id="${process.id}"
-                        data-number="${escapedProcessNumber}"
-                        data-lawyerid="${process.lawyer_id}"
-                        data-clientid="${process.client_id}"
-                        data-entrydate="${process.entry_date}"
-                        data-deliverydeadline="${process.delivery_deadline}"
-                        data-fataldeadline="${process.fatal_deadline}"
-                        data-status="${escapedStatus}"
-                        data-actiontype="${escapedActionType}"
-                        data-completiondate="${process.data_conclusao_real || ''}">Editar</button>
-                <button class="btn btn-sm btn-outline-danger btn-delete-process delete-btn ms-1" data-id="${process.id}">Excluir</button>`;
-        });
+        processListLawyerMap = Array.isArray(allLawyers) ? allLawyers.reduce((map, lawyer) => { map[lawyer.id] = lawyer.name; return map; }, {}) : {};
+        processListClientMap = Array.isArray(allClients) ? allClients.reduce((map, client) => { map[client.id] = client.name; return map; }, {}) : {};
+
+        // Processos que deixaram de existir saem da seleção.
+        const currentIds = new Set(processes.map(process => process.id));
+        selectedProcessIds.forEach(id => { if (!currentIds.has(id)) selectedProcessIds.delete(id); });
+
+        showManagementList('processes', processes);
     } catch (error) {
         console.error('Falha ao buscar processos:', error);
-        if(processesTableBody) processesTableBody.innerHTML = '<tr><td colspan="8" class="text-center">Erro ao carregar processos.</td></tr>'; // colspan=8 (7 colunas + checkbox)
+        showManagementListMessage('processes', 'Erro ao carregar processos.');
     }
 }
 
@@ -563,7 +574,7 @@ document.addEventListener('DOMContentLoaded', async () => {
                         throw new Error(`Login failed: ${detailError}`);
                     }
                     const data = await response.json();
-                    saveToken(data.access_token);
+                    saveSessionTokens(data); // Token de acesso e refresh token (auth_session.js)
                     window.location.href = 'dashboard.html';
                 } catch (error) {
                     console.error('Erro no login:', error);
@@ -580,6 +591,7 @@ document.addEventListener('DOMContentLoaded', async () => {
         if(logoutButtonEl) {
             logoutButtonEl.addEventListener('click', () => { if (confirm("Tem certeza que deseja sair?")) logout(); });
         }
+        initializeManagementLists(); // Antes das primeiras buscas (fetchAndSetCurrentUser_forIndexPage)
         const authSuccess = await fetchAndSetCurrentUser_forIndexPage();
         if (!authSuccess) return;
 
@@ -766,7 +778,7 @@ document.addEventListener('DOMContentLoaded', async () => {
                     delivery_deadline: parseDisplayDate(document.getElementById('process-delivery-deadline').value.trim()),
                     fatal_deadline: parseDisplayDate(document.getElementById('process-fatal-deadline').value.trim()),
                     data_conclusao_real: parseDisplayDate(document.getElementById('process-completion-date').value.trim()) || null,
-                    status: document.getElementById('process-status').value.trim(),
+                    status: document.getElementById('process-status').value || null,
                     action_type: document.getElementById('process-action-type').value.trim() || null,
                 };
 
@@ -814,7 +826,14 @@ document.addEventListener('DOMContentLoaded', async () => {
                 } else if (target && target.classList.contains('btn-delete-process')) {
                     deleteProcess(target.dataset.id);
                 }
-                // O clique no checkbox é tratado separadamente se necessário, ou não precisa de handler aqui.
+                // O clique no checkbox é tratado no listener de 'change' abaixo.
+            });
+            processesTableBodyEl.addEventListener('change', (event) => {
+                const checkbox = event.target;
+                if (!checkbox.classList.contains('process-checkbox')) return;
+                const processId = parseInt(checkbox.dataset.id, 10);
+                if (checkbox.checked) selectedProcessIds.add(processId);
+                else selectedProcessIds.delete(processId);
             });
         }
         const cancelProcessUpdateBtnEl = document.getElementById('cancel-process-update');
@@ -832,10 +851,7 @@ document.addEventListener('DOMContentLoaded', async () => {
         }
 
 
-        // Lógica de Busca em Tabelas
-        setupTableSearchIndex('search-lawyers', 'lawyers-table-body');
-        setupTableSearchIndex('search-clients', 'clients-table-body');
-        setupTableSearchIndex('search-processes', 'processes-table-body');
+        // Lógica de Busca em Tabelas (os campos de busca são ligados em initializeManagementLists)
         setupSearchIconClick('search-lawyers-icon', 'search-lawyers');
         setupSearchIconClick('search-clients-icon', 'search-clients');
         setupSearchIconClick('search-processes-icon', 'search-processes');
@@ -881,20 +897,19 @@ async function deleteProcess(id) {
     } catch (error) { console.error('Falha ao excluir processo:', error); alert(`Erro: ${error.message}`); }
 }
 async function handleDeleteSelectedProcesses() {
-    /* ... (lógica existente) ... */
-    const selectedCheckboxes = document.querySelectorAll('#processes-list .process-checkbox:checked');
-    if (selectedCheckboxes.length === 0) { alert('Nenhum processo selecionado.'); return; }
-    const processIdsToDelete = Array.from(selectedCheckboxes).map(cb => cb.dataset.id);
+    if (selectedProcessIds.size === 0) { alert('Nenhum processo selecionado.'); return; }
+    const processIdsToDelete = Array.from(selectedProcessIds);
     if (!confirm(`Excluir ${processIdsToDelete.length} processo(s)?`)) return;
-    // ... (restante da lógica de Promise.allSettled e feedback)
-    let successCount = 0;
-    for (const id of processIdsToDelete) {
-        try {
-            const response = await fetch(`${API_BASE_URL}/processes/${id}`, { method: 'DELETE', headers: getAuthHeaders()});
-            if(response.ok) successCount++;
-            else console.error(`Falha ao excluir processo ${id}: ${response.statusText}`);
-        } catch (e) { console.error(`Erro ao excluir processo ${id}:`, e); }
-    }
-    alert(`${successCount} processo(s) excluído(s). Falhas (se houver) registradas no console.`);
+    // Uma única requisição /batch para todas as exclusões, em vez de um DELETE por processo.
+    const operations = processIdsToDelete.map(id => ({ entity: 'process', action: 'delete', id }));
+    try {
+        const response = await fetch(`${API_BASE_URL}/batch`, { method: 'POST', headers: getAuthHeaders(), body: JSON.stringify({ operations }) });
+        if (response.status === 401) { alert("Sessão expirada."); logout(); return; }
+        if (!response.ok) { const errorData = await response.json(); throw new Error(`HTTP error ${response.status}: ${errorData.detail || 'Erro desconhecido'}`); }
+        const batchResult = await response.json();
+        const failures = batchResult.results.filter(r => r.status_code >= 400);
+        failures.forEach(r => console.error(`Falha ao excluir processo ${r.id}: ${r.detail}`));
+        alert(`${batchResult.results.length - failures.length} processo(s) excluído(s). Falhas (se houver) registradas no console.`);
+    } catch (error) { console.error('Falha ao excluir processos em lote:', error); alert(`Erro: ${error.message}`); }
     fetchProcesses();
 }
@@ -0,0 +1,65 @@
+// Web Worker de busca das listas (TableSearch em virtual_table.js).
+// Guarda o texto pesquisável de cada item, normalizado (minúsculas, sem acentos), e um índice de
+// trigramas: para termos com 3 ou mais caracteres, só os itens da menor lista de posições entre os
+// trigramas do termo são conferidos. Devolve as posições dos itens encontrados, em ordem.
+
+let texts = [];
+let trigramIndex = new Map(); // trigrama -> Int32Array com as posições dos itens que o contêm
+let indexedGeneration = 0;
+
+function normalize(text) {
+    return text.normalize('NFD').replace(/[\u0300-\u036f]/g, '').toLowerCase();
+}
+
+function buildIndex(sourceTexts) {
+    texts = sourceTexts.map(normalize);
+    const lists = new Map();
+    texts.forEach((text, position) => {
+        const seen = new Set();
+        for (let i = 0; i + 3 <= text.length; i++) {
+            const trigram = text.substring(i, i + 3);
+            if (seen.has(trigram)) continue;
+            seen.add(trigram);
+            let list = lists.get(trigram);
+            if (!list) {
+                list = [];
+                lists.set(trigram, list);
+            }
+            list.push(position);
+        }
+    });
+    trigramIndex = new Map();
+    lists.forEach((list, trigram) => trigramIndex.set(trigram, Int32Array.from(list)));
+}
+
+function search(query) {
+    const term = normalize(query.trim());
+    let candidates = null;
+    for (let i = 0; i + 3 <= term.length; i++) {
+        const list = trigramIndex.get(term.substring(i, i + 3));
+        if (!list) return new Int32Array(0);
+        if (!candidates || list.length < candidates.length) candidates = list;
+    }
+    const matches = [];
+    if (candidates) {
+        for (const position of candidates) {
+            if (texts[position].includes(term)) matches.push(position);
+        }
+    } else { // Termo curto: confere todos os itens
+        for (let position = 0; position < texts.length; position++) {
+            if (texts[position].includes(term)) matches.push(position);
+        }
+    }
+    return Int32Array.from(matches);
+}
+
+self.onmessage = (event) => {
+    const message = event.data;
+    if (message.type === 'index') {
+        buildIndex(message.texts);
+        indexedGeneration = message.generation;
+    } else if (message.type === 'search') {
+        const positions = search(message.query);
+        self.postMessage({ type: 'result', requestId: message.requestId, generation: indexedGeneration, positions }, [positions.buffer]);
+    }
+};
@@ -4,7 +4,7 @@ let currentUserForSettingsPage = null;
 
 // Funções de token e headers
 function userSettingsGetToken() { return localStorage.getItem('authToken'); }
-function userSettingsRemoveToken() { localStorage.removeItem('authToken'); }
+function userSettingsRemoveToken() { clearSessionTokens(); } // auth_session.js
 function userSettingsGetAuthHeaders(isFormData = false) {
     const token = userSettingsGetToken();
     const headers = {};
@@ -13,7 +13,7 @@ function userSettingsGetAuthHeaders(isFormData = false) {
     return headers;
 }
 function userSettingsLogout() {
-    userSettingsRemoveToken();
+    endSession(); // Revoga o refresh token e apaga os tokens (auth_session.js)
     currentUserForSettingsPage = null;
     window.location.href = 'login.html';
 }
@@ -292,7 +292,7 @@ async function handleUpdatePassword(event) {
             newPasswordEl.value = '';
             confirmPasswordEl.value = '';
             setTimeout(() => {
-                adminSettingsLogout(); // Força logout e redireciona para login
+                userSettingsLogout(); // Força logout e redireciona para login
             }, 3000);
         } else {
             console.error("[AdminSettings] Erro ao atualizar senha:", responseData);
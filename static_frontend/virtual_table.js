@@ -0,0 +1,198 @@
+// Componentes de lista compartilhados por dashboard.js e script.js:
+//  * VirtualTable: renderiza apenas as linhas visíveis (mais uma margem) de uma tabela com rolagem;
+//    o restante é representado por linhas espaçadoras com a altura correspondente. O número de
+//    elementos no DOM não depende do tamanho da lista.
+//  * TableSearch: busca por texto nos itens da lista em um Web Worker (search_worker.js), que mantém
+//    um índice pré-montado e devolve as posições dos itens encontrados, sem travar a página.
+
+// URL do worker relativa a este arquivo (também funciona com o nome versionado pelo hash).
+const SEARCH_WORKER_URL = new URL('search_worker.js', document.currentScript ? document.currentScript.src : window.location.href).href;
+
+class VirtualTable {
+    // container: elemento com rolagem (ex.: div.table-responsive); tbody: corpo da tabela;
+    // renderRow(tr, item): preenche as células da linha de um item.
+    constructor({ container, tbody, columnCount, renderRow, emptyMessage = 'Nenhum item encontrado.', rowHeight = 41, overscan = 8 }) {
+        this.container = container;
+        this.tbody = tbody;
+        this.columnCount = columnCount;
+        this.renderRow = renderRow;
+        this.emptyMessage = emptyMessage;
+        this.rowHeight = rowHeight; // Estimativa inicial; ajustada pela altura média das linhas renderizadas
+        this.overscan = overscan;
+        this.items = [];
+        this.start = -1;
+        this.end = -1;
+        this.framePending = false;
+
+        this.container.addEventListener('scroll', () => this.scheduleRender(), { passive: true });
+        window.addEventListener('resize', () => this.scheduleRender(true));
+    }
+
+    setItems(items) {
+        this.items = items;
+        this.container.scrollTop = Math.min(this.container.scrollTop, items.length * this.rowHeight);
+        if (items.length === 0) {
+            this.setMessage(this.emptyMessage);
+            return;
+        }
+        this.render(true);
+    }
+
+    // Mensagem no lugar das linhas (carregando, erro, lista vazia).
+    setMessage(text) {
+        this.items = [];
+        this.start = this.end = -1;
+        const row = document.createElement('tr');
+        const cell = row.insertCell();
+        cell.colSpan = this.columnCount;
+        cell.className = 'text-center';
+        cell.textContent = text;
+        this.tbody.replaceChildren(row);
+    }
+
+    scheduleRender(force = false) {
+        this.forceNextRender = this.forceNextRender || force;
+        if (this.framePending) return;
+        this.framePending = true;
+        requestAnimationFrame(() => {
+            this.framePending = false;
+            const forceRender = this.forceNextRender;
+            this.forceNextRender = false;
+            if (this.items.length) this.render(forceRender);
+        });
+    }
+
+    render(force = false) {
+        const total = this.items.length;
+        // Distância entre o topo da área rolável e o início do tbody (cabeçalho, margens).
+        const tbodyOffset = this.tbody.getBoundingClientRect().top - this.container.getBoundingClientRect().top + this.container.scrollTop;
+        const viewportHeight = Math.max(this.container.clientHeight, window.innerHeight);
+        const firstVisible = Math.floor(Math.max(0, this.container.scrollTop - tbodyOffset) / this.rowHeight);
+        const start = Math.min(Math.max(0, firstVisible - this.overscan), Math.max(0, total - 1));
+        const end = Math.min(total, firstVisible + Math.ceil(viewportHeight / this.rowHeight) + this.overscan);
+        if (!force && start === this.start && end === this.end) return;
+        this.start = start;
+        this.end = end;
+
+        const fragment = document.createDocumentFragment();
+        // O zebrado do Bootstrap (nth-of-type) conta as linhas espaçadoras: com uma linha extra, de
+        // altura zero, quando necessário, cada item mantém a cor da sua posição na lista completa.
+        if (start > 0) {
+            fragment.appendChild(this.spacerRow(start * this.rowHeight));
+            if (start % 2 === 0) fragment.appendChild(this.spacerRow(0));
+        }
+        const rows = [];
+        for (let index = start; index < end; index++) {
+            const row = document.createElement('tr');
+            this.renderRow(row, this.items[index], index);
+            rows.push(row);
+            fragment.appendChild(row);
+        }
+        if (end < total) fragment.appendChild(this.spacerRow((total - end) * this.rowHeight));
+        this.tbody.replaceChildren(fragment);
+
+        // Linhas com altura diferente da estimada: ajusta e renderiza de novo no próximo quadro.
+        const measured = rows.reduce((sum, row) => sum + row.offsetHeight, 0) / rows.length;
+        if (measured > 0 && Math.abs(measured - this.rowHeight) > 1) {
+            this.rowHeight = measured;
+            this.scheduleRender(true);
+        }
+    }
+
+    spacerRow(height) {
+        const row = document.createElement('tr');
+        row.className = 'virtual-table-spacer';
+        row.setAttribute('aria-hidden', 'true');
+        const cell = row.insertCell();
+        cell.colSpan = this.columnCount;
+        cell.style.height = `${height}px`;
+        return row;
+    }
+}
+
+class TableSearch {
+    // textOf(item): texto pesquisável de um item (os valores exibidos nas colunas).
+    constructor(textOf) {
+        this.textOf = textOf;
+        this.items = [];
+        this.generation = 0;
+        this.requestId = 0;
+        this.pending = null;
+        this.worker = null;
+        try {
+            this.worker = new Worker(SEARCH_WORKER_URL);
+            this.worker.onmessage = (event) => this.handleResult(event.data);
+            this.worker.onerror = (error) => {
+                console.error('Erro no worker de busca; a busca passa a ser feita na página.', error);
+                this.worker = null;
+                this.texts = this.items.map(item => TableSearch.normalize(this.textOf(item)));
+                if (this.pending) this.pending.resolve(null);
+            };
+        } catch (error) {
+            console.warn('Web Worker indisponível; a busca será feita na página.', error);
+        }
+    }
+
+    static normalize(text) {
+        return text.normalize('NFD').replace(/[\u0300-\u036f]/g, '').toLowerCase();
+    }
+
+    // Troca a lista pesquisada; o índice é montado no worker.
+    setItems(items) {
+        this.items = items;
+        this.generation++;
+        const texts = items.map(this.textOf);
+        if (this.worker) {
+            this.worker.postMessage({ type: 'index', generation: this.generation, texts });
+        } else {
+            this.texts = texts.map(TableSearch.normalize);
+        }
+    }
+
+    // Itens que contêm o termo. Resolve com null quando uma busca mais recente a substituiu.
+    search(query) {
+        if (this.pending) this.pending.resolve(null);
+        this.pending = null;
+        if (!query.trim()) return Promise.resolve(this.items);
+        if (!this.worker) {
+            const term = TableSearch.normalize(query.trim());
+            return Promise.resolve(this.items.filter((item, position) => this.texts[position].includes(term)));
+        }
+        const requestId = ++this.requestId;
+        return new Promise(resolve => {
+            this.pending = { requestId, resolve };
+            this.worker.postMessage({ type: 'search', requestId, generation: this.generation, query });
+        });
+    }
+
+    handleResult(message) {
+        if (message.type !== 'result' || !this.pending || message.requestId !== this.pending.requestId) return;
+        const { resolve } = this.pending;
+        this.pending = null;
+        if (message.generation !== this.generation) {
+            resolve(null);
+            return;
+        }
+        const matches = new Array(message.positions.length);
+        for (let i = 0; i < message.positions.length; i++) {
+            matches[i] = this.items[message.positions[i]];
+        }
+        resolve(matches);
+    }
+}
+
+// Liga um campo de busca a uma VirtualTable: a cada digitação, a tabela mostra os itens encontrados.
+function bindTableSearch(inputElement, tableSearch, virtualTable) {
+    inputElement.addEventListener('input', () => {
+        virtualTable.container.scrollTop = 0; // Resultados de uma nova busca começam do topo
+        tableSearch.search(inputElement.value).then(matches => {
+            if (matches) virtualTable.setItems(matches);
+        });
+    });
+    inputElement.addEventListener('keydown', function(event) {
+        if (event.key === 'Enter') {
+            event.preventDefault();
+            inputElement.blur();
+        }
+    });
+}
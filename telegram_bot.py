@@ -1,11 +1,14 @@
 import os
+import json
 import logging
 import asyncio
-from typing import Optional
+import time
+from typing import Optional, Tuple
 
 import telegram # type: ignore
 from telegram import Update
 from telegram.ext import Application, ApplicationBuilder, ContextTypes, CommandHandler
+from telegram.request import BaseRequest, RequestData
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -27,11 +30,56 @@ except ValueError:
     logger.error(f"Invalid TELEGRAM_ADVANCE_NOTIFICATION_DAYS: '{TELEGRAM_ADVANCE_NOTIFICATION_DAYS_STR}'. Must be an integer. Using default 5.")
     TELEGRAM_ADVANCE_NOTIFICATION_DAYS = 5
 
-def create_telegram_application() -> Optional[Application]:
+# Modo de recebimento de updates (polling/webhook), definido em core/config.py.
+from core.config import TELEGRAM_UPDATE_MODE, TELEGRAM_WEBHOOK_URL, TELEGRAM_WEBHOOK_SECRET # noqa: F401
+
+# Token usado pelo bot offline quando TELEGRAM_BOT_TOKEN não está definido (nunca chega ao Telegram).
+OFFLINE_BOT_TOKEN = "000000:offline"
+
+
+class OfflineTelegramRequest(BaseRequest):
+    """
+    Transporte do bot que não acessa a rede (TELEGRAM_WEBHOOK_OFFLINE). getMe devolve um bot fictício,
+    sendMessage devolve a mensagem "enviada" e as demais chamadas retornam sucesso; todas são
+    registradas no log, para conferir as respostas dos handlers em testes locais.
+    """
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_request(self, url: str, method: str, request_data: Optional[RequestData] = None,
+                         read_timeout=BaseRequest.DEFAULT_NONE, write_timeout=BaseRequest.DEFAULT_NONE,
+                         connect_timeout=BaseRequest.DEFAULT_NONE, pool_timeout=BaseRequest.DEFAULT_NONE) -> Tuple[int, bytes]:
+        endpoint = url.rsplit("/", 1)[-1]
+        parameters = request_data.parameters if request_data else {}
+        if endpoint == "getMe":
+            result = {"id": 0, "is_bot": True, "first_name": "Offline", "username": "offline_bot"}
+        elif endpoint == "sendMessage":
+            logger.info(f"[offline] sendMessage to chat_id {parameters.get('chat_id')}: {parameters.get('text')}")
+            result = {
+                "message_id": 0, "date": int(time.time()), "text": parameters.get("text"),
+                "chat": {"id": parameters.get("chat_id"), "type": "private"},
+            }
+        else:
+            logger.info(f"[offline] {endpoint}: {parameters}")
+            result = True
+        return 200, json.dumps({"ok": True, "result": result}).encode("utf-8")
+
+
+def create_telegram_application(offline: bool = False) -> Optional[Application]:
     """
     Creates and initializes the Telegram Application using ApplicationBuilder.
     Returns the Application instance or None if the token is missing or invalid.
+    With offline=True, the bot uses OfflineTelegramRequest and never reaches Telegram.
     """
+    if offline:
+        logger.warning("Telegram application created in offline mode: bot calls are logged, not sent.")
+        return ApplicationBuilder().token(TELEGRAM_BOT_TOKEN or OFFLINE_BOT_TOKEN) \
+            .request(OfflineTelegramRequest()).get_updates_request(OfflineTelegramRequest()).build()
+
     if not TELEGRAM_BOT_TOKEN:
         logger.critical("TELEGRAM_BOT_TOKEN not found in environment variables. Cannot create Telegram application.")
         return None
@@ -83,14 +131,13 @@ async def send_telegram_message(bot: telegram.Bot, chat_id: str, text: str) -> b
         logger.error(f"An unexpected error occurred while sending message to chat_id {chat_id}: {e}", exc_info=True)
         return False
 
-# Placeholder for the start command handler - will be implemented in a later step
 async def start_command_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handles the /start command."""
     if update.effective_chat:
         await update.effective_chat.send_message(
             "Olá! Eu sou seu bot de assistência jurídica. Aqui estão os comandos que você pode usar:\n"
             "/help - Mostra esta mensagem de ajuda.\n"
-            "/my_deadlines - (Em breve) Mostra seus próximos prazos."
+            "/my_deadlines - Mostra seus próximos prazos."
         )
         logger.info(f"/start command received from chat_id {update.effective_chat.id}")
     else:
@@ -103,12 +150,46 @@ async def help_command_handler(update: Update, context: ContextTypes.DEFAULT_TYP
             "Olá! Eu sou seu bot de assistência jurídica. Aqui estão os comandos que você pode usar:\n"
             "/start - Inicia a conversa com o bot e mostra esta mensagem.\n"
             "/help - Mostra esta mensagem de ajuda.\n"
-            "/my_deadlines - (Em breve) Mostra seus próximos prazos."
+            "/my_deadlines - Mostra seus próximos prazos."
         )
         logger.info(f"/help command received from chat_id {update.effective_chat.id}")
     else:
         logger.warning("/help command received but no effective_chat found in update.")
 
+async def my_deadlines_command_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handles the /my_deadlines command: lists the upcoming deadlines of the lawyer linked to this chat."""
+    from core.lawyer_deadlines import get_lawyer_for_chat, get_upcoming_deadlines, format_deadlines_message
+
+    chat = update.effective_chat
+    if not chat:
+        logger.warning("/my_deadlines command received but no effective_chat found in update.")
+        return
+    username = update.effective_user.username if update.effective_user else None
+    try:
+        lawyer = await get_lawyer_for_chat(chat.id, username)
+        if lawyer is None:
+            await chat.send_message(
+                "Não encontrei um advogado cadastrado com este Telegram. "
+                f"Peça para cadastrar o ID {chat.id} (ou seu @usuário) no campo Telegram do seu perfil."
+            )
+            return
+        lawyer_id, lawyer_name = lawyer
+        deadlines = await get_upcoming_deadlines(lawyer_id)
+        await chat.send_message(format_deadlines_message(lawyer_name, deadlines))
+        logger.info(f"/my_deadlines command received from chat_id {chat.id} (lawyer {lawyer_id}, {len(deadlines)} deadlines)")
+    except Exception as e:
+        logger.error(f"Error handling /my_deadlines for chat_id {chat.id}: {e}", exc_info=True)
+        await chat.send_message("Não foi possível consultar seus prazos agora. Tente novamente em instantes.")
+
+
+def register_command_handlers(application: Application) -> None:
+    """Registers the bot command handlers (shared by polling in the worker and webhook mode in the API)."""
+    application.add_handler(CommandHandler("start", start_command_handler))
+    application.add_handler(CommandHandler("help", help_command_handler))
+    # block=False: the lookup awaits the database (in a thread), so the dispatcher keeps
+    # handling other chats' updates meanwhile instead of waiting for this one.
+    application.add_handler(CommandHandler("my_deadlines", my_deadlines_command_handler, block=False))
+
 
 # The main_test function is removed as its previous logic for initializing and
 # testing the bot instance directly is no longer applicable with ApplicationBuilder.
@@ -124,7 +205,7 @@ async def main_bot_runner(): # Renamed from main_test and repurposed
 
     if application:
         # Add command handlers
-        application.add_handler(CommandHandler("start", start_command_handler))
+        register_command_handlers(application)
         # Add other handlers (MessageHandler, etc.) here as needed
 
         logger.info("Starting bot polling...")
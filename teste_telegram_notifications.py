@@ -9,7 +9,8 @@ load_dotenv()
 
 import asyncio # Import asyncio
 # Importações do projeto
-from database import SessionLocal, engine, Base
+from database import SessionLocal, engine
+from migrations import upgrade
 from models.lawyer import LawyerDB
 from models.client import ClientDB, AreaOfExpertiseEnum
 from models.legal_process import LegalProcessDB
@@ -227,8 +228,8 @@ if __name__ == "__main__":
     if not verify_env_vars():
         exit(1) # Sai se o token do bot não estiver configurado
 
-    # Garante que as tabelas existam
-    Base.metadata.create_all(bind=engine)
+    # Garante que as tabelas existam (aplica as migrações pendentes)
+    upgrade(engine)
 
     db = None # Inicializa db
     try:
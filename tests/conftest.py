@@ -0,0 +1,105 @@
+"""
+Configuração comum dos testes: um banco SQLite temporário, migrado até a revisão mais recente,
+uma sessão por teste (`db`) e um cliente da API autenticado como admin (`client`, `admin_headers`).
+
+DATABASE_URL precisa estar definida antes do primeiro import de `database`; processos filhos
+(testes com vários workers) herdam a variável e usam o mesmo arquivo.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.TemporaryDirectory(prefix="tests_db_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir.name}/test.db"
+os.environ.pop("TELEGRAM_BOT_TOKEN", None)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_database():
+    from database import engine
+    from migrations import upgrade
+
+    upgrade(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(migrated_database):
+    import models.data_version # noqa: F401 Registra todos os modelos de processos (relationships) e os listeners de versão
+    from database import SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.rollback()
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def client(migrated_database):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    response = client.post("/auth/token", data={"username": "admin", "password": "admin"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def make_lawyer(db):
+    """Cria (e grava) um advogado com OAB, e-mail e username únicos."""
+    from uuid import uuid4
+
+    from models.lawyer import LawyerDB
+
+    def make(**values):
+        suffix = uuid4().hex[:8]
+        values = {"name": f"Advogado {suffix}", "oab": f"T{suffix}", "email": f"{suffix}@example.com",
+                  "username": f"user_{suffix}", "hashed_password": "-", **values}
+        lawyer = LawyerDB(**values)
+        db.add(lawyer)
+        db.commit()
+        return lawyer
+
+    return make
+
+
+@pytest.fixture
+def lawyer_and_client(db, make_lawyer):
+    """Advogado e cliente novos (já gravados), para os processos criados no teste."""
+    from models.client import AreaOfExpertiseEnum, ClientDB
+
+    client = ClientDB(name="Cliente de teste", area_of_expertise=AreaOfExpertiseEnum.CONTRATOS)
+    db.add(client)
+    db.commit()
+    return make_lawyer(), client
+
+
+@pytest.fixture
+def make_process(db):
+    """Cria (e grava) um processo com número único; prazos padrão em 2025."""
+    from datetime import date
+    from uuid import uuid4
+
+    from models.legal_process import LegalProcessDB
+
+    def make(lawyer, client, **values):
+        values = {"process_number": f"T-{uuid4().hex[:10]}", "entry_date": date(2025, 1, 1),
+                  "delivery_deadline": date(2025, 2, 1), "fatal_deadline": date(2025, 2, 5), "status": "ativo", **values}
+        process = LegalProcessDB(lawyer_id=lawyer.id, client_id=client.id, **values)
+        db.add(process)
+        db.commit()
+        return process
+
+    return make
@@ -0,0 +1,74 @@
+"""
+Arquivamento de processos concluídos (core/archive.py): processos movidos para
+legal_processes_archive mantêm o id, que nunca é reutilizado, e o número continua único nas duas
+tabelas (API e /batch).
+"""
+from datetime import date
+from types import SimpleNamespace
+
+from sqlalchemy import func, text
+
+from core.archive import archive_concluded_processes
+from models.legal_process import LegalProcessDB
+from models.legal_process_archive import LegalProcessArchiveDB
+
+
+def _archive_newest(db, lawyer, customer, make_process):
+    """Conclui e arquiva o processo de maior id da tabela principal."""
+    process = make_process(lawyer, customer, status="concluído", data_conclusao_real=date(2020, 1, 1))
+    archived = SimpleNamespace(id=process.id, process_number=process.process_number)
+    db.expunge(process)
+    assert archive_concluded_processes(db) >= 1
+    assert db.get(LegalProcessArchiveDB, archived.id) is not None
+    assert db.get(LegalProcessDB, archived.id) is None
+    return archived
+
+
+def test_archived_id_is_never_reused(db, lawyer_and_client, make_process):
+    lawyer, customer = lawyer_and_client
+    archived = _archive_newest(db, lawyer, customer, make_process)
+
+    created = make_process(lawyer, customer)
+    assert created.id > archived.id
+    duplicated = db.execute(text("SELECT id FROM legal_processes_all GROUP BY id HAVING COUNT(*) > 1")).all()
+    assert duplicated == []
+
+
+def test_recent_or_open_processes_stay(db, lawyer_and_client, make_process):
+    lawyer, customer = lawyer_and_client
+    recent = make_process(lawyer, customer, status="concluído", data_conclusao_real=date.today())
+    active = make_process(lawyer, customer, data_conclusao_real=date(2020, 1, 1))
+    archive_concluded_processes(db)
+    assert db.get(LegalProcessDB, recent.id) is not None
+    assert db.get(LegalProcessDB, active.id) is not None
+
+
+def test_archived_number_stays_unique(client, admin_headers, db, lawyer_and_client, make_process):
+    lawyer, customer = lawyer_and_client
+    archived = _archive_newest(db, lawyer, customer, make_process)
+    other = make_process(lawyer, customer)
+    payload = {"process_number": archived.process_number, "lawyer_id": lawyer.id, "client_id": customer.id,
+               "entry_date": "2025-01-01", "delivery_deadline": "2025-02-01", "fatal_deadline": "2025-02-05"}
+
+    assert client.post("/processes/", headers=admin_headers, json=payload).status_code == 400
+    assert client.put(f"/processes/{other.id}", headers=admin_headers, json=payload).status_code == 400
+    response = client.post("/batch", headers=admin_headers, json={"operations": [
+        {"entity": "process", "action": "create", "data": payload},
+        {"entity": "process", "action": "update", "id": other.id, "data": {"process_number": archived.process_number}},
+    ]})
+    assert [result["status_code"] for result in response.json()["results"]] == [400, 400]
+    db.expire_all()
+    assert db.query(func.count(LegalProcessDB.id)).filter(LegalProcessDB.process_number == archived.process_number).scalar() == 0
+
+
+def test_archived_process_is_still_readable(client, admin_headers, db, lawyer_and_client, make_process):
+    lawyer, customer = lawyer_and_client
+    archived = _archive_newest(db, lawyer, customer, make_process)
+
+    response = client.get(f"/processes/{archived.id}", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["process_number"] == archived.process_number
+    listed = client.get("/processes/", headers=admin_headers, params={"lawyer_id": lawyer.id}).json()
+    assert archived.id not in [process["id"] for process in listed]
+    listed = client.get("/processes/", headers=admin_headers, params={"lawyer_id": lawyer.id, "include_archived": "true"}).json()
+    assert archived.id in [process["id"] for process in listed]
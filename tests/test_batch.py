@@ -0,0 +1,99 @@
+"""
+POST /batch (routers/batch.py): resultado por operação no modo parcial e tudo ou nada no modo
+atômico, conferidos no banco.
+"""
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from core.process_index import process_index
+from models.data_version import get_data_version
+from models.legal_process import LegalProcessDB
+
+
+@pytest.fixture
+def process(db, lawyer_and_client):
+    lawyer, customer = lawyer_and_client
+    process = LegalProcessDB(process_number=f"B-{uuid4().hex[:8]}", lawyer_id=lawyer.id, client_id=customer.id, status="ativo",
+                             entry_date=date(2025, 1, 1), delivery_deadline=date(2025, 2, 1), fatal_deadline=date(2025, 2, 5))
+    db.add(process)
+    db.commit()
+    return process
+
+
+def _create(process: LegalProcessDB, number: str) -> dict:
+    return {"entity": "process", "action": "create", "data": {
+        "process_number": number, "lawyer_id": process.lawyer_id, "client_id": process.client_id,
+        "entry_date": "2025-01-01", "delivery_deadline": "2025-02-01", "fatal_deadline": "2025-02-05",
+    }}
+
+
+def _numbers(db, process: LegalProcessDB):
+    db.expire_all()
+    return {row.process_number: row.status for row in db.query(LegalProcessDB).filter(LegalProcessDB.lawyer_id == process.lawyer_id)}
+
+
+def test_partial_batch_keeps_successful_operations(client, admin_headers, db, process):
+    new_number = f"B-{uuid4().hex[:8]}"
+    response = client.post("/batch", headers=admin_headers, json={"operations": [
+        _create(process, new_number),
+        {"entity": "process", "action": "update", "id": process.id, "data": {"status": "suspenso"}},
+        {"entity": "lawyer", "action": "update", "id": 10 ** 9, "data": {"name": "Inexistente"}},
+        _create(process, process.process_number), # Número duplicado
+    ]})
+
+    body = response.json()
+    assert body["committed"] is True
+    assert [result["status_code"] for result in body["results"]] == [201, 200, 404, 400]
+    assert _numbers(db, process) == {process.process_number: "suspenso", new_number: "ativo"}
+
+
+def test_atomic_batch_persists_nothing_on_failure(client, admin_headers, db, process):
+    before = get_data_version(db)
+    response = client.post("/batch", headers=admin_headers, json={"atomic": True, "operations": [
+        _create(process, f"B-{uuid4().hex[:8]}"),
+        {"entity": "process", "action": "update", "id": process.id, "data": {"status": "suspenso"}},
+        {"entity": "lawyer", "action": "update", "id": 10 ** 9, "data": {"name": "Inexistente"}},
+        {"entity": "process", "action": "update", "id": process.id, "data": {"status": "concluído"}},
+    ]})
+
+    body = response.json()
+    assert body["committed"] is False
+    assert [result["status_code"] for result in body["results"]] == [424, 424, 404, 424]
+    assert _numbers(db, process) == {process.process_number: "ativo"}
+    assert get_data_version(db) == before
+
+
+def test_atomic_batch_commits_all_operations(client, admin_headers, db, process):
+    numbers = [f"B-{uuid4().hex[:8]}" for _ in range(3)]
+    before = get_data_version(db)
+    response = client.post("/batch", headers=admin_headers, json={"atomic": True, "operations": [
+        *(_create(process, number) for number in numbers),
+        {"entity": "process", "action": "update", "id": process.id, "data": {"status": "suspenso"}},
+    ]})
+
+    body = response.json()
+    assert body["committed"] is True
+    assert [result["status_code"] for result in body["results"]] == [201, 201, 201, 200]
+    assert _numbers(db, process) == {process.process_number: "suspenso", **{number: "ativo" for number in numbers}}
+    assert get_data_version(db) == before + 1 # Um incremento por lote, não por operação
+
+
+def test_aborted_atomic_batch_leaves_process_index_consistent(client, admin_headers, db, process):
+    process_index.enabled = True
+    process_index.load()
+    try:
+        response = client.post("/batch", headers=admin_headers, json={"atomic": True, "operations": [
+            _create(process, f"PHANTOM-{uuid4().hex[:8]}"),
+            {"entity": "process", "action": "update", "id": process.id, "data": {"status": "suspenso"}},
+            {"entity": "process", "action": "update", "id": process.id, "data": {"lawyer_id": 10 ** 9}},
+        ]})
+        assert response.json()["committed"] is False
+
+        indexed = process_index.search(get_data_version(db), set(), lawyer_id=process.lawyer_id, client_id=None, status=None,
+                                       action_type=None, fatal_from=None, fatal_to=None)
+        assert indexed is not None
+        assert {p.process_number: p.status for p in indexed} == _numbers(db, process) == {process.process_number: "ativo"}
+    finally:
+        process_index.enabled = False
@@ -0,0 +1,67 @@
+"""
+Dias úteis (core/business_days.py): feriados fixos e móveis, herança de calendários, recesso e
+aritmética da tabela pré-calculada comparada com uma contagem dia a dia.
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from core.business_days import (
+    BusinessDayTable, add_business_days, business_days_between, easter_sunday, get_holiday_calendar, is_business_day,
+)
+
+
+def _naive_is_business_day(calendar, day: date) -> bool:
+    return day.weekday() < 5 and not calendar.is_holiday(day)
+
+
+def test_easter_sunday():
+    assert [easter_sunday(year) for year in (2024, 2025, 2026)] == [date(2024, 3, 31), date(2025, 4, 20), date(2026, 4, 5)]
+
+
+def test_national_and_state_holidays():
+    assert not is_business_day(date(2025, 3, 4)) # Carnaval (terça)
+    assert not is_business_day(date(2025, 4, 18)) # Sexta-feira Santa
+    assert not is_business_day(date(2025, 6, 19)) # Corpus Christi
+    assert not is_business_day(date(2025, 11, 20)) # Consciência Negra
+    assert is_business_day(date(2025, 7, 9))
+    assert not is_business_day(date(2025, 7, 9), calendar_name="BR-SP") # Herda o nacional e acrescenta 9 de julho
+    assert not is_business_day(date(2025, 4, 18), calendar_name="BR-SP")
+
+
+def test_forensic_recess_crosses_the_year():
+    forense = get_holiday_calendar("BR-FORENSE")
+    assert forense.is_holiday(date(2025, 12, 22)) and forense.is_holiday(date(2026, 1, 20))
+    assert not forense.is_holiday(date(2026, 1, 21))
+    assert add_business_days(date(2025, 12, 19), 1, calendar_name="BR-FORENSE") == date(2026, 1, 21)
+
+
+def test_add_and_count_business_days():
+    assert add_business_days(date(2025, 4, 17), 1) == date(2025, 4, 22) # Pula a Sexta-feira Santa e o 21 de abril
+    assert add_business_days(date(2025, 4, 22), -1) == date(2025, 4, 17)
+    assert add_business_days(date(2025, 4, 19), -1) == date(2025, 4, 17) # Sábado: o dia útil anterior já é o primeiro passo
+    assert business_days_between(date(2025, 4, 17), date(2025, 4, 22)) == 1
+    assert business_days_between(date(2025, 4, 22), date(2025, 4, 17)) == -1
+
+
+@pytest.mark.parametrize("calendar_name", ["BR", "BR-SP", "BR-FORENSE"])
+def test_table_matches_day_by_day_count(calendar_name):
+    calendar = get_holiday_calendar(calendar_name)
+    table = BusinessDayTable(calendar, date(2024, 1, 1), date(2026, 12, 31))
+    days = [date(2024, 2, 5) + timedelta(days=offset) for offset in range(0, 2 * 365 + 180, 7)]
+    for start in days[:20]:
+        for end in days[::11]:
+            low, high = min(start, end), max(start, end)
+            expected = sum(_naive_is_business_day(calendar, low + timedelta(days=i)) for i in range(1, (high - low).days + 1))
+            assert table.business_days_between(start, end) == (expected if end >= start else -expected)
+        for n in (0, 1, 5, 23):
+            result = table.add_business_days(start, n)
+            assert _naive_is_business_day(calendar, result) or n == 0
+            if _naive_is_business_day(calendar, start):
+                assert table.business_days_between(start, result) == n
+
+
+def test_table_outside_range_raises():
+    table = BusinessDayTable(get_holiday_calendar("BR"), date(2025, 1, 1), date(2025, 12, 31))
+    with pytest.raises(ValueError):
+        table.ordinal(date(2026, 1, 1))
@@ -0,0 +1,143 @@
+"""
+Backends de cache (core/cache.py): LRU local, cliente do protocolo do Redis contra o servidor de
+core/cache_server.py e o modo de dois níveis com invalidação do L1 por pub/sub.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.cache import LocalCache, RedisCache, TieredCache
+from core.cache_server import CacheServer
+
+CHANNEL = "testes:invalidacoes"
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condição não atingida a tempo"
+        time.sleep(0.01)
+
+
+@pytest.fixture(scope="module")
+def cache_server():
+    """Servidor de cache (protocolo Redis) em uma porta livre, em uma thread própria."""
+    server = CacheServer()
+    loop = asyncio.new_event_loop()
+    started = loop.run_until_complete(asyncio.start_server(server.handle, "127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server.url = f"redis://127.0.0.1:{started.sockets[0].getsockname()[1]}/0"
+    yield server
+
+    async def shutdown():
+        started.close()
+        connections = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in connections:
+            task.cancel()
+        await asyncio.gather(*connections, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+@pytest.fixture
+def make_redis(cache_server):
+    caches = []
+
+    def make(**values):
+        cache = RedisCache(cache_server.url, **{"key_prefix": "testes:", **values})
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def test_local_cache_evicts_least_recently_used_by_size():
+    cache = LocalCache(max_bytes=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"5678")
+    assert cache.get("a") == b"1234" # "a" passa a ser a mais recente
+    cache.set("c", b"90ab")
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (b"1234", None, b"90ab")
+    assert cache.stats()["size_bytes"] == 8 and cache.evictions == 1
+
+    cache.set("grande", b"x" * 11)
+    assert cache.get("grande") is None and cache.get("a") == b"1234"
+
+
+def test_local_cache_ttl():
+    cache = LocalCache()
+    cache.set("curta", b"1", ttl=0.01)
+    cache.set("longa", b"2", ttl=60)
+    time.sleep(0.05)
+    assert (cache.get("curta"), cache.get("longa")) == (None, b"2")
+
+
+def test_get_or_load_runs_a_single_load():
+    cache = LocalCache()
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return b"valor"
+
+    def request(results):
+        barrier.wait()
+        results.append(cache.get_or_load("estatisticas", loader))
+
+    results = []
+    threads = [threading.Thread(target=request, args=(results,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1 and results == [b"valor"] * 8
+
+
+def test_redis_cache_round_trip(make_redis):
+    cache = make_redis()
+    cache.set("chave", b"\x00bytes\r\n")
+    assert cache.get("chave") == b"\x00bytes\r\n"
+    assert make_redis(key_prefix="outro:").get("chave") is None
+
+    cache.set("expira", b"1", ttl=0.01)
+    time.sleep(0.05)
+    assert cache.get("expira") is None
+
+    cache.delete("chave")
+    assert cache.get("chave") is None
+    assert (cache.hits, cache.misses, cache.errors) == (1, 2, 0)
+
+
+def test_redis_cache_unavailable_behaves_as_empty():
+    cache = RedisCache("redis://127.0.0.1:1/0")
+    cache.set("chave", b"1")
+    assert cache.get("chave") is None
+    assert cache.stats()["available"] is False and cache.errors == 1 # A segunda chamada nem tenta conectar
+    cache.close()
+
+
+def test_tiered_cache_invalidates_other_processes(cache_server, make_redis):
+    subscribers = len(cache_server._channels[CHANNEL.encode()])
+    first = TieredCache(LocalCache(), make_redis(), channel=CHANNEL)
+    second = TieredCache(LocalCache(), make_redis(), channel=CHANNEL)
+    _wait_for(lambda: len(cache_server._channels[CHANNEL.encode()]) == subscribers + 2)
+
+    first.set("usuario:1", b"v1")
+    assert second.get("usuario:1") == b"v1" # Lido do L2 e guardado no L1
+    assert second.local.get("usuario:1") == b"v1"
+
+    first.delete("usuario:1")
+    _wait_for(lambda: second.invalidations_received == 1)
+    assert second.local.get("usuario:1") is None
+    assert second.get("usuario:1") is None
+    assert first.invalidations_received == 0 # As próprias mensagens são ignoradas
@@ -0,0 +1,84 @@
+"""
+Versão dos dados (models/data_version.py): incrementada uma vez por transação que escreve em
+processos, advogados ou clientes, inclusive com SAVEPOINTs liberados ou desfeitos no meio.
+"""
+from datetime import date
+from uuid import uuid4
+
+from sqlalchemy.exc import IntegrityError
+
+from models.data_version import get_data_version
+from models.legal_process import LegalProcessDB
+
+
+def _process(lawyer, client, **values) -> LegalProcessDB:
+    values.setdefault("process_number", f"DV-{uuid4().hex[:10]}")
+    return LegalProcessDB(lawyer_id=lawyer.id, client_id=client.id, entry_date=date(2025, 1, 1),
+                          delivery_deadline=date(2025, 2, 1), fatal_deadline=date(2025, 2, 5), **values)
+
+
+def test_commit_bumps_version_once(db, lawyer_and_client):
+    lawyer, client = lawyer_and_client
+    before = get_data_version(db)
+    db.add_all([_process(lawyer, client) for _ in range(3)])
+    db.flush()
+    db.add(_process(lawyer, client))
+    db.commit()
+    assert get_data_version(db) == before + 1
+
+
+def test_read_only_commit_keeps_version(db):
+    before = get_data_version(db)
+    db.commit()
+    assert get_data_version(db) == before
+
+
+def test_released_savepoints_bump_version_once(db, lawyer_and_client):
+    lawyer, client = lawyer_and_client
+    before = get_data_version(db)
+    for _ in range(5):
+        with db.begin_nested():
+            db.add(_process(lawyer, client))
+    db.commit()
+    assert get_data_version(db) == before + 1
+
+
+def test_failed_savepoint_keeps_changes_made_before_it(db, lawyer_and_client):
+    lawyer, client = lawyer_and_client
+    process = _process(lawyer, client, status="ativo")
+    db.add(process)
+    db.commit()
+    before = get_data_version(db)
+
+    process.status = "suspenso"
+    db.flush()
+    try:
+        with db.begin_nested():
+            db.add(_process(lawyer, client, process_number=process.process_number)) # Número duplicado
+    except IntegrityError:
+        pass
+    db.commit()
+
+    assert db.query(LegalProcessDB.status).filter(LegalProcessDB.id == process.id).scalar() == "suspenso"
+    assert get_data_version(db) == before + 1
+
+
+def test_rolled_back_savepoint_alone_keeps_version(db, lawyer_and_client):
+    lawyer, client = lawyer_and_client
+    before = get_data_version(db)
+    savepoint = db.begin_nested()
+    db.add(_process(lawyer, client))
+    db.flush()
+    savepoint.rollback()
+    db.commit()
+    assert get_data_version(db) == before
+
+
+def test_outer_rollback_discards_released_savepoint(db, lawyer_and_client):
+    lawyer, client = lawyer_and_client
+    before = get_data_version(db)
+    with db.begin_nested():
+        db.add(_process(lawyer, client))
+    db.rollback()
+    db.commit()
+    assert get_data_version(db) == before
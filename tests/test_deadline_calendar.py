@@ -0,0 +1,83 @@
+"""
+Calendário de prazos (models/deadline_calendar.py, core/deadline_calendar.py): linhas mantidas
+pelos eventos do ORM a cada escrita de processo e a consulta por intervalo de datas.
+"""
+from datetime import date, timedelta
+from uuid import uuid4
+
+from core.deadline_calendar import get_deadline_entries, rebuild_deadline_calendar
+from models.deadline_calendar import DeadlineCalendarDB
+from models.legal_process import LegalProcessDB
+
+
+def _process(lawyer, client, delivery: date, fatal: date, **values) -> LegalProcessDB:
+    return LegalProcessDB(process_number=f"DC-{uuid4().hex[:8]}", lawyer_id=lawyer.id, client_id=client.id,
+                          entry_date=date(2030, 1, 1), delivery_deadline=delivery, fatal_deadline=fatal, **values)
+
+
+def _entries(db, lawyer, **kwargs):
+    return [(row.deadline_date, row.deadline_type, row.process_id)
+            for row in get_deadline_entries(db, date(2030, 1, 1), date(2030, 12, 31), lawyer_id=lawyer.id, **kwargs)]
+
+
+def test_limit_returns_the_first_deadlines_in_date_order(db, lawyer_and_client):
+    lawyer, client = lawyer_and_client
+    processes = [_process(lawyer, client, date(2030, 5, 1) + timedelta(days=offset), date(2030, 6, 1) + timedelta(days=offset),
+                          status="ativo") for offset in (3, 0, 2, 1)]
+    db.add_all(processes)
+    db.commit()
+
+    everything = _entries(db, lawyer)
+    assert len(everything) == 8
+    assert everything == sorted(everything)
+    assert _entries(db, lawyer, limit=3) == everything[:3]
+
+
+def test_calendar_follows_process_writes(db, lawyer_and_client, make_process):
+    lawyer, client = lawyer_and_client
+    process = make_process(lawyer, client, delivery_deadline=date(2030, 3, 1), fatal_deadline=date(2030, 3, 10))
+    assert _entries(db, lawyer) == [(date(2030, 3, 1), "entrega", process.id), (date(2030, 3, 10), "fatal", process.id)]
+
+    process.fatal_deadline = date(2030, 4, 1)
+    db.commit()
+    assert _entries(db, lawyer) == [(date(2030, 3, 1), "entrega", process.id), (date(2030, 4, 1), "fatal", process.id)]
+
+    process.status = "suspenso" # Só processos ativos ficam no calendário
+    db.commit()
+    assert _entries(db, lawyer) == []
+
+    process.status = "ativo"
+    db.commit()
+    db.delete(process)
+    db.commit()
+    assert _entries(db, lawyer) == []
+
+
+def test_rebuild_matches_incremental_maintenance(db, lawyer_and_client, make_process):
+    lawyer, client = lawyer_and_client
+    make_process(lawyer, client, delivery_deadline=date(2030, 7, 1), fatal_deadline=None)
+    make_process(lawyer, client, delivery_deadline=date(2030, 7, 2), fatal_deadline=date(2030, 7, 3))
+    make_process(lawyer, client, status="concluído", delivery_deadline=date(2030, 7, 4), fatal_deadline=date(2030, 7, 5))
+    rows = lambda: sorted(db.query(DeadlineCalendarDB.deadline_date, DeadlineCalendarDB.deadline_type, DeadlineCalendarDB.process_id))
+    incremental = rows()
+
+    rebuild_deadline_calendar(db)
+    db.commit()
+    assert rows() == incremental
+
+
+def test_deadlines_endpoint_filters_by_range_and_type(client, admin_headers, lawyer_and_client, make_process):
+    lawyer, customer = lawyer_and_client
+    process = make_process(lawyer, customer, delivery_deadline=date(2030, 8, 1), fatal_deadline=date(2030, 8, 20))
+    params = {"from": "2030-08-01", "to": "2030-08-10", "lawyer_id": lawyer.id}
+
+    response = client.get("/deadlines", headers=admin_headers, params=params)
+    assert response.status_code == 200, response.text
+    assert [(entry["deadline_date"], entry["deadline_type"], entry["process_id"]) for entry in response.json()] == [
+        ("2030-08-01", "entrega", process.id),
+    ]
+    response = client.get("/deadlines", headers=admin_headers, params={**params, "to": "2030-08-31", "deadline_type": "fatal"})
+    assert [entry["deadline_date"] for entry in response.json()] == ["2030-08-20"]
+
+    assert client.get("/deadlines", headers=admin_headers, params={"from": "2030-08-10", "to": "2030-08-01"}).status_code == 400
+    assert client.get("/deadlines", headers=admin_headers, params={"from": "2030-01-01", "to": "2031-12-31"}).status_code == 400
@@ -0,0 +1,77 @@
+"""
+Tradução de IntegrityError (core/integrity.py): a coluna da constraint violada é identificada
+pela mensagem do driver e a API responde com a mensagem específica do campo.
+"""
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+import models.lawyer  # noqa: F401 (índices de lawyers no metadata, usados para mapear nomes de índice)
+from core.integrity import integrity_error_column
+
+
+def _error(message):
+    return IntegrityError("INSERT ...", {}, Exception(message))
+
+
+@pytest.mark.parametrize("message, column", [
+    ("UNIQUE constraint failed: lawyers.email", "email"),
+    ("(1062, \"Duplicate entry 'a@b.com' for key 'lawyers.ix_lawyers_email'\")", "email"),
+    ("(1062, \"Duplicate entry '123' for key 'ix_lawyers_oab'\")", "oab"),
+    ("(1452, 'Cannot add or update a child row: a foreign key constraint fails (`db`.`legal_processes`, "
+     "CONSTRAINT `legal_processes_ibfk_2` FOREIGN KEY (`client_id`) REFERENCES `clients` (`id`))')", "client_id"),
+    ("duplicate key value violates unique constraint \"ix_lawyers_username\"\nDETAIL:  Key (username)=(ana) already exists.", "username"),
+    ("FOREIGN KEY constraint failed", None),
+])
+def test_integrity_error_column(message, column):
+    assert integrity_error_column(_error(message)) == column
+
+
+def _lawyer_payload(**values):
+    suffix = uuid4().hex[:8]
+    number = uuid4().int
+    oab = f"{number % 10**6:06d}{chr(65 + number // 10**6 % 26)}{chr(65 + number // 10**8 % 26)}"
+    return {"name": f"Advogado {suffix}", "oab": oab, "email": f"i{suffix}@example.com", "username": f"i{suffix}", **values}
+
+
+@pytest.mark.parametrize("field, detail", [
+    ("oab", "OAB already registered."),
+    ("email", "Email already registered."),
+    ("username", "Nickname (username) já registrado."),
+])
+def test_create_lawyer_duplicate_field(client, admin_headers, field, detail):
+    existing = _lawyer_payload()
+    assert client.post("/lawyers/", headers=admin_headers, json=existing).status_code == 200
+
+    response = client.post("/lawyers/", headers=admin_headers, json=_lawyer_payload(**{field: existing[field]}))
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+
+
+def test_update_lawyer_duplicate_email(client, admin_headers):
+    first = client.post("/lawyers/", headers=admin_headers, json=_lawyer_payload()).json()
+    second = client.post("/lawyers/", headers=admin_headers, json=_lawyer_payload()).json()
+
+    response = client.put(f"/lawyers/{second['id']}", headers=admin_headers, json=_lawyer_payload(email=first["email"]))
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email já registrado por outro usuário."
+
+
+def test_process_with_missing_references(client, admin_headers, lawyer_and_client, make_process):
+    lawyer, customer = lawyer_and_client
+    payload = {"process_number": f"I-{uuid4().hex[:10]}", "lawyer_id": lawyer.id, "client_id": customer.id,
+               "entry_date": "2025-01-01", "delivery_deadline": "2025-02-01", "fatal_deadline": "2025-02-05"}
+
+    response = client.post("/processes/", headers=admin_headers, json={**payload, "client_id": 999999})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Cliente com id 999999 não encontrado."
+    response = client.post("/processes/", headers=admin_headers, json={**payload, "lawyer_id": 999999})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Advogado com id 999999 não encontrado."
+
+    existing = make_process(lawyer, customer)
+    response = client.post("/processes/", headers=admin_headers, json={**payload, "process_number": existing.process_number})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Erro: Número do processo já existente."
+    assert client.post("/processes/", headers=admin_headers, json=payload).status_code == 200
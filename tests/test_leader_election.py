@@ -0,0 +1,164 @@
+"""
+Eleição de líder entre workers (core/scheduler.py): vários LeaderElection disputando o mesmo
+lease no banco de testes, no mesmo processo e em processos separados.
+"""
+import asyncio
+import multiprocessing
+import time
+
+from sqlalchemy import func
+
+from core.scheduler import LeaderElection, daily_deadlines_job, scheduler_today, upcoming_fatal_deadlines_job
+from database import SessionLocal
+from models.job_queue import JobDB
+from models.scheduler_lease import SchedulerLeaseDB
+
+LEASE_TTL_SECONDS = 1 # Renovação a cada ~0,33 s
+
+
+def _election(name: str, events: list, index: int) -> LeaderElection:
+    async def on_elected():
+        events.append(("elected", index))
+
+    async def on_revoked():
+        events.append(("revoked", index))
+
+    return LeaderElection(on_elected, on_revoked, name=name, ttl_seconds=LEASE_TTL_SECONDS, holder=f"test-worker-{index}")
+
+
+async def _wait_for(predicate, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        await asyncio.sleep(0.05)
+    return predicate()
+
+
+def _lease_holder(name: str):
+    db = SessionLocal()
+    try:
+        return db.query(SchedulerLeaseDB.holder).filter(SchedulerLeaseDB.name == name).scalar()
+    finally:
+        db.close()
+
+
+def test_single_leader_among_workers():
+    async def scenario():
+        events = []
+        elections = [_election("test_single", events, index) for index in range(5)]
+        for election in elections:
+            election.start()
+        try:
+            assert await _wait_for(lambda: any(e.is_leader for e in elections), timeout=3)
+            # Vários ciclos de renovação: a liderança não pode mudar nem se duplicar.
+            await asyncio.sleep(LEASE_TTL_SECONDS * 2)
+            leaders = [e for e in elections if e.is_leader]
+            assert len(leaders) == 1
+            assert _lease_holder("test_single") == leaders[0].holder
+            assert events == [("elected", elections.index(leaders[0]))]
+        finally:
+            for election in elections:
+                await election.stop()
+
+    asyncio.run(scenario())
+
+
+def test_takeover_after_release():
+    async def scenario():
+        events = []
+        elections = [_election("test_release", events, index) for index in range(3)]
+        for election in elections:
+            election.start()
+        try:
+            assert await _wait_for(lambda: any(e.is_leader for e in elections), timeout=3)
+            old_leader = next(e for e in elections if e.is_leader)
+            await old_leader.stop() # Libera o lease: o sucessor não espera a expiração
+            others = [e for e in elections if e is not old_leader]
+            assert await _wait_for(lambda: any(e.is_leader for e in others), timeout=LEASE_TTL_SECONDS)
+            assert sum(e.is_leader for e in others) == 1
+            assert not old_leader.is_leader
+            assert ("revoked", elections.index(old_leader)) in events
+        finally:
+            for election in elections:
+                await election.stop()
+
+    asyncio.run(scenario())
+
+
+def test_takeover_after_lease_expires():
+    async def scenario():
+        events = []
+        elections = [_election("test_expiry", events, index) for index in range(3)]
+        for election in elections:
+            election.start()
+        try:
+            assert await _wait_for(lambda: any(e.is_leader for e in elections), timeout=3)
+            crashed = next(e for e in elections if e.is_leader)
+            # Líder "morre": para de renovar sem liberar o lease.
+            crashed._task.cancel()
+            others = [e for e in elections if e is not crashed]
+            await asyncio.sleep(LEASE_TTL_SECONDS / 2)
+            assert not any(e.is_leader for e in others) # Lease ainda válido
+            assert await _wait_for(lambda: any(e.is_leader for e in others), timeout=LEASE_TTL_SECONDS * 3)
+            assert sum(e.is_leader for e in others) == 1
+            assert _lease_holder("test_expiry") == next(e for e in others if e.is_leader).holder
+        finally:
+            for election in elections:
+                await election.stop()
+
+    asyncio.run(scenario())
+
+
+def _worker_process(name: str, index: int, barrier, duration: float, results) -> None:
+    """Worker separado: disputa o lease e, como o líder faria, dispara os jobs agendados."""
+    async def run():
+        elected = []
+
+        async def on_elected():
+            elected.append(time.monotonic())
+            daily_deadlines_job()
+            upcoming_fatal_deadlines_job()
+
+        async def on_revoked():
+            pass
+
+        election = LeaderElection(on_elected, on_revoked, name=name, ttl_seconds=LEASE_TTL_SECONDS, holder=f"process-{index}")
+        barrier.wait()
+        election.start()
+        # Misfire/troca de líder: o mesmo job disparado de novo por outro processo não duplica a fila.
+        daily_deadlines_job()
+        await asyncio.sleep(duration)
+        is_leader = election.is_leader
+        await election.stop()
+        results.put((index, len(elected), is_leader))
+
+    asyncio.run(run())
+
+
+def test_worker_processes_elect_one_leader_and_enqueue_jobs_once():
+    context = multiprocessing.get_context("spawn")
+    workers = 4
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_worker_process, args=("test_processes", index, barrier, LEASE_TTL_SECONDS * 3, results))
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+    assert sum(elected for _, elected, _ in outcomes) == 1
+    assert sum(is_leader for _, _, is_leader in outcomes) == 1
+
+    today = scheduler_today().isoformat()
+    db = SessionLocal()
+    try:
+        for dedup_key in (f"daily_deadlines:{today}", f"upcoming_fatal_deadlines:{today}"):
+            assert db.query(func.count(JobDB.id)).filter(JobDB.dedup_key == dedup_key).scalar() == 1
+    finally:
+        db.close()
@@ -0,0 +1,158 @@
+"""
+Migrações versionadas (migrations/): cadeia de revisões, banco novo migrado até a head igual aos
+modelos, re-execução sem efeito e conferência da revisão no startup. Cada teste usa um arquivo
+SQLite próprio, separado do banco dos demais testes.
+"""
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+
+from database import Base
+from migrations import SchemaVersionError, check_schema_version, head_revision, load_migrations, upgrade
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/migrations.db")
+
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    yield engine
+    engine.dispose()
+
+
+def test_revisions_form_a_linear_chain():
+    migrations = load_migrations()
+    assert migrations[0].down_revision is None
+    for previous, migration in zip(migrations, migrations[1:]):
+        assert migration.down_revision == previous.revision
+    assert head_revision() == migrations[-1].revision
+
+
+def test_fresh_database_matches_models(engine):
+    import main # noqa: F401 Registra todos os modelos em Base.metadata
+
+    assert upgrade(engine) == [migration.revision for migration in load_migrations()]
+    assert upgrade(engine) == []
+    assert check_schema_version(engine) == head_revision()
+
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        assert inspector.has_table(table.name), table.name
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        assert {column.name for column in table.columns} <= columns, table.name
+
+
+def test_each_migration_is_re_executable(engine):
+    for migration in load_migrations():
+        upgrade(engine, migration.revision)
+        with engine.begin() as connection:
+            migration.module.upgrade(connection)
+
+
+def test_outdated_database_is_rejected(engine):
+    revisions = [migration.revision for migration in load_migrations()]
+    upgrade(engine, revisions[-2])
+    with pytest.raises(SchemaVersionError):
+        check_schema_version(engine)
+    with pytest.raises(ValueError):
+        upgrade(engine, "9999")
+    assert upgrade(engine) == revisions[-1:]
+
+
+def _seed_lawyer_and_client(connection):
+    connection.execute(text(
+        "INSERT INTO lawyers (id, name, oab, email, username, hashed_password) VALUES (1, 'A', '1SP', 'a@example.com', 'a', '-')"
+    ))
+    connection.execute(text("INSERT INTO clients (id, name, area_of_expertise) VALUES (1, 'C', 'CONTRATOS')"))
+
+
+def test_monotonic_ids_migration_renumbers_reused_ids(engine):
+    upgrade(engine, "0008")
+    with engine.begin() as connection:
+        _seed_lawyer_and_client(connection)
+        connection.execute(text(
+            "INSERT INTO legal_processes_archive (id, process_number, status_code, lawyer_id, client_id, archived_at) "
+            "VALUES (3, 'ARQ-3', 3, 1, 1, '2024-01-01')"
+        ))
+        # Id 3 reutilizado pela tabela principal depois do arquivamento, com prazo e notificação.
+        for process_id, number in ((1, "P-1"), (3, "P-3")):
+            connection.execute(text(
+                "INSERT INTO legal_processes (id, process_number, status_code, fatal_deadline, lawyer_id, client_id) "
+                "VALUES (:id, :number, 1, '2030-01-10', 1, 1)"
+            ), {"id": process_id, "number": number})
+            connection.execute(text(
+                "INSERT INTO deadline_calendar (deadline_date, deadline_type, process_id) VALUES ('2030-01-10', 'fatal', :id)"
+            ), {"id": process_id})
+        connection.execute(text(
+            "INSERT INTO notification_ledger (process_id, deadline_type, deadline_date, channel, alert_kind, status, attempts, "
+            "created_at, updated_at) VALUES (3, 'fatal', '2030-01-10', 'telegram', 'vencimento', 'enviado', 1, "
+            "'2030-01-10', '2030-01-10')"
+        ))
+
+    assert upgrade(engine) == ["0009"]
+
+    with engine.connect() as connection:
+        processes = dict(connection.execute(text("SELECT process_number, id FROM legal_processes")).all())
+        assert processes == {"P-1": 1, "P-3": 4}
+        assert sorted(connection.execute(text("SELECT process_id FROM deadline_calendar")).scalars()) == [1, 4]
+        assert connection.execute(text("SELECT process_id FROM notification_ledger")).scalar() == 4
+        assert connection.execute(text("SELECT COUNT(*) FROM legal_processes_all")).scalar() == 3
+        assert connection.execute(text("PRAGMA foreign_keys")).scalar() == 1
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM deadline_calendar WHERE process_id = 4"))
+        connection.execute(text("DELETE FROM notification_ledger"))
+        connection.execute(text("DELETE FROM legal_processes WHERE id = 4"))
+        connection.execute(text(
+            "INSERT INTO legal_processes (process_number, status_code, lawyer_id, client_id) VALUES ('P-5', 1, 1, 1)"
+        ))
+        # AUTOINCREMENT: o id removido (e os arquivados) não volta a ser usado.
+        assert connection.execute(text("SELECT id FROM legal_processes WHERE process_number = 'P-5'")).scalar() == 5
+
+
+def test_status_codes_migration_converts_legacy_values(engine):
+    upgrade(engine, "0007")
+    with engine.begin() as connection:
+        _seed_lawyer_and_client(connection)
+        for process_id, status, action_type in ((1, "Ativo", "Cível"), (2, " concluido", "Cível"), (3, "SUSPENSO", None)):
+            connection.execute(text(
+                "INSERT INTO legal_processes (id, process_number, status, action_type, lawyer_id, client_id) "
+                "VALUES (:id, :number, :status, :action_type, 1, 1)"
+            ), {"id": process_id, "number": f"P-{process_id}", "status": status, "action_type": action_type})
+        connection.execute(text(
+            "INSERT INTO legal_processes_archive (id, process_number, status, action_type, lawyer_id, client_id, archived_at) "
+            "VALUES (4, 'ARQ-4', 'Concluído', 'Trabalhista', 1, 1, '2024-01-01')"
+        ))
+
+    assert upgrade(engine, "0008") == ["0008"]
+
+    with engine.connect() as connection:
+        assert dict(connection.execute(text("SELECT id, status_code FROM legal_processes")).all()) == {1: 1, 2: 3, 3: 2}
+        action_types = dict(connection.execute(text("SELECT name, id FROM action_types")).all())
+        assert set(action_types) == {"Cível", "Trabalhista"}
+        assert dict(connection.execute(text("SELECT id, action_type_id FROM legal_processes_all")).all()) == {
+            1: action_types["Cível"], 2: action_types["Cível"], 3: None, 4: action_types["Trabalhista"],
+        }
+        assert connection.execute(text("SELECT status_code FROM legal_processes_archive")).scalar() == 3
+        assert "status" not in {column["name"] for column in inspect(connection).get_columns("legal_processes")}
+
+
+def test_status_codes_migration_stops_on_unknown_status(engine):
+    upgrade(engine, "0007")
+    with engine.begin() as connection:
+        _seed_lawyer_and_client(connection)
+        connection.execute(text(
+            "INSERT INTO legal_processes (id, process_number, status, lawyer_id, client_id) VALUES (1, 'P-1', 'em análise', 1, 1)"
+        ))
+
+    with pytest.raises(RuntimeError, match="'em análise' \\(1\\)"):
+        upgrade(engine)
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT status FROM legal_processes WHERE id = 1")).scalar() == "em análise"
+
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE legal_processes SET status = 'suspenso' WHERE status = 'em análise'"))
+    assert upgrade(engine) == ["0008", "0009"]
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT status_code FROM legal_processes WHERE id = 1")).scalar() == 2
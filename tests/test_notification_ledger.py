@@ -0,0 +1,52 @@
+"""
+Ledger de notificações (core/notification_ledger.py): cada alerta de prazo é reservado uma única
+vez, mesmo com a varredura repetida, e só volta a ser enfileirado depois de uma falha definitiva.
+"""
+from datetime import date
+
+from core.notification_ledger import CHANNEL_TELEGRAM, NotificationKey, claim_notifications, link_outbox_messages, \
+    mark_notifications_for_outbox
+from core.notifications import enqueue_daily_deadline_notifications
+from core.outbox import add_outbox_messages
+from models.notification_ledger import NotificationLedgerDB
+from models.outbox import OutboxMessageDB
+
+DUE_DATE = date(2033, 3, 16) # Quarta-feira útil, sem prazos de outros testes
+
+
+def test_daily_scan_enqueues_each_alert_once(db, lawyer_and_client, make_lawyer, make_process):
+    _, customer = lawyer_and_client
+    lawyer = make_lawyer(telegram_id="555030")
+    make_process(lawyer, customer, delivery_deadline=DUE_DATE, fatal_deadline=DUE_DATE)
+    make_process(lawyer, customer, delivery_deadline=DUE_DATE, fatal_deadline=date(2033, 4, 1))
+
+    assert enqueue_daily_deadline_notifications(db, today=DUE_DATE) == 2 # Uma mensagem por processo
+    assert enqueue_daily_deadline_notifications(db, today=DUE_DATE) == 0 # Varredura repetida (misfire, outro worker)
+
+    assert db.query(OutboxMessageDB).filter(OutboxMessageDB.recipient == "555030").count() == 2
+    ledger = db.query(NotificationLedgerDB).filter(NotificationLedgerDB.deadline_date == DUE_DATE).all()
+    assert len(ledger) == 3 # Entrega dos dois processos e fatal do primeiro
+    assert all(row.outbox_id is not None for row in ledger)
+
+
+def test_failed_alert_can_be_claimed_again(db, lawyer_and_client, make_process):
+    lawyer, customer = lawyer_and_client
+    process = make_process(lawyer, customer)
+    key = NotificationKey(process.id, "fatal", process.fatal_deadline, CHANNEL_TELEGRAM, "vencimento")
+
+    claimed = claim_notifications(db, [key])
+    assert list(claimed) == [key]
+    message = add_outbox_messages(db, [{"recipient": "1", "body": "alerta"}])[0]
+    link_outbox_messages(db, {claimed[key]: message.id})
+    db.commit()
+    assert claim_notifications(db, [key]) == {} # Pendente no outbox
+
+    mark_notifications_for_outbox(db, [message.id], sent=True)
+    db.commit()
+    assert claim_notifications(db, [key]) == {} # Já entregue
+
+    mark_notifications_for_outbox(db, [message.id], sent=False)
+    db.commit()
+    assert claim_notifications(db, [key]) == claimed # Falha definitiva: retomado na mesma linha
+    db.commit()
+    assert db.get(NotificationLedgerDB, claimed[key]).attempts == 2
@@ -0,0 +1,88 @@
+"""
+Outbox de notificações (core/outbox.py): reserva, envio, novas tentativas com backoff exponencial
+e falha definitiva propagada ao ledger.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import telegram_bot
+from core.notification_ledger import CHANNEL_TELEGRAM, NotificationKey, claim_notifications, link_outbox_messages
+from core.outbox import OUTBOX_RETRY_BACKOFF, add_outbox_messages, claim_outbox_messages, drain_outbox, record_outbox_results
+from models.notification_ledger import NotificationLedgerDB
+from models.outbox import OutboxMessageDB
+
+
+@pytest.fixture
+def message(db):
+    message = add_outbox_messages(db, [{"recipient": "555033", "body": "Prazo amanhã"}])[0]
+    message.max_attempts = 3
+    db.commit()
+    return message
+
+
+def _claim_ids(db):
+    return [row[0] for row in claim_outbox_messages(db, "test-worker", limit=1000)]
+
+
+def _make_ready(db, message):
+    message.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+
+
+def test_failures_back_off_exponentially_until_given_up(db, lawyer_and_client, make_process, message):
+    lawyer, customer = lawyer_and_client
+    process = make_process(lawyer, customer)
+    key = NotificationKey(process.id, "fatal", process.fatal_deadline, CHANNEL_TELEGRAM, "vencimento")
+    ledger_id = claim_notifications(db, [key])[key]
+    link_outbox_messages(db, {ledger_id: message.id})
+    db.commit()
+
+    assert message.id in _claim_ids(db)
+    assert message.id not in _claim_ids(db) # Reservada: nenhum outro drainer a recebe
+
+    for attempt in (1, 2):
+        before = datetime.utcnow()
+        record_outbox_results(db, [], {message.id: "timeout"})
+        db.refresh(message)
+        assert (message.status, message.attempts, message.last_error) == ("pendente", attempt, "timeout")
+        backoff = OUTBOX_RETRY_BACKOFF * (2 ** (attempt - 1))
+        assert before + backoff <= message.next_attempt_at <= datetime.utcnow() + backoff
+        assert message.id not in _claim_ids(db) # Ainda no backoff
+        _make_ready(db, message)
+        assert message.id in _claim_ids(db)
+
+    record_outbox_results(db, [], {message.id: "timeout"}) # Terceira falha: max_attempts
+    db.refresh(message)
+    assert message.status == "falhou"
+    assert db.get(NotificationLedgerDB, ledger_id).status == "falhou"
+
+
+def test_abandoned_message_is_claimed_again(db, message):
+    assert message.id in _claim_ids(db)
+    message.locked_at = datetime.utcnow() - timedelta(hours=1) # Drainer morreu no meio do envio
+    db.commit()
+    assert message.id in _claim_ids(db)
+    db.refresh(message)
+    assert message.attempts == 2
+
+
+def test_drain_sends_and_records_results(db, message, monkeypatch):
+    sent = []
+
+    async def fake_send(bot, chat_id, text):
+        sent.append((chat_id, text))
+        return chat_id == "555033"
+
+    monkeypatch.setattr(telegram_bot, "send_telegram_message", fake_send)
+    failing = add_outbox_messages(db, [{"recipient": "999", "body": "Sem chat"}])[0]
+    db.commit()
+
+    asyncio.run(drain_outbox(object(), "test-worker", batch_size=1000))
+
+    assert ("555033", "Prazo amanhã") in sent
+    db.refresh(message)
+    db.refresh(failing)
+    assert (message.status, message.sent_at is not None) == ("enviado", True)
+    assert (failing.status, failing.attempts) == ("pendente", 1)
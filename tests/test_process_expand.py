@@ -0,0 +1,52 @@
+"""
+?expand=lawyer,client em GET /processes/ e GET /processes/{id}: nome/OAB do advogado e nome do
+cliente embutidos na resposta, inclusive para processos arquivados.
+"""
+from datetime import date
+
+from core.archive import archive_concluded_processes
+
+
+def _by_id(response):
+    assert response.status_code == 200, response.text
+    return {item["id"]: item for item in response.json()}
+
+
+def test_list_expands_lawyer_and_client(client, admin_headers, lawyer_and_client, make_process):
+    lawyer, customer = lawyer_and_client
+    process = make_process(lawyer, customer)
+
+    item = _by_id(client.get("/processes/", headers=admin_headers, params={"lawyer_id": lawyer.id, "expand": "lawyer, client"}))[process.id]
+    assert (item["lawyer_name"], item["lawyer_oab"], item["client_name"]) == (lawyer.name, lawyer.oab, customer.name)
+
+    item = _by_id(client.get("/processes/", headers=admin_headers, params={"lawyer_id": lawyer.id, "expand": "lawyer"}))[process.id]
+    assert item["lawyer_name"] == lawyer.name and item["client_name"] is None
+
+    item = _by_id(client.get("/processes/", headers=admin_headers, params={"lawyer_id": lawyer.id}))[process.id]
+    assert (item["lawyer_name"], item["lawyer_oab"], item["client_name"]) == (None, None, None)
+
+
+def test_invalid_expand_is_rejected(client, admin_headers):
+    response = client.get("/processes/", headers=admin_headers, params={"expand": "lawyer,cliente"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Valor inválido em expand: cliente. Use: lawyer, client."
+
+
+def test_single_and_archived_processes_expand(client, admin_headers, db, lawyer_and_client, make_process):
+    lawyer, customer = lawyer_and_client
+    process = make_process(lawyer, customer)
+    archived = make_process(lawyer, customer, status="concluído", data_conclusao_real=date(2020, 1, 1))
+    archived_id = archived.id
+    db.expunge(archived)
+    archive_concluded_processes(db)
+
+    for process_id in (process.id, archived_id):
+        response = client.get(f"/processes/{process_id}", headers=admin_headers, params={"expand": "client,lawyer"})
+        assert response.status_code == 200, response.text
+        assert (response.json()["lawyer_name"], response.json()["client_name"]) == (lawyer.name, customer.name)
+
+    items = _by_id(client.get("/processes/", headers=admin_headers, params={
+        "lawyer_id": lawyer.id, "include_archived": True, "expand": "client",
+    }))
+    assert set(items) == {process.id, archived_id}
+    assert {item["client_name"] for item in items.values()} == {customer.name}
@@ -0,0 +1,77 @@
+"""
+Índice de processos em memória (core/process_index.py): depois de cada commit, o índice está na
+versão gravada e devolve o mesmo que o banco, inclusive com SAVEPOINTs liberados ou desfeitos.
+"""
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from core.process_index import process_index
+from models.data_version import get_data_version
+from models.legal_process import LegalProcessDB
+
+
+@pytest.fixture
+def index(db, lawyer_and_client):
+    process_index.enabled = True
+    process_index.load()
+    yield process_index
+    process_index.enabled = False
+
+
+def _process(lawyer, client, number: str, **values) -> LegalProcessDB:
+    return LegalProcessDB(process_number=number, lawyer_id=lawyer.id, client_id=client.id, entry_date=date(2025, 1, 1),
+                          delivery_deadline=date(2025, 2, 1), fatal_deadline=date(2025, 2, 5), **values)
+
+
+def _assert_index_matches_db(db, lawyer):
+    version = get_data_version(db)
+    indexed = process_index.search(version, set(), lawyer_id=lawyer.id, client_id=None, status=None, action_type=None,
+                                   fatal_from=None, fatal_to=None)
+    assert indexed is not None, "o índice deveria estar na versão do banco"
+    stored = db.query(LegalProcessDB).filter(LegalProcessDB.lawyer_id == lawyer.id).order_by(LegalProcessDB.id).all()
+    assert [(p.process_number, p.status) for p in indexed] == [(p.process_number, p.status) for p in stored]
+
+
+def test_commit_is_applied_to_the_index(db, lawyer_and_client, index):
+    lawyer, client = lawyer_and_client
+    db.add(_process(lawyer, client, f"IX-{uuid4().hex[:8]}"))
+    db.commit()
+    _assert_index_matches_db(db, lawyer)
+
+
+def test_released_savepoint_of_rolled_back_transaction_is_not_indexed(db, lawyer_and_client, index):
+    lawyer, client = lawyer_and_client
+    process = _process(lawyer, client, f"IX-{uuid4().hex[:8]}", status="ativo")
+    db.add(process)
+    db.commit()
+
+    process.status = "suspenso"
+    db.flush()
+    with db.begin_nested():
+        db.add(_process(lawyer, client, f"PHANTOM-{uuid4().hex[:8]}"))
+    db.rollback()
+
+    # Commits seguintes avançam o banco e o índice juntos; o processo desfeito não pode aparecer.
+    db.add(_process(lawyer, client, f"IX-{uuid4().hex[:8]}"))
+    db.commit()
+    _assert_index_matches_db(db, lawyer)
+    assert not any(p.process_number.startswith("PHANTOM") for p in db.query(LegalProcessDB).filter(LegalProcessDB.lawyer_id == lawyer.id))
+
+
+def test_rolled_back_savepoint_keeps_earlier_changes(db, lawyer_and_client, index):
+    lawyer, client = lawyer_and_client
+    process = _process(lawyer, client, f"IX-{uuid4().hex[:8]}", status="ativo")
+    db.add(process)
+    db.commit()
+
+    process.status = "suspenso"
+    db.flush()
+    savepoint = db.begin_nested()
+    db.add(_process(lawyer, client, f"IX-{uuid4().hex[:8]}"))
+    db.flush()
+    savepoint.rollback()
+    db.commit()
+    _assert_index_matches_db(db, lawyer)
+
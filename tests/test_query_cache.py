@@ -0,0 +1,63 @@
+"""
+Cache das consultas de processos (core/query_cache.py): a resposta de GET /processes/ é reutilizada
+enquanto a versão dos dados não muda, e qualquer escrita em processos ou clientes a invalida.
+"""
+from datetime import date
+
+from core.query_cache import normalize_filters
+from models.client import AreaOfExpertiseEnum
+
+
+def test_normalize_filters_ignores_empty_values_and_order():
+    assert normalize_filters(status="ativo", lawyer_id=None, client_id=3, expand=set()) == (("client_id", 3), ("status", "ativo"))
+    assert normalize_filters(expand={"lawyer", "client"}) == normalize_filters(expand=["client", "lawyer"])
+
+
+def _list(client, admin_headers, **params):
+    response = client.get("/processes/", headers=admin_headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.headers["X-Cache"], response.json()
+
+
+def test_processes_cache_is_invalidated_by_writes(client, admin_headers, db, lawyer_and_client, make_process):
+    lawyer, customer = lawyer_and_client
+    process = make_process(lawyer, customer)
+
+    assert _list(client, admin_headers, lawyer_id=lawyer.id)[0] == "MISS"
+    cache, body = _list(client, admin_headers, lawyer_id=lawyer.id)
+    assert cache == "HIT" and [item["id"] for item in body] == [process.id]
+    # Outros filtros têm entradas próprias.
+    assert _list(client, admin_headers, lawyer_id=lawyer.id, status="concluído") == ("MISS", [])
+
+    # Escrita pela API.
+    payload = {"process_number": process.process_number, "lawyer_id": lawyer.id, "client_id": customer.id,
+               "entry_date": "2025-01-01", "delivery_deadline": "2025-03-01", "fatal_deadline": "2025-03-05"}
+    response = client.put(f"/processes/{process.id}", headers=admin_headers, json=payload)
+    assert response.status_code == 200, response.text
+    cache, body = _list(client, admin_headers, lawyer_id=lawyer.id)
+    assert cache == "MISS" and body[0]["delivery_deadline"] == "2025-03-01"
+    assert _list(client, admin_headers, lawyer_id=lawyer.id)[0] == "HIT"
+
+    # Escrita direta pelo ORM, em outra sessão.
+    created = make_process(lawyer, customer, entry_date=date(2025, 1, 2))
+    cache, body = _list(client, admin_headers, lawyer_id=lawyer.id)
+    assert cache == "MISS" and {item["id"] for item in body} == {process.id, created.id}
+
+    # Dados embutidos de outra tabela (cliente) também invalidam.
+    _list(client, admin_headers, lawyer_id=lawyer.id, expand="client")
+    customer.area_of_expertise = AreaOfExpertiseEnum.AMBIENTAL
+    customer.name = "Cliente renomeado"
+    db.commit()
+    cache, body = _list(client, admin_headers, lawyer_id=lawyer.id, expand="client")
+    assert cache == "MISS" and {item["client_name"] for item in body} == {"Cliente renomeado"}
+
+
+def test_rolled_back_write_keeps_cache(client, admin_headers, db, lawyer_and_client, make_process):
+    lawyer, customer = lawyer_and_client
+    process = make_process(lawyer, customer)
+    _list(client, admin_headers, lawyer_id=lawyer.id)
+
+    process.status = "concluído"
+    db.flush()
+    db.rollback()
+    assert _list(client, admin_headers, lawyer_id=lawyer.id)[0] == "HIT"
@@ -0,0 +1,51 @@
+"""
+Reatribuição em massa (POST /admin/processes/reassign): simulação (dry_run), UPDATE único e aviso
+ao advogado de destino no outbox.
+"""
+from models.legal_process import LegalProcessDB
+from models.outbox import OutboxMessageDB
+
+
+def _lawyers_of(db, processes):
+    db.expire_all()
+    return [db.get(LegalProcessDB, process.id).lawyer_id for process in processes]
+
+
+def test_dry_run_counts_without_changing(client, admin_headers, db, lawyer_and_client, make_lawyer, make_process):
+    source, customer = lawyer_and_client
+    target = make_lawyer()
+    processes = [make_process(source, customer), make_process(source, customer), make_process(source, customer, status="concluído")]
+
+    response = client.post("/admin/processes/reassign", headers=admin_headers, json={
+        "from_lawyer_id": source.id, "to_lawyer_id": target.id, "status": "ativo", "dry_run": True,
+    })
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {"dry_run": True, "matched": 2, "updated": 0}
+    assert _lawyers_of(db, processes) == [source.id] * 3
+
+
+def test_reassign_updates_matching_processes_and_notifies_target(client, admin_headers, db, lawyer_and_client, make_lawyer,
+                                                                 make_process):
+    source, customer = lawyer_and_client
+    target = make_lawyer(telegram_id="555001")
+    processes = [make_process(source, customer), make_process(source, customer), make_process(source, customer, status="concluído")]
+
+    response = client.post("/admin/processes/reassign", headers=admin_headers, json={
+        "from_lawyer_id": source.id, "to_lawyer_id": target.id, "status": "ativo",
+    })
+
+    assert response.json() == {"dry_run": False, "matched": 2, "updated": 2}
+    assert _lawyers_of(db, processes) == [target.id, target.id, source.id]
+    messages = db.query(OutboxMessageDB).filter(OutboxMessageDB.recipient == "555001").all()
+    assert len(messages) == 1
+    assert messages[0].body.startswith("📌 2 PROCESSO(S) ATRIBUÍDO(S) A VOCÊ")
+    assert all(process.process_number in messages[0].body for process in processes[:2])
+
+
+def test_reassign_requires_a_filter_and_an_existing_target(client, admin_headers, lawyer_and_client):
+    source, _ = lawyer_and_client
+    assert client.post("/admin/processes/reassign", headers=admin_headers, json={"to_lawyer_id": source.id}).status_code == 400
+    response = client.post("/admin/processes/reassign", headers=admin_headers,
+                           json={"from_lawyer_id": source.id, "to_lawyer_id": 10 ** 9})
+    assert response.status_code == 404
@@ -0,0 +1,89 @@
+"""
+Refresh tokens com rotação (core/refresh_tokens.py, POST /auth/refresh e /auth/logout): cada
+token vale uma renovação e a reutilização de um token já trocado encerra a sessão.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+import core.refresh_tokens as refresh_tokens
+from core.refresh_tokens import _hash_token, issue_refresh_token, purge_expired_refresh_tokens
+from models.refresh_token import RefreshTokenDB
+
+
+@pytest.fixture
+def session_token(db, make_lawyer):
+    """Refresh token de um advogado novo (OAB e nickname válidos para /auth/users/me)."""
+    number = uuid4().int
+    lawyer = make_lawyer(oab=f"{number % 10**6:06d}RT", username=f"rt{uuid4().hex[:10]}")
+    token = issue_refresh_token(db, lawyer.id)
+    db.commit()
+    return lawyer, token
+
+
+def _refresh(client, token):
+    return client.post("/auth/refresh", json={"refresh_token": token})
+
+
+def test_login_returns_refresh_token(client):
+    response = client.post("/auth/token", data={"username": "admin", "password": "admin"})
+    assert response.status_code == 200
+    refreshed = _refresh(client, response.json()["refresh_token"])
+    assert refreshed.status_code == 200, refreshed.text
+
+
+def test_refresh_rotates_token(client, session_token):
+    lawyer, token = session_token
+    response = _refresh(client, token)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["refresh_token"] != token and body["token_type"] == "bearer"
+
+    me = client.get("/auth/users/me", headers={"Authorization": f"Bearer {body['access_token']}"})
+    assert me.status_code == 200 and me.json()["id"] == lawyer.id
+    assert _refresh(client, body["refresh_token"]).status_code == 200
+
+
+def test_concurrent_reuse_is_refused_without_revoking(client, session_token):
+    _, token = session_token
+    successor = _refresh(client, token).json()["refresh_token"]
+
+    response = _refresh(client, token)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Refresh token já renovado."
+    assert _refresh(client, successor).status_code == 200
+
+
+def test_reuse_after_grace_revokes_session(client, db, session_token, monkeypatch):
+    _, token = session_token
+    successor = _refresh(client, token).json()["refresh_token"]
+    monkeypatch.setattr(refresh_tokens, "REFRESH_TOKEN_REUSE_GRACE_SECONDS", -1)
+
+    response = _refresh(client, token)
+    assert response.status_code == 401
+    assert response.json()["detail"].startswith("Refresh token reutilizado.")
+    assert _refresh(client, successor).status_code == 401
+    family = db.query(RefreshTokenDB).filter(RefreshTokenDB.token_hash == _hash_token(token)).one().family_id
+    assert db.query(RefreshTokenDB).filter(RefreshTokenDB.family_id == family, RefreshTokenDB.revoked_at.is_(None)).count() == 0
+
+
+def test_logout_revokes_session(client, session_token):
+    _, token = session_token
+    successor = _refresh(client, token).json()["refresh_token"]
+    assert client.post("/auth/logout", json={"refresh_token": successor}).status_code == 204
+    assert _refresh(client, successor).status_code == 401
+    assert client.post("/auth/logout", json={"refresh_token": "desconhecido"}).status_code == 204
+
+
+def test_expired_token_is_rejected_and_purged(client, db, session_token):
+    _, token = session_token
+    record = db.query(RefreshTokenDB).filter(RefreshTokenDB.token_hash == _hash_token(token)).one()
+    record.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+
+    response = _refresh(client, token)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Refresh token inválido ou expirado."
+    assert purge_expired_refresh_tokens(db) >= 1
+    assert db.query(RefreshTokenDB).filter(RefreshTokenDB.token_hash == _hash_token(token)).first() is None
@@ -0,0 +1,98 @@
+"""
+Relatórios assíncronos (core/reports.py, routers/reports.py): pedido pela API, geração pelo
+worker com progresso, download do arquivo e novas tentativas em caso de falha.
+"""
+import csv
+import io
+from datetime import date
+
+import pytest
+
+import core.reports as reports
+from core.reports import claim_report_jobs, generate_report
+from models.report_job import ReportJobDB, ReportStatusEnum
+
+WORKER_ID = "worker-relatorios-teste"
+
+
+@pytest.fixture(autouse=True)
+def reports_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(reports, "REPORTS_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _request(client, admin_headers, **payload):
+    response = client.post("/reports/", json=payload, headers=admin_headers)
+    assert response.status_code == 202, response.text
+    return response.json()
+
+
+def _run(db, report_id):
+    """Reserva os pedidos pendentes e gera o relatório `report_id` (os demais voltam para a fila)."""
+    claimed = claim_report_jobs(db, WORKER_ID, limit=100)
+    assert report_id in claimed
+    db.query(ReportJobDB).filter(ReportJobDB.id.in_(claimed), ReportJobDB.id != report_id).update(
+        {ReportJobDB.status: ReportStatusEnum.PENDENTE.value, ReportJobDB.locked_by: None}, synchronize_session=False
+    )
+    db.commit()
+    return generate_report(report_id, WORKER_ID)
+
+
+def _download_rows(client, admin_headers, report_id):
+    response = client.get(f"/reports/{report_id}/download", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/csv")
+    return list(csv.reader(io.StringIO(response.content.decode("utf-8-sig")), delimiter=";"))
+
+
+def test_portfolio_report_pages_and_downloads(client, admin_headers, db, lawyer_and_client, make_process, monkeypatch):
+    lawyer, customer = lawyer_and_client
+    created = [make_process(lawyer, customer) for _ in range(5)]
+    monkeypatch.setattr(reports, "REPORT_PAGE_SIZE", 2)
+
+    job = _request(client, admin_headers, report_type="lawyer_portfolio", lawyer_id=lawyer.id)
+    assert job["status"] == "pendente" and job["download_url"] is None
+    assert client.get(f"/reports/{job['id']}/download", headers=admin_headers).status_code == 409
+
+    assert _run(db, job["id"]) == 5
+    status = client.get(f"/reports/{job['id']}", headers=admin_headers).json()
+    assert status["status"] == "concluido"
+    assert (status["rows_written"], status["total_rows"], status["progress"]) == (5, 5, 1.0)
+    assert status["download_url"] == f"/reports/{job['id']}/download"
+
+    header, *rows = _download_rows(client, admin_headers, job["id"])
+    assert header[:2] == ["ID", "Número do Processo"]
+    assert [int(row[0]) for row in rows] == [process.id for process in created]
+    assert {row[8] for row in rows} == {"01/01/2025"}
+
+
+def test_late_report_lists_only_late_processes(client, admin_headers, db, lawyer_and_client, make_process):
+    lawyer, customer = lawyer_and_client
+    late = make_process(lawyer, customer, delivery_deadline=date(2025, 2, 1), status="concluído", data_conclusao_real=date(2025, 2, 4))
+    make_process(lawyer, customer, delivery_deadline=date(2025, 2, 1), status="concluído", data_conclusao_real=date(2025, 1, 30))
+    make_process(lawyer, customer, delivery_deadline=date(2999, 1, 1))
+
+    job = _request(client, admin_headers, report_type="late_processes", lawyer_id=lawyer.id)
+    assert _run(db, job["id"]) == 1
+    header, *rows = _download_rows(client, admin_headers, job["id"])
+    assert header[-1] == "Dias de Atraso"
+    assert [(int(row[0]), row[-1]) for row in rows] == [(late.id, "3")]
+
+
+def test_failed_generation_is_retried_then_given_up(client, admin_headers, db, lawyer_and_client, make_process, monkeypatch, reports_dir):
+    lawyer, customer = lawyer_and_client
+    make_process(lawyer, customer)
+
+    def broken_writer(report_format, path):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(reports, "_open_writer", broken_writer)
+    job = _request(client, admin_headers, report_type="lawyer_portfolio", lawyer_id=lawyer.id)
+    for expected_status in ("pendente", "falhou"):
+        with pytest.raises(OSError):
+            _run(db, job["id"])
+        db.expire_all()
+        stored = db.get(ReportJobDB, job["id"])
+        assert stored.status == expected_status
+        assert stored.locked_by is None and "disco cheio" in stored.error
+    assert list(reports_dir.iterdir()) == []
@@ -0,0 +1,108 @@
+"""
+Serialização e compressão das respostas (core/responses.py): negociação do Accept-Encoding,
+tamanho mínimo, respostas em streaming e formatos já comprimidos.
+"""
+import gzip
+import json
+from datetime import date, datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from core.responses import CompressionMiddleware, FastJSONResponse, negotiate_encoding
+
+BIG_BODY = b"processo;" * 500
+
+
+@pytest.fixture(scope="module")
+def compressed_client():
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/big")
+    def big():
+        return Response(BIG_BODY, media_type="text/plain")
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([BIG_BODY[:100], BIG_BODY[100:]]), media_type="text/plain")
+
+    @app.get("/xlsx")
+    def xlsx():
+        return Response(BIG_BODY, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("deflate, *;q=0.1", "br"),
+    ("gzip;q=abc, br", "br"),
+])
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding, ["br", "gzip"]) == expected
+
+
+def test_negotiate_encoding_without_brotli():
+    assert negotiate_encoding("br, gzip;q=0.5", ["gzip"]) == "gzip"
+    assert negotiate_encoding("br", ["gzip"]) is None
+
+
+def _raw(client, path, accept_encoding):
+    """Corpo como enviado pelo servidor (sem a descompressão automática do cliente HTTP)."""
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_large_response_is_gzipped(compressed_client):
+    response, body = _raw(compressed_client, "/big", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(body) < len(BIG_BODY)
+    assert gzip.decompress(body) == BIG_BODY
+
+
+def test_brotli_is_preferred_when_installed(compressed_client):
+    brotli = pytest.importorskip("brotli")
+    response, body = _raw(compressed_client, "/big", "gzip, br")
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(body) == BIG_BODY
+
+
+def test_small_or_unaccepted_responses_are_not_compressed(compressed_client):
+    response, body = _raw(compressed_client, "/small", "gzip")
+    assert "content-encoding" not in response.headers
+    assert json.loads(body) == {"ok": True}
+
+    response, body = _raw(compressed_client, "/big", "identity")
+    assert "content-encoding" not in response.headers and body == BIG_BODY
+
+
+def test_streaming_response_is_compressed_in_chunks(compressed_client):
+    response, body = _raw(compressed_client, "/stream", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(body) == BIG_BODY
+
+
+def test_already_compressed_formats_pass_through(compressed_client):
+    response, body = _raw(compressed_client, "/xlsx", "gzip")
+    assert "content-encoding" not in response.headers and body == BIG_BODY
+
+
+def test_fast_json_response_matches_default_encoding():
+    content = {"data": date(2025, 2, 1).isoformat(), "criado": datetime(2025, 2, 1, 10, 30).isoformat(), "nome": "Ação",
+               "valores": [1, 2.5, None], "por_id": {1: "a"}}
+    assert json.loads(FastJSONResponse(content).body) == json.loads(JSONResponse(content).body)
@@ -0,0 +1,61 @@
+"""
+Agregados de processos (core/rollups.py): o processamento incremental das alterações registradas
+deve produzir as mesmas linhas que a reconstrução completa.
+"""
+from datetime import date
+
+from core.rollups import mark_processes_changed, rebuild_process_rollups, refresh_process_rollups
+from models.legal_process import LegalProcessDB
+from models.process_rollup import ProcessDailyRollupDB, ProcessMonthlyRollupDB
+
+
+def _rollup_rows(db, lawyer_ids):
+    """Linhas diárias e mensais dos advogados, sem depender da ordem."""
+    db.expire_all()
+    rows = {}
+    for model, period in ((ProcessDailyRollupDB, "day"), (ProcessMonthlyRollupDB, "month")):
+        rows[period] = sorted(
+            (getattr(row, period), row.lawyer_id, row.area_of_expertise, row.action_type, row.status,
+             row.opened_count, row.concluded_count, row.late_count, row.slippage_days_sum)
+            for row in db.query(model).filter(model.lawyer_id.in_(lawyer_ids))
+        )
+    return rows
+
+
+def test_incremental_refresh_matches_rebuild(db, lawyer_and_client, make_lawyer, make_process):
+    lawyer, customer = lawyer_and_client
+    other_lawyer = make_lawyer()
+    lawyer_ids = [lawyer.id, other_lawyer.id]
+    late = make_process(lawyer, customer, entry_date=date(2025, 1, 10), delivery_deadline=date(2025, 2, 1))
+    on_time = make_process(lawyer, customer, entry_date=date(2025, 1, 10), delivery_deadline=date(2025, 3, 1))
+    removed = make_process(lawyer, customer, entry_date=date(2025, 1, 20))
+    moved = make_process(lawyer, customer, entry_date=date(2025, 2, 3))
+    refresh_process_rollups(db)
+    assert _rollup_rows(db, lawyer_ids) != {"day": [], "month": []}
+
+    late.status, late.data_conclusao_real = "concluído", date(2025, 2, 11)
+    on_time.status, on_time.data_conclusao_real = "concluído", date(2025, 2, 20)
+    db.delete(removed)
+    db.commit()
+    # Escrita em massa: não dispara os eventos do ORM.
+    mark_processes_changed(db, LegalProcessDB.id == moved.id)
+    db.query(LegalProcessDB).filter(LegalProcessDB.id == moved.id).update(
+        {LegalProcessDB.lawyer_id: other_lawyer.id}, synchronize_session=False
+    )
+    db.commit()
+
+    refresh_process_rollups(db)
+    incremental = _rollup_rows(db, lawyer_ids)
+    # As entradas recentes (abaixo do tempo de acomodação) são reprocessadas sem efeito.
+    refresh_process_rollups(db)
+    assert _rollup_rows(db, lawyer_ids) == incremental
+
+    rebuild_process_rollups(db)
+    assert _rollup_rows(db, lawyer_ids) == incremental
+
+    concluded = [row for row in incremental["day"] if row[0] == date(2025, 2, 11)]
+    assert [row[6:] for row in concluded] == [(1, 1, 10)]
+    assert not any(row[1] == lawyer.id and row[0] == date(2025, 2, 3) for row in incremental["day"])
+    assert any(row[1] == other_lawyer.id and row[0] == date(2025, 2, 3) for row in incremental["day"])
+    january = [row for row in incremental["month"] if row[0] == date(2025, 1, 1)]
+    assert sum(row[5] for row in january) == 2
@@ -0,0 +1,25 @@
+"""
+Jobs agendados (core/scheduler.py): dedup_keys diárias na data do fuso dos gatilhos.
+"""
+from datetime import datetime, timezone
+
+import core.scheduler as scheduler
+from models.job_queue import JobDB
+
+
+class _FrozenDatetime(datetime):
+    """23:30 em UTC: ainda 20:30 do mesmo dia em America/Sao_Paulo."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return datetime(2031, 3, 10, 23, 30, tzinfo=timezone.utc).astimezone(tz)
+
+
+def test_daily_dedup_key_uses_scheduler_timezone(db, monkeypatch):
+    monkeypatch.setattr(scheduler, "datetime", _FrozenDatetime)
+    assert scheduler.scheduler_today().isoformat() == "2031-03-10"
+
+    scheduler.daily_deadlines_job()
+    scheduler.daily_deadlines_job() # Segundo disparo (misfire): mesma chave, nada novo na fila
+    keys = [key for (key,) in db.query(JobDB.dedup_key).filter(JobDB.dedup_key.like("daily_deadlines:2031-03-1%"))]
+    assert keys == ["daily_deadlines:2031-03-10"]
@@ -0,0 +1,97 @@
+"""
+Frontend com impressão digital e pré-compressão (core/static_assets.py): geração incremental dos
+arquivos, referências reescritas no HTML e cabeçalhos de cache e de codificação ao servir.
+"""
+import gzip
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.static_assets import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, FingerprintedStaticFiles, build_static_assets
+
+SCRIPT = b"console.log('processos');\n" * 80
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    source = tmp_path / "fonte"
+    source.mkdir()
+    (source / "script.js").write_bytes(SCRIPT)
+    (source / "style.css").write_bytes(b"body { margin: 0; }\n")
+    (source / "index.html").write_text(
+        '<link href="/frontend/style.css"><script src="script.js"></script><a href="outro.html"></a>', encoding="utf-8"
+    )
+    return source
+
+
+def _client(build_dir, fallback_dir=None):
+    app = FastAPI()
+    app.mount("/frontend", FingerprintedStaticFiles(directory=str(build_dir), fallback_directory=fallback_dir), name="frontend")
+    return TestClient(app)
+
+
+def test_build_fingerprints_and_rewrites_html(source_dir, tmp_path):
+    build = tmp_path / "build"
+    manifest = build_static_assets(str(source_dir), str(build))
+    assert set(manifest) == {"script.js", "style.css"}
+    assert manifest["script.js"].startswith("script.") and manifest["script.js"].endswith(".js")
+
+    html = (build / "index.html").read_text(encoding="utf-8")
+    assert f'href="/frontend/{manifest["style.css"]}"' in html and f'src="{manifest["script.js"]}"' in html
+    assert 'href="outro.html"' in html
+
+    assert gzip.decompress((build / (manifest["script.js"] + ".gz")).read_bytes()) == SCRIPT
+    assert not (build / (manifest["style.css"] + ".gz")).exists() # Pequeno demais para comprimir
+    assert (build / "script.js").read_bytes() == SCRIPT # Nome original mantido para páginas antigas
+
+
+def test_rebuild_only_rewrites_changed_files(source_dir, tmp_path):
+    build = tmp_path / "build"
+    manifest = build_static_assets(str(source_dir), str(build))
+    hashed = build / manifest["script.js"]
+    written_at = os.stat(hashed).st_mtime_ns
+    os.utime(hashed, ns=(written_at - 10**9, written_at - 10**9))
+
+    assert build_static_assets(str(source_dir), str(build)) == manifest
+    assert os.stat(hashed).st_mtime_ns == written_at - 10**9
+
+    (source_dir / "script.js").write_bytes(SCRIPT + b"// alterado\n")
+    changed = build_static_assets(str(source_dir), str(build))
+    assert changed["script.js"] != manifest["script.js"]
+    assert changed["script.js"] in (build / "index.html").read_text(encoding="utf-8")
+
+
+def test_serves_precompressed_variant_with_immutable_cache(source_dir, tmp_path):
+    build = tmp_path / "build"
+    manifest = build_static_assets(str(source_dir), str(build))
+    client = _client(build)
+
+    response = client.get(f"/frontend/{manifest['script.js']}", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200 and response.content == SCRIPT
+    assert response.headers["content-encoding"] == "gzip"
+    assert "javascript" in response.headers["content-type"]
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    response = client.get(f"/frontend/{manifest['script.js']}", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers and response.content == SCRIPT
+
+
+def test_html_is_revalidated(source_dir, tmp_path):
+    build = tmp_path / "build"
+    build_static_assets(str(source_dir), str(build))
+    client = _client(build)
+
+    response = client.get("/frontend/index.html")
+    assert response.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+    revalidated = client.get("/frontend/index.html", headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+def test_fallback_directory_serves_original_files(source_dir, tmp_path):
+    client = _client(tmp_path / "build_vazio", fallback_dir=str(source_dir))
+    response = client.get("/frontend/style.css")
+    assert response.status_code == 200 and response.content == b"body { margin: 0; }\n"
+    assert response.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
@@ -0,0 +1,41 @@
+"""
+Cache do usuário autenticado (core/security.py): alterações de advogados removem a entrada do
+cache no commit, inclusive quando um SAVEPOINT foi desfeito depois da alteração.
+"""
+from uuid import uuid4
+
+from sqlalchemy.exc import IntegrityError
+
+from core.cache import get_cache
+from core.security import _user_cache_key
+from models.lawyer import LawyerDB
+
+
+def test_lawyer_change_invalidates_cache_despite_failed_savepoint(db, lawyer_and_client):
+    lawyer, _ = lawyer_and_client
+    key = _user_cache_key(lawyer.oab)
+    get_cache().set(key, b"{}", 60)
+
+    lawyer.name = "Nome novo"
+    db.flush()
+    try:
+        with db.begin_nested():
+            db.add(LawyerDB(name="Duplicado", oab=lawyer.oab, email=f"{uuid4().hex[:8]}@example.com",
+                            username=f"dup_{uuid4().hex[:8]}", hashed_password="-"))
+    except IntegrityError:
+        pass
+    db.commit()
+
+    assert get_cache().get(key) is None
+
+
+def test_rolled_back_transaction_keeps_cache(db, lawyer_and_client):
+    lawyer, _ = lawyer_and_client
+    key = _user_cache_key(lawyer.oab)
+    get_cache().set(key, b"{}", 60)
+
+    with db.begin_nested():
+        lawyer.name = "Nome desfeito"
+    db.rollback()
+
+    assert get_cache().get(key) == b"{}"
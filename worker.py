@@ -0,0 +1,416 @@
+"""
+Worker de background: executa os jobs da fila durável (tabela job_queue) fora dos processos da API.
+
+Uso:
+    python -m worker
+
+Vários workers podem rodar em paralelo (inclusive em máquinas diferentes): todos consomem a fila,
+reservando jobs com SELECT ... FOR UPDATE SKIP LOCKED, e apenas o líder eleito (lease no banco,
+ver core/scheduler.py) roda o scheduler que enfileira os jobs periódicos e o polling do bot do Telegram.
+Os relatórios (tabela report_jobs) têm um consumo próprio, executado em um pool de processos.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from database import SessionLocal, engine
+# Importa todos os modelos para que os mappers (relacionamentos e eventos) estejam configurados.
+from models import lawyer, client, legal_process, deadline_calendar, notification_ledger, outbox, scheduler_lease, job_queue, lawyer_delay_stats, legal_process_archive, process_rollup, report_job, data_version, refresh_token, action_type # noqa
+from models.job_queue import JobTypeEnum
+from core.job_queue import claim_jobs, complete_job, fail_job, requeue_stale_jobs
+from core.outbox import drain_outbox, OUTBOX_BATCH_SIZE
+from core.reports import REPORT_PROCESS_POOL_SIZE, claim_report_jobs, generate_report
+from core.scheduler import LeaderElection, create_scheduler, register_scheduled_jobs
+
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logging.getLogger('apscheduler').setLevel(logging.WARNING)
+logger = logging.getLogger("worker")
+
+try:
+    WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "4"))
+except ValueError:
+    logger.error("WORKER_CONCURRENCY inválido. Usando padrão de 4.")
+    WORKER_CONCURRENCY = 4
+
+try:
+    WORKER_POLL_INTERVAL_SECONDS = float(os.getenv("WORKER_POLL_INTERVAL_SECONDS", "5"))
+except ValueError:
+    logger.error("WORKER_POLL_INTERVAL_SECONDS inválido. Usando padrão de 5 segundos.")
+    WORKER_POLL_INTERVAL_SECONDS = 5.0
+
+# Intervalo entre varreduras de jobs abandonados (worker morto no meio da execução).
+STALE_JOBS_CHECK_SECONDS = 60
+
+
+class Worker:
+    """Consumidor da fila de jobs; no worker líder, também scheduler e polling do Telegram."""
+
+    def __init__(self, concurrency: int = WORKER_CONCURRENCY, poll_interval: float = WORKER_POLL_INTERVAL_SECONDS):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.telegram_app = None
+        self.bot = None
+        self.scheduler = None
+        self.leader_election: Optional[LeaderElection] = None
+        self._telegram_polling = False
+        self._consumer_task: Optional[asyncio.Task] = None
+        self._drain_task: Optional[asyncio.Task] = None
+        self._reports_task: Optional[asyncio.Task] = None
+        self._report_pool: Optional[ProcessPoolExecutor] = None
+        self._running_reports: Set[asyncio.Task] = set()
+        self._handlers: Dict[str, Callable[[dict], Awaitable[None]]] = {
+            JobTypeEnum.DAILY_DEADLINES.value: self._run_daily_deadlines,
+            JobTypeEnum.UPCOMING_FATAL_DEADLINES.value: self._run_upcoming_fatal_deadlines,
+            JobTypeEnum.REFRESH_DELAY_STATISTICS.value: self._run_refresh_delay_statistics,
+            JobTypeEnum.ARCHIVE_CONCLUDED_PROCESSES.value: self._run_archive_concluded_processes,
+            JobTypeEnum.REFRESH_PROCESS_ROLLUPS.value: self._run_refresh_process_rollups,
+            JobTypeEnum.CLEANUP_REPORTS.value: self._run_cleanup_reports,
+            JobTypeEnum.PURGE_REFRESH_TOKENS.value: self._run_purge_refresh_tokens,
+            JobTypeEnum.PURGE_FINISHED_JOBS.value: self._run_purge_finished_jobs,
+        }
+
+    # --- Handlers dos jobs ---
+    # As varreduras de prazos apenas gravam os alertas no outbox (sessão curta, em thread);
+    # o envio fica com o drainer do outbox (_drain), em qualquer worker com bot disponível.
+    async def _run_daily_deadlines(self, payload: dict) -> None:
+        from core.notifications import enqueue_daily_deadline_notifications, run_notification_producer
+        await asyncio.to_thread(run_notification_producer, enqueue_daily_deadline_notifications)
+
+    async def _run_upcoming_fatal_deadlines(self, payload: dict) -> None:
+        from core.notifications import enqueue_upcoming_fatal_deadline_notifications, run_notification_producer
+        await asyncio.to_thread(run_notification_producer, enqueue_upcoming_fatal_deadline_notifications)
+
+    async def _run_refresh_delay_statistics(self, payload: dict) -> None:
+        from core.analytics import refresh_lawyer_delay_statistics
+
+        def refresh():
+            db = SessionLocal()
+            try:
+                stats = refresh_lawyer_delay_statistics(db)
+                logger.info(f"Estatísticas de atraso recalculadas para {len(stats)} advogado(s).")
+            finally:
+                db.close()
+
+        await asyncio.to_thread(refresh)
+
+    async def _run_archive_concluded_processes(self, payload: dict) -> None:
+        from core.archive import archive_concluded_processes
+
+        def archive():
+            db = SessionLocal()
+            try:
+                archived = archive_concluded_processes(db)
+                logger.info(f"Arquivamento concluído: {archived} processo(s) movido(s) para o arquivo.")
+            finally:
+                db.close()
+
+        await asyncio.to_thread(archive)
+
+    async def _run_refresh_process_rollups(self, payload: dict) -> None:
+        from core.rollups import rebuild_process_rollups, refresh_process_rollups
+
+        def refresh():
+            db = SessionLocal()
+            try:
+                # payload {"rebuild": true}: reconstrói os agregados do zero (ex.: após correções feitas direto no banco).
+                if (payload or {}).get("rebuild"):
+                    rebuild_process_rollups(db)
+                else:
+                    processed = refresh_process_rollups(db)
+                    if processed:
+                        logger.info(f"Agregados diários atualizados com {processed} alteração(ões).")
+            finally:
+                db.close()
+
+        await asyncio.to_thread(refresh)
+
+    async def _run_cleanup_reports(self, payload: dict) -> None:
+        from core.reports import cleanup_expired_reports
+
+        def cleanup():
+            db = SessionLocal()
+            try:
+                removed = cleanup_expired_reports(db)
+                if removed:
+                    logger.info(f"{removed} relatório(s) expirado(s) removido(s).")
+            finally:
+                db.close()
+
+        await asyncio.to_thread(cleanup)
+
+    async def _run_purge_refresh_tokens(self, payload: dict) -> None:
+        from core.refresh_tokens import purge_expired_refresh_tokens
+
+        def purge():
+            db = SessionLocal()
+            try:
+                removed = purge_expired_refresh_tokens(db)
+                if removed:
+                    logger.info(f"{removed} refresh token(s) expirado(s) removido(s).")
+            finally:
+                db.close()
+
+        await asyncio.to_thread(purge)
+
+    async def _run_purge_finished_jobs(self, payload: dict) -> None:
+        from core.job_queue import purge_finished_jobs
+        from core.outbox import purge_outbox_messages
+
+        def purge():
+            db = SessionLocal()
+            try:
+                jobs = purge_finished_jobs(db)
+                messages = purge_outbox_messages(db)
+                if jobs or messages:
+                    logger.info(f"Limpeza: {jobs} job(s) finalizado(s) e {messages} mensagem(ns) do outbox removido(s).")
+            finally:
+                db.close()
+
+        await asyncio.to_thread(purge)
+
+    # --- Telegram ---
+    async def _start_telegram(self) -> None:
+        from telegram_bot import create_telegram_application, register_command_handlers
+
+        self.telegram_app = create_telegram_application()
+        if not self.telegram_app:
+            logger.error("Failed to create Telegram application. Notifications will not be sent by this worker.")
+            return
+        register_command_handlers(self.telegram_app)
+        try:
+            await self.telegram_app.initialize()
+            self.bot = self.telegram_app.bot
+        except Exception as e:
+            logger.error(f"Error initializing Telegram application: {e}", exc_info=True)
+
+    async def _start_telegram_polling(self) -> None:
+        from telegram_bot import TELEGRAM_UPDATE_MODE, TELEGRAM_WEBHOOK_URL, TELEGRAM_WEBHOOK_SECRET
+
+        if not self.bot:
+            return
+        if TELEGRAM_UPDATE_MODE == "webhook":
+            # Os updates chegam pela rota /telegram/webhook da API; o líder apenas registra o webhook.
+            if not TELEGRAM_WEBHOOK_URL:
+                logger.error("TELEGRAM_UPDATE_MODE=webhook but TELEGRAM_WEBHOOK_URL is not set. Webhook not registered.")
+                return
+            try:
+                await self.bot.set_webhook(url=TELEGRAM_WEBHOOK_URL, secret_token=TELEGRAM_WEBHOOK_SECRET)
+                logger.info(f"Telegram webhook registered at {TELEGRAM_WEBHOOK_URL}.")
+            except Exception as e:
+                logger.error(f"Error registering Telegram webhook: {e}", exc_info=True)
+            return
+        try:
+            await self.telegram_app.updater.start_polling() # type: ignore
+            await self.telegram_app.start()
+            self._telegram_polling = True
+            logger.info("Telegram bot polling started on the leader worker.")
+        except Exception as e:
+            logger.error(f"Error starting Telegram bot polling: {e}", exc_info=True)
+
+    async def _stop_telegram_polling(self) -> None:
+        if not self._telegram_polling:
+            return
+        try:
+            if self.telegram_app.updater and self.telegram_app.updater.running: # type: ignore
+                await self.telegram_app.updater.stop() # type: ignore
+            if self.telegram_app.running:
+                await self.telegram_app.stop()
+            logger.info("Telegram bot polling stopped.")
+        except Exception as e:
+            logger.error(f"Error stopping Telegram bot polling: {e}", exc_info=True)
+        self._telegram_polling = False
+
+    # --- Liderança ---
+    async def _on_elected(self) -> None:
+        self.scheduler = create_scheduler()
+        register_scheduled_jobs(self.scheduler)
+        self.scheduler.start()
+        logger.info("Scheduler started on the leader worker.")
+        await self._start_telegram_polling()
+
+    async def _on_revoked(self) -> None:
+        if self.scheduler and self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+            logger.info("Scheduler shut down (leadership released).")
+        self.scheduler = None
+        await self._stop_telegram_polling()
+
+    # --- Consumo da fila ---
+    def _claim(self):
+        db = SessionLocal()
+        try:
+            jobs = claim_jobs(db, self.worker_id, limit=self.concurrency)
+            return [(job.id, job.job_type, job.payload or {}) for job in jobs]
+        finally:
+            db.close()
+
+    def _finish(self, job_id: int, error: Optional[BaseException]) -> None:
+        db = SessionLocal()
+        try:
+            if error is None:
+                complete_job(db, job_id)
+            else:
+                fail_job(db, job_id, error)
+        finally:
+            db.close()
+
+    def _requeue_stale(self) -> None:
+        db = SessionLocal()
+        try:
+            requeue_stale_jobs(db)
+        finally:
+            db.close()
+
+    async def _execute(self, job_id: int, job_type: str, payload: dict) -> None:
+        handler = self._handlers.get(job_type)
+        error = None
+        try:
+            if handler is None:
+                raise ValueError(f"Tipo de job desconhecido: '{job_type}'.")
+            logger.info(f"Executando job {job_id} ({job_type}).")
+            await handler(payload)
+        except Exception as e:
+            logger.error(f"Erro no job {job_id} ({job_type}): {e}", exc_info=True)
+            error = e
+        await asyncio.to_thread(self._finish, job_id, error)
+
+    async def _consume(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_stale_check = 0.0
+        while True:
+            try:
+                if loop.time() >= next_stale_check:
+                    await asyncio.to_thread(self._requeue_stale)
+                    next_stale_check = loop.time() + STALE_JOBS_CHECK_SECONDS
+                jobs = await asyncio.to_thread(self._claim)
+                if jobs:
+                    await asyncio.gather(*(self._execute(*job) for job in jobs))
+                if len(jobs) < self.concurrency:
+                    await asyncio.sleep(self.poll_interval) # Fila vazia: aguarda; fila cheia: busca o próximo lote já.
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro no consumo da fila de jobs: {e}", exc_info=True)
+                await asyncio.sleep(self.poll_interval)
+
+    async def _drain(self) -> None:
+        """Envia as mensagens do outbox; com lote cheio, busca o próximo sem esperar."""
+        while True:
+            try:
+                processed = await drain_outbox(self.bot, self.worker_id)
+                if processed < OUTBOX_BATCH_SIZE:
+                    await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro ao drenar o outbox de notificações: {e}", exc_info=True)
+                await asyncio.sleep(self.poll_interval)
+
+    # --- Relatórios ---
+    # Consumo separado da fila de jobs: um relatório grande levaria minutos e, no lote de _consume,
+    # seguraria os demais jobs. Cada relatório roda em um processo do pool (CPU da formatação
+    # fora do GIL do worker) e uma vaga livre é preenchida sem esperar os outros terminarem.
+    def _claim_reports(self, limit: int):
+        db = SessionLocal()
+        try:
+            return claim_report_jobs(db, self.worker_id, limit=limit)
+        finally:
+            db.close()
+
+    async def _generate_report(self, report_id: int) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            logger.info(f"Gerando relatório {report_id}.")
+            rows = await loop.run_in_executor(self._report_pool, generate_report, report_id, self.worker_id)
+            logger.info(f"Relatório {report_id} concluído ({rows} linha(s)).")
+        except Exception as e:
+            # A falha (nova tentativa ou status "falhou") já foi registrada pelo próprio generate_report.
+            logger.error(f"Erro ao gerar o relatório {report_id}: {e}")
+
+    async def _reports(self) -> None:
+        # "spawn": os processos filhos não herdam as conexões do pool do SQLAlchemy nem o event loop.
+        self._report_pool = ProcessPoolExecutor(max_workers=REPORT_PROCESS_POOL_SIZE, mp_context=multiprocessing.get_context("spawn"))
+        while True:
+            try:
+                free_slots = REPORT_PROCESS_POOL_SIZE - len(self._running_reports)
+                if free_slots > 0:
+                    for report_id in await asyncio.to_thread(self._claim_reports, free_slots):
+                        task = asyncio.create_task(self._generate_report(report_id))
+                        self._running_reports.add(task)
+                        task.add_done_callback(self._running_reports.discard)
+                await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro no consumo dos relatórios: {e}", exc_info=True)
+                await asyncio.sleep(self.poll_interval)
+
+    # --- Ciclo de vida ---
+    async def start(self) -> None:
+        await self._start_telegram()
+        self.leader_election = LeaderElection(on_elected=self._on_elected, on_revoked=self._on_revoked, holder=self.worker_id)
+        self.leader_election.start()
+        self._consumer_task = asyncio.create_task(self._consume())
+        if REPORT_PROCESS_POOL_SIZE > 0:
+            self._reports_task = asyncio.create_task(self._reports())
+        if self.bot:
+            self._drain_task = asyncio.create_task(self._drain())
+        else:
+            logger.warning("Sem bot do Telegram: este worker não drenará o outbox de notificações.")
+        logger.info(f"Worker {self.worker_id} started (concurrency={self.concurrency}).")
+
+    async def stop(self) -> None:
+        for task in (self._consumer_task, self._drain_task, self._reports_task, *self._running_reports):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if self._report_pool:
+            # Relatórios interrompidos continuam "executando" e voltam à fila após REPORT_LOCK_TIMEOUT.
+            self._report_pool.shutdown(wait=False, cancel_futures=True)
+        if self.leader_election:
+            await self.leader_election.stop()
+        if self.telegram_app:
+            try:
+                await self.telegram_app.shutdown()
+            except Exception as e:
+                logger.error(f"Error during Telegram application shutdown: {e}", exc_info=True)
+        logger.info(f"Worker {self.worker_id} stopped.")
+
+
+async def run_worker() -> None:
+    worker = Worker()
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError: # Windows
+            pass
+    await worker.start()
+    try:
+        await stop_event.wait()
+    finally:
+        await worker.stop()
+
+
+if __name__ == "__main__":
+    from migrations import check_schema_version
+    check_schema_version(engine)
+    asyncio.run(run_worker())